@@ -1,6 +1,7 @@
 
 """Main Streamlit application for public procurement document generation."""
 import streamlit as st
+import os
 import database
 import logging
 from config import (
@@ -21,20 +22,20 @@ from utils.validation_control import (
     render_step_validation_toggle, get_validation_status_message
 )
 from ui.controllers.form_controller import FormController
-from ui.admin_panel import render_admin_panel
-from ui.dashboard import render_dashboard
 from ui.form_styles import apply_form_styles
 from localization import get_text, format_step_indicator
-from init_database import initialize_cpv_data, check_cpv_data_status
-from utils.optimized_database_logger import configure_optimized_logging as configure_database_logging
-from utils.qdrant_init import init_qdrant_on_startup
+from utils.metrics import metrics
+from utils.rerun_profiler import profile_rerun, profiling_requested, span, traced
+from utils.startup import startup, lazy_callable, warm_imports
+import importlib.util
 
-# Import AI integration patch
-try:
-    from patches.ai_integration_patch import apply_ai_integration
-    AI_INTEGRATION_AVAILABLE = True
-except ImportError:
-    AI_INTEGRATION_AVAILABLE = False
+# Pages and the AI chain are imported when first used (see utils/startup.py)
+render_admin_panel = lazy_callable('ui.admin_panel', 'render_admin_panel')
+render_dashboard = lazy_callable('ui.dashboard', 'render_dashboard')
+apply_ai_integration = lazy_callable('patches.ai_integration_patch', 'apply_ai_integration')
+
+AI_INTEGRATION_AVAILABLE = importlib.util.find_spec('patches.ai_integration_patch') is not None
+if not AI_INTEGRATION_AVAILABLE:
     logging.warning("AI integration patch not available")
 
 # Import performance optimization patch
@@ -92,13 +93,31 @@ def render_warning_box(title: str, content: str):
     """
     st.markdown(warning_html, unsafe_allow_html=True)
 
-# Initialize CPV data on startup (outside of Streamlit context)
-def init_app_data():
-    """Initialize application data on startup."""
-    # Configure logging
-    configure_database_logging(level=logging.INFO)
-    
-    # Initialize CPV data
+# Process-level startup tasks, run once per server process (see utils/startup.py)
+@startup.task('logging')
+def _configure_logging():
+    from utils.optimized_database_logger import configure_optimized_logging
+    configure_optimized_logging(level=logging.INFO)
+
+
+@startup.task('metrics_exporters')
+def _start_metrics_exporters():
+    # Start metrics exporters configured via METRICS_PORT / OTEL_METRICS_EXPORTER
+    from utils.metrics import start_exporters_from_env
+    start_exporters_from_env()
+
+
+@startup.task('sql_tracing')
+def _install_sql_tracing():
+    # Trace every sqlite3 call site when SQL_PROFILER=true (see admin "SQL profiler" tab)
+    if os.getenv('SQL_PROFILER', 'false').lower() == 'true':
+        from utils.sql_profiler import install_sql_tracing
+        install_sql_tracing()
+
+
+@startup.task('cpv_data', background=True)
+def _initialize_cpv_data():
+    from init_database import initialize_cpv_data, check_cpv_data_status
     status = check_cpv_data_status()
     if not status['initialized']:
         result = initialize_cpv_data()
@@ -106,21 +125,51 @@ def init_app_data():
             logging.info(f"CPV data initialized: {result['imported']} codes from {result['source']}")
         else:
             logging.warning(f"CPV initialization failed: {result['message']}")
-    
-    # Initialize Qdrant collection (non-blocking per Story 27.1)
+
+
+@startup.task('qdrant', background=True)
+def _initialize_qdrant():
+    # Non-blocking per Story 27.1: the app runs without vector database support
+    from utils.qdrant_init import init_qdrant_on_startup
     qdrant_result = init_qdrant_on_startup()
     if not qdrant_result['success']:
-        # Log but continue - non-blocking requirement
         logging.info("App starting without vector database support")
+    return qdrant_result
+
+
+@startup.task('preload_backends', background=True)
+def _preload_backends():
+    # Optionally warm heavy document backends
+    # (e.g. PRELOAD_BACKENDS=docling,docling_converter,langchain_splitter)
+    preload = [name.strip() for name in os.getenv('PRELOAD_BACKENDS', '').split(',') if name.strip()]
+    if preload:
+        from utils.backend_registry import backends
+        backends.preload(preload, background=False)
+
+
+@startup.task('warm_pages', background=True)
+def _warm_pages():
+    # Import the pages after login renders so the first navigation does not pay for it;
+    # the delay keeps the imports from competing with the first render for the GIL
+    import time
+    time.sleep(2)
+    warm_imports('ui.dashboard', 'ui.admin_panel', 'patches.ai_integration_patch')
+
 
-# Run initialization only once using session state
-# This prevents repeated initialization on every Streamlit rerun
-if 'app_initialized' not in st.session_state:
-    init_app_data()
-    st.session_state.app_initialized = True
-    logging.info("[INIT] Application data initialized (one-time setup)")
-else:
-    logging.debug("[INIT] Application already initialized, skipping setup")
+def init_app_data(wait: bool = True):
+    """Initialize application data once per process.
+
+    Foreground tasks run before this returns; with `wait` it also blocks
+    until the background tasks (CPV seeding, Qdrant, backend preload) finish.
+    """
+    startup.start()
+    if wait:
+        for task in startup.report():
+            startup.wait(task['name'])
+
+# One-time, process-level setup; background tasks keep running while the first page renders
+if startup.start():
+    logging.info("[INIT] Application startup tasks launched (one-time per process)")
 
 # CRITICAL: Apply lot_mode fix at TOP LEVEL before main() runs
 # This ensures lot_mode is NEVER 'none' even if session state persists
@@ -460,7 +509,8 @@ def main():
     
     if 'schema' not in st.session_state:
         try:
-            st.session_state['schema'] = load_json_schema(SCHEMA_FILE)
+            with span('load_json_schema', 'schema'):
+                st.session_state['schema'] = load_json_schema(SCHEMA_FILE)
         except FileNotFoundError:
             st.error(get_text("schema_file_not_found", filename=SCHEMA_FILE))
             st.stop()
@@ -523,9 +573,18 @@ def main():
             logging.debug(f"Form page but not edit mode: edit_mode={st.session_state.get('edit_mode')}, edit_record_id={st.session_state.get('edit_record_id')}")
 
     # Route to appropriate page based on current_page state
+    with metrics.time('page_load_seconds', page=st.session_state.current_page):
+        _render_current_page()
+
+def _render_current_page():
+    """Render the page selected in st.session_state.current_page."""
     if st.session_state.current_page == 'dashboard':
         render_dashboard()
     elif st.session_state.current_page == 'form':
+        # CPV selectors need the seeded codes; seeding runs in the background at startup
+        if not startup.ready('cpv_data') and startup.started:
+            with st.spinner('Nalagam CPV kode...'):
+                startup.wait('cpv_data', timeout=30)
         # Load data if in edit mode but data not yet loaded - moved here for proper timing
         if st.session_state.get('edit_mode') and st.session_state.get('edit_record_id'):
             import logging
@@ -1218,6 +1277,7 @@ def render_compact_progress_indicator():
             if selected != current:
                 navigate_to_step(selected)
 
+@traced('validate_step', 'validation')
 def validate_step(step_keys, schema):
     """Validate the fields for the current step using centralized validation."""
     # Story 27.3: Refactored to use ValidationManager
@@ -1322,6 +1382,7 @@ def validate_step(step_keys, schema):
     logging.info(f"validate_step returning: {is_valid}")
     return is_valid
 
+@traced('render_main_form', 'page')
 def render_main_form():
     """Render the main multi-step form interface with enhanced UX."""
     # Apply form styles at the beginning
@@ -1572,7 +1633,8 @@ def render_main_form():
     with col1:
         # Get fixed form steps
         from config_fixed import get_fixed_steps
-        fixed_form_steps = get_fixed_steps()
+        with span('get_fixed_steps', 'steps'):
+            fixed_form_steps = get_fixed_steps()
         
         # Calculate progress
         current_step_num = st.session_state.current_step + 1
@@ -1798,6 +1860,10 @@ def render_main_form():
                     # Also apply general AI integration
                     apply_ai_integration()
                     logging.info("[AI_SETUP] AI injection completed for both field_renderer and section_renderer")
+                    # Opt-in (AI_PREFETCH_ENABLED): generate this step's AI suggestions in the background
+                    from ui.renderers.ai_prefetch import prefetch_step_suggestions
+                    prefetch_step_suggestions(st.session_state.current_step, current_step_properties,
+                                              should_render=form_controller.section_renderer._should_render)
                 except Exception as e:
                     logging.debug(f"AI integration could not be applied: {e}")
             
@@ -3320,4 +3386,6 @@ def render_drafts_sidebar(draft_options):
             st.error(get_text("draft_load_error"))
 
 if __name__ == "__main__":
-    main()
+    with profile_rerun(st.session_state.get('current_page', 'dashboard'),
+                       enabled=profiling_requested(st.session_state, st.query_params)):
+        main()
@@ -0,0 +1,96 @@
+"""
+Online backups: snapshot throughput, WAL archiving throughput, and how much a
+running backup slows foreground commits compared with no backup and with the
+previous shutil.copyfile approach.
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+
+from harness import benchmark
+from fixtures import temp_database, seed_procurements
+
+COMMITS = 200
+
+
+def _database(ctx, rows, journal):
+    path = temp_database(ctx)
+    seed_procurements(path, rows, lots=3)
+    with sqlite3.connect(path) as conn:
+        conn.execute(f"PRAGMA journal_mode={journal}")
+    return path
+
+
+def _pages(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("PRAGMA page_count").fetchone()[0]
+
+
+@benchmark('backup.full_snapshot', group='backup',
+           params={'rows': [10_000, 100_000], 'journal': ['wal', 'delete']}, rounds=3)
+def bench_full_snapshot(ctx, rows, journal):
+    """BackupManager.full_backup (online copy + zstd); items are database pages"""
+    from services.backup_service import BackupManager
+
+    path = _database(ctx, rows, journal)
+    manager = BackupManager(path, backup_dir=os.path.join(ctx.workdir, 'backups'))
+    ctx.items = _pages(path)
+    return manager.full_backup
+
+
+@benchmark('backup.archive_wal', group='backup', params={'rows_per_run': [1_000]}, rounds=5)
+def bench_archive_wal(ctx, rows_per_run):
+    """Insert rows, then archive the new WAL frames; items are rows committed per run"""
+    from services.backup_service import BackupManager
+
+    path = _database(ctx, 1_000, 'wal')
+    manager = BackupManager(path, backup_dir=os.path.join(ctx.workdir, 'backups'))
+    manager.full_backup()
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_autocheckpoint=0")
+    ctx.add_cleanup(conn.close)
+    ctx.items = rows_per_run
+
+    def run():
+        conn.executemany("INSERT INTO javna_narocila (naziv, form_data_json) VALUES (?, '{}')",
+                         [('bench',)] * rows_per_run)
+        conn.commit()
+        manager.archive_wal()
+    return run
+
+
+@benchmark('backup.foreground_commits', group='backup',
+           params={'backup': ['none', 'online', 'copyfile'], 'journal': ['wal', 'delete']}, rounds=5)
+def bench_foreground_commits(ctx, backup, journal):
+    """Single-row commits while backups run back to back in a thread; items are commits"""
+    from services.backup_service import BackupManager
+
+    path = _database(ctx, 20_000, journal)
+    manager = BackupManager(path, backup_dir=os.path.join(ctx.workdir, 'backups'))
+    stop = threading.Event()
+
+    def background():
+        target = os.path.join(ctx.workdir, 'copy.db')
+        while not stop.is_set():
+            if backup == 'online':
+                manager.full_backup()
+                shutil.rmtree(manager.backup_dir, ignore_errors=True)
+            else:
+                shutil.copyfile(path, target)
+
+    if backup != 'none':
+        thread = threading.Thread(target=background, daemon=True)
+        thread.start()
+        ctx.add_cleanup(lambda: (stop.set(), thread.join()))
+
+    conn = sqlite3.connect(path, timeout=30)
+    ctx.add_cleanup(conn.close)
+    ctx.items = COMMITS
+
+    def run():
+        for i in range(COMMITS):
+            conn.execute("UPDATE javna_narocila SET status = ? WHERE id = ?", (f"s{i}", i % 1000 + 1))
+            conn.commit()
+    return run
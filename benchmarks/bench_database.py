@@ -0,0 +1,86 @@
+"""
+Procurement CRUD and CPV lookups against a generated SQLite database.
+"""
+
+import itertools
+
+from harness import benchmark
+from fixtures import temp_database, seed_procurements, seed_cpv_codes, make_form_data
+
+ROW_COUNTS = [1_000, 10_000, 100_000]
+
+
+@benchmark('db.get_procurements_for_customer', group='database', params={'rows': ROW_COUNTS})
+def bench_list_for_customer(ctx, rows):
+    """Dashboard listing for one organization"""
+    import database
+    seed_procurements(temp_database(ctx), rows)
+    return lambda: database.get_procurements_for_customer('demo_organizacija')
+
+
+@benchmark('db.get_procurement_by_id', group='database', params={'rows': ROW_COUNTS}, rounds=20)
+def bench_get_by_id(ctx, rows):
+    """Load one procurement including JSON form data"""
+    import database
+    seed_procurements(temp_database(ctx), rows)
+    ids = itertools.cycle(range(1, rows, max(1, rows // 97)))
+    return lambda: database.get_procurement_by_id(next(ids))
+
+
+@benchmark('db.create_procurement', group='database', params={'rows': ROW_COUNTS}, rounds=20)
+def bench_create(ctx, rows):
+    """Insert a procurement into a table of the given size"""
+    import database
+    seed_procurements(temp_database(ctx), rows)
+    form_data = make_form_data(rows + 1, lots=3)
+    return lambda: database.create_procurement(form_data)
+
+
+@benchmark('db.update_procurement', group='database', params={'rows': ROW_COUNTS}, rounds=20)
+def bench_update(ctx, rows):
+    """Update a procurement's form data"""
+    import database
+    seed_procurements(temp_database(ctx), rows)
+    ids = itertools.cycle(range(1, rows, max(1, rows // 97)))
+    form_data = make_form_data(rows + 2, lots=3)
+    return lambda: database.update_procurement(next(ids), form_data)
+
+
+@benchmark('db.delete_procurement', group='database', params={'rows': ROW_COUNTS}, rounds=20)
+def bench_delete(ctx, rows):
+    """Delete one procurement (a different row each call)"""
+    import database
+    seed_procurements(temp_database(ctx), rows)
+    ids = iter(range(rows, 0, -1))
+    return lambda: database.delete_procurement(next(ids))
+
+
+@benchmark('cpv.search_cpv_codes', group='cpv', params={'codes': [10_000], 'term': ['45', 'storitev']}, rounds=20)
+def bench_cpv_search(ctx, codes, term):
+    """Autocomplete search by code prefix or description word"""
+    from utils import cpv_manager
+    seed_cpv_codes(temp_database(ctx), codes)
+    return lambda: cpv_manager.search_cpv_codes(term, limit=20)
+
+
+@benchmark('cpv.get_all_cpv_codes', group='cpv', params={'codes': [10_000]}, rounds=20)
+def bench_cpv_page(ctx, codes):
+    """Paginated admin listing with a search term"""
+    from utils import cpv_manager
+    seed_cpv_codes(temp_database(ctx), codes)
+    return lambda: cpv_manager.get_all_cpv_codes('gradnja', page=3, per_page=50)
+
+
+@benchmark('cpv.selector_data', group='cpv', params={'codes': [10_000]})
+def bench_cpv_selector_data(ctx, codes):
+    """Everything the CPV selector prepares before rendering: dropdown options and validation"""
+    from utils import cpv_manager
+    from ui.components.cpv_selector import parse_cpv_from_text, validate_cpv_codes
+    seeded = seed_cpv_codes(temp_database(ctx), codes)
+    text = ', '.join(code for code, _ in seeded[::max(1, codes // 20)])
+
+    def run():
+        options = cpv_manager.get_cpv_codes_for_dropdown()
+        validate_cpv_codes(parse_cpv_from_text(text))
+        return options
+    return run
@@ -0,0 +1,137 @@
+"""
+Form state reconstruction and step validation on generated multi-lot sessions.
+"""
+
+from unittest.mock import patch
+
+from harness import benchmark
+from fixtures import temp_database, make_session_state
+
+LOT_COUNTS = [1, 5, 20]
+
+
+def _patch_session_state(ctx, state):
+    patcher = patch('streamlit.session_state', state)
+    patcher.start()
+    ctx.add_cleanup(patcher.stop)
+
+
+@benchmark('form.get_form_data_from_session', group='form', params={'lots': LOT_COUNTS}, rounds=10)
+def bench_form_data_from_session(ctx, lots):
+    """Rebuild nested form data from flat session state"""
+    from utils.schema_utils import get_form_data_from_session
+    state = make_session_state(lots)
+    _patch_session_state(ctx, state)
+    ctx.items = len(state)
+    return get_form_data_from_session
+
+
+@benchmark('form.validate_all_steps', group='form', params={'lots': LOT_COUNTS}, rounds=5)
+def bench_validate_all_steps(ctx, lots):
+    """ValidationManager.validate_step over every step of the form"""
+    from config import get_dynamic_form_steps
+    from utils.validations import ValidationManager
+
+    temp_database(ctx)
+    state = make_session_state(lots)
+    _patch_session_state(ctx, state)
+    steps = get_dynamic_form_steps(state)
+    ctx.items = len(steps)
+
+    def run():
+        manager = ValidationManager(state['schema'], state)
+        for index, step_keys in enumerate(steps):
+            manager.validate_step(step_keys, index)
+    return run
+
+
+@benchmark('form.controller_field_roundtrip', group='form', params={'fields': [50, 500]}, rounds=10)
+def bench_controller_roundtrip(ctx, fields):
+    """FormController construction plus set/get of every field (the old unified_performance case)"""
+    from ui.controllers.form_controller import FormController
+    schema = {'type': 'object', 'properties': {
+        f'field_{i}': {'type': 'string', 'title': f'Field {i}'} for i in range(fields)
+    }}
+    ctx.items = fields
+
+    def run():
+        state = {}
+        with patch('streamlit.session_state', state):
+            controller = FormController(schema)
+            for i in range(fields):
+                controller.context.set_field_value(f'field_{i}', f'value_{i}')
+            for i in range(fields):
+                controller.context.get_field_value(f'field_{i}')
+    return run
+
+
+def _lot_context(lots: int, fields: int):
+    """FormContext over a plain-dict session with `fields` values in each of `lots` lots.
+
+    Half of the fields hold the same value in every lot, as the pre-lot
+    screens (client, project) do after they are synced to all lots.
+    """
+    from utils.form_helpers import FormContext
+    state = {}
+    context = FormContext(state)
+    shared = [f"shared value {i}" for i in range(fields // 2)]
+    for index in range(lots):
+        if index:
+            context.add_lot()
+        context.switch_to_lot(index)
+        for i in range(fields):
+            value = shared[i] if i < len(shared) else f"lot {index} value {i}"
+            context.set_field_value(f"section_{i % 10}.field_{i}", value)
+    context.switch_to_lot(0)
+    return state, context
+
+
+@benchmark('form.lot_remove_first', group='form', params={'lots': [10, 50]}, rounds=10)
+def bench_lot_remove_first(ctx, lots):
+    """Remove lot 0 of a multi-lot form, then duplicate the last lot to keep the count"""
+    state, context = _lot_context(lots, 200)
+    ctx.items = lots
+
+    def run():
+        context.remove_lot(0)
+        context.copy_lot_data(context.get_lot_count() - 1, context.add_lot())
+    return run
+
+
+@benchmark('form.lot_duplicate', group='form', params={'lots': [10, 50]}, rounds=10)
+def bench_lot_duplicate(ctx, lots):
+    """Duplicate the current lot into a new lot, then remove the copy"""
+    state, context = _lot_context(lots, 200)
+
+    def run():
+        new_index = context.add_lot()
+        context.copy_lot_data(0, new_index)
+        context.remove_lot(new_index)
+    return run
+
+
+@benchmark('form.validation_prep', group='form',
+           params={'widgets': [500, 5_000], 'mode': ['full_scan', 'callbacks']}, rounds=10)
+def bench_validation_prep(ctx, widgets, mode):
+    """WidgetSync.ensure_validation_ready after 5 widget edits, with and without on_change callbacks"""
+    from utils.metrics import metrics
+    from utils.widget_sync import WidgetSync, widget_callback
+
+    state = {'lots': [{'name': 'Splošni sklop', 'index': 0}], 'current_lot_index': 0}
+    for i in range(widgets):
+        state[f'widget_lots.0.field_{i}'] = state[f'lots.0.field_{i}'] = f'value {i}'
+    _patch_session_state(ctx, state)
+    edited = [f'lots.0.field_{i}' for i in range(0, widgets, widgets // 5)]
+    ctx.items = len(edited)
+
+    def run():
+        scans = sum(s['value'] for s in metrics.snapshot('widget_sync_full_scans_total'))
+        for session_key in edited:
+            widget_key = f'widget_{session_key}'
+            state[widget_key] = state[widget_key] + '!'
+            if mode == 'callbacks':
+                callback = widget_callback(widget_key, session_key)
+                callback['on_change'](*callback['args'])
+        WidgetSync.ensure_validation_ready()
+        ctx.extra['full_scans'] = sum(s['value'] for s in metrics.snapshot('widget_sync_full_scans_total')) - scans
+    return run
@@ -0,0 +1,108 @@
+"""
+Log handler ingest, document chunking/embedding and DOCX generation (single and batch).
+"""
+
+import os
+import time
+import logging
+import sqlite3
+from unittest.mock import patch
+
+from harness import benchmark
+from fixtures import (
+    temp_database, seed_procurements, make_log_messages, make_document_text, make_document_data,
+    FakeEmbeddingServer
+)
+
+
+@benchmark('logging.optimized_handler_ingest', group='logging', params={'records': [1_000, 10_000]}, rounds=3)
+def bench_log_ingest(ctx, records):
+    """Emit records and wait until all are committed to application_logs"""
+    import database
+    from utils.optimized_database_logger import OptimizedDatabaseLogHandler
+
+    path = temp_database(ctx)
+    database.create_logs_table()
+    handler = OptimizedDatabaseLogHandler(fallback_file=os.path.join(ctx.workdir, 'fallback.log'))
+    bench_logger = logging.getLogger(f'bench.ingest.{records}')
+    bench_logger.propagate = False
+    bench_logger.setLevel(logging.DEBUG)
+    bench_logger.addHandler(handler)
+    ctx.add_cleanup(lambda: bench_logger.removeHandler(handler))
+    messages = make_log_messages(records)
+    ctx.items = records
+    written = [0]
+
+    def run():
+        for level, message in messages:
+            bench_logger.log(level, message)
+        handler.flush()
+        written[0] += records
+        deadline = time.time() + 60
+        with sqlite3.connect(path) as conn:
+            while conn.execute("SELECT COUNT(*) FROM application_logs").fetchone()[0] < written[0]:
+                if time.time() > deadline:
+                    raise TimeoutError("log handler did not drain its queue")
+                time.sleep(0.005)
+    return run
+
+
+def _document_processor(ctx):
+    from services import qdrant_document_processor
+    patcher = patch.object(qdrant_document_processor, 'get_qdrant_client', return_value=None)
+    patcher.start()
+    ctx.add_cleanup(patcher.stop)
+    return qdrant_document_processor.QdrantDocumentProcessor()
+
+
+@benchmark('documents.chunk_text', group='documents', params={'pages': [10, 100]}, rounds=10)
+def bench_chunk_text(ctx, pages):
+    """Split extracted text into chunks (LangChain splitter or fallback)"""
+    processor = _document_processor(ctx)
+    text = make_document_text(pages)
+    ctx.items = len(text)
+    return lambda: processor.chunk_text(text)
+
+
+@benchmark('documents.embed_chunks', group='documents',
+           params={'pages': [10], 'latency_ms': [0, 20]}, rounds=3)
+def bench_embed_chunks(ctx, pages, latency_ms):
+    """Embed every chunk of a document through the OpenAI client against a local fake server"""
+    from openai import OpenAI
+
+    server = FakeEmbeddingServer(latency=latency_ms / 1000).start()
+    ctx.add_cleanup(server.stop)
+    processor = _document_processor(ctx)
+    processor.openai_client = OpenAI(api_key='benchmark', base_url=server.base_url, max_retries=0)
+    chunks = processor.chunk_text(make_document_text(pages))
+    ctx.items = len(chunks)
+
+    def run():
+        for chunk in chunks:
+            if processor.create_embedding(chunk) is None:
+                raise RuntimeError("embedding request failed")
+    return run
+
+
+@benchmark('documents.generate_docx', group='documents', params={'lots': [1, 20]}, rounds=10)
+def bench_generate_docx(ctx, lots):
+    """DocumentGenerator.generate_document for one procurement"""
+    from services.document_generator import DocumentGenerator
+
+    generator = DocumentGenerator()
+    generator.temp_dir = ctx.workdir
+    data = make_document_data(1, lots)
+    return lambda: os.remove(generator.generate_document(data))
+
+
+@benchmark('documents.generate_batch_zip', group='documents',
+           params={'procurements': [50], 'processes': [1, 4]}, rounds=3)
+def bench_generate_batch_zip(ctx, procurements, processes):
+    """DocumentGenerator.generate_batch_zip for procurements loaded from the database"""
+    from services.document_generator import DocumentGenerator
+
+    seed_procurements(temp_database(ctx), procurements, lots=5)
+    generator = DocumentGenerator()
+    ids = list(range(1, procurements + 1))
+    ctx.items = procurements
+    return lambda: generator.generate_batch_zip(ids, os.path.join(ctx.workdir, 'batch.zip'), processes)
@@ -0,0 +1,34 @@
+"""
+Rate limiter decisions per second for each storage (memory, SQLite, mmap).
+"""
+
+import os
+
+from harness import benchmark
+
+DECISIONS = 10_000
+
+
+@benchmark('rate_limit.decisions', group='rate_limit',
+           params={'storage': ['memory', 'sqlite', 'mmap'], 'sessions': [100, 10_000]}, rounds=5)
+def bench_rate_limit_decisions(ctx, storage, sessions):
+    """is_allowed() for sessions taking turns; most keys stay under their limit"""
+    from utils.rate_limiter import MemoryStorage, MmapStorage, RateLimiter, SQLiteStorage
+
+    if storage == 'sqlite':
+        backend = SQLiteStorage(os.path.join(ctx.workdir, 'limits.db'))
+    elif storage == 'mmap':
+        backend = MmapStorage(os.path.join(ctx.workdir, 'limits.bin'))
+        ctx.add_cleanup(backend.close)
+    else:
+        backend = MemoryStorage()
+    limiter = RateLimiter(max_requests=20, window_seconds=60, name='bench', storage=backend)
+    keys = [f"session_{i}" for i in range(sessions)]
+    ctx.items = DECISIONS
+
+    def run():
+        allowed = 0
+        for i in range(DECISIONS):
+            allowed += limiter.is_allowed(keys[i % sessions])[0]
+        ctx.extra['allowed_ratio'] = round(allowed / DECISIONS, 3)
+    return run
@@ -0,0 +1,107 @@
+"""
+Chunk retrieval: BM25 lexical search and the hybrid BM25 + vector query path.
+
+Recall is measured on labelled identifier queries (ZJN-3 articles, CPV codes)
+from make_labelled_chunks. The fake embeddings are not semantic, so the
+dense-only recall shows what vectors do with identifiers, not with prose.
+"""
+
+import os
+import sqlite3
+
+from harness import benchmark
+from fixtures import make_labelled_chunks, FakeEmbeddingServer
+
+TOP_K = 5
+
+
+def _chunk_database(ctx, chunks) -> str:
+    path = os.path.join(ctx.workdir, 'chunks.db')
+    with sqlite3.connect(path) as conn:
+        conn.executescript("""
+            CREATE TABLE ai_documents (id INTEGER PRIMARY KEY, filename TEXT, tip_dokumenta TEXT);
+            CREATE TABLE ai_document_chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, document_id INTEGER NOT NULL,
+                chunk_index INTEGER NOT NULL, chunk_text TEXT NOT NULL, chunk_size INTEGER, vector_id TEXT
+            );
+        """)
+        conn.executemany("INSERT INTO ai_documents VALUES (?, ?, 'pravilniki')",
+                         [(doc_id, f"dokument_{doc_id}.pdf") for doc_id in {c[0] for c in chunks}])
+        conn.executemany("INSERT INTO ai_document_chunks (document_id, chunk_index, chunk_text) VALUES (?, ?, ?)",
+                         chunks)
+    return path
+
+
+def _recall(results, queries) -> float:
+    found = sum(any(f"{hit.payload['document_id']}:{hit.payload['chunk_index']}" == relevant for hit in hits)
+                for hits, (_, relevant) in zip(results, queries))
+    return round(found / len(queries), 3)
+
+
+@benchmark('retrieval.lexical_search', group='retrieval', params={'chunks': [1_000, 10_000]}, rounds=5)
+def bench_lexical_search(ctx, chunks):
+    """BM25 search for labelled identifier queries over ai_document_chunks"""
+    from services.hybrid_search import ChunkLexicalIndex
+
+    rows, queries = make_labelled_chunks(chunks)
+    index = ChunkLexicalIndex(_chunk_database(ctx, rows))
+    if not index.ensure_index():
+        raise ImportError("SQLite FTS5")
+    queries = queries[:100]
+    ctx.items = len(queries)
+    ctx.extra['recall_at_5'] = _recall([index.search(q, TOP_K) for q, _ in queries], queries)
+    return lambda: [index.search(q, TOP_K) for q, _ in queries]
+
+
+@benchmark('retrieval.hybrid_query', group='retrieval',
+           params={'latency_ms': [0, 50], 'mode': ['hybrid', 'vector']}, rounds=3)
+def bench_hybrid_query(ctx, latency_ms, mode):
+    """hybrid_search with embeddings from a fake server; 'vector' disables the lexical side"""
+    import numpy as np
+    from openai import OpenAI
+    from services.hybrid_search import ChunkLexicalIndex, RetrievedChunk, hybrid_search
+
+    rows, queries = make_labelled_chunks(2_000)
+    index = ChunkLexicalIndex(_chunk_database(ctx, rows))
+    if not index.ensure_index():
+        raise ImportError("SQLite FTS5")
+    queries = queries[:20]
+
+    server = FakeEmbeddingServer(dimensions=256, latency=latency_ms / 1000).start()
+    ctx.add_cleanup(server.stop)
+    client = OpenAI(api_key='benchmark', base_url=server.base_url, max_retries=0)
+
+    def embed(text):
+        return client.embeddings.create(model='text-embedding-3-small', input=text).data[0].embedding
+
+    texts = [text for _, _, text in rows]
+    matrix = np.array([item.embedding for item in client.embeddings.create(
+        model='text-embedding-3-small', input=texts).data], dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-9
+
+    def vector_search(vector, limit):
+        scores = matrix @ np.asarray(vector, dtype=np.float32)
+        return [RetrievedChunk(int(i), float(scores[i]),
+                               {'document_id': rows[i][0], 'chunk_index': rows[i][1], 'text': rows[i][2]})
+                for i in np.argsort(-scores)[:limit]]
+
+    previous = os.environ.get('AI_HYBRID_SEARCH')
+    os.environ['AI_HYBRID_SEARCH'] = 'false' if mode == 'vector' else 'true'
+
+    def restore():
+        if previous is None:
+            os.environ.pop('AI_HYBRID_SEARCH', None)
+        else:
+            os.environ['AI_HYBRID_SEARCH'] = previous
+    ctx.add_cleanup(restore)
+
+    def run():
+        return [hybrid_search(q, TOP_K, embed, vector_search, index=index) for q, _ in queries]
+
+    server.requests = 0
+    results = run()
+    ctx.items = len(queries)
+    ctx.extra['recall_at_5'] = _recall([result.hits for result in results], queries)
+    ctx.extra['lexical_fast_path'] = round(sum(r.mode == 'lexical' for r in results) / len(results), 3)
+    ctx.extra['embeddings_per_query'] = round(server.requests / len(queries), 3)
+    return run
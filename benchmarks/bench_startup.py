@@ -0,0 +1,97 @@
+"""
+Cold start of app.py: time to first render and the imports that dominate it.
+
+Each measurement is a fresh `python -X importtime` process that runs app.py
+once through Streamlit's AppTest (the login form is the first render) and
+reports the elapsed time. The importtime log is parsed into cumulative time
+per top-level import so regressions can be traced to a module.
+
+    python benchmarks/bench_startup.py            # first render + top 15 imports
+    python benchmarks/bench_startup.py --json out.json
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+from typing import Any, Dict, List
+
+from harness import benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+DRIVER = """
+import sys, json, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=300)
+app.run()
+print(json.dumps({
+    'first_render_seconds': time.perf_counter() - start,
+    'exceptions': [e.message for e in app.exception],
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Top-level imports (nesting level 0) with self and cumulative seconds"""
+    imports = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) <= 1:
+            imports.append({'module': match.group(4),
+                            'self_seconds': int(match.group(1)) / 1e6,
+                            'cumulative_seconds': int(match.group(2)) / 1e6})
+    return imports
+
+
+def measure_startup(script: str = 'app.py') -> Dict[str, Any]:
+    """Run one cold start in a fresh interpreter"""
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', DRIVER, script],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    wall = time.perf_counter() - start
+    lines = [line for line in process.stdout.splitlines() if line.startswith('{')]
+    if process.returncode or not lines:
+        raise RuntimeError(f"startup run failed: {process.stderr.strip().splitlines()[-1:]}")
+    report = json.loads(lines[-1])
+    if report['exceptions']:
+        raise RuntimeError(f"app raised during first render: {report['exceptions'][0][:200]}")
+    report['process_seconds'] = wall
+    report['imports'] = sorted(parse_importtime(process.stderr),
+                               key=lambda i: i['cumulative_seconds'], reverse=True)
+    return report
+
+
+@benchmark('startup.first_render', group='startup', rounds=3, warmup=0)
+def bench_first_render(ctx):
+    """Fresh interpreter to first rendered page of app.py (includes interpreter start)"""
+    return measure_startup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app.py cold start")
+    parser.add_argument('--script', default='app.py')
+    parser.add_argument('--top', type=int, default=15, help="Top-level imports to list")
+    parser.add_argument('--json', default=None, help="Write the full report to this file")
+    args = parser.parse_args()
+
+    report = measure_startup(args.script)
+    print(f"Process start to first render: {report['process_seconds'] * 1000:.0f}ms "
+          f"(script run {report['first_render_seconds'] * 1000:.0f}ms)")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for item in report['imports'][:args.top]:
+        print(f"{item['cumulative_seconds'] * 1000:10.1f}ms {item['self_seconds'] * 1000:8.1f}ms  {item['module']}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""
+Generated fixtures for the benchmark suite.
+
+Everything is derived from a seeded random.Random so runs are reproducible:
+procurement form data and rows, multi-lot session state built from the real
+form schema, CPV codes, log records, document text, labelled document chunks
+for retrieval, and a fake OpenAI-compatible embeddings server.
+"""
+
+import os
+import json
+import time
+import zlib
+import random
+import sqlite3
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_PATH = os.path.join(ROOT, 'json_files', 'SEZNAM_POTREBNIH_PODATKOV.json')
+SEED = 20240501
+
+WORDS = (
+    "naročnik ponudnik javno naročilo sklop pogodba merilo cena rok izvedba "
+    "dobava storitev gradnja specifikacija zahteva ponudba vrednost plačilo "
+    "garancija pogoj sposobnost referenca dokazilo obrazec priloga postopek "
+    "odpiranje pregled pogajanja kakovost okolje socialno trajnost dokumentacija"
+).split()
+ORGANIZATIONS = [f"Občina {name}" for name in (
+    "Ljubljana", "Maribor", "Celje", "Kranj", "Koper", "Novo mesto", "Ptuj", "Velenje"
+)]
+ORDER_TYPES = ['blago', 'storitve', 'gradnje']
+PROCEDURES = ['odprti postopek', 'naročilo male vrednosti', 'konkurenčni dialog']
+
+
+def rng_for(*parts) -> random.Random:
+    return random.Random(f"{SEED}:{':'.join(map(str, parts))}")
+
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+# ============ DATABASE ============
+
+def temp_database(ctx) -> str:
+    """Point database.DATABASE_FILE (and modules that copied it) at a fresh file"""
+    import database
+    from utils import cpv_manager
+
+    path = os.path.join(ctx.workdir, 'bench.db')
+    previous = database.DATABASE_FILE, cpv_manager.DATABASE_FILE
+    database.DATABASE_FILE = cpv_manager.DATABASE_FILE = path
+
+    def restore():
+        database.DATABASE_FILE, cpv_manager.DATABASE_FILE = previous
+    ctx.add_cleanup(restore)
+
+    database.init_db()
+    return path
+
+
+def make_form_data(index: int, lots: int = 1) -> Dict[str, Any]:
+    """Nested form data shaped like a saved procurement"""
+    rng = rng_for('form', index, lots)
+    data = {
+        'clientInfo': {
+            'multipleClients': 'ne',
+            'singleClientName': rng.choice(ORGANIZATIONS),
+            'singleClientStreetAddress': f"Trg {rng.randint(1, 99)}",
+            'singleClientPostalCode': f"{rng.randint(1000, 9999)} Mesto"
+        },
+        'projectInfo': {
+            'projectName': f"Naročilo {index}: {sentence(rng, 4)}",
+            'projectSubject': sentence(rng, 30),
+            'cpvCodes': ', '.join(f"{rng.randint(30000000, 45999999)}-{rng.randint(0, 9)}" for _ in range(3))
+        },
+        'submissionProcedure': {'procedure': rng.choice(PROCEDURES)},
+        'orderType': {
+            'type': rng.choice(ORDER_TYPES),
+            'estimatedValue': round(rng.uniform(10_000, 2_000_000), 2),
+            'cofinancers': [{'cofinancerName': rng.choice(ORGANIZATIONS)} for _ in range(rng.randint(0, 2))]
+        },
+        'executionDeadline': {'type': 'dni', 'days': rng.randint(30, 720)},
+        'otherInfo': sentence(rng, 20),
+        'lot_mode': 'multiple' if lots > 1 else 'single',
+        'num_lots': lots
+    }
+    if lots > 1:
+        data['lotsInfo'] = {'hasLots': True}
+        data['lots'] = [{'name': f"Sklop {i + 1}"} for i in range(lots)]
+        for lot in range(lots):
+            data[f'lot_{lot}'] = {
+                'orderType': {'type': rng.choice(ORDER_TYPES),
+                              'estimatedValue': round(rng.uniform(5_000, 500_000), 2)},
+                'technicalSpecifications': {'hasSpecifications': 'da', 'description': sentence(rng, 25)},
+                'selectionCriteria': {'price': True, 'priceRatio': rng.randint(40, 100)}
+            }
+    return data
+
+
+def seed_procurements(path: str, rows: int, lots: int = 1, batch: int = 5000) -> None:
+    """Insert `rows` procurements directly (far faster than create_procurement)"""
+    start = date(2023, 1, 1)
+    with sqlite3.connect(path) as conn:
+        for offset in range(0, rows, batch):
+            records = []
+            for i in range(offset, min(offset + batch, rows)):
+                form_data = make_form_data(i, lots)
+                records.append((
+                    ORGANIZATIONS[i % len(ORGANIZATIONS)] if i % 2 else 'demo_organizacija',
+                    form_data['projectInfo']['projectName'],
+                    form_data['orderType']['type'],
+                    form_data['submissionProcedure']['procedure'],
+                    (start + timedelta(days=i % 700)).isoformat(),
+                    'Osnutek' if i % 3 else 'Objavljeno',
+                    form_data['orderType']['estimatedValue'],
+                    json.dumps(form_data, ensure_ascii=False)
+                ))
+            conn.executemany("""
+                INSERT INTO javna_narocila
+                (organizacija, naziv, vrsta, postopek, datum_objave, status, vrednost, form_data_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, records)
+        conn.commit()
+
+
+def make_cpv_codes(count: int) -> List[Tuple[str, str]]:
+    rng = rng_for('cpv', count)
+    codes = set()
+    while len(codes) < count:
+        codes.add(f"{rng.randint(3000000, 98999999):08d}-{rng.randint(0, 9)}")
+    return [(code, sentence(rng, 6)) for code in sorted(codes)]
+
+
+def seed_cpv_codes(path: str, count: int) -> List[Tuple[str, str]]:
+    codes = make_cpv_codes(count)
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM cpv_codes")
+        conn.executemany("INSERT INTO cpv_codes (code, description) VALUES (?, ?)", codes)
+        conn.commit()
+    return codes
+
+
+# ============ SESSION STATE ============
+
+def load_schema() -> Dict[str, Any]:
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _leaf_keys(schema: Dict[str, Any], properties: Dict[str, Any], prefix: str,
+               depth: int = 0) -> List[Tuple[str, Dict[str, Any]]]:
+    keys = []
+    for name, prop in properties.items():
+        if '$ref' in prop:
+            ref = prop['$ref'].lstrip('#/').split('/')
+            resolved = schema
+            for part in ref:
+                resolved = resolved.get(part, {})
+            prop = {**resolved, **{k: v for k, v in prop.items() if k != '$ref'}}
+        key = f"{prefix}{name}"
+        if prop.get('type') == 'object' and 'properties' in prop and depth < 4:
+            keys.extend(_leaf_keys(schema, prop['properties'], f"{key}.", depth + 1))
+        elif prop.get('type') == 'array' and prop.get('items', {}).get('type') == 'object':
+            item_props = prop['items'].get('properties', {})
+            for index in range(2):
+                keys.extend(_leaf_keys(schema, item_props, f"{key}.{index}.", depth + 1))
+        else:
+            keys.append((key, prop))
+    return keys
+
+
+def _value_for(prop: Dict[str, Any], rng: random.Random) -> Any:
+    if prop.get('enum'):
+        return rng.choice(prop['enum'])
+    kind = prop.get('type')
+    if kind == 'boolean':
+        return rng.random() < 0.5
+    if kind in ('number', 'integer'):
+        return rng.randint(1, 500_000)
+    if kind == 'array':
+        return []
+    return sentence(rng, 5)
+
+
+def make_session_state(lots: int = 3, schema: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Flat session state for a multi-lot form: general fields plus lot_N.* fields"""
+    schema = schema or load_schema()
+    rng = rng_for('session', lots)
+    leaves = _leaf_keys(schema, schema.get('properties', {}), '')
+    state: Dict[str, Any] = {
+        'schema': schema,
+        'lot_mode': 'multiple' if lots > 1 else 'single',
+        'lotsInfo.hasLots': lots > 1,
+        'lots': [{'name': f"Sklop {i + 1}", 'index': i} for i in range(lots)],
+        'lot_names': [f"Sklop {i + 1}" for i in range(lots)],
+        'current_lot_index': 0,
+        'current_step': 0
+    }
+    lot_sections = {'orderType', 'technicalSpecifications', 'executionDeadline', 'priceInfo',
+                    'inspectionInfo', 'negotiationsInfo', 'participationAndExclusion',
+                    'participationConditions', 'financialGuarantees', 'variantOffers',
+                    'selectionCriteria', 'contractInfo', 'otherInfo'}
+    for key, prop in leaves:
+        section = key.split('.')[0]
+        if lots > 1 and section in lot_sections:
+            for lot in range(lots):
+                state[f"lot_{lot}.{key}"] = _value_for(prop, rng)
+                state[f"widget_lot_{lot}.{key}"] = state[f"lot_{lot}.{key}"]
+        else:
+            state[key] = _value_for(prop, rng)
+            state[f"widget_{key}"] = state[key]
+    return state
+
+
+# ============ LOGS AND DOCUMENTS ============
+
+def make_log_messages(count: int) -> List[Tuple[int, str]]:
+    import logging
+    rng = rng_for('logs', count)
+    levels = [logging.DEBUG, logging.INFO, logging.INFO, logging.WARNING, logging.ERROR]
+    return [(rng.choice(levels), sentence(rng, rng.randint(5, 25))) for _ in range(count)]
+
+
+def make_document_text(pages: int) -> str:
+    """About 3,000 characters of paragraphs per page"""
+    rng = rng_for('document', pages)
+    paragraphs = []
+    for page in range(pages):
+        paragraphs.append(f"{page + 1}. poglavje")
+        for _ in range(6):
+            paragraphs.append(' '.join(sentence(rng, rng.randint(8, 20)) for _ in range(4)))
+    return '\n\n'.join(paragraphs)
+
+
+def make_labelled_chunks(count: int, docs: int = 20) -> Tuple[List[Tuple[int, int, str]], List[Tuple[str, str]]]:
+    """Document chunks and labelled retrieval queries.
+
+    Every fifth chunk cites a unique ZJN-3 article or CPV code; each cited
+    identifier yields one query whose relevant chunk is "document_id:chunk_index".
+    """
+    rng = rng_for('chunks', count)
+    chunks, queries = [], []
+    for i in range(count):
+        doc_id, chunk_index = i % docs + 1, i // docs
+        text = ' '.join(sentence(rng, rng.randint(10, 18)) for _ in range(4))
+        if i % 5 == 0:
+            if i % 10 == 0:
+                article = i // 10 + 1
+                text += f" Skladno s {article}. členom ZJN-3 naročnik {rng.choice(WORDS)} {rng.choice(WORDS)}."
+                queries.append((f"Kaj določa {article}. člen ZJN-3?", f"{doc_id}:{chunk_index}"))
+            else:
+                code = f"{45000000 + i:08d}-{i % 10}"
+                text += f" Predmet je opredeljen s CPV kodo {code}."
+                queries.append((f"CPV {code}", f"{doc_id}:{chunk_index}"))
+        chunks.append((doc_id, chunk_index, text))
+    return chunks, queries
+
+
+def make_document_data(index: int, lots: int = 5) -> Dict[str, Any]:
+    """Procurement dict in the shape DocumentGenerator expects"""
+    rng = rng_for('docx', index, lots)
+    return {
+        'id': index,
+        'naziv': f"Naročilo {index}: {sentence(rng, 4)}",
+        'vrsta_postopka': rng.choice(PROCEDURES),
+        'datum_objave': '2024-05-01',
+        'ocenjena_vrednost': round(rng.uniform(10_000, 2_000_000), 2),
+        'narocnik_naziv': rng.choice(ORGANIZATIONS),
+        'narocnik_naslov': f"Trg {rng.randint(1, 99)}",
+        'email': 'narocila@example.si',
+        'opis_narocila': '\n'.join(sentence(rng, 30) for _ in range(8)),
+        'cpv_kode': [f"{rng.randint(30000000, 45999999)}-{rng.randint(0, 9)}" for _ in range(5)],
+        'merila': [{'naziv': sentence(rng, 3), 'utez': w, 'opis': sentence(rng, 15)}
+                   for w in (60, 25, 15)],
+        'sklopi': [{'naziv': f"Sklop {i + 1}", 'opis': sentence(rng, 25),
+                    'ocenjena_vrednost': round(rng.uniform(5_000, 500_000), 2)} for i in range(lots)],
+        'dodatne_informacije': sentence(rng, 40)
+    }
+
+
+class FakeEmbeddingServer:
+    """
+    Minimal OpenAI-compatible /v1/embeddings endpoint on localhost.
+
+    Returns deterministic vectors after `latency` seconds, so embedding
+    benchmarks measure client-side batching and serialization, not the API.
+    """
+
+    def __init__(self, dimensions: int = 1536, latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                inputs = body.get('input', [])
+                inputs = [inputs] if isinstance(inputs, str) else inputs
+                dims = body.get('dimensions') or server.dimensions
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                seeds = [zlib.crc32(text.encode()) for text in inputs]
+                payload = json.dumps({
+                    'object': 'list',
+                    'model': body.get('model', 'text-embedding-3-small'),
+                    'data': [{
+                        'object': 'embedding', 'index': i,
+                        'embedding': [((seed >> (j % 24)) & 0xFF) / 255.0 for j in range(dims)]
+                    } for i, seed in enumerate(seeds)],
+                    'usage': {'prompt_tokens': sum(len(t) // 4 for t in inputs),
+                              'total_tokens': sum(len(t) // 4 for t in inputs)}
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}/v1"
+
+    def start(self) -> 'FakeEmbeddingServer':
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,241 @@
+"""
+Benchmark registry, runner and baseline comparison.
+
+Benchmarks are plain functions registered with @benchmark. Each receives a
+BenchContext plus one combination of its parameters, does its setup, and
+returns the zero-argument callable to be timed:
+
+    @benchmark('db.get_procurement_by_id', group='database', params={'rows': [1000, 10000]})
+    def bench_get_by_id(ctx, rows):
+        path = temp_database(ctx)
+        seed_procurements(path, rows)
+        return lambda: database.get_procurement_by_id(rows // 2)
+
+A benchmark whose setup raises ImportError is reported as skipped, so the
+suite runs with whatever optional dependencies are installed.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import platform
+import tempfile
+import itertools
+import statistics
+import subprocess
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+SCHEMA_VERSION = 1
+
+
+@dataclass
+class Benchmark:
+    name: str
+    group: str
+    func: Callable[..., Callable[[], Any]]
+    params: Dict[str, List[Any]] = field(default_factory=dict)
+    rounds: int = 5
+    warmup: int = 1
+    description: str = ''
+
+
+REGISTRY: List[Benchmark] = []
+
+
+def benchmark(name: str, group: str, params: Optional[Dict[str, List[Any]]] = None,
+              rounds: int = 5, warmup: int = 1):
+    """Register a benchmark function (see module docstring)"""
+    def decorator(func):
+        REGISTRY.append(Benchmark(name, group, func, params or {}, rounds, warmup,
+                                  (func.__doc__ or '').strip().split('\n')[0]))
+        return func
+    return decorator
+
+
+class BenchContext:
+    """Per-run scratch directory, cleanups and throughput accounting"""
+
+    def __init__(self):
+        self.workdir = tempfile.mkdtemp(prefix='bench_')
+        # Items processed per timed call; enables items_per_second in results
+        self.items: Optional[int] = None
+        # Quality figures measured during setup or the run (recall, hit ratios, ...)
+        self.extra: Dict[str, Any] = {}
+        self._cleanups: List[Callable[[], None]] = []
+
+    def add_cleanup(self, fn: Callable[[], None]):
+        self._cleanups.append(fn)
+
+    def close(self):
+        for fn in reversed(self._cleanups):
+            try:
+                fn()
+            except Exception:
+                pass
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def expand_params(params: Dict[str, List[Any]], quick: bool = False) -> List[Dict[str, Any]]:
+    """Cartesian product of parameter values (only the first values in quick mode)"""
+    if not params:
+        return [{}]
+    keys = list(params)
+    values = [params[k][:1] if quick else params[k] for k in keys]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def result_id(name: str, params: Dict[str, Any]) -> str:
+    if not params:
+        return name
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+def _stats(times: List[float]) -> Dict[str, float]:
+    ordered = sorted(times)
+    return {
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'mean': statistics.mean(ordered),
+        'stdev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        'p95': ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        'max': ordered[-1]
+    }
+
+
+def run_benchmark(bench: Benchmark, params: Dict[str, Any],
+                  rounds: Optional[int] = None, warmup: Optional[int] = None) -> Dict[str, Any]:
+    """Set up, warm up and time one parameter combination"""
+    result = {
+        'id': result_id(bench.name, params),
+        'name': bench.name,
+        'group': bench.group,
+        'params': params,
+        'status': 'ok'
+    }
+    ctx = BenchContext()
+    try:
+        try:
+            fn = bench.func(ctx, **params)
+        except ImportError as e:
+            result.update(status='skipped', reason=f"missing dependency: {e}")
+            return result
+
+        for _ in range(bench.warmup if warmup is None else warmup):
+            fn()
+        times = []
+        for _ in range(bench.rounds if rounds is None else rounds):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+        result['rounds'] = len(times)
+        result['seconds'] = _stats(times)
+        if ctx.items:
+            result['items'] = ctx.items
+            result['items_per_second'] = ctx.items / result['seconds']['median']
+        if ctx.extra:
+            result['extra'] = dict(ctx.extra)
+    except Exception as e:
+        result.update(status='error', reason=f"{type(e).__name__}: {e}",
+                      traceback=traceback.format_exc(limit=5))
+    finally:
+        ctx.close()
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def machine_info() -> Dict[str, Any]:
+    """Enough about the machine to tell whether two reports are comparable"""
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'sqlite': sqlite3.sqlite_version,
+        'git_commit': _git_commit()
+    }
+
+
+def run_suite(benchmarks: List[Benchmark], quick: bool = False,
+              rounds: Optional[int] = None, progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+    """Run every parameter combination of the given benchmarks"""
+    started = time.perf_counter()
+    report = {
+        'schema_version': SCHEMA_VERSION,
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'quick': quick,
+        'machine': machine_info(),
+        'results': []
+    }
+    for bench in benchmarks:
+        for params in expand_params(bench.params, quick):
+            result = run_benchmark(bench, params, rounds=rounds if rounds else (2 if quick else None))
+            report['results'].append(result)
+            if progress:
+                progress(result)
+    report['duration_seconds'] = time.perf_counter() - started
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.20,
+            min_delta_seconds: float = 0.0005) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compare median times against a baseline report.
+
+    A result regresses when its median exceeds the baseline median by more
+    than `threshold` (relative) and `min_delta_seconds` (absolute, to ignore
+    noise on sub-millisecond benchmarks).
+    """
+    base = {r['id']: r for r in baseline.get('results', []) if r.get('status') == 'ok'}
+    comparison = {'regressions': [], 'improvements': [], 'unchanged': [], 'new': []}
+    for result in report['results']:
+        if result.get('status') != 'ok':
+            continue
+        previous = base.get(result['id'])
+        if previous is None:
+            comparison['new'].append({'id': result['id']})
+            continue
+        now, before = result['seconds']['median'], previous['seconds']['median']
+        row = {'id': result['id'], 'baseline': before, 'current': now,
+               'ratio': now / before if before else float('inf')}
+        if now > before * (1 + threshold) and now - before > min_delta_seconds:
+            comparison['regressions'].append(row)
+        elif now < before * (1 - threshold) and before - now > min_delta_seconds:
+            comparison['improvements'].append(row)
+        else:
+            comparison['unchanged'].append(row)
+    return comparison
+
+
+def machine_differences(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    keys = ('machine', 'cpu_count', 'python', 'implementation', 'sqlite')
+    current, previous = report.get('machine', {}), baseline.get('machine', {})
+    return [f"{k}: {previous.get(k)} -> {current.get(k)}" for k in keys if current.get(k) != previous.get(k)]
+
+
+def save_report(report: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
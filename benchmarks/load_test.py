@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+Headless load test: many concurrent simulated form sessions in one process.
+
+Each simulated session has its own session state and replays editor journeys
+from journeys.json (step navigation, field entry, lot add/remove, validation,
+CPV search, draft save, opening an existing draft) through the real
+application code: FormController rendering in Streamlit bare mode,
+ValidationManager, get_form_data_from_session, database.py and cpv_manager.
+Sessions run on threads, as Streamlit serves them.
+
+    python benchmarks/load_test.py --sessions 1,5,10,25 --duration 30
+    python benchmarks/load_test.py --sessions 10 --iterations 3 --think-scale 0
+    python benchmarks/load_test.py --db /tmp/load.db --sessions 20 --slo-p95 250
+
+Reported per concurrency level:
+- throughput (actions/s, journeys/s)
+- latency percentiles per action
+- SQLite write-statement latency, which includes time spent waiting for the
+  database lock (sqlite applies its busy timeout inside the statement), and
+  "database is locked" errors
+- session state size per session and process RSS growth per session
+
+With --slo-p95 the highest level whose rerun p95 stays within the limit is
+reported as the sustained concurrency.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import sqlite3
+import tempfile
+import argparse
+import threading
+from datetime import datetime
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# Add parent directory (application modules) and this directory (suite modules) to path
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from harness import machine_info, save_report
+from fixtures import load_schema, seed_procurements, seed_cpv_codes, rng_for, _leaf_keys, _value_for
+
+DEFAULT_JOURNEYS = os.path.join(BENCH_DIR, 'journeys.json')
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+PERCENTILES = (50, 90, 95, 99)
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'COMMIT', 'BEGIN')
+# Actions handled by a callback without re-rendering the page
+NON_RERUN_ACTIONS = ('validate', 'save_draft', 'cpv_search')
+
+
+# ============ SESSION STATE ============
+
+class SimulatedSessionState(dict):
+    """Per-session state with the attribute access Streamlit's SessionStateProxy allows"""
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __delattr__(self, key):
+        try:
+            del self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+
+class ThreadLocalSessionState:
+    """
+    Stand-in for streamlit.session_state that routes to the calling thread's session.
+
+    Application modules read st.session_state at call time, so patching the
+    module attribute with this proxy gives every simulated session its own
+    state, the same isolation the Streamlit server provides per browser tab.
+    """
+
+    def __init__(self):
+        object.__setattr__(self, '_local', threading.local())
+
+    def bind(self, state: Optional[SimulatedSessionState]):
+        self._local.state = state
+
+    @property
+    def current(self) -> SimulatedSessionState:
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            raise RuntimeError("no simulated session bound to this thread")
+        return state
+
+    def __getattr__(self, key):
+        return getattr(self.current, key)
+
+    def __setattr__(self, key, value):
+        setattr(self.current, key, value)
+
+    def __delattr__(self, key):
+        delattr(self.current, key)
+
+    def __getitem__(self, key):
+        return self.current[key]
+
+    def __setitem__(self, key, value):
+        self.current[key] = value
+
+    def __delitem__(self, key):
+        del self.current[key]
+
+    def __contains__(self, key):
+        return key in self.current
+
+    def __iter__(self):
+        return iter(self.current)
+
+    def __len__(self):
+        return len(self.current)
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate retained size of a session state (containers followed, shared objects counted once)"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+# ============ SIMULATED SESSION ============
+
+class SimulatedSession:
+    """
+    One editor: its session state plus the actions a journey can replay.
+
+    Each action does what the corresponding Streamlit interaction triggers on
+    the server; interactions that change what is on screen end with rerun(),
+    which renders the current step the way render_main_form does.
+    """
+
+    ACTION_NAMES = frozenset({
+        'open_form', 'open_draft', 'fill_step', 'next_step', 'prev_step', 'goto_step', 'add_lot',
+        'remove_lot', 'validate', 'save_draft', 'cpv_search', 'think'
+    })
+
+    def __init__(self, session_id: int, schema: Dict[str, Any], proxy: ThreadLocalSessionState,
+                 think_scale: float = 1.0):
+        self.session_id = session_id
+        self.schema = schema
+        self.proxy = proxy
+        self.think_scale = think_scale
+        self.rng = rng_for('load', session_id)
+        self.state = SimulatedSessionState()
+        self.actions: Dict[str, Callable[..., None]] = {
+            'open_form': self.open_form,
+            'open_draft': self.open_draft,
+            'fill_step': self.fill_step,
+            'next_step': lambda: self.goto_step(self.state.get('current_step', 0) + 1),
+            'prev_step': lambda: self.goto_step(self.state.get('current_step', 0) - 1),
+            'goto_step': self.goto_step,
+            'add_lot': self.add_lot,
+            'remove_lot': self.remove_lot,
+            'validate': self.validate,
+            'save_draft': self.save_draft,
+            'cpv_search': self.cpv_search
+        }
+
+    # ---- helpers ----
+
+    def steps(self) -> List[List[str]]:
+        from config import get_dynamic_form_steps
+        return get_dynamic_form_steps(self.state)
+
+    def step_keys(self) -> List[str]:
+        steps = self.steps()
+        return steps[min(self.state.get('current_step', 0), len(steps) - 1)]
+
+    def step_properties(self, step_keys: List[str]) -> Dict[str, Any]:
+        """Schema properties for a step, lot_N.<section> mapped back to <section> (as in app.py)"""
+        from utils.schema_utils import resolve_schema_ref
+        properties = {}
+        for key in step_keys:
+            if key.startswith('lot_context_'):
+                properties[key] = {'type': 'lot_context'}
+                continue
+            original = key.split('.', 1)[1] if key.startswith('lot_') and '.' in key else key
+            prop = self.schema['properties'].get(original)
+            if prop is None:
+                continue
+            prop = dict(prop)
+            if '$ref' in prop:
+                resolved = resolve_schema_ref(self.schema, prop.pop('$ref')) or {}
+                prop.update(type='object', properties=resolved.get('properties', {}),
+                            required=resolved.get('required', []))
+            if original == 'orderType':
+                prop.pop('render_if', None)
+            properties[key] = prop
+        return properties
+
+    def rerun(self):
+        """Server-side work of one rerun on the form page"""
+        from ui.controllers.form_controller import FormController
+        step_keys = self.step_keys()
+        controller = FormController()
+        controller.set_schema({'properties': self.step_properties(step_keys)})
+        controller.render_form(show_validation_summary=False)
+
+    # ---- actions ----
+
+    def open_form(self):
+        self.state.clear()
+        self.state.update(schema=self.schema, current_page='form', current_step=0,
+                          lot_mode='single', organization_name='demo_organizacija')
+        self.rerun()
+
+    def open_draft(self):
+        import database
+        from ui.dashboard import load_procurement_to_form
+        self.state.clear()
+        self.state.update(schema=self.schema, current_page='form', current_step=0)
+        with sqlite3.connect(database.DATABASE_FILE) as conn:
+            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM javna_narocila").fetchone()[0]
+        if max_id:
+            procurement_id = self.rng.randint(1, max_id)
+            load_procurement_to_form(procurement_id)
+            self.state.update(edit_mode=True, edit_record_id=procurement_id)
+        self.rerun()
+
+    def fill_step(self):
+        """Type a value into every field of the current step"""
+        for key in self.step_keys():
+            prefix, section = '', key
+            if key.startswith('lot_') and '.' in key:
+                lot, section = key.split('.', 1)
+                prefix = f"{lot}."
+            prop = self.schema['properties'].get(section)
+            if prop is None:
+                continue
+            for leaf, leaf_prop in _leaf_keys(self.schema, {section: prop}, prefix):
+                self.state[leaf] = _value_for(leaf_prop, self.rng)
+        self.rerun()
+
+    def goto_step(self, step: int):
+        self.state['current_step'] = max(0, min(step, len(self.steps()) - 1))
+        self.rerun()
+
+    def add_lot(self):
+        from utils.form_helpers import FormContext
+        context = FormContext(self.state)
+        index = context.add_lot()
+        self.state['lot_names'] = [lot['name'] for lot in self.state['lots']]
+        self.state.update({'lotsInfo.hasLots': True, 'lot_mode': 'multiple', 'num_lots': index + 1})
+        self.rerun()
+
+    def remove_lot(self):
+        from utils.form_helpers import FormContext
+        context = FormContext(self.state)
+        if context.remove_lot(context.get_lot_count() - 1):
+            self.state['lot_names'] = [lot['name'] for lot in self.state['lots']]
+            self.state['num_lots'] = len(self.state['lots'])
+        self.rerun()
+
+    def validate(self):
+        from utils.validations import ValidationManager
+        manager = ValidationManager(self.schema, self.state)
+        manager.validate_step(self.step_keys(), self.state.get('current_step', 0))
+
+    def save_draft(self):
+        """save_form_draft without file handling: create once, update afterwards"""
+        import database
+        from utils.schema_utils import get_form_data_from_session
+        form_data = get_form_data_from_session()
+        form_data['status'] = 'delno izpolnjen'
+        procurement_id = self.state.get('edit_record_id') or self.state.get('current_procurement_id')
+        if procurement_id:
+            database.update_procurement(procurement_id, form_data)
+        else:
+            self.state['current_procurement_id'] = database.create_procurement(form_data)
+
+    def cpv_search(self, term: str):
+        from utils import cpv_manager
+        cpv_manager.search_cpv_codes(term, limit=20)
+
+    def think(self, ms: float):
+        if self.think_scale > 0:
+            # +-50% jitter so sessions do not move in lockstep
+            time.sleep(ms / 1000 * self.think_scale * self.rng.uniform(0.5, 1.5))
+
+
+# ============ RUNNER ============
+
+class LoadRecorder:
+    """Thread-safe collection of action latencies, errors and SQL write timings"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.error_examples: Dict[str, str] = {}
+        self.sql_writes: List[float] = []
+        self.lock_errors = 0
+        self.journeys = 0
+
+    def action(self, name: str, seconds: float, error: Optional[BaseException] = None):
+        with self.lock:
+            self.latencies[name].append(seconds)
+            if error is not None:
+                self.errors[name] += 1
+                self.error_examples.setdefault(name, f"{type(error).__name__}: {error}")
+                if 'database is locked' in str(error):
+                    self.lock_errors += 1
+
+    def sql(self, entry: Dict[str, Any], start: float, duration: float):
+        if entry.get('fingerprint', '').lstrip().upper().startswith(WRITE_PREFIXES):
+            with self.lock:
+                self.sql_writes.append(duration)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {f"p{p}": ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+              for p in PERCENTILES}
+    result.update(count=len(ordered), mean=sum(ordered) / len(ordered), max=ordered[-1])
+    return result
+
+
+def load_journeys(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path, encoding='utf-8') as f:
+        journeys = {name: j for name, j in json.load(f).items() if not name.startswith('_')}
+    for name, journey in journeys.items():
+        for step in journey['actions']:
+            if step['action'] not in SimulatedSession.ACTION_NAMES:
+                raise ValueError(f"journey {name}: unknown action {step['action']!r}")
+    return journeys
+
+
+def _run_session(session: SimulatedSession, journeys: Dict[str, Dict[str, Any]], recorder: LoadRecorder,
+                 deadline: Optional[float], iterations: Optional[int], start_delay: float):
+    session.proxy.bind(session.state)
+    time.sleep(start_delay)
+    names = list(journeys)
+    weights = [journeys[name].get('weight', 1) for name in names]
+    completed = 0
+    try:
+        while (iterations is None or completed < iterations) and (deadline is None or time.time() < deadline):
+            journey = journeys[session.rng.choices(names, weights)[0]]
+            for step in journey['actions']:
+                if deadline is not None and time.time() >= deadline:
+                    return
+                args = {k: v for k, v in step.items() if k != 'action'}
+                if step['action'] == 'think':
+                    session.think(**args)
+                    continue
+                error = None
+                start = time.perf_counter()
+                try:
+                    session.actions[step['action']](**args)
+                except Exception as e:  # a failing action is a result, not a harness crash
+                    error = e
+                recorder.action(step['action'], time.perf_counter() - start, error)
+            completed += 1
+            with recorder.lock:
+                recorder.journeys += 1
+    finally:
+        session.proxy.bind(None)
+
+
+def _warm_imports():
+    """Import everything the actions use so module import time is not measured as latency"""
+    import database  # noqa: F401
+    import ui.dashboard  # noqa: F401
+    import ui.controllers.form_controller  # noqa: F401
+    import utils.validations  # noqa: F401
+    import utils.cpv_manager  # noqa: F401
+
+
+def run_load(sessions: int, journeys: Dict[str, Dict[str, Any]], duration: Optional[float] = None,
+             iterations: Optional[int] = None, think_scale: float = 1.0, ramp_up: float = 0.0,
+             trace_sql: bool = True) -> Dict[str, Any]:
+    """Run `sessions` concurrent simulated sessions and summarize the results"""
+    from unittest.mock import patch
+    from utils import sql_profiler
+
+    if duration is None and iterations is None:
+        iterations = 1
+    _warm_imports()
+    schema = load_schema()
+    proxy = ThreadLocalSessionState()
+    recorder = LoadRecorder()
+    simulated = [SimulatedSession(i, schema, proxy, think_scale) for i in range(sessions)]
+
+    tracing_was_installed = sql_profiler.is_tracing_installed()
+    if trace_sql:
+        sql_profiler.install_sql_tracing()
+        sql_profiler.profiler.listeners.append(recorder.sql)
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    deadline = time.time() + ramp_up + duration if duration is not None else None
+    try:
+        with patch('streamlit.session_state', proxy):
+            threads = [
+                threading.Thread(
+                    target=_run_session, name=f"load-session-{s.session_id}",
+                    args=(s, journeys, recorder, deadline, iterations, ramp_up * i / max(1, sessions)),
+                    daemon=True
+                )
+                for i, s in enumerate(simulated)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        if trace_sql:
+            sql_profiler.profiler.listeners.remove(recorder.sql)
+            if not tracing_was_installed:
+                sql_profiler.uninstall_sql_tracing()
+    elapsed = time.perf_counter() - started
+    rss_after = _rss_bytes()
+
+    all_latencies = [t for times in recorder.latencies.values() for t in times]
+    rerun_latencies = [t for name, times in recorder.latencies.items()
+                       if name not in NON_RERUN_ACTIONS for t in times]
+    state_sizes = [deep_sizeof(dict(s.state)) - deep_sizeof(schema) for s in simulated]
+    return {
+        'sessions': sessions,
+        'elapsed_seconds': elapsed,
+        'think_scale': think_scale,
+        'journeys_completed': recorder.journeys,
+        'actions': len(all_latencies),
+        'actions_per_second': len(all_latencies) / elapsed if elapsed else 0.0,
+        'journeys_per_second': recorder.journeys / elapsed if elapsed else 0.0,
+        'latency_seconds': {
+            'all': percentiles(all_latencies),
+            'rerun': percentiles(rerun_latencies),
+            **{name: percentiles(times) for name, times in sorted(recorder.latencies.items())}
+        },
+        'errors': dict(recorder.errors),
+        'error_examples': recorder.error_examples,
+        'sqlite': {
+            'write_statement_seconds': percentiles(recorder.sql_writes),
+            'lock_errors': recorder.lock_errors
+        },
+        'memory': {
+            'session_state_bytes': percentiles(state_sizes),
+            'rss_growth_bytes_per_session': ((rss_after - rss_before) / sessions
+                                             if rss_before is not None and rss_after is not None else None)
+        }
+    }
+
+
+def prepare_database(path: Optional[str], procurements: int, cpv_codes: int) -> str:
+    """Use an existing database or create a seeded temporary one"""
+    import database
+    from utils import cpv_manager
+
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix='load_test_'), 'load.db')
+        database.DATABASE_FILE = cpv_manager.DATABASE_FILE = path
+        database.init_db()
+        seed_procurements(path, procurements, lots=2)
+        seed_cpv_codes(path, cpv_codes)
+    else:
+        database.DATABASE_FILE = cpv_manager.DATABASE_FILE = path
+    return path
+
+
+def _ms(stats: Dict[str, float], key: str) -> str:
+    return f"{stats[key] * 1000:8.1f}" if stats else f"{'-':>8}"
+
+
+def print_level(result: Dict[str, Any]):
+    print(f"\n--- {result['sessions']} sessions: {result['actions']} actions, "
+          f"{result['journeys_completed']} journeys in {result['elapsed_seconds']:.1f}s "
+          f"({result['actions_per_second']:.1f} actions/s, {result['journeys_per_second']:.2f} journeys/s)")
+    print(f"  {'action':<14} {'count':>7} {'p50 ms':>8} {'p90 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  errors")
+    for name, stats in result['latency_seconds'].items():
+        if not stats:
+            continue
+        print(f"  {name:<14} {stats['count']:>7} {_ms(stats, 'p50')} {_ms(stats, 'p90')} {_ms(stats, 'p95')} "
+              f"{_ms(stats, 'p99')} {_ms(stats, 'max')}  {result['errors'].get(name, '')}")
+    writes = result['sqlite']['write_statement_seconds']
+    if writes:
+        print(f"  sqlite writes: {writes['count']} statements, p95 {writes['p95'] * 1000:.1f}ms, "
+              f"max {writes['max'] * 1000:.1f}ms, {result['sqlite']['lock_errors']} lock errors")
+    memory = result['memory']
+    state = memory['session_state_bytes']
+    line = f"  session state: mean {state['mean'] / 1024:.0f} KiB, max {state['max'] / 1024:.0f} KiB"
+    if memory['rss_growth_bytes_per_session'] is not None:
+        line += f"; RSS growth {memory['rss_growth_bytes_per_session'] / 1024 / 1024:.1f} MiB/session"
+    print(line)
+    for name, example in result['error_examples'].items():
+        print(f"  first {name} error: {example}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent simulated form sessions load test")
+    parser.add_argument('--sessions', default='1,5,10',
+                        help="Comma-separated concurrency levels to run in turn")
+    parser.add_argument('--duration', type=float, default=None, help="Seconds per level")
+    parser.add_argument('--iterations', type=int, default=None,
+                        help="Journeys per session (default 1 when --duration is not given)")
+    parser.add_argument('--think-scale', type=float, default=1.0,
+                        help="Multiplier for recorded think times; 0 replays back-to-back")
+    parser.add_argument('--ramp-up', type=float, default=0.0, help="Seconds over which sessions start")
+    parser.add_argument('--journeys', default=DEFAULT_JOURNEYS)
+    parser.add_argument('--db', default=None,
+                        help="Existing database (e.g. from scripts/generate_synthetic_data.py); "
+                             "default: a temporary seeded database")
+    parser.add_argument('--seed-procurements', type=int, default=2_000)
+    parser.add_argument('--seed-cpv-codes', type=int, default=5_000)
+    parser.add_argument('--no-sql-trace', action='store_true', help="Skip SQL write timing (less overhead)")
+    parser.add_argument('--slo-p95', type=float, default=None,
+                        help="Rerun p95 limit in ms; reports the highest level that meets it")
+    parser.add_argument('--output', default=None, help="Results JSON path (default: results/load_<timestamp>.json)")
+    parser.add_argument('--verbose', action='store_true', help="Keep application logging output")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    levels = [int(level) for level in args.sessions.split(',') if level.strip()]
+    journeys = load_journeys(args.journeys)
+    db_path = prepare_database(args.db, args.seed_procurements, args.seed_cpv_codes)
+
+    print("=" * 100)
+    print(f"Load test: levels {levels}, journeys {list(journeys)}, database {db_path}")
+    print("=" * 100)
+    results = []
+    for level in levels:
+        result = run_load(level, journeys, duration=args.duration, iterations=args.iterations,
+                          think_scale=args.think_scale, ramp_up=args.ramp_up,
+                          trace_sql=not args.no_sql_trace)
+        print_level(result)
+        results.append(result)
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'machine': machine_info(),
+        'database': db_path,
+        'arguments': vars(args),
+        'levels': results
+    }
+    if args.slo_p95 is not None:
+        passing = [r['sessions'] for r in results
+                   if r['latency_seconds']['rerun'] and r['latency_seconds']['rerun']['p95'] * 1000 <= args.slo_p95]
+        report['sustained_sessions'] = max(passing) if passing else 0
+        print(f"\nSustained concurrency (rerun p95 <= {args.slo_p95:.0f}ms): {report['sustained_sessions']} sessions")
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"load_{datetime.now():%Y%m%d_%H%M%S}.json")
+    save_report(report, output)
+    print(f"\nResults -> {output}")
+    return 1 if any(r['errors'] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for QdrantCRUDService counting and deletion strategies.
+
+Compares the old patterns (count via limit-1000 search, scroll IDs then delete,
+per-document deletes) with server-side count and delete-by-filter, with and
+without payload indexes.
+
+Runs against a local Qdrant server (--url http://localhost:6333) or, by
+default, qdrant-client's in-process stand-in (":memory:"). The in-process mode
+has no payload indexes of its own, so use a real server for index numbers.
+
+    python benchmarks/qdrant_crud_benchmark.py --points 1000000 --url http://localhost:6333
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Filter, FieldCondition,
+    MatchValue, MatchAny, FilterSelector, PointIdsList
+)
+
+from services.qdrant_crud_service import INDEXED_PAYLOAD_FIELDS
+
+BENCH_COLLECTION = "benchmark_crud"
+ORGANIZATIONS = [f"org_{i}" for i in range(50)]
+DOCUMENT_TYPES = ["pogodbe", "razpisi", "navodila", "specifikacije"]
+
+
+def _timed(fn, iterations=5):
+    times = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return {
+        'mean': statistics.mean(times),
+        'median': statistics.median(times),
+        'min': min(times),
+        'max': max(times),
+        'result': result
+    }
+
+
+def _doc_filter(document_ids):
+    match = MatchAny(any=document_ids) if len(document_ids) > 1 else MatchValue(value=document_ids[0])
+    return Filter(must=[FieldCondition(key="document_id", match=match)])
+
+
+def load_points(client, points, dim, chunks_per_doc, batch_size=1000, seed=42):
+    """Create the benchmark collection and upsert synthetic chunks"""
+    rng = random.Random(seed)
+    if client.collection_exists(BENCH_COLLECTION):
+        client.delete_collection(BENCH_COLLECTION)
+    client.create_collection(
+        collection_name=BENCH_COLLECTION,
+        vectors_config=VectorParams(size=dim, distance=Distance.COSINE, on_disk=True)
+    )
+
+    start = time.perf_counter()
+    for offset in range(0, points, batch_size):
+        batch = []
+        for point_id in range(offset, min(offset + batch_size, points)):
+            doc_index = point_id // chunks_per_doc
+            batch.append(PointStruct(
+                id=point_id,
+                vector=[rng.random() for _ in range(dim)],
+                payload={
+                    "document_id": f"doc_{doc_index}",
+                    "organization": ORGANIZATIONS[doc_index % len(ORGANIZATIONS)],
+                    "document_type": DOCUMENT_TYPES[doc_index % len(DOCUMENT_TYPES)],
+                    "chunk_index": point_id % chunks_per_doc
+                }
+            ))
+        client.upsert(collection_name=BENCH_COLLECTION, points=batch, wait=False)
+    elapsed = time.perf_counter() - start
+    return {'points': points, 'seconds': elapsed, 'points_per_second': points / elapsed}
+
+
+def create_indexes(client):
+    for field, index_type in INDEXED_PAYLOAD_FIELDS.items():
+        client.create_payload_index(BENCH_COLLECTION, field_name=field,
+                                    field_schema=index_type, wait=True)
+
+
+def benchmark_count(client, dim, iterations):
+    """Filtered total: limit-1000 search (old) vs server-side count (new)"""
+    query_filter = Filter(must=[FieldCondition(key="organization", match=MatchValue(value="org_7"))])
+    query_vector = [0.5] * dim
+
+    search = _timed(lambda: len(client.search(
+        collection_name=BENCH_COLLECTION, query_vector=query_vector,
+        query_filter=query_filter, limit=1000, with_payload=False
+    )), iterations)
+    count = _timed(lambda: client.count(
+        BENCH_COLLECTION, count_filter=query_filter, exact=True
+    ).count, iterations)
+    return {'search_estimate': search, 'count': count}
+
+
+def benchmark_delete(client, documents, chunks_per_doc, start_doc):
+    """Delete `documents` documents with each strategy on disjoint document ranges"""
+    results = {}
+
+    # Old: scroll IDs per document, delete by ID list, one document at a time
+    doc_ids = [f"doc_{i}" for i in range(start_doc, start_doc + documents)]
+    start = time.perf_counter()
+    for doc_id in doc_ids:
+        ids, next_offset = [], None
+        while True:
+            page, next_offset = client.scroll(
+                BENCH_COLLECTION, scroll_filter=_doc_filter([doc_id]), limit=100,
+                offset=next_offset, with_payload=False, with_vectors=False
+            )
+            ids.extend(p.id for p in page)
+            if next_offset is None:
+                break
+        if ids:
+            client.delete(BENCH_COLLECTION, points_selector=PointIdsList(points=ids), wait=True)
+    results['scroll_then_delete'] = time.perf_counter() - start
+
+    # New: one delete-by-filter for all documents
+    doc_ids = [f"doc_{i}" for i in range(start_doc + documents, start_doc + 2 * documents)]
+    start = time.perf_counter()
+    client.delete(BENCH_COLLECTION, points_selector=FilterSelector(filter=_doc_filter(doc_ids)), wait=True)
+    results['delete_by_filter'] = time.perf_counter() - start
+
+    results['points_per_strategy'] = documents * chunks_per_doc
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QdrantCRUDService count/delete benchmark")
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--dim', type=int, default=64,
+                        help="Vector size (1536 matches production; smaller keeps the stand-in in RAM)")
+    parser.add_argument('--chunks-per-doc', type=int, default=20)
+    parser.add_argument('--delete-docs', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--url', default=None, help="Qdrant server URL (default: in-process stand-in)")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url) if args.url else QdrantClient(":memory:")
+
+    print("=" * 60)
+    print("Qdrant CRUD Benchmarks")
+    print(f"{args.points:,} points × {args.dim} dims, backend: {args.url or 'in-process'}")
+    print("=" * 60)
+
+    load = load_points(client, args.points, args.dim, args.chunks_per_doc)
+    print(f"\nLoad: {load['seconds']:.1f}s ({load['points_per_second']:,.0f} points/s)")
+
+    print("\n1. Filtered total without payload indexes")
+    print("-" * 40)
+    unindexed = benchmark_count(client, args.dim, args.iterations)
+    for name, r in unindexed.items():
+        print(f"{name:16s} mean {r['mean']*1000:8.2f}ms  result {r['result']}")
+
+    create_indexes(client)
+    print("\n2. Filtered total with payload indexes")
+    print("-" * 40)
+    indexed = benchmark_count(client, args.dim, args.iterations)
+    for name, r in indexed.items():
+        print(f"{name:16s} mean {r['mean']*1000:8.2f}ms  result {r['result']}")
+
+    print(f"\n3. Deleting {args.delete_docs} documents")
+    print("-" * 40)
+    deletes = benchmark_delete(client, args.delete_docs, args.chunks_per_doc, start_doc=0)
+    print(f"scroll + delete by IDs: {deletes['scroll_then_delete']*1000:8.2f}ms")
+    print(f"delete by filter:       {deletes['delete_by_filter']*1000:8.2f}ms")
+
+    info = client.get_collection(BENCH_COLLECTION)
+    print(f"\nCollection: {info.points_count:,} points, {info.segments_count} segments, "
+          f"indexed payload fields: {sorted(info.payload_schema)}")
+
+    client.delete_collection(BENCH_COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the application's hot paths.
+
+Covers procurement CRUD at 1k/10k/100k rows, get_form_data_from_session and
+full step validation on multi-lot forms, CPV search and selector data, log
+handler ingest, document chunking and embedding against a local fake
+server, DOCX generation, and lexical/hybrid chunk retrieval with recall on a
+labelled sample. All fixtures are generated (see fixtures.py).
+
+Results are written as JSON with machine info. When a baseline exists the
+run is compared against it and exits with status 1 on any regression:
+
+    python benchmarks/run_benchmarks.py                      # full run, compare to baseline.json
+    python benchmarks/run_benchmarks.py --quick -k database  # smallest sizes, one group
+    python benchmarks/run_benchmarks.py --save-baseline      # record a new baseline
+
+Baselines are machine-specific; record one on the machine that runs the
+comparison (a warning is printed when machine info differs).
+"""
+
+import os
+import sys
+import logging
+import argparse
+import importlib
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# Add parent directory (application modules) and this directory (suite modules) to path
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from harness import REGISTRY, run_suite, compare, machine_differences, save_report, load_report
+
+SUITE_MODULES = ['bench_database', 'bench_forms', 'bench_ingest', 'bench_backup', 'bench_startup',
+                 'bench_retrieval', 'bench_rate_limit']
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+
+def _print_result(result):
+    if result['status'] != 'ok':
+        print(f"  {result['id']:<60} {result['status'].upper()}: {result['reason']}")
+        return
+    s = result['seconds']
+    line = f"  {result['id']:<60} median {s['median'] * 1000:9.2f}ms  p95 {s['p95'] * 1000:9.2f}ms"
+    if 'items_per_second' in result:
+        line += f"  {result['items_per_second']:>12,.0f} items/s"
+    if 'extra' in result:
+        line += '  ' + ' '.join(f"{k}={v:.3g}" if isinstance(v, float) else f"{k}={v}"
+                                for k, v in result['extra'].items())
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument('-k', '--filter', default=None,
+                        help="Only run benchmarks whose name or group contains this text")
+    parser.add_argument('--quick', action='store_true', help="Smallest parameter values, 2 rounds")
+    parser.add_argument('--rounds', type=int, default=None, help="Override rounds per benchmark")
+    parser.add_argument('--output', default=None, help="Results JSON path (default: results/<timestamp>.json)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Write results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.20,
+                        help="Relative slowdown of the median that counts as a regression")
+    parser.add_argument('--list', action='store_true', help="List benchmarks and exit")
+    parser.add_argument('--verbose', action='store_true', help="Keep application logging output")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    for module in SUITE_MODULES:
+        importlib.import_module(module)
+
+    benchmarks = [b for b in REGISTRY
+                  if not args.filter or args.filter in b.name or args.filter in b.group]
+    if args.list:
+        for b in benchmarks:
+            print(f"{b.group:<10} {b.name:<40} {b.params or ''}  {b.description}")
+        return 0
+
+    print("=" * 100)
+    print(f"Benchmark suite: {len(benchmarks)} benchmarks{' (quick)' if args.quick else ''}")
+    print("=" * 100)
+    report = run_suite(benchmarks, quick=args.quick, rounds=args.rounds, progress=_print_result)
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    save_report(report, output)
+    statuses = [r['status'] for r in report['results']]
+    print(f"\n{statuses.count('ok')} ok, {statuses.count('skipped')} skipped, "
+          f"{statuses.count('error')} errors in {report['duration_seconds']:.1f}s -> {output}")
+
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 1 if 'error' in statuses else 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to record one")
+        return 1 if 'error' in statuses else 0
+
+    baseline = load_report(args.baseline)
+    for difference in machine_differences(report, baseline):
+        print(f"WARNING: baseline recorded on a different machine ({difference})")
+
+    comparison = compare(report, baseline, threshold=args.threshold)
+    for row in comparison['improvements']:
+        print(f"  faster  {row['id']:<60} {row['baseline'] * 1000:9.2f}ms -> {row['current'] * 1000:9.2f}ms")
+    for row in comparison['regressions']:
+        print(f"  SLOWER  {row['id']:<60} {row['baseline'] * 1000:9.2f}ms -> {row['current'] * 1000:9.2f}ms "
+              f"(x{row['ratio']:.2f})")
+
+    if comparison['regressions']:
+        print(f"\nFAILED: {len(comparison['regressions'])} regression(s) over {args.threshold:.0%}")
+        return 1
+    print(f"\nNo regressions over {args.threshold:.0%} "
+          f"({len(comparison['unchanged'])} unchanged, {len(comparison['improvements'])} faster)")
+    return 1 if 'error' in statuses else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
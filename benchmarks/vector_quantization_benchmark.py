@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Recall@k vs latency/memory for knowledge base vector storage modes.
+
+Evaluates full precision, int8 scalar and binary quantization (each with and
+without rescoring) at several Matryoshka-truncated dimensions on a synthetic
+corpus. Ground truth is exact cosine search over the full 1536-d vectors.
+
+The synthetic embeddings are clustered and have variance that decays along the
+dimensions, like text-embedding-3-* vectors whose leading dimensions carry most
+of the signal. By default the quantized search is simulated with numpy. With
+--url, the same modes are run against a Qdrant server using the collection
+settings from utils.qdrant_init.
+
+    python benchmarks/vector_quantization_benchmark.py --corpus 50000 --dims 1536,512,256
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.qdrant_init import (
+    VECTOR_SIZE, DEFAULT_OVERSAMPLING, VectorStorageConfig,
+    build_vectors_config, build_quantization_config, build_search_params
+)
+
+
+def _normalize(x):
+    return x / np.linalg.norm(x, axis=-1, keepdims=True)
+
+
+def make_corpus(n, queries, dim=VECTOR_SIZE, clusters=200, seed=42):
+    """Clustered unit vectors with decaying per-dimension variance"""
+    rng = np.random.default_rng(seed)
+    scale = 1.0 / np.sqrt(1.0 + np.arange(dim) / 64.0)
+    centers = rng.normal(size=(clusters, dim)) * scale
+    labels = rng.integers(0, clusters, size=n)
+    corpus = centers[labels] + 0.6 * rng.normal(size=(n, dim)) * scale
+    query_labels = rng.integers(0, clusters, size=queries)
+    query = centers[query_labels] + 0.6 * rng.normal(size=(queries, dim)) * scale
+    return _normalize(corpus).astype(np.float32), _normalize(query).astype(np.float32)
+
+
+def truncate(vectors, dims):
+    return _normalize(vectors[:, :dims]).astype(np.float32)
+
+
+class SimulatedIndex:
+    """Brute-force search over a quantized representation, optionally rescored"""
+
+    def __init__(self, vectors, quantization):
+        self.vectors = vectors
+        self.quantization = quantization
+        if quantization == 'int8':
+            # Symmetric quantile clipping, as Qdrant's scalar quantization with quantile=0.99
+            self.scale = np.quantile(np.abs(vectors), 0.99) / 127.0
+            self.codes = np.clip(np.round(vectors / self.scale), -127, 127).astype(np.int8)
+        elif quantization == 'binary':
+            self.codes = np.packbits(vectors > 0, axis=1)
+        self.dims = vectors.shape[1]
+
+    @property
+    def bytes_in_ram(self):
+        if self.quantization == 'none':
+            return self.vectors.nbytes
+        return self.codes.nbytes
+
+    def _coarse_scores(self, query):
+        if self.quantization == 'int8':
+            q = np.clip(np.round(query / self.scale), -127, 127).astype(np.int32)
+            return self.codes.astype(np.int32) @ q
+        if self.quantization == 'binary':
+            q = np.packbits(query > 0)
+            # Fewer differing bits = more similar
+            return -np.unpackbits(self.codes ^ q, axis=1).sum(axis=1)
+        return self.vectors @ query
+
+    def search(self, query, k, rescore, oversampling):
+        candidates = int(k * oversampling) if (rescore and self.quantization != 'none') else k
+        candidates = min(candidates, len(self.vectors) - 1)
+        scores = self._coarse_scores(query)
+        top = np.argpartition(-scores, candidates)[:candidates]
+        if rescore and self.quantization != 'none':
+            exact = self.vectors[top] @ query
+            return top[np.argsort(-exact)[:k]]
+        return top[np.argsort(-scores[top])[:k]]
+
+
+def recall_at_k(found, truth):
+    return len(set(found.tolist()) & set(truth.tolist())) / len(truth)
+
+
+def run_simulated(corpus, queries, dims_list, k):
+    truth = [np.argsort(-(corpus @ q))[:k] for q in queries]
+    rows = []
+    for dims in dims_list:
+        vectors = truncate(corpus, dims)
+        qs = truncate(queries, dims)
+        for quantization in ('none', 'int8', 'binary'):
+            index = SimulatedIndex(vectors, quantization)
+            for rescore in ((False,) if quantization == 'none' else (False, True)):
+                oversampling = DEFAULT_OVERSAMPLING[quantization]
+                recalls, times = [], []
+                for q, t in zip(qs, truth):
+                    start = time.perf_counter()
+                    found = index.search(q, k, rescore, oversampling)
+                    times.append(time.perf_counter() - start)
+                    recalls.append(recall_at_k(found, t))
+                rows.append({
+                    'dims': dims,
+                    'quantization': quantization,
+                    'rescore': rescore,
+                    'recall': statistics.mean(recalls),
+                    'p50_ms': statistics.median(times) * 1000,
+                    'ram_mb': index.bytes_in_ram / (1024 * 1024)
+                })
+    return rows
+
+
+def run_qdrant(url, corpus, queries, dims_list, k, batch_size=512):
+    """Same grid against a Qdrant server, with rescoring as configured by the app"""
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import PointStruct
+
+    client = QdrantClient(url=url)
+    truth = [np.argsort(-(corpus @ q))[:k] for q in queries]
+    rows = []
+    for dims in dims_list:
+        vectors = truncate(corpus, dims)
+        qs = truncate(queries, dims)
+        for quantization in ('none', 'int8', 'binary'):
+            config = VectorStorageConfig(dimensions=dims, quantization=quantization, rescore=True,
+                                         oversampling=DEFAULT_OVERSAMPLING[quantization], on_disk=True)
+            name = f"bench_quant_{quantization}_{dims}"
+            if client.collection_exists(name):
+                client.delete_collection(name)
+            client.create_collection(name, vectors_config=build_vectors_config(config),
+                                     quantization_config=build_quantization_config(config))
+            for offset in range(0, len(vectors), batch_size):
+                client.upsert(name, points=[
+                    PointStruct(id=offset + i, vector=v.tolist())
+                    for i, v in enumerate(vectors[offset:offset + batch_size])
+                ])
+
+            recalls, times = [], []
+            for q, t in zip(qs, truth):
+                start = time.perf_counter()
+                hits = client.search(name, query_vector=q.tolist(), limit=k,
+                                     search_params=build_search_params(config))
+                times.append(time.perf_counter() - start)
+                recalls.append(recall_at_k(np.array([h.id for h in hits]), t))
+
+            rows.append({
+                'dims': dims,
+                'quantization': quantization,
+                'rescore': quantization != 'none',
+                'recall': statistics.mean(recalls),
+                'p50_ms': statistics.median(times) * 1000,
+                'ram_mb': len(vectors) * config.bytes_per_vector / (1024 * 1024)
+            })
+            client.delete_collection(name)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector storage mode recall/latency benchmark")
+    parser.add_argument('--corpus', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--dims', default='1536,768,512,256')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--url', default=None, help="Qdrant server URL (default: numpy simulation)")
+    args = parser.parse_args()
+
+    dims_list = [int(d) for d in args.dims.split(',')]
+    corpus, queries = make_corpus(args.corpus, args.queries)
+
+    print("=" * 72)
+    print("Vector Storage Modes - recall@{} vs latency/memory".format(args.k))
+    print(f"{args.corpus:,} vectors, {args.queries} queries, backend: {args.url or 'numpy simulation'}")
+    print("=" * 72)
+
+    rows = run_qdrant(args.url, corpus, queries, dims_list, args.k) if args.url \
+        else run_simulated(corpus, queries, dims_list, args.k)
+
+    print(f"{'dims':>6} {'mode':>8} {'rescore':>8} {'recall':>8} {'p50 ms':>9} {'RAM MB':>9}")
+    print("-" * 72)
+    for r in rows:
+        print(f"{r['dims']:>6} {r['quantization']:>8} {str(r['rescore']):>8} "
+              f"{r['recall']:>8.3f} {r['p50_ms']:>9.2f} {r['ram_mb']:>9.1f}")
+
+    print("\nConfigure the chosen mode with VECTOR_QUANTIZATION, VECTOR_DIMENSIONS,")
+    print("VECTOR_RESCORE and VECTOR_OVERSAMPLING (see utils/qdrant_init.py).")
+
+
+if __name__ == "__main__":
+    main()
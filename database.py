@@ -3,6 +3,8 @@ import json
 from datetime import datetime, timedelta, date
 import os
 
+from utils.metrics import metrics
+
 DATABASE_FILE = 'mainDB.db'  # Back to using main database after fixing corruption
 
 def convert_dates_to_strings(obj):
@@ -145,6 +147,7 @@ def get_all_draft_metadata():
     procurements = get_all_procurements()
     return [(p['id'], p['zadnja_sprememba']) for p in procurements if p.get('status') == 'Delno izpolnjeno']
 
+@metrics.timed('db_call_seconds', site='get_recent_drafts')
 def get_recent_drafts(limit=5):
     """Get the most recent draft entries with metadata."""
     init_db()
@@ -180,6 +183,7 @@ def get_recent_drafts(limit=5):
         
         return results
 
+@metrics.timed('db_call_seconds', site='load_draft')
 def load_draft(draft_id):
     init_db()
     with sqlite3.connect(DATABASE_FILE) as conn:
@@ -192,6 +196,7 @@ def load_draft(draft_id):
 
 # ============ PROCUREMENT CRUD OPERATIONS ============
 
+@metrics.timed('db_call_seconds', site='get_procurements_for_customer')
 def get_procurements_for_customer(customer_name='demo_organizacija'):
     """Fetch all procurements for a specific customer."""
     init_db()
@@ -210,6 +215,7 @@ def get_procurements_for_customer(customer_name='demo_organizacija'):
     conn.close()
     return procurements
 
+@metrics.timed('db_call_seconds', site='get_procurement_by_id')
 def get_procurement_by_id(procurement_id):
     """Fetch a single procurement by ID."""
     init_db()
@@ -231,6 +237,7 @@ def get_procurement_by_id(procurement_id):
         return procurement
     return None
 
+@metrics.timed('db_call_seconds', site='create_procurement')
 def create_procurement(form_data, customer_name='demo_organizacija'):
     """Create a new procurement record."""
     init_db()
@@ -357,6 +364,7 @@ def create_procurement(form_data, customer_name='demo_organizacija'):
         conn.commit()
         return cursor.lastrowid
 
+@metrics.timed('db_call_seconds', site='update_procurement')
 def update_procurement(procurement_id, form_data):
     """Update an existing procurement record."""
     import logging
@@ -504,6 +512,7 @@ def update_procurement(procurement_id, form_data):
         conn.commit()
         return cursor.rowcount > 0
 
+@metrics.timed('db_call_seconds', site='delete_procurement')
 def delete_procurement(procurement_id):
     """Delete a procurement record."""
     init_db()
@@ -899,6 +908,7 @@ def create_ai_documents_tables():
 
 # ============ ORGANIZATION MANAGEMENT (Story 2) ============
 
+@metrics.timed('db_call_seconds', site='get_all_organizations')
 def get_all_organizations():
     """Get all organizations from the database."""
     init_db()
@@ -921,6 +931,7 @@ def get_all_organizations():
             else:
                 raise
 
+@metrics.timed('db_call_seconds', site='get_organization_by_name')
 def get_organization_by_name(name):
     """Get organization by name."""
     init_db()
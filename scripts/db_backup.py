@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Online backups of the application database (see services/backup_service.py).
+
+    python scripts/db_backup.py full                       # new snapshot (starts a generation)
+    python scripts/db_backup.py wal                        # archive WAL frames committed since last run
+    python scripts/db_backup.py run --interval 60          # archive continuously, snapshot daily, prune
+    python scripts/db_backup.py list
+    python scripts/db_backup.py prune --keep 3 --max-age-days 14
+    python scripts/db_backup.py restore --target restored.db --until 2026-10-18T14:30:00
+
+Restore never writes over the live database unless --overwrite is given;
+stop the application before restoring over it.
+"""
+
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from services.backup_service import BackupManager, BackupError, RetentionPolicy, BACKUP_DIR
+
+
+def _describe(record):
+    if record is None:
+        return "nothing new to archive"
+    if record.kind == 'full':
+        return f"snapshot {record.path}: {record.pages} pages, {record.size / 1024:.1f} KiB"
+    return f"WAL frames {record.first_frame}-{record.last_frame} -> {record.path} ({record.size / 1024:.1f} KiB)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online SQLite backups with WAL archiving")
+    parser.add_argument('--db', default=None, help="Database file (default: database.DATABASE_FILE)")
+    parser.add_argument('--backup-dir', default=BACKUP_DIR)
+    parser.add_argument('--pages-per-step', type=int, default=None,
+                        help="Pages per backup step in rollback-journal mode (<=0: one step)")
+    parser.add_argument('--step-pause', type=float, default=None, help="Seconds to pause between steps")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('full', help="Take a snapshot")
+    commands.add_parser('wal', help="Archive new WAL frames")
+    run = commands.add_parser('run', help="Archive continuously")
+    run.add_argument('--interval', type=float, default=60.0, help="Seconds between WAL archive runs")
+    run.add_argument('--full-every', type=float, default=24.0, help="Hours between snapshots")
+    commands.add_parser('list', help="List generations")
+    prune = commands.add_parser('prune', help="Apply the retention policy")
+    prune.add_argument('--keep', type=int, default=3, help="Newest generations to keep")
+    prune.add_argument('--max-age-days', type=int, default=14, help="Also keep generations younger than this")
+    restore = commands.add_parser('restore', help="Rebuild a database from the backups")
+    restore.add_argument('--target', required=True)
+    restore.add_argument('--until', default=None, help="ISO timestamp; restore the last archived state before it")
+    restore.add_argument('--generation', default=None)
+    restore.add_argument('--overwrite', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    options = {k: v for k, v in (('pages_per_step', args.pages_per_step), ('step_pause', args.step_pause))
+               if v is not None}
+    manager = BackupManager(args.db, backup_dir=args.backup_dir, **options)
+
+    try:
+        if args.command == 'full':
+            print(_describe(manager.full_backup()))
+        elif args.command == 'wal':
+            print(_describe(manager.archive_wal()))
+        elif args.command == 'run':
+            manager.run(interval=args.interval, full_every=args.full_every * 3600)
+        elif args.command == 'list':
+            for generation, records in manager.generations().items():
+                wal = [r for r in records if r.kind == 'wal']
+                size = sum(r.size for r in records)
+                last = records[-1].created
+                print(f"{generation}  {len(wal):4d} WAL segments  {size / (1024 * 1024):8.2f} MiB  up to {last}")
+        elif args.command == 'prune':
+            removed = manager.prune(RetentionPolicy(args.keep, args.max_age_days))
+            print(f"Removed {len(removed)} generation(s): {', '.join(removed) or '-'}")
+        elif args.command == 'restore':
+            until = datetime.fromisoformat(args.until) if args.until else None
+            result = manager.restore(args.target, until=until, generation=args.generation,
+                                     overwrite=args.overwrite)
+            print(f"Restored generation {result['generation']} ({result['frames']} WAL frames) "
+                  f"as of {result['restored_to']} to {args.target}")
+    except BackupError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
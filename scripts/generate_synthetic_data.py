@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Generate a production-scale synthetic database for load tests and benchmarks.
+
+Creates organizations, CPV criteria assignments, procurements whose
+form_data_json follows SEZNAM_POTREBNIH_PODATKOV.json (including multi-lot
+forms), form documents with associations and versions, AI documents with
+chunks, and application logs.
+
+Output is deterministic: the same --seed and --end-date produce the same rows.
+Rows are inserted with executemany in large transactions, with secondary
+indexes dropped during the load and rebuilt afterwards, so a million log rows
+take seconds rather than minutes.
+
+    python scripts/generate_synthetic_data.py --db /tmp/load.db --procurements 100000 --logs 1000000
+    python scripts/generate_synthetic_data.py --db mainDB.db --scale small --append
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import itertools
+import argparse
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import database
+from config import LOT_SPECIFIC_STEPS, FINAL_STEPS
+
+SCHEMA_FILE = os.path.join(ROOT, 'json_files', 'SEZNAM_POTREBNIH_PODATKOV.json')
+CPV_SEED_FILE = os.path.join(ROOT, 'json_files', 'cpv_seed_data.json')
+
+SCALES = {
+    'small': {'organizations': 20, 'procurements': 1_000, 'cpv_criteria': 500,
+              'form_documents': 1_000, 'ai_documents': 100, 'logs': 50_000},
+    'medium': {'organizations': 200, 'procurements': 20_000, 'cpv_criteria': 3_000,
+               'form_documents': 20_000, 'ai_documents': 2_000, 'logs': 1_000_000},
+    'large': {'organizations': 1_000, 'procurements': 200_000, 'cpv_criteria': 9_000,
+              'form_documents': 200_000, 'ai_documents': 20_000, 'logs': 5_000_000},
+}
+
+# Sections saved per lot (lot_N.<section>.<field>) in multi-lot forms
+LOT_SECTIONS = {key for step in LOT_SPECIFIC_STEPS + FINAL_STEPS for key in step}
+
+WORDS = (
+    "naročnik ponudnik javno naročilo sklop pogodba merilo cena rok izvedba dobava "
+    "storitev gradnja specifikacija zahteva ponudba vrednost plačilo garancija pogoj "
+    "sposobnost referenca dokazilo obrazec priloga postopek odpiranje pregled pogajanja "
+    "kakovost okolje socialno trajnost dokumentacija vzdrževanje oprema material"
+).split()
+TOWNS = ["Ljubljana", "Maribor", "Celje", "Kranj", "Koper", "Novo mesto", "Velenje",
+         "Ptuj", "Murska Sobota", "Nova Gorica", "Jesenice", "Trbovlje", "Kamnik"]
+ORG_KINDS = ["Občina", "Javni zavod", "Osnovna šola", "Zdravstveni dom", "Komunalno podjetje"]
+LOG_MODULES = [("app", "main"), ("database", "get_procurement_by_id"), ("ui.dashboard", "render_dashboard"),
+               ("utils.validations", "validate_step"), ("services.ai_response_service", "generate_field_response"),
+               ("ui.admin_panel", "render_admin_panel"), ("services.qdrant_document_processor", "process_document")]
+LOG_LEVELS = (["DEBUG"] * 30 + ["INFO"] * 55 + ["WARNING"] * 10 + ["ERROR"] * 4 + ["CRITICAL"])
+RETENTION_HOURS = {'DEBUG': 24, 'INFO': 168, 'WARNING': 720, 'ERROR': 2160, 'CRITICAL': 8760}
+FILE_TYPES = [('.pdf', 'application/pdf'),
+              ('.docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+              ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+              ('.txt', 'text/plain')]
+DOCUMENT_FIELDS = ["technicalSpecifications.specificationDocuments", "priceInfo.priceDocuments",
+                   "contractInfo.contractDraft", "otherInfo.attachments"]
+
+
+def sentence(rng: random.Random, words: int = 10) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+class SchemaFaker:
+    """Random values that follow the form JSON schema (enums, types, bounds, $refs)"""
+
+    def __init__(self, schema: Dict[str, Any], rng: random.Random, fill_rate: float = 0.8):
+        self.schema = schema
+        self.rng = rng
+        self.fill_rate = fill_rate
+
+    def _resolve(self, prop: Dict[str, Any]) -> Dict[str, Any]:
+        if '$ref' not in prop:
+            return prop
+        target = self.schema
+        for part in prop['$ref'].lstrip('#/').split('/'):
+            target = target.get(part, {})
+        return {**target, **{k: v for k, v in prop.items() if k != '$ref'}}
+
+    def value(self, prop: Dict[str, Any], depth: int = 0) -> Any:
+        prop = self._resolve(prop)
+        rng = self.rng
+        if prop.get('enum'):
+            return rng.choice(prop['enum'])
+        kind = prop.get('type')
+        if kind == 'object':
+            return self.object(prop, depth + 1) if depth < 6 else {}
+        if kind == 'array':
+            items = self._resolve(prop.get('items', {}))
+            if items.get('enum'):
+                return rng.sample(items['enum'], rng.randint(0, min(3, len(items['enum']))))
+            if items.get('type') == 'object':
+                return [self.object(items, depth + 1) for _ in range(rng.randint(1, 3))]
+            return []
+        if kind == 'boolean':
+            return rng.random() < 0.5
+        if kind in ('number', 'integer'):
+            low = prop.get('minimum', 0)
+            high = prop.get('maximum', 1_000_000 if kind == 'number' else 1_000)
+            return rng.randint(int(low), int(high)) if kind == 'integer' else round(rng.uniform(low, high), 2)
+        if prop.get('format') == 'date':
+            return (date(2024, 1, 1) + timedelta(days=rng.randint(0, 700))).isoformat()
+        return sentence(rng, rng.randint(2, 12))
+
+    def object(self, prop: Dict[str, Any], depth: int = 0) -> Dict[str, Any]:
+        required = set(prop.get('required', []))
+        return {
+            name: self.value(child, depth)
+            for name, child in prop.get('properties', {}).items()
+            if name in required or self.rng.random() < self.fill_rate
+        }
+
+
+class SyntheticDataGenerator:
+    """Bulk loader for one SQLite database file"""
+
+    def __init__(self, db_path: str, seed: int = 42, end_date: Optional[date] = None,
+                 batch_size: int = 50_000):
+        self.db_path = db_path
+        self.seed = seed
+        self.end_date = end_date or date.today()
+        self.batch_size = batch_size
+        with open(SCHEMA_FILE, encoding='utf-8') as f:
+            self.schema = json.load(f)
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        # Bulk-load settings: no fsync, rollback journal kept in memory
+        self.conn.execute("PRAGMA journal_mode=MEMORY")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-65536")
+
+    @property
+    def stamp(self) -> str:
+        """Fixed value for created_at-style columns that would otherwise default to now"""
+        return f"{self.end_date} 00:00:00"
+
+    def rng(self, name: str) -> random.Random:
+        """Independent stream per table, so changing one count does not shift the others"""
+        return random.Random(f"{self.seed}:{name}")
+
+    def close(self):
+        self.conn.execute("PRAGMA journal_mode=WAL")  # what the application expects
+        self.conn.close()
+
+    # ============ INFRASTRUCTURE ============
+
+    def init_schema(self):
+        """Create all tables through the application's own migrations"""
+        previous_cwd, previous_db = os.getcwd(), database.DATABASE_FILE
+        database.DATABASE_FILE = self.db_path
+        os.chdir(ROOT)  # migrations/ paths are relative to the project root
+        try:
+            database.init_db()
+        finally:
+            os.chdir(previous_cwd)
+            database.DATABASE_FILE = previous_db
+
+    def columns(self, table: str) -> List[str]:
+        return [row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+
+    def max_id(self, table: str) -> int:
+        return self.conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+
+    def bulk_insert(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """executemany of dict rows; the first row's keys define the columns"""
+        iterator = iter(rows)
+        first = next(iterator, None)
+        if first is None:
+            return 0
+        columns = list(first)
+        return self.insert_rows(table, columns, (
+            tuple(row[c] for c in columns) for row in itertools.chain([first], iterator)
+        ))
+
+    def insert_rows(self, table: str, columns: Sequence[str], rows: Iterable[Tuple]) -> int:
+        """
+        executemany of tuple rows in batch_size transactions.
+
+        Columns missing from the live table (older schemas) are dropped, so
+        the loader works against databases at any migration level.
+        """
+        available = set(self.columns(table))
+        keep = [i for i, c in enumerate(columns) if c in available]
+        if len(keep) < len(columns):
+            rows = (tuple(row[i] for i in keep) for row in rows)
+        names = [columns[i] for i in keep]
+        sql = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+
+        count = 0
+        for batch in iter(lambda: list(itertools.islice(rows, self.batch_size)), []):
+            count += self._write(sql, batch)
+        return count
+
+    def _write(self, sql: str, batch: Sequence[Tuple]) -> int:
+        self.conn.execute("BEGIN")
+        self.conn.executemany(sql, batch)
+        self.conn.execute("COMMIT")
+        return len(batch)
+
+    @contextmanager
+    def deferred_indexes(self, tables: Sequence[str]) -> Iterator[None]:
+        """Drop secondary indexes during the load and rebuild them once at the end"""
+        placeholders = ', '.join('?' * len(tables))
+        indexes = self.conn.execute(f"""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+        """, tuple(tables)).fetchall()
+        for name, _ in indexes:
+            self.conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+        try:
+            yield
+        finally:
+            for _, sql in indexes:
+                self.conn.execute(sql)
+
+    # ============ TABLES ============
+
+    def organizations(self, count: int) -> List[Tuple[int, str]]:
+        rng = self.rng('organizations')
+        start = self.max_id('organizacija')
+        names = []
+        for i in range(count):
+            names.append(f"{rng.choice(ORG_KINDS)} {rng.choice(TOWNS)} {start + i + 1}")
+        self.bulk_insert('organizacija', (
+            {'naziv': name,
+             'password_hash': hashlib.sha256(f"{self.seed}:{name}".encode()).hexdigest(),
+             'created_at': f"{self.end_date - timedelta(days=rng.randint(30, 900))} 08:00:00"}
+            for name in names
+        ))
+        return self.conn.execute("SELECT id, naziv FROM organizacija ORDER BY id").fetchall()
+
+    def cpv_criteria(self, count: int) -> int:
+        """Load CPV codes if missing, then assign criteria types to `count` codes"""
+        if self.conn.execute("SELECT COUNT(*) FROM cpv_codes").fetchone()[0] == 0:
+            with open(CPV_SEED_FILE, encoding='utf-8') as f:
+                self.bulk_insert('cpv_codes', ({'code': c['code'], 'description': c['description'],
+                                                'created_at': self.stamp, 'updated_at': self.stamp}
+                                               for c in json.load(f)))
+        for name, description in (("Merila - cena", "Izberite kode, kjer cena ne sme biti edino merilo"),
+                                  ("Merila - socialna merila", "Izberite kode, kjer veljajo socialna merila")):
+            self.conn.execute("INSERT OR IGNORE INTO criteria_types (name, description, created_at) "
+                              "VALUES (?, ?, ?)", (name, description, self.stamp))
+        type_ids = [row[0] for row in self.conn.execute("SELECT id FROM criteria_types ORDER BY id")]
+        codes = [row[0] for row in self.conn.execute("SELECT code FROM cpv_codes ORDER BY code")]
+        rng = self.rng('cpv_criteria')
+        pairs = {(rng.choice(codes), rng.choice(type_ids))
+                 for _ in range(min(count, len(codes) * len(type_ids)) * 2)}
+        pairs = [pair + (self.stamp, self.stamp) for pair in sorted(pairs)[:count]]
+        self.conn.execute("BEGIN")
+        self.conn.executemany("INSERT OR IGNORE INTO cpv_criteria (cpv_code, criteria_type_id, created_at, updated_at) "
+                              "VALUES (?, ?, ?, ?)", pairs)
+        self.conn.execute("COMMIT")
+        return len(pairs)
+
+    def _form_templates(self, lots: int, variants: int = 32) -> List[Tuple[str, float]]:
+        """
+        Pre-serialized form_data_json templates with __NAZIV__ placeholders.
+
+        Serializing a full schema-shaped form per row dominates load time, so
+        each lot count gets a pool of distinct forms and rows pick from it.
+        """
+        rng = self.rng(f'forms:{lots}')
+        faker = SchemaFaker(self.schema, rng)
+        properties = self.schema['properties']
+        templates = []
+        for _ in range(variants):
+            form = {name: faker.value(prop) for name, prop in properties.items()
+                    if lots == 1 or name not in LOT_SECTIONS}
+            form['projectInfo'] = {**form.get('projectInfo', {}), 'projectName': '__NAZIV__'}
+            total = 0.0
+            if lots > 1:
+                form['lotsInfo'] = {**form.get('lotsInfo', {}), 'hasLots': True}
+                form['lot_mode'] = 'multiple'
+                form['num_lots'] = lots
+                form['lots'] = [{'name': f"Sklop {i + 1}", 'index': i} for i in range(lots)]
+                for lot in range(lots):
+                    for section in LOT_SECTIONS:
+                        if section in properties:
+                            self._flatten(form, f"lot_{lot}.{section}", faker.value(properties[section]))
+                    value = round(rng.uniform(5_000, 800_000), 2)
+                    form[f"lot_{lot}.orderType.estimatedValue"] = value
+                    total += value
+            else:
+                form['lot_mode'] = 'single'
+                total = round(rng.uniform(10_000, 3_000_000), 2)
+                form['orderType'] = {**form.get('orderType', {}), 'estimatedValue': total}
+            templates.append((json.dumps(form, ensure_ascii=False), total))
+        return templates
+
+    @staticmethod
+    def _flatten(target: Dict[str, Any], prefix: str, value: Any):
+        if isinstance(value, dict):
+            for key, child in value.items():
+                SyntheticDataGenerator._flatten(target, f"{prefix}.{key}", child)
+        else:
+            target[prefix] = value
+
+    def procurements(self, count: int, organizations: List[Tuple[int, str]],
+                     lot_weights: Dict[int, int] = None) -> int:
+        lot_weights = lot_weights or {1: 60, 2: 15, 3: 12, 5: 8, 10: 5}
+        templates = {lots: self._form_templates(lots) for lots in lot_weights}
+        lot_choices, weights = list(lot_weights), list(lot_weights.values())
+        org_names = [name for _, name in organizations] or ['demo_organizacija']
+        rng = self.rng('procurements')
+        statuses = ['Osnutek'] * 6 + ['Objavljeno'] * 3 + ['Zaključeno']
+        start = self.max_id('javna_narocila')
+
+        def rows():
+            for i in range(count):
+                lots = rng.choices(lot_choices, weights)[0]
+                template, value = rng.choice(templates[lots])
+                naziv = f"JN-{start + i + 1:07d} {sentence(rng, 4)[:-1]}"
+                modified = self.end_date - timedelta(days=rng.randint(0, 730))
+                yield {
+                    'organizacija': rng.choice(org_names),
+                    'naziv': naziv,
+                    'vrsta': rng.choice(['blago', 'storitve', 'gradnje']),
+                    'postopek': rng.choice(['odprti postopek', 'naročilo male vrednosti', 'konkurenčni dialog']),
+                    'datum_objave': modified.isoformat(),
+                    'status': rng.choice(statuses),
+                    'vrednost': value,
+                    'form_data_json': template.replace('__NAZIV__', json.dumps(naziv, ensure_ascii=False)[1:-1]),
+                    'zadnja_sprememba': f"{modified} 12:00:00",
+                    'uporabnik': 'synthetic',
+                    'created_at': f"{modified} 09:00:00"
+                }
+        return self.bulk_insert('javna_narocila', rows())
+
+    def form_documents(self, count: int, max_versions: int = 3) -> Dict[str, int]:
+        """Documents (latest version active), their version history and form associations"""
+        rng = self.rng('form_documents')
+        form_ids = [row[0] for row in self.conn.execute("SELECT id FROM javna_narocila")] or [1]
+        org_ids = [row[0] for row in self.conn.execute("SELECT id FROM organizacija")] or [None]
+        next_id = self.max_id('form_documents') + 1
+        documents, versions, associations = [], [], []
+
+        for i in range(count):
+            ext, mime = rng.choice(FILE_TYPES)
+            name = f"{rng.choice(WORDS)}_{i}{ext}"
+            size = rng.randint(10_000, 20_000_000)
+            version_count = rng.randint(1, max_versions)
+            file_hash = hashlib.sha256(f"{self.seed}:doc:{i}".encode()).hexdigest()
+            uploaded = datetime.combine(self.end_date, datetime.min.time()) - timedelta(minutes=rng.randint(0, 1_000_000))
+            doc_id = next_id + i
+            documents.append({
+                'id': doc_id, 'file_hash': file_hash, 'original_name': name,
+                'file_path': f"data/form_documents/{file_hash[:2]}/{file_hash}{ext}",
+                'file_size': size, 'mime_type': mime, 'file_type': ext,
+                'processing_status': rng.choice(['completed'] * 8 + ['pending', 'failed']),
+                'version': version_count, 'is_active': 1,
+                'metadata_json': json.dumps({'pages': rng.randint(1, 120)}),
+                'upload_date': uploaded.isoformat(sep=' ', timespec='seconds'),
+                'created_at': uploaded.isoformat(sep=' ', timespec='seconds'),
+                'updated_at': uploaded.isoformat(sep=' ', timespec='seconds')
+            })
+            for v in range(1, version_count + 1):
+                versions.append({
+                    'document_id': doc_id, 'version_number': v,
+                    'file_hash': hashlib.sha256(f"{file_hash}:{v}".encode()).hexdigest(),
+                    'file_path': f"data/form_documents/versions/{doc_id}_v{v}{ext}",
+                    'file_size': size + rng.randint(-5_000, 5_000), 'original_name': name,
+                    'change_type': 'create' if v == 1 else 'replace',
+                    'changed_by': 'synthetic',
+                    'changed_at': (uploaded - timedelta(days=version_count - v)).isoformat(sep=' ', timespec='seconds')
+                })
+            # Shared documents are associated with several forms
+            for form_id in {rng.choice(form_ids) for _ in range(rng.choice([1, 1, 1, 2, 3]))}:
+                associations.append({
+                    'form_document_id': doc_id, 'form_id': form_id,
+                    'form_type': rng.choice(['submission', 'submission', 'draft']),
+                    'field_name': rng.choice(DOCUMENT_FIELDS),
+                    'organization_id': rng.choice(org_ids), 'created_by': 'synthetic',
+                    'created_at': uploaded.isoformat(sep=' ', timespec='seconds')
+                })
+
+        return {
+            'form_documents': self.bulk_insert('form_documents', documents),
+            'form_document_versions': self.bulk_insert('form_document_versions', versions),
+            'form_document_associations': self.bulk_insert('form_document_associations', associations)
+        }
+
+    def ai_documents(self, count: int, chunks_per_document: Tuple[int, int] = (5, 60)) -> Dict[str, int]:
+        rng = self.rng('ai_documents')
+        next_id = self.max_id('ai_documents') + 1
+        documents, chunks = [], []
+        for i in range(count):
+            doc_id = next_id + i
+            ext, _ = rng.choice(FILE_TYPES)
+            n_chunks = rng.randint(*chunks_per_document)
+            created = datetime.combine(self.end_date, datetime.min.time()) - timedelta(minutes=rng.randint(0, 1_000_000))
+            documents.append({
+                'id': doc_id, 'filename': f"baza_znanja_{doc_id}{ext}",
+                'file_path': f"data/ai_documents/{doc_id}{ext}", 'file_type': ext.lstrip('.'),
+                'tip_dokumenta': rng.choice(['pogodbe', 'razpisi', 'navodila', 'specifikacije', 'general']),
+                'tags': json.dumps(rng.sample(WORDS, 3), ensure_ascii=False),
+                'description': sentence(rng, 8), 'processing_status': 'completed',
+                'chunk_count': n_chunks, 'embedding_count': n_chunks,
+                'created_at': created.isoformat(sep=' ', timespec='seconds'),
+                'processed_at': created.isoformat(sep=' ', timespec='seconds'),
+                'updated_at': created.isoformat(sep=' ', timespec='seconds')
+            })
+            for index in range(n_chunks):
+                text = ' '.join(sentence(rng, rng.randint(10, 25)) for _ in range(6))
+                chunks.append({
+                    'document_id': doc_id, 'chunk_index': index, 'chunk_text': text,
+                    'chunk_size': len(text), 'vector_id': f"{doc_id}_{index}", 'embedding_generated': 1,
+                    'created_at': created.isoformat(sep=' ', timespec='seconds')
+                })
+        return {
+            'ai_documents': self.bulk_insert('ai_documents', documents),
+            'ai_document_chunks': self.bulk_insert('ai_document_chunks', chunks)
+        }
+
+    def application_logs(self, count: int, days: int = 30,
+                         organizations: List[Tuple[int, str]] = ()) -> int:
+        """Logs spread over the last `days` days, newest at end_date"""
+        rng = self.rng('application_logs')
+        messages = [sentence(rng, rng.randint(4, 20)) for _ in range(5_000)]
+        orgs = list(organizations) or [(None, None)]
+        sessions = [hashlib.md5(f"{self.seed}:session:{i}".encode()).hexdigest() for i in range(2_000)]
+        end = datetime.combine(self.end_date, datetime.max.time().replace(microsecond=0))
+        offsets = range(days * 86_400)
+        line_numbers = range(1, 3000)
+        columns = ('timestamp', 'organization_id', 'organization_name', 'session_id', 'log_level',
+                   'module', 'function_name', 'line_number', 'message', 'retention_hours',
+                   'expires_at', 'created_at', 'log_date', 'log_time')
+
+        def rows():
+            # Random draws per chunk with choices(k=...), which is several times
+            # cheaper than one randrange/choice call per field per row
+            for chunk_start in range(0, count, self.batch_size):
+                n = min(self.batch_size, count - chunk_start)
+                for offset, level, (module, function), (org_id, org_name), session, line, message in zip(
+                        rng.choices(offsets, k=n), rng.choices(LOG_LEVELS, k=n),
+                        rng.choices(LOG_MODULES, k=n), rng.choices(orgs, k=n),
+                        rng.choices(sessions, k=n), rng.choices(line_numbers, k=n),
+                        rng.choices(messages, k=n)):
+                    ts = end - timedelta(seconds=offset)
+                    stamp = ts.isoformat(sep=' ')
+                    hours = RETENTION_HOURS[level]
+                    yield (stamp, org_id, org_name, session, level, module, function, line, message, hours,
+                           (ts + timedelta(hours=hours)).isoformat(sep=' '), stamp, stamp[:10], stamp[11:])
+        return self.insert_rows('application_logs', columns, rows())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic production-scale data")
+    parser.add_argument('--db', required=True, help="SQLite database file to create or extend")
+    parser.add_argument('--scale', choices=list(SCALES), default='small',
+                        help="Preset row counts; individual counts below override it")
+    for name in SCALES['small']:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=None, dest=name)
+    parser.add_argument('--log-days', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end-date', type=date.fromisoformat, default=None,
+                        help="Newest timestamp (YYYY-MM-DD, default today); fix it for identical output")
+    parser.add_argument('--batch-size', type=int, default=50_000)
+    parser.add_argument('--append', action='store_true', help="Allow writing into a non-empty database")
+    args = parser.parse_args()
+
+    counts = {name: getattr(args, name) if getattr(args, name) is not None else default
+              for name, default in SCALES[args.scale].items()}
+
+    if os.path.exists(args.db) and os.path.getsize(args.db) > 0 and not args.append:
+        parser.error(f"{args.db} already exists; use --append to add rows to it")
+
+    generator = SyntheticDataGenerator(args.db, seed=args.seed, end_date=args.end_date,
+                                       batch_size=args.batch_size)
+    generator.init_schema()
+    tables = ['organizacija', 'cpv_criteria', 'javna_narocila', 'form_documents',
+              'form_document_versions', 'form_document_associations',
+              'ai_documents', 'ai_document_chunks', 'application_logs']
+
+    def timed(label, fn):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        rows = sum(result.values()) if isinstance(result, dict) else (
+            len(result) if isinstance(result, list) else result)
+        print(f"  {label:<22} {rows:>12,} rows {elapsed:8.2f}s  ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+        return result
+
+    print(f"Generating into {args.db} (seed={args.seed}, scale={args.scale})")
+    total_start = time.perf_counter()
+    with generator.deferred_indexes(tables):
+        organizations = timed('organizations', lambda: generator.organizations(counts['organizations']))
+        timed('cpv_criteria', lambda: generator.cpv_criteria(counts['cpv_criteria']))
+        timed('procurements', lambda: generator.procurements(counts['procurements'], organizations))
+        timed('form_documents', lambda: generator.form_documents(counts['form_documents']))
+        timed('ai_documents', lambda: generator.ai_documents(counts['ai_documents']))
+        timed('application_logs', lambda: generator.application_logs(
+            counts['logs'], days=args.log_days, organizations=organizations))
+        index_start = time.perf_counter()
+    print(f"  {'rebuild indexes':<22} {'':>12}      {time.perf_counter() - index_start:8.2f}s")
+    generator.conn.execute("ANALYZE")
+    generator.close()
+    print(f"Done in {time.perf_counter() - total_start:.1f}s, "
+          f"{os.path.getsize(args.db) / (1024 * 1024):,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
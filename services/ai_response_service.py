@@ -8,6 +8,11 @@ import logging
 from typing import List, Dict, Optional, Tuple
 from openai import OpenAI
 
+from utils.metrics import metrics
+from utils.single_flight import model_limits
+from services.llm_stream import ChatStream, stream_chat, completion_params
+from services.context_packer import PackedContext, pack_context
+
 # Force load environment variables
 try:
     from dotenv import load_dotenv
@@ -65,8 +70,59 @@ class AIResponseService:
         Returns:
             Generated response text
         """
+        return ''.join(self.stream_response(query, chunks, context_mode, language))
+    
+    def stream_response(
+        self,
+        query: str,
+        chunks: List[Dict],
+        context_mode: str = "document",
+        language: str = "sl"
+    ) -> ChatStream:
+        """
+        Streaming variant of generate_response: an iterator of text deltas
+        (render with st.write_stream). Arguments as for generate_response.
+        """
         if not self.client:
-            return "❌ OpenAI ni konfiguriran. Preverite API ključ."
+            return ChatStream.from_text("❌ OpenAI ni konfiguriran. Preverite API ključ.")
+        
+        # Allow empty chunks for form context mode (pure AI generation)
+        if not chunks and context_mode != "form":
+            return ChatStream.from_text("🔍 Ni najdenih relevantnih informacij za odgovor na vaše vprašanje.")
+        
+        # Check if user is asking for summary
+        is_summary_request = self._is_summary_request(query)
+        
+        # Build context from chunks
+        packed = self._pack_context(chunks)
+        context_text = packed.text
+        
+        # Create system message based on language
+        if language == "sl":
+            system_message = self._get_slovenian_system_message(is_summary_request, context_mode)
+        else:
+            system_message = self._get_english_system_message(is_summary_request, context_mode)
+        
+        # Build messages for OpenAI
+        messages = [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": f"Kontekst dokumenta:\n\n{context_text}"},
+            {"role": "user", "content": query}
+        ]
+        
+        # Get current model and settings (may have been updated)
+        current_model = self._get_current_model()
+        current_max_tokens = int(os.getenv("AI_MAX_TOKENS", str(self.max_tokens)))
+        current_temperature = float(os.getenv("AI_TEMPERATURE", str(self.temperature)))
+        
+        # Note: o1 models don't support temperature and max_tokens parameters
+        stream = stream_chat(
+            self.client, 'document_response', current_model, messages,
+            error_prefix="❌ Napaka pri generiranju odgovora: ",
+            **completion_params(current_model, current_max_tokens, current_temperature)
+        )
+        stream.context = packed.stats()
+        return stream
     
     def get_ai_response(self, query: str, field_type: str = None) -> str:
         """
@@ -80,14 +136,39 @@ class AIResponseService:
         Returns:
             Generated response text
         """
+        result = ''.join(self.stream_ai_response(query, field_type))
+        logger.info(f"[AI_RESPONSE] Received response: {result[:200] if result else 'None'}...")
+        return result
+    
+    def stream_ai_response(self, query: str, field_type: str = None) -> ChatStream:
+        """Streaming variant of get_ai_response: an iterator of text deltas."""
         if not self.client:
             logger.error("[AI_RESPONSE] OpenAI client not configured")
-            return "❌ OpenAI ni konfiguriran. Preverite API ključ."
+            return ChatStream.from_text("❌ OpenAI ni konfiguriran. Preverite API ključ.")
         
         logger.info(f"[AI_RESPONSE] Getting AI response for field_type: {field_type}")
         logger.debug(f"[AI_RESPONSE] Query (first 500 chars): {query[:500]}...")
         
-        # Build appropriate system message
+        system_message = self.field_system_message(field_type)
+        
+        messages = [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": query}
+        ]
+        
+        current_model = self._get_current_model()
+        logger.info(f"[AI_RESPONSE] Using model: {current_model}")
+        logger.debug(f"[AI_RESPONSE] System message: {system_message[:200]}...")
+        logger.debug(f"[AI_RESPONSE] User query: {query[:200]}...")
+        
+        return stream_chat(
+            self.client, 'field_response', current_model, messages,
+            error_prefix="❌ Napaka pri generiranju odgovora: ",
+            max_tokens=500, temperature=0.7
+        )
+    
+    def field_system_message(self, field_type: str = None) -> str:
+        """System message for form field suggestions (part of the response cache key)."""
         system_message = """Ti si AI asistent za javna naročila v Sloveniji. 
         Pomagaš pri izpolnjevanju obrazcev za javna naročila.
         Odgovori morajo biti konkretni, praktični in skladni s slovensko zakonodajo.
@@ -106,83 +187,7 @@ class AIResponseService:
         elif field_type == "negotiation_terms":
             system_message += "\nOsredotoči se na pogajanja v javnih naročilih (število krogov, vsebina pogajanj, način izvedbe, ipd.)."
         
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": query}
-        ]
-        
-        try:
-            current_model = self._get_current_model()
-            logger.info(f"[AI_RESPONSE] Using model: {current_model}")
-            logger.debug(f"[AI_RESPONSE] System message: {system_message[:200]}...")
-            logger.debug(f"[AI_RESPONSE] User query: {query[:200]}...")
-            
-            response = self.client.chat.completions.create(
-                model=current_model,
-                messages=messages,
-                max_tokens=500,
-                temperature=0.7
-            )
-            
-            result = response.choices[0].message.content
-            logger.info(f"[AI_RESPONSE] Received response: {result[:200] if result else 'None'}...")
-            return result
-            
-        except Exception as e:
-            logger.error(f"[AI_RESPONSE] AI generation error: {e}")
-            import traceback
-            logger.debug(f"[AI_RESPONSE] Traceback: {traceback.format_exc()}")
-            return f"❌ Napaka pri generiranju odgovora: {str(e)}"
-        
-        # Allow empty chunks for form context mode (pure AI generation)
-        if not chunks and context_mode != "form":
-            return "🔍 Ni najdenih relevantnih informacij za odgovor na vaše vprašanje."
-        
-        # Check if user is asking for summary
-        is_summary_request = self._is_summary_request(query)
-        
-        # Build context from chunks
-        context_text = self._build_context(chunks)
-        
-        # Create system message based on language
-        if language == "sl":
-            system_message = self._get_slovenian_system_message(is_summary_request, context_mode)
-        else:
-            system_message = self._get_english_system_message(is_summary_request, context_mode)
-        
-        # Build messages for OpenAI
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": f"Kontekst dokumenta:\n\n{context_text}"},
-            {"role": "user", "content": query}
-        ]
-        
-        try:
-            # Get current model and settings (may have been updated)
-            current_model = self._get_current_model()
-            current_max_tokens = int(os.getenv("AI_MAX_TOKENS", str(self.max_tokens)))
-            current_temperature = float(os.getenv("AI_TEMPERATURE", str(self.temperature)))
-            
-            # Generate response
-            # Note: o1 models don't support temperature and max_tokens parameters
-            if current_model.startswith('o1'):
-                response = self.client.chat.completions.create(
-                    model=current_model,
-                    messages=messages
-                )
-            else:
-                response = self.client.chat.completions.create(
-                    model=current_model,
-                    messages=messages,
-                    max_tokens=current_max_tokens,
-                    temperature=current_temperature
-                )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            logger.error(f"Error generating AI response: {e}")
-            return f"❌ Napaka pri generiranju odgovora: {str(e)}"
+        return system_message
     
     def _is_summary_request(self, query: str) -> bool:
         """Check if query is asking for a summary."""
@@ -201,28 +206,17 @@ class AIResponseService:
         return any(keyword in query_lower for keyword in summary_keywords)
     
     def _build_context(self, chunks: List[Dict]) -> str:
-        """Build context text from chunks."""
-        context_parts = []
-        
-        for i, chunk in enumerate(chunks[:5], 1):  # Use top 5 chunks
-            # Get text from chunk
-            text = chunk.get('chunk_text') or chunk.get('text', '')
-            if not text:
-                continue
-                
-            # Add chunk with metadata
-            chunk_index = chunk.get('chunk_index', i)
+        """Build context text from chunks, packed into the context token budget."""
+        return self._pack_context(chunks).text
+    
+    def _pack_context(self, chunks: List[Dict]) -> PackedContext:
+        """Deduplicated, MMR-selected chunks within AI_CONTEXT_TOKEN_BUDGET."""
+        def header(chunk: Dict, position: int) -> str:
+            chunk_index = chunk.get('chunk_index', position)
             total_chunks = chunk.get('total_chunks', 0)
-            
-            if total_chunks:
-                context_parts.append(f"[Del {chunk_index}/{total_chunks}]")
-            else:
-                context_parts.append(f"[Del {i}]")
-            
-            context_parts.append(text.strip())
-            context_parts.append("")  # Empty line between chunks
+            return f"[Del {chunk_index}/{total_chunks}]" if total_chunks else f"[Del {position}]"
         
-        return "\n".join(context_parts)
+        return pack_context(chunks, header=header, call='document_response')
     
     def _get_slovenian_system_message(self, is_summary: bool, context_mode: str) -> str:
         """Get Slovenian system message."""
@@ -353,18 +347,20 @@ Be precise with all dates and numbers."""
             current_max_tokens = int(os.getenv("AI_MAX_TOKENS", str(self.max_tokens)))
             
             # o1 models don't support temperature and max_tokens
-            if current_model.startswith('o1'):
-                response = self.client.chat.completions.create(
-                    model=current_model,
-                    messages=messages
-                )
-            else:
-                response = self.client.chat.completions.create(
-                    model=current_model,
-                    messages=messages,
-                    max_tokens=current_max_tokens,
-                    temperature=0.5  # Lower temperature for summaries
-                )
+            with model_limits.limit(current_model), \
+                    metrics.time('ai_call_seconds', call='summary', model=current_model):
+                if current_model.startswith('o1'):
+                    response = self.client.chat.completions.create(
+                        model=current_model,
+                        messages=messages
+                    )
+                else:
+                    response = self.client.chat.completions.create(
+                        model=current_model,
+                        messages=messages,
+                        max_tokens=current_max_tokens,
+                        temperature=0.5  # Lower temperature for summaries
+                    )
             
             return response.choices[0].message.content
             
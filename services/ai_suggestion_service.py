@@ -4,7 +4,11 @@ Implements brownfield story for AI suggestion transfer with full form context
 """
 
 import os
+import copy
 import logging
+import time
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Tuple
 import streamlit as st
 from datetime import datetime
@@ -12,6 +16,10 @@ from datetime import datetime
 # Import existing services
 from services.qdrant_crud_service import QdrantCRUDService
 from services.ai_response_service import AIResponseService
+from services.response_cache import get_response_cache, prompt_version, current_org
+from services.context_packer import count_tokens, fit_lines
+from utils.single_flight import ai_calls, fingerprint
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -25,23 +33,32 @@ class AIFieldSuggestionService:
     # Class-level cache for expensive service instances
     _qdrant_service = None
     _ai_response_service = None
+    _init_lock = threading.Lock()
+    
+    # Suggestions generated ahead of a click by the step prefetcher, by request fingerprint
+    _prefetched: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    _prefetched_lock = threading.Lock()
+    PREFETCH_TTL_SECONDS = 600
+    PREFETCH_MAX_ENTRIES = 256
     
     def __init__(self):
         """Initialize with cached Qdrant and AI response services."""
-        # Use cached instances to avoid recreating expensive services
-        if AIFieldSuggestionService._qdrant_service is None:
-            try:
-                AIFieldSuggestionService._qdrant_service = QdrantCRUDService()
-            except Exception as e:
-                logger.warning(f"Could not initialize Qdrant service: {e}")
-                AIFieldSuggestionService._qdrant_service = None
-        
-        if AIFieldSuggestionService._ai_response_service is None:
-            try:
-                AIFieldSuggestionService._ai_response_service = AIResponseService()
-            except Exception as e:
-                logger.warning(f"Could not initialize AI response service: {e}")
-                AIFieldSuggestionService._ai_response_service = None
+        # Use cached instances to avoid recreating expensive services; the lock
+        # keeps sessions starting at the same time from each building their own
+        with AIFieldSuggestionService._init_lock:
+            if AIFieldSuggestionService._qdrant_service is None:
+                try:
+                    AIFieldSuggestionService._qdrant_service = QdrantCRUDService()
+                except Exception as e:
+                    logger.warning(f"Could not initialize Qdrant service: {e}")
+                    AIFieldSuggestionService._qdrant_service = None
+            
+            if AIFieldSuggestionService._ai_response_service is None:
+                try:
+                    AIFieldSuggestionService._ai_response_service = AIResponseService()
+                except Exception as e:
+                    logger.warning(f"Could not initialize AI response service: {e}")
+                    AIFieldSuggestionService._ai_response_service = None
         
         self.qdrant_service = AIFieldSuggestionService._qdrant_service
         self.ai_response_service = AIFieldSuggestionService._ai_response_service
@@ -51,7 +68,8 @@ class AIFieldSuggestionService:
         field_context: str, 
         field_type: str,
         query: str,
-        form_data: Dict = None
+        form_data: Dict = None,
+        refresh: bool = False
     ) -> Dict[str, Any]:
         """
         Collects full form context before generating suggestions.
@@ -61,9 +79,14 @@ class AIFieldSuggestionService:
             field_type: Type of field (e.g., 'negotiation_terms', 'cofinancer_requirements')
             query: User's specific query or field prompt
             form_data: Complete form state from session
+            refresh: Skip the shared response cache and generate new suggestions
             
         Returns:
             Dictionary with suggestions, source, confidence, and context used
+            ('cache' is 'exact' when AI suggestions came from the response cache)
+        
+        Concurrent requests with the same field and form context (several
+        sessions on the same step, a double click) share one generation.
         """
         logger.info(f"[AI_SUGGESTION] Getting AI suggestions for field: {field_context}, type: {field_type}")
         logger.debug(f"[AI_SUGGESTION] Query: {query}")
@@ -74,6 +97,81 @@ class AIFieldSuggestionService:
         logger.info(f"[AI_SUGGESTION] Collected context keys: {list(full_context.keys())[:10]}")
         logger.debug(f"[AI_SUGGESTION] Full context: {full_context}")
         
+        return self.get_suggestion_for_context(field_context, field_type, query, full_context, refresh=refresh)
+    
+    def suggestion_key(self, field_context: str, field_type: str, query: str,
+                       full_context: Dict, org: Optional[str] = None) -> str:
+        """Fingerprint of a suggestion request (org, field and form context)"""
+        return fingerprint('field_suggestion', org or current_org(), field_context, field_type, query, full_context)
+    
+    def get_suggestion_for_context(
+        self,
+        field_context: str,
+        field_type: str,
+        query: str,
+        full_context: Dict,
+        refresh: bool = False,
+        org: Optional[str] = None,
+        prefetch: bool = False
+    ) -> Dict[str, Any]:
+        """
+        get_field_suggestion for an already collected form context.
+        
+        Safe to call outside the Streamlit script thread (the step prefetcher
+        does) as long as org is given. prefetch=True keeps the result for the
+        click that follows.
+        """
+        org = org or current_org()
+        key = self.suggestion_key(field_context, field_type, query, full_context, org)
+        
+        if refresh:
+            self.forget_prefetched(key)
+        else:
+            prefetched = self._take_prefetched(key)
+            if prefetched is not None:
+                logger.info(f"[AI_SUGGESTION] Using prefetched suggestions for field: {field_context}")
+                metrics.inc('ai_prefetch_total', result='hit')
+                return prefetched
+        
+        # A click while the prefetch is still running joins it here
+        result = ai_calls.do(
+            f"{key}:refresh" if refresh else key,
+            lambda: self._suggest(field_context, field_type, query, full_context, refresh, org),
+            call='field_suggestion'
+        )
+        if prefetch:
+            with AIFieldSuggestionService._prefetched_lock:
+                AIFieldSuggestionService._prefetched[key] = (time.time(), result)
+                while len(AIFieldSuggestionService._prefetched) > self.PREFETCH_MAX_ENTRIES:
+                    AIFieldSuggestionService._prefetched.popitem(last=False)
+        # Callers that joined an in-flight request get their own copy
+        return copy.deepcopy(result)
+    
+    def _take_prefetched(self, key: str) -> Optional[Dict[str, Any]]:
+        with AIFieldSuggestionService._prefetched_lock:
+            entry = AIFieldSuggestionService._prefetched.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.PREFETCH_TTL_SECONDS:
+                del AIFieldSuggestionService._prefetched[key]
+                return None
+            return copy.deepcopy(entry[1])
+    
+    def forget_prefetched(self, key: str):
+        """Drop a prefetched result (its form context is no longer current)"""
+        with AIFieldSuggestionService._prefetched_lock:
+            AIFieldSuggestionService._prefetched.pop(key, None)
+    
+    def _suggest(
+        self,
+        field_context: str,
+        field_type: str,
+        query: str,
+        full_context: Dict,
+        refresh: bool = False,
+        org: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Knowledge base first, then AI generation (the body of get_field_suggestion)."""
         # Build intelligent search query using full context
         search_query = self._build_contextual_query(field_context, field_type, full_context)
         
@@ -98,7 +196,9 @@ class AIFieldSuggestionService:
             field_context, 
             field_type, 
             full_context,
-            query
+            query,
+            refresh=refresh,
+            org=org
         )
     
     def _collect_form_context(self, form_data: Dict) -> Dict[str, Any]:
@@ -343,17 +443,29 @@ class AIFieldSuggestionService:
         field_context: str,
         field_type: str,
         full_context: Dict,
-        query: str
+        query: str,
+        refresh: bool = False,
+        org: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate AI suggestions using complete form context.
         Falls back to this when knowledge base doesn't have good results.
+        The prompt embeds the whole form context, so identical prompts from any
+        session are answered from the shared response cache.
         """
         # Build comprehensive prompt with all context
         logger.info(f"[AI_SUGGESTION] Generating AI suggestions for field: {field_context}")
         prompt = self._build_contextual_prompt(field_context, field_type, full_context, query)
         logger.debug(f"[AI_SUGGESTION] Built prompt (first 500 chars): {prompt[:500]}...")
         
+        cache_key = self._response_cache_key(field_type, prompt)
+        if cache_key and not refresh:
+            cached = get_response_cache().get(org=org, **cache_key)
+            if cached:
+                result, tier = cached
+                logger.info(f"[AI_SUGGESTION] Response cache {tier} hit for field: {field_context}")
+                return {**result, 'cache': tier}
+        
         # Generate suggestions using AI
         suggestions = []
         
@@ -407,7 +519,7 @@ class AIFieldSuggestionService:
         
         logger.info(f"[AI_SUGGESTION] Returning {len(suggestions)} suggestions for field: {field_context}")
         
-        return {
+        result = {
             'suggestions': suggestions,
             'source': 'ai_generated',
             'context_used': {
@@ -418,6 +530,29 @@ class AIFieldSuggestionService:
             },
             'timestamp': datetime.now().isoformat()
         }
+        
+        generated = [s for s in suggestions if s['source'] == 'ai_generated']
+        if cache_key and generated:
+            # Tokens of the calls a hit saves
+            tokens = count_tokens(prompt) * 2 + sum(count_tokens(s['text']) for s in generated)
+            get_response_cache().put(response=result, tokens=tokens, org=org, **cache_key)
+        
+        return result
+    
+    def _response_cache_key(self, field_type: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """Response cache coordinates of an AI suggestion request; None if caching is unavailable"""
+        if not self.ai_response_service:
+            return None
+        try:
+            return {
+                'namespace': 'field_suggestion',
+                'model': str(self.ai_response_service._get_current_model()),
+                'version': prompt_version(str(self.ai_response_service.field_system_message(field_type))),
+                'prompt': prompt
+            }
+        except Exception as e:
+            logger.debug(f"[AI_SUGGESTION] Response cache unavailable: {e}")
+            return None
     
     def _build_contextual_prompt(
         self, 
@@ -429,12 +564,8 @@ class AIFieldSuggestionService:
         """
         Build a comprehensive prompt with all context for AI generation.
         """
-        prompt_parts = [
-            f"Generiraj predlog za polje '{field_context}' v javnem naročilu.",
-            "",
-            "Kontekst javnega naročila:",
+        context_lines = [
             f"- Naslov projekta: {full_context.get('project_title', 'Ni določen')}",
-            f"- Opis: {full_context.get('project_description', 'Ni opisa')[:200]}",
             f"- Tip naročila: {full_context.get('procurement_type', 'Ni določen')}",
             f"- Trenutni sklop: {full_context.get('current_lot', {}).get('name', 'Splošni')}",
             f"- Ocenjena vrednost: {full_context.get('estimated_value', 0)} EUR",
@@ -442,9 +573,18 @@ class AIFieldSuggestionService:
         
         # Add cofinancer context if present
         if full_context.get('cofinancers'):
-            prompt_parts.append(f"- Sofinancerji: {', '.join(full_context['cofinancers'])}")
+            context_lines.append(f"- Sofinancerji: {', '.join(full_context['cofinancers'])}")
         if full_context.get('funding_programs'):
-            prompt_parts.append(f"- Programi financiranja: {', '.join(full_context['funding_programs'])}")
+            context_lines.append(f"- Programi financiranja: {', '.join(full_context['funding_programs'])}")
+        context_lines.append(f"- Opis: {full_context.get('project_description', 'Ni opisa')}")
+        
+        # The form context is bounded by tokens; the description goes last and is cut first
+        prompt_parts = [
+            f"Generiraj predlog za polje '{field_context}' v javnem naročilu.",
+            "",
+            "Kontekst javnega naročila:",
+            *fit_lines(context_lines, int(os.getenv('AI_FORM_CONTEXT_TOKEN_BUDGET', '400'))),
+        ]
         
         # Add field-specific guidance
         if 'cofinancer' in field_type.lower():
@@ -0,0 +1,484 @@
+"""
+Online SQLite Backups
+Consistent backups of the live database taken with the SQLite online backup
+API (sqlite3.Connection.backup) instead of copying the file, plus WAL
+archiving for point-in-time restore.
+
+A generation is one compressed base snapshot followed by the WAL segments
+archived after it. Replaying every frame of the WAL that was current when the
+snapshot was taken, in order and from frame 1, on top of that snapshot
+reproduces the database as of the last archived commit: frames hold whole
+page images, so frames already contained in the snapshot are simply
+rewritten. Frames are validated with the WAL checksum chain, so a frame
+still being written is never archived.
+
+When the WAL restarts between two archive runs (after a checkpoint) the
+frames written just before the restart may never have been seen, so the
+chain cannot be continued safely; the next run starts a new generation with
+a fresh snapshot instead of producing a restore point with a hole in it.
+
+Snapshots and segments are zstd-compressed (gzip when zstandard is not
+installed) and listed in manifest.json in the backup directory. Retention
+keeps the newest generations plus everything younger than a maximum age.
+"""
+
+import io
+import os
+import sys
+import gzip
+import json
+import time
+import shutil
+import struct
+import hashlib
+import sqlite3
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add parent directory to path for local imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+BACKUP_DIR = 'backups'
+MANIFEST_FILE = 'manifest.json'
+PAGES_PER_STEP = 256         # pages copied per backup step in rollback-journal mode
+STEP_PAUSE = 0.002           # seconds slept between steps so writers get the lock
+MAX_RESTARTS = 5             # backup restarts (source written mid-copy) before one-step copy
+ZSTD_LEVEL = 3
+
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+WAL_MAGIC_LE = 0x377f0682
+WAL_MAGIC_BE = 0x377f0683
+
+# progress(pages_done, pages_total)
+ProgressCallback = Callable[[int, int], None]
+
+
+class BackupError(Exception):
+    """Raised when a backup or restore cannot be completed"""
+
+
+class _BackupRestarted(Exception):
+    pass
+
+
+@dataclass
+class BackupRecord:
+    """One file in the backup directory: a base snapshot or a WAL segment"""
+    kind: str                       # 'full' or 'wal'
+    generation: str
+    created: str
+    path: str                       # relative to the backup directory
+    size: int
+    sha256: str
+    pages: int = 0                  # full: database pages copied
+    first_frame: int = 0            # wal: frame numbers covered (1-based, inclusive)
+    last_frame: int = 0
+
+
+@dataclass
+class RetentionPolicy:
+    """Keep the newest `keep_generations` generations and any newer than `max_age_days`"""
+    keep_generations: int = 3
+    max_age_days: Optional[int] = 14
+
+
+@dataclass
+class _WalHeader:
+    raw: bytes
+    page_size: int
+    checkpoint_seq: int
+    salt: Tuple[int, int]
+    checksum: Tuple[int, int]
+    big_endian: bool
+
+
+def _wal_checksum(data: bytes, s0: int, s1: int, big_endian: bool) -> Tuple[int, int]:
+    """SQLite's WAL checksum over 8-byte chunks, continuing from (s0, s1)"""
+    words = struct.unpack(('>' if big_endian else '<') + f'{len(data) // 4}I', data)
+    for i in range(0, len(words), 2):
+        s0 = (s0 + words[i] + s1) & 0xFFFFFFFF
+        s1 = (s1 + words[i + 1] + s0) & 0xFFFFFFFF
+    return s0, s1
+
+
+def read_wal_header(wal_path: str) -> Optional[_WalHeader]:
+    """Parse and verify the WAL header; None if there is no usable WAL"""
+    try:
+        with open(wal_path, 'rb') as f:
+            raw = f.read(WAL_HEADER_SIZE)
+    except FileNotFoundError:
+        return None
+    if len(raw) < WAL_HEADER_SIZE:
+        return None
+    magic, _version, page_size, seq, salt1, salt2, ck1, ck2 = struct.unpack('>8I', raw)
+    if magic not in (WAL_MAGIC_LE, WAL_MAGIC_BE):
+        return None
+    big_endian = magic == WAL_MAGIC_BE
+    if _wal_checksum(raw[:24], 0, 0, big_endian) != (ck1, ck2):
+        return None
+    return _WalHeader(raw, page_size, seq, (salt1, salt2), (ck1, ck2), big_endian)
+
+
+def scan_wal_frames(wal_path: str, header: _WalHeader, offset: int, frame: int,
+                    checksum: Tuple[int, int]) -> Tuple[int, int, Tuple[int, int]]:
+    """Walk valid frames from `offset` and return the position after the last commit frame.
+
+    Returns (end_offset, frames_through_commit, checksum_at_commit). Scanning
+    stops at the first frame with a different salt or a broken checksum chain
+    (unwritten, torn or left over from before a WAL restart).
+    """
+    frame_size = WAL_FRAME_HEADER_SIZE + header.page_size
+    commit = (offset, frame, checksum)
+    s0, s1 = checksum
+    with open(wal_path, 'rb') as f:
+        f.seek(offset)
+        while True:
+            data = f.read(frame_size)
+            if len(data) < frame_size:
+                break
+            _pgno, db_size, salt1, salt2, ck1, ck2 = struct.unpack('>6I', data[:WAL_FRAME_HEADER_SIZE])
+            if (salt1, salt2) != header.salt:
+                break
+            s0, s1 = _wal_checksum(data[:8] + data[WAL_FRAME_HEADER_SIZE:], s0, s1, header.big_endian)
+            if (s0, s1) != (ck1, ck2):
+                break
+            offset += frame_size
+            frame += 1
+            if db_size:
+                commit = (offset, frame, (s0, s1))
+    return commit
+
+
+def _compressed_suffix() -> str:
+    return '.zst' if HAS_ZSTD else '.gz'
+
+
+def _compress_stream(source, dest_path: str) -> Tuple[int, str]:
+    """Compress a binary stream to dest_path; returns (compressed size, sha256)"""
+    with open(dest_path, 'wb') as out:
+        if dest_path.endswith('.zst'):
+            zstandard.ZstdCompressor(level=ZSTD_LEVEL).copy_stream(source, out)
+        else:
+            with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=6, mtime=0) as gz:
+                shutil.copyfileobj(source, gz, 1024 * 1024)
+    return os.path.getsize(dest_path), _file_sha256(dest_path)
+
+
+def _decompress_to(source_path: str, out) -> None:
+    with open(source_path, 'rb') as f:
+        if source_path.endswith('.zst'):
+            if not HAS_ZSTD:
+                raise BackupError(f"{source_path} je stisnjen z zstd; namestite paket zstandard")
+            zstandard.ZstdDecompressor().copy_stream(f, out)
+        else:
+            with gzip.GzipFile(fileobj=f, mode='rb') as gz:
+                shutil.copyfileobj(gz, out, 1024 * 1024)
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BackupManager:
+    """Takes snapshots, archives WAL segments, prunes and restores"""
+
+    def __init__(self, db_path: Optional[str] = None, backup_dir: str = BACKUP_DIR,
+                 pages_per_step: int = PAGES_PER_STEP, step_pause: float = STEP_PAUSE,
+                 retention: Optional[RetentionPolicy] = None):
+        if db_path is None:
+            import database
+            db_path = database.DATABASE_FILE
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.pages_per_step = pages_per_step
+        self.step_pause = step_pause
+        self.retention = retention or RetentionPolicy()
+        self._lock = threading.RLock()
+
+    # -- manifest ---------------------------------------------------------
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.backup_dir, MANIFEST_FILE)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'database': os.path.abspath(self.db_path), 'records': [], 'wal': None}
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        os.makedirs(self.backup_dir, exist_ok=True)
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def records(self) -> List[BackupRecord]:
+        return [BackupRecord(**r) for r in self._load_manifest()['records']]
+
+    def generations(self) -> Dict[str, List[BackupRecord]]:
+        """Records grouped by generation, oldest generation first"""
+        grouped: Dict[str, List[BackupRecord]] = {}
+        for record in self.records():
+            grouped.setdefault(record.generation, []).append(record)
+        return dict(sorted(grouped.items()))
+
+    # -- snapshots --------------------------------------------------------
+
+    @property
+    def wal_path(self) -> str:
+        return self.db_path + '-wal'
+
+    def _copy(self, source: sqlite3.Connection, target: sqlite3.Connection,
+              progress: Optional[ProgressCallback]) -> int:
+        """Run the online backup and return the number of pages copied.
+
+        In WAL mode one step is used: the read transaction it holds does not
+        block writers, and stepping would restart on every foreground commit.
+        In rollback-journal mode readers do block writers, so pages are copied
+        in small steps with a pause between them; a copy that keeps being
+        restarted by writes finishes as one step.
+        """
+        mode = source.execute("PRAGMA journal_mode").fetchone()[0].lower()
+        copied = [0]
+
+        def step(status, remaining, total):
+            if total - remaining < copied[0]:
+                step.restarts += 1
+                if step.restarts > MAX_RESTARTS:
+                    raise _BackupRestarted()
+            copied[0] = total - remaining
+            if progress:
+                progress(copied[0], total)
+            if remaining and self.step_pause:
+                time.sleep(self.step_pause)
+        step.restarts = 0
+
+        if mode == 'wal' or self.pages_per_step <= 0:
+            source.backup(target, pages=-1, progress=step)
+        else:
+            try:
+                source.backup(target, pages=self.pages_per_step, progress=step)
+            except _BackupRestarted:
+                logger.info("Backup restarted %d times by concurrent writes; copying in one step", MAX_RESTARTS)
+                source.backup(target, pages=-1, progress=step)
+        return copied[0]
+
+    def full_backup(self, progress: Optional[ProgressCallback] = None) -> BackupRecord:
+        """Take a base snapshot and start a new generation"""
+        if not os.path.exists(self.db_path):
+            raise BackupError(f"Ni baze podatkov za varnostno kopiranje: {self.db_path}")
+        with self._lock:
+            generation = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+            gen_dir = os.path.join(self.backup_dir, generation)
+            os.makedirs(gen_dir, exist_ok=True)
+            handle, snapshot = tempfile.mkstemp(prefix='snapshot_', suffix='.db', dir=gen_dir)
+            os.close(handle)
+            try:
+                for _ in range(3):
+                    before = read_wal_header(self.wal_path)
+                    source = sqlite3.connect(self.db_path)
+                    target = sqlite3.connect(snapshot)
+                    try:
+                        pages = self._copy(source, target, progress)
+                    finally:
+                        target.close()
+                        source.close()
+                    after = read_wal_header(self.wal_path)
+                    # A WAL restart during the copy leaves no frame chain that fits the snapshot
+                    if (before and before.salt) == (after and after.salt):
+                        break
+                else:
+                    raise BackupError("WAL se je med kopiranjem večkrat ponastavil")
+
+                relative = os.path.join(generation, 'base.db' + _compressed_suffix())
+                with open(snapshot, 'rb') as f:
+                    size, digest = _compress_stream(f, os.path.join(self.backup_dir, relative))
+            finally:
+                os.remove(snapshot)
+
+            record = BackupRecord('full', generation, datetime.now().isoformat(), relative, size, digest,
+                                  pages=pages)
+            manifest = self._load_manifest()
+            manifest['records'].append(asdict(record))
+            if after is not None:
+                manifest.setdefault('headers', {})[generation] = after.raw.hex()
+            manifest['wal'] = None if after is None else {
+                'generation': generation,
+                'header': after.raw.hex(),
+                'offset': WAL_HEADER_SIZE,
+                'frame': 0,
+                'checksum': list(after.checksum),
+            }
+            self._save_manifest(manifest)
+            logger.info("Full backup %s: %d pages, %d bytes", relative, pages, size)
+            return record
+
+    # -- WAL archiving ----------------------------------------------------
+
+    def archive_wal(self) -> Optional[BackupRecord]:
+        """Archive WAL frames committed since the last run.
+
+        Returns the new segment, a new base snapshot when the chain had to be
+        restarted, or None when there was nothing new (or the database is not
+        in WAL mode).
+        """
+        with self._lock:
+            header = read_wal_header(self.wal_path)
+            if header is None:
+                return None
+            state = self._load_manifest().get('wal')
+            if not state or bytes.fromhex(state['header'])[16:24] != header.raw[16:24]:
+                logger.info("WAL restarted since the last archive run; starting a new generation")
+                return self.full_backup()
+
+            end, last_frame, checksum = scan_wal_frames(
+                self.wal_path, header, state['offset'], state['frame'], tuple(state['checksum']))
+            if end == state['offset']:
+                return None
+
+            first_frame = state['frame'] + 1
+            relative = os.path.join(state['generation'],
+                                    f"wal-{first_frame:08d}-{last_frame:08d}{_compressed_suffix()}")
+            with open(self.wal_path, 'rb') as f:
+                f.seek(state['offset'])
+                segment = io.BytesIO(f.read(end - state['offset']))
+            size, digest = _compress_stream(segment, os.path.join(self.backup_dir, relative))
+
+            record = BackupRecord('wal', state['generation'], datetime.now().isoformat(), relative, size, digest,
+                                  first_frame=first_frame, last_frame=last_frame)
+            manifest = self._load_manifest()
+            manifest['records'].append(asdict(record))
+            manifest['wal'].update(offset=end, frame=last_frame, checksum=list(checksum))
+            self._save_manifest(manifest)
+            return record
+
+    def run(self, interval: float = 60.0, full_every: Optional[float] = 24 * 3600,
+            stop: Optional[threading.Event] = None):
+        """Archive the WAL every `interval` seconds, with a new snapshot every `full_every`"""
+        stop = stop or threading.Event()
+        last_full = 0.0
+        while not stop.is_set():
+            try:
+                if not self._load_manifest().get('wal') or (full_every and time.time() - last_full >= full_every):
+                    self.full_backup()
+                    last_full = time.time()
+                    self.prune()
+                elif (record := self.archive_wal()) and record.kind == 'full':
+                    last_full = time.time()
+            except Exception as e:
+                logger.error(f"Backup run failed: {e}")
+            stop.wait(interval)
+
+    # -- retention --------------------------------------------------------
+
+    def prune(self, policy: Optional[RetentionPolicy] = None) -> List[str]:
+        """Delete generations outside the retention policy; returns their ids"""
+        policy = policy or self.retention
+        with self._lock:
+            manifest = self._load_manifest()
+            generations = list(self.generations())
+            current = (manifest.get('wal') or {}).get('generation')
+            keep = set(generations[-policy.keep_generations:]) if policy.keep_generations else set()
+            if policy.max_age_days is not None:
+                cutoff = (datetime.now() - timedelta(days=policy.max_age_days)).strftime('%Y%m%dT%H%M%S%f')
+                keep.update(g for g in generations if g >= cutoff)
+            if current:
+                keep.add(current)
+            removed = [g for g in generations if g not in keep]
+            if not removed:
+                return []
+            for generation in removed:
+                shutil.rmtree(os.path.join(self.backup_dir, generation), ignore_errors=True)
+            manifest['records'] = [r for r in manifest['records'] if r['generation'] not in removed]
+            for generation in removed:
+                manifest.get('headers', {}).pop(generation, None)
+            self._save_manifest(manifest)
+            return removed
+
+    # -- restore ----------------------------------------------------------
+
+    def _verified_path(self, record: BackupRecord) -> str:
+        path = os.path.join(self.backup_dir, record.path)
+        if _file_sha256(path) != record.sha256:
+            raise BackupError(f"Kontrolna vsota se ne ujema: {record.path}")
+        return path
+
+    def restore(self, target: str, until: Optional[datetime] = None,
+                generation: Optional[str] = None, overwrite: bool = False) -> Dict[str, Any]:
+        """Rebuild the database at `target` as of the last archived commit before `until`.
+
+        Uses the newest generation whose snapshot is not newer than `until`
+        (or the given generation) and replays its WAL segments up to `until`.
+        """
+        if os.path.exists(target) and not overwrite:
+            raise BackupError(f"Ciljna datoteka že obstaja: {target}")
+        limit = until.isoformat() if until else None
+        manifest = self._load_manifest()
+        candidates = {g: r for g, r in self.generations().items()
+                      if (generation is None or g == generation)
+                      and any(x.kind == 'full' and (limit is None or x.created <= limit) for x in r)}
+        if not candidates:
+            raise BackupError("Ni varnostne kopije za izbrani čas")
+        chosen, records = list(candidates.items())[-1]
+        base = next(r for r in records if r.kind == 'full')
+        segments = sorted((r for r in records if r.kind == 'wal' and (limit is None or r.created <= limit)),
+                          key=lambda r: r.first_frame)
+
+        work = target + '.restoring'
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(work + suffix):
+                os.remove(work + suffix)
+        with open(work, 'wb') as out:
+            _decompress_to(self._verified_path(base), out)
+
+        frames = 0
+        if segments:
+            header = manifest.get('headers', {}).get(chosen)
+            if header is None:
+                raise BackupError(f"Za generacijo {chosen} ni shranjene glave WAL")
+            expected = 1
+            with open(work + '-wal', 'wb') as wal:
+                wal.write(bytes.fromhex(header))
+                for segment in segments:
+                    if segment.first_frame != expected:
+                        raise BackupError(f"Manjka segment WAL pred sličico {segment.first_frame}")
+                    _decompress_to(self._verified_path(segment), wal)
+                    expected = segment.last_frame + 1
+            frames = expected - 1
+
+        conn = sqlite3.connect(work)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            status = conn.execute("PRAGMA quick_check").fetchone()[0]
+        finally:
+            conn.close()
+        if status != 'ok':
+            raise BackupError(f"Obnovljena baza ni veljavna: {status}")
+
+        for suffix in ('-wal', '-shm'):
+            for path in (work + suffix, target + suffix):
+                if os.path.exists(path):
+                    os.remove(path)
+        os.replace(work, target)
+        return {'generation': chosen, 'snapshot': base.created, 'frames': frames,
+                'restored_to': segments[-1].created if segments else base.created}
@@ -0,0 +1,277 @@
+"""
+Context Packing
+Fits retrieved chunks into a token budget before they go into a prompt.
+
+Retrieval returns top-k chunks that were split with a character overlap
+(CHUNK_OVERLAP, 200 by default), so neighbouring chunks repeat each other's
+edges and several hits often say the same thing. pack_context():
+
+1. drops chunks whose text is contained in a more relevant one,
+2. picks chunks by maximal marginal relevance (MMR): relevance from the
+   search score, redundancy from word overlap with chunks already picked,
+3. trims the overlap a picked chunk shares with an adjacent picked chunk,
+4. stops adding chunks once the token budget (AI_CONTEXT_TOKEN_BUDGET,
+   default 3000) is full.
+
+Tokens are counted with a real tokenizer (the `tokenizers` package, loading
+AI_TOKENIZER, default Xenova/gpt-4o, from a local tokenizer.json or the
+Hugging Face hub). When it cannot be loaded, counts fall back to the
+4-characters-per-token estimate and are marked as estimated.
+"""
+
+import os
+import re
+import sys
+import math
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+# Add parent directory to path for local imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backend_registry import backends
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKENIZER = 'Xenova/gpt-4o'
+MIN_OVERLAP_CHARS = 40
+
+_WORD = re.compile(r'\w{3,}', re.UNICODE)
+
+
+class TokenCounter:
+    """Token counts from the configured tokenizer, or an estimate without it"""
+
+    def __init__(self, source: Optional[str] = None):
+        self.source = source or os.getenv('AI_TOKENIZER', DEFAULT_TOKENIZER)
+        self._tokenizer = None
+        self._failed = self.source == 'estimate'
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._tokenizer is not None or self._failed:
+            return self._tokenizer
+        with self._lock:
+            if self._tokenizer is None and not self._failed:
+                try:
+                    tokenizers = backends.load('tokenizers')
+                    if os.path.exists(self.source):
+                        self._tokenizer = tokenizers.Tokenizer.from_file(self.source)
+                    else:
+                        self._tokenizer = tokenizers.Tokenizer.from_pretrained(self.source)
+                    logger.info(f"Token counting uses tokenizer {self.source}")
+                except Exception as e:
+                    self._failed = True
+                    logger.warning(f"Tokenizer {self.source} unavailable, estimating tokens: {e}")
+        return self._tokenizer
+
+    @property
+    def exact(self) -> bool:
+        """True when counts come from the tokenizer"""
+        return self._load() is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        tokenizer = self._load()
+        if tokenizer is None:
+            return math.ceil(len(text) / 4)
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text that is at most max_tokens long"""
+        if max_tokens <= 0:
+            return ''
+        tokenizer = self._load()
+        if tokenizer is None:
+            return text[:max_tokens * 4]
+        encoding = tokenizer.encode(text, add_special_tokens=False)
+        if len(encoding.ids) <= max_tokens:
+            return text
+        return text[:encoding.offsets[max_tokens - 1][1]]
+
+
+token_counter = TokenCounter()
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text according to the shared counter"""
+    return token_counter.count(text)
+
+
+def context_token_budget() -> int:
+    return int(os.getenv('AI_CONTEXT_TOKEN_BUDGET', '3000'))
+
+
+@dataclass
+class PackedContext:
+    """Chunks chosen for a prompt and the rendered context text"""
+    text: str
+    chunks: List[Dict[str, Any]] = field(default_factory=list)
+    tokens: int = 0
+    budget: int = 0
+    candidates: int = 0
+    duplicates: int = 0
+    over_budget: int = 0
+    trimmed_chars: int = 0
+    estimated: bool = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {'tokens': self.tokens, 'budget': self.budget, 'chunks': len(self.chunks),
+                'candidates': self.candidates, 'duplicates': self.duplicates,
+                'over_budget': self.over_budget, 'trimmed_chars': self.trimmed_chars,
+                'estimated': self.estimated}
+
+
+def _chunk_text(chunk: Dict[str, Any]) -> str:
+    return (chunk.get('chunk_text') or chunk.get('text') or '').strip()
+
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.casefold()))
+
+
+def _similarity(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _overlap(left: str, right: str, max_chars: int) -> int:
+    """Length of the longest end of left that starts right (0 below MIN_OVERLAP_CHARS)"""
+    if len(left) < MIN_OVERLAP_CHARS or len(right) < MIN_OVERLAP_CHARS:
+        return 0
+    tail = left[-max_chars:]
+    head = right[:MIN_OVERLAP_CHARS]
+    index = tail.find(head)
+    while index != -1:
+        if right.startswith(tail[index:]):
+            return len(tail) - index
+        index = tail.find(head, index + 1)
+    return 0
+
+
+def _relevance(chunks: Sequence[Dict[str, Any]]) -> List[float]:
+    """Search scores (cosine similarity); rank order when chunks carry no score"""
+    scores = [chunk.get('score') for chunk in chunks]
+    if any(score is None for score in scores):
+        return [1 - i / len(chunks) for i in range(len(chunks))]
+    return [min(max(float(score), 0.0), 1.0) for score in scores]
+
+
+def pack_context(chunks: Sequence[Union[str, Dict[str, Any]]], budget: Optional[int] = None,
+                 header: Optional[Callable[[Dict[str, Any], int], str]] = None,
+                 separator: str = "\n\n", mmr_lambda: Optional[float] = None,
+                 call: str = 'rag', counter: Optional[TokenCounter] = None) -> PackedContext:
+    """Select, deduplicate and render retrieved chunks within a token budget.
+
+    Args:
+        chunks: Search hits ordered by relevance (dicts with 'text' or
+            'chunk_text' and optionally 'score', 'document_id', 'chunk_index')
+            or plain strings
+        budget: Token budget for the rendered context (AI_CONTEXT_TOKEN_BUDGET)
+        header: Line placed above each chunk, given the chunk and its 1-based
+            position in the packed context
+        separator: Text between rendered chunks
+        mmr_lambda: Relevance/diversity trade-off (AI_CONTEXT_MMR_LAMBDA, 0.7);
+            1.0 keeps the search order
+        call: Label for the ai_context_tokens metric
+
+    Returns:
+        PackedContext; chunk dicts are copies whose 'text' is what was packed
+    """
+    counter = counter or token_counter
+    budget = budget if budget is not None else context_token_budget()
+    mmr_lambda = mmr_lambda if mmr_lambda is not None else \
+        float(os.getenv('AI_CONTEXT_MMR_LAMBDA', '0.7'))
+    max_overlap = int(os.getenv('CHUNK_OVERLAP', '200')) * 2
+
+    items = [{'text': chunk} if isinstance(chunk, str) else dict(chunk) for chunk in chunks]
+    for item, relevance in zip(items, _relevance(items) if items else []):
+        item['text'] = _chunk_text(item)
+        item['_relevance'] = relevance
+    packed = PackedContext(text='', budget=budget, candidates=len(items),
+                           estimated=not counter.exact)
+
+    # 1. Chunks repeated inside a more relevant chunk add nothing
+    candidates: List[Dict[str, Any]] = []
+    for item in items:
+        text = ' '.join(item['text'].split())
+        if not text or any(text in ' '.join(kept['text'].split()) for kept in candidates):
+            packed.duplicates += 1
+            continue
+        item['_words'] = _words(item['text'])
+        candidates.append(item)
+
+    # 2-4. MMR selection into the budget
+    selected: List[Dict[str, Any]] = []
+    parts: List[str] = []
+    separator_tokens = counter.count(separator)
+    used = 0
+    while candidates and budget - used > separator_tokens:
+        best = max(candidates, key=lambda c: mmr_lambda * c['_relevance'] - (1 - mmr_lambda) * max(
+            (_similarity(c['_words'], s['_words']) for s in selected), default=0.0))
+        candidates.remove(best)
+
+        text = best['text']
+        for kept in selected:
+            same_document = kept.get('document_id') == best.get('document_id')
+            if not same_document:
+                continue
+            cut = _overlap(kept['text'], text, max_overlap)
+            text = text[cut:]
+            cut = _overlap(text, kept['text'], max_overlap)
+            text = text[:len(text) - cut]
+        text = text.strip()
+        packed.trimmed_chars += len(best['text']) - len(text)
+        if len(text) < MIN_OVERLAP_CHARS and len(text) < len(best['text']):
+            packed.duplicates += 1
+            continue
+
+        position = len(selected) + 1
+        prefix = f"{header(best, position)}\n" if header else ''
+        cost = counter.count(prefix + text) + (separator_tokens if parts else 0)
+        if used + cost > budget:
+            if selected:
+                packed.over_budget += 1
+                continue
+            # Even the best chunk is too long: keep as much of it as fits
+            text = counter.truncate(text, budget - counter.count(prefix))
+            cost = counter.count(prefix + text)
+
+        best['text'] = text
+        selected.append(best)
+        parts.append(prefix + text)
+        used += cost
+
+    packed.over_budget += len(candidates)
+    packed.text = separator.join(parts)
+    packed.tokens = counter.count(packed.text)
+    packed.chunks = [{k: v for k, v in chunk.items() if not k.startswith('_')} for chunk in selected]
+
+    metrics.observe('ai_context_tokens', packed.tokens, call=call)
+    if packed.duplicates:
+        metrics.inc('ai_context_chunks_dropped_total', packed.duplicates, call=call, reason='duplicate')
+    if packed.over_budget:
+        metrics.inc('ai_context_chunks_dropped_total', packed.over_budget, call=call, reason='budget')
+    return packed
+
+
+def fit_lines(lines: Sequence[str], budget: int, counter: Optional[TokenCounter] = None) -> List[str]:
+    """Keep lines in order until the token budget is spent; the last one is cut to fit"""
+    counter = counter or token_counter
+    kept: List[str] = []
+    used = 0
+    for line in lines:
+        cost = counter.count(line + "\n")
+        if used + cost > budget:
+            remaining = budget - used
+            if remaining > 8:
+                kept.append(counter.truncate(line, remaining - 1).rstrip() + '…')
+            break
+        kept.append(line)
+        used += cost
+    return kept
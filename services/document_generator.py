@@ -1,290 +1,383 @@
 """Document generator service for creating DOCX exports with proper Slovenian character support."""
 
+import io
 import os
-import re
 import tempfile
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
 from docx import Document
-from docx.shared import Inches, Pt, RGBColor
+from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
+
+from services.docx_template import DocxTemplate, get_template, iter_zip
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# A .docx placed here replaces the built-in layout (see services/docx_template.py for the tags)
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'templates', 'javno_narocilo.docx')
+
+# Form fields listed as selection criteria, with the title shown in documents
+CRITERIA_TITLES = {
+    'price': 'Cena',
+    'additionalReferences': 'Dodatne reference imenovanega kadra',
+    'additionalTechnicalRequirements': 'Dodatne tehnične zahteve',
+    'shorterDeadline': 'Krajši rok izvedbe',
+    'longerWarranty': 'Garancija daljša od zahtevane',
+    'costEfficiency': 'Stroškovna učinkovitost',
+    'socialCriteria': 'Socialna merila',
+    'otherCriteriaCustom': 'Drugo',
+}
+
+
+def _build_default_template() -> bytes:
+    """The standard procurement layout as a tagged template, built once per process"""
+    doc = Document()
+
+    def tag(text):
+        doc.add_paragraph(text)
+
+    def line(field, label, suffix=''):
+        tag(f"{{% if {field} %}}")
+        doc.add_paragraph(f"{label}: {{{{ {field} }}}}{suffix}")
+        tag("{% endif %}")
+
+    title = doc.add_heading('Javno naročilo', 0)
+    title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    tag("{% if id %}")
+    doc.add_heading("Številka: {{ id }}", level=2)
+    tag("{% endif %}")
+    tag("{% if naziv %}")
+    doc.add_heading("Naziv: {{ naziv }}", level=2)
+    tag("{% endif %}")
+    doc.add_paragraph()
+
+    tag("{% if summary %}")
+    doc.add_heading('Povzetek z AI priporočili', level=1)
+    tag("{{ summary|markdown }}")
+    doc.add_page_break()
+    tag("{% endif %}")
+
+    doc.add_heading('Osnovni podatki', level=1)
+    line('vrsta_postopka', 'Vrsta postopka')
+    line('datum_objave', 'Datum objave')
+    line('rok_za_oddajo', 'Rok za oddajo ponudb')
+    line('ocenjena_vrednost', 'Ocenjena vrednost', ' EUR')
+    doc.add_paragraph()
+
+    doc.add_heading('Naročnik', level=1)
+    line('narocnik_naziv', 'Naziv')
+    line('narocnik_naslov', 'Naslov')
+    line('narocnik_posta', 'Pošta')
+    line('narocnik_drzava', 'Država')
+    line('kontaktna_oseba', 'Kontaktna oseba')
+    line('email', 'E-pošta')
+    line('telefon', 'Telefon')
+    doc.add_paragraph()
+
+    doc.add_heading('Podrobnosti naročila', level=1)
+    tag("{% if opis_narocila %}")
+    doc.add_heading('Opis naročila', level=2)
+    doc.add_paragraph("{{ opis_narocila }}")
+    tag("{% endif %}")
+    tag("{% if cpv_list %}")
+    doc.add_heading('CPV kode', level=2)
+    tag("{% for code in cpv_list %}")
+    doc.add_paragraph("• {{ code }}", style='List Bullet')
+    tag("{% endfor %}")
+    tag("{% elif cpv_text %}")
+    doc.add_heading('CPV kode', level=2)
+    doc.add_paragraph("{{ cpv_text }}")
+    tag("{% endif %}")
+    tag("{% if kraj_izvedbe %}")
+    doc.add_heading('Kraj izvedbe', level=2)
+    doc.add_paragraph("{{ kraj_izvedbe }}")
+    tag("{% endif %}")
+    doc.add_paragraph()
+
+    doc.add_heading('Merila za izbor', level=1)
+    tag("{% if criteria %}")
+    tag("{% for criterion in criteria %}")
+    doc.add_paragraph("{{ criterion.label }}")
+    tag("{% if criterion.opis %}")
+    doc.add_paragraph("   {{ criterion.opis }}")
+    tag("{% endif %}")
+    tag("{% endfor %}")
+    tag("{% elif criteria_text %}")
+    doc.add_paragraph("{{ criteria_text }}")
+    tag("{% else %}")
+    doc.add_paragraph("Merila niso določena.")
+    tag("{% endif %}")
+    doc.add_paragraph()
+
+    tag("{% if lots %}")
+    doc.add_heading('Sklopi', level=1)
+    tag("{% for lot in lots %}")
+    doc.add_heading("Sklop {{ loop.index }}: {{ lot.naziv|default('Brez naziva') }}", level=2)
+    line('lot.opis', 'Opis')
+    line('lot.ocenjena_vrednost', 'Ocenjena vrednost', ' EUR')
+    line('lot.cpv_kode', 'CPV kode')
+    doc.add_paragraph()
+    tag("{% endfor %}")
+    tag("{% endif %}")
+    doc.add_paragraph()
+
+    doc.add_heading('Dodatne informacije', level=1)
+    line('dostop_do_dokumentacije', 'Dostop do dokumentacije')
+    line('rok_za_vprasanja', 'Rok za vprašanja')
+    line('datum_odpiranja', 'Datum odpiranja ponudb')
+    line('veljavnost_ponudbe', 'Veljavnost ponudbe', ' dni')
+    tag("{% if dodatne_informacije %}")
+    doc.add_heading('Opombe', level=2)
+    doc.add_paragraph("{{ dodatne_informacije }}")
+    tag("{% endif %}")
+
+    doc.add_paragraph()
+    doc.add_paragraph()
+    footer = doc.add_paragraph()
+    footer.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    run = footer.add_run("Dokument generiran: {{ generated_at }}")
+    run.font.size = Pt(10)
+    run.font.color.rgb = RGBColor(128, 128, 128)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+_default_template: Optional[DocxTemplate] = None
+
+
+def load_template(path: Optional[str] = None) -> DocxTemplate:
+    """Compiled template: the given file, templates/javno_narocilo.docx if present, else the built-in layout"""
+    global _default_template
+    path = path or TEMPLATE_PATH
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        return get_template(path)
+    if _default_template is None:
+        _default_template = DocxTemplate(_build_default_template())
+    return _default_template
+
+
+def procurement_to_document_data(procurement: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a javna_narocila row (with parsed form_data) to the fields documents use"""
+    form = procurement.get('form_data') or {}
+
+    def get(path, default=None):
+        # Saved forms use both nested ({'lot_0': {...}}) and flat ('lot_0.x.y') keys
+        if path in form:
+            return form[path]
+        value = form
+        for part in path.split('.'):
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = value[part]
+        return value
+
+    client = get('clientInfo', {}) or {}
+    clients = client.get('clients') or []
+    first_client = clients[0] if clients and isinstance(clients[0], dict) else {}
+    street = ' '.join(filter(None, [client.get('singleClientStreet') or client.get('singleClientStreetAddress')
+                                    or first_client.get('street'),
+                                    client.get('singleClientHouseNumber') or first_client.get('houseNumber')]))
+    post = ' '.join(filter(None, [str(client.get('singleClientPostalCode') or first_client.get('postalCode') or ''),
+                                  client.get('singleClientCity') or first_client.get('city')]))
+
+    def criteria_from(section):
+        section = section or {}
+        return [{'naziv': title, 'utez': section.get(f'{key}Ratio')}
+                for key, title in CRITERIA_TITLES.items() if section.get(key) is True]
+
+    lots = []
+    for index, lot in enumerate(form.get('lots') or []):
+        if len(form.get('lots') or []) < 2:
+            break
+        lot = lot if isinstance(lot, dict) else {}
+        lots.append({
+            'naziv': lot.get('name'),
+            'opis': get(f'lot_{index}.technicalSpecifications.description'),
+            'ocenjena_vrednost': get(f'lot_{index}.orderType.estimatedValue') or get(f'lots.{index}.orderType.estimatedValue'),
+        })
+
+    criteria = criteria_from(get('selectionCriteria'))
+    if not criteria and lots:
+        criteria = criteria_from(get('lot_0.selectionCriteria'))
+    cpv = get('projectInfo.cpvCodes')
+
+    return {
+        'id': procurement.get('id'),
+        'naziv': get('projectInfo.projectName') or procurement.get('naziv'),
+        'vrsta_postopka': get('submissionProcedure.procedure') or procurement.get('postopek'),
+        'datum_objave': procurement.get('datum_objave'),
+        'ocenjena_vrednost': get('orderType.estimatedValue') or procurement.get('vrednost'),
+        'narocnik_naziv': (client.get('singleClientName') or first_client.get('name')
+                           or procurement.get('organizacija')),
+        'narocnik_naslov': street or None,
+        'narocnik_posta': post or None,
+        'opis_narocila': get('projectInfo.projectSubject'),
+        'cpv_kode': [code.strip() for code in cpv.split(',') if code.strip()] if isinstance(cpv, str) else cpv,
+        'merila': criteria,
+        'sklopi': lots,
+        'dodatne_informacije': get('otherInfo') if isinstance(get('otherInfo'), str) else None,
+    }
+
 
 class DocumentGenerator:
     """Service for generating documents from procurement data."""
-    
-    def __init__(self):
-        """Initialize the document generator."""
+
+    def __init__(self, template_path: Optional[str] = None):
+        """
+        Initialize the document generator.
+
+        Args:
+            template_path: Optional .docx template (default: templates/javno_narocilo.docx
+                           if present, otherwise the built-in layout)
+        """
         self.temp_dir = tempfile.gettempdir()
-    
-    def generate_document(self, data: Dict[str, Any], format_type: str = "DOCX", 
-                         include_summary: bool = False, 
+        self.template_path = template_path
+
+    def generate_document(self, data: Dict[str, Any], format_type: str = "DOCX",
+                         include_summary: bool = False,
                          summary_content: Optional[str] = None) -> str:
         """
         Generate a document in the specified format.
-        
+
         Args:
             data: Procurement data dictionary
             format_type: Format type (only "DOCX" supported)
             include_summary: Whether to include AI summary
             summary_content: Optional AI-generated summary content
-            
+
         Returns:
             Path to the generated document
         """
         if format_type != "DOCX":
             format_type = "DOCX"  # Force DOCX as it's the only supported format
-        
+
         return self._generate_docx(data, include_summary, summary_content)
-    
-    def _generate_docx(self, data: Dict[str, Any], 
+
+    def _generate_docx(self, data: Dict[str, Any],
                       include_summary: bool = False,
                       summary_content: Optional[str] = None) -> str:
-        """Generate a DOCX document with proper formatting."""
-        doc = Document()
-        
-        # Add title
-        title = doc.add_heading('Javno naročilo', 0)
-        title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        
-        # Add procurement ID and name
-        if data.get('id'):
-            doc.add_heading(f"Številka: {data['id']}", level=2)
-        if data.get('naziv'):
-            doc.add_heading(f"Naziv: {data['naziv']}", level=2)
-        
-        doc.add_paragraph()
-        
-        # Add AI summary if provided
-        if include_summary and summary_content:
-            doc.add_heading('Povzetek z AI priporočili', level=1)
-            self._add_formatted_content(doc, summary_content)
-            doc.add_page_break()
-        
-        # Add sections
-        self._add_basic_info_section(doc, data)
-        self._add_contracting_authority_section(doc, data)
-        self._add_procurement_details_section(doc, data)
-        self._add_criteria_section(doc, data)
-        self._add_lots_section(doc, data)
-        self._add_additional_info_section(doc, data)
-        
-        # Save document
+        """Generate a DOCX document and save it to the temp directory."""
+        content = self.render_docx(data, include_summary, summary_content)
+
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"javno_narocilo_{data.get('id', 'novo')}_{timestamp}.docx"
         filepath = os.path.join(self.temp_dir, filename)
-        
-        doc.save(filepath)
+
+        with open(filepath, 'wb') as f:
+            f.write(content)
         logger.info(f"Generated DOCX document: {filepath}")
-        
+
         return filepath
-    
-    def _add_formatted_content(self, doc, content: str):
-        """Add content with markdown formatting support."""
-        if not content:
-            return
-        
-        lines = content.split('\n')
-        for line in lines:
-            if not line.strip():
-                doc.add_paragraph()
-                continue
-            
-            # Handle headers
-            if line.startswith('### '):
-                doc.add_heading(line[4:], level=3)
-            elif line.startswith('## '):
-                doc.add_heading(line[3:], level=2)
-            elif line.startswith('# '):
-                doc.add_heading(line[2:], level=1)
-            # Handle bullet points
-            elif line.strip().startswith('- ') or line.strip().startswith('* '):
-                text = line.strip()[2:]
-                p = doc.add_paragraph(style='List Bullet')
-                self._add_formatted_text_to_paragraph(p, text)
-            # Handle numbered lists - manual formatting for proper markdown support
-            elif re.match(r'^\s*\d+\.\s+', line):
-                match = re.match(r'^(\s*\d+\.\s+)(.+)', line)
-                if match:
-                    number_part = match.group(1)
-                    text_part = match.group(2)
-                    p = doc.add_paragraph()
-                    p.add_run(number_part)
-                    self._add_formatted_text_to_paragraph(p, text_part)
-                    p.paragraph_format.left_indent = Inches(0.5)
-                    p.paragraph_format.first_line_indent = Inches(-0.25)
-            else:
-                # Regular paragraph with formatting
-                p = doc.add_paragraph()
-                self._add_formatted_text_to_paragraph(p, line)
-    
-    def _add_formatted_text_to_paragraph(self, paragraph, text: str):
-        """Add text with markdown formatting to a paragraph."""
-        # Pattern to match bold text
-        pattern = r'\*\*([^*]+)\*\*'
-        last_end = 0
-        
-        for match in re.finditer(pattern, text):
-            # Add text before the match
-            if match.start() > last_end:
-                paragraph.add_run(text[last_end:match.start()])
-            
-            # Add bold text
-            bold_run = paragraph.add_run(match.group(1))
-            bold_run.bold = True
-            
-            last_end = match.end()
-        
-        # Add remaining text
-        if last_end < len(text):
-            paragraph.add_run(text[last_end:])
-    
-    def _add_basic_info_section(self, doc, data: Dict[str, Any]):
-        """Add basic information section."""
-        doc.add_heading('Osnovni podatki', level=1)
-        
-        info = []
-        if data.get('vrsta_postopka'):
-            info.append(f"Vrsta postopka: {data['vrsta_postopka']}")
-        if data.get('datum_objave'):
-            info.append(f"Datum objave: {data['datum_objave']}")
-        if data.get('rok_za_oddajo'):
-            info.append(f"Rok za oddajo ponudb: {data['rok_za_oddajo']}")
-        if data.get('ocenjena_vrednost'):
-            info.append(f"Ocenjena vrednost: {data['ocenjena_vrednost']} EUR")
-        
-        for item in info:
-            doc.add_paragraph(item)
-        
-        doc.add_paragraph()
-    
-    def _add_contracting_authority_section(self, doc, data: Dict[str, Any]):
-        """Add contracting authority section."""
-        doc.add_heading('Naročnik', level=1)
-        
-        info = []
-        if data.get('narocnik_naziv'):
-            info.append(f"Naziv: {data['narocnik_naziv']}")
-        if data.get('narocnik_naslov'):
-            info.append(f"Naslov: {data['narocnik_naslov']}")
-        if data.get('narocnik_posta'):
-            info.append(f"Pošta: {data['narocnik_posta']}")
-        if data.get('narocnik_drzava'):
-            info.append(f"Država: {data['narocnik_drzava']}")
-        if data.get('kontaktna_oseba'):
-            info.append(f"Kontaktna oseba: {data['kontaktna_oseba']}")
-        if data.get('email'):
-            info.append(f"E-pošta: {data['email']}")
-        if data.get('telefon'):
-            info.append(f"Telefon: {data['telefon']}")
-        
-        for item in info:
-            doc.add_paragraph(item)
-        
-        doc.add_paragraph()
-    
-    def _add_procurement_details_section(self, doc, data: Dict[str, Any]):
-        """Add procurement details section."""
-        doc.add_heading('Podrobnosti naročila', level=1)
-        
-        if data.get('opis_narocila'):
-            doc.add_heading('Opis naročila', level=2)
-            doc.add_paragraph(data['opis_narocila'])
-        
-        if data.get('cpv_kode'):
-            doc.add_heading('CPV kode', level=2)
-            if isinstance(data['cpv_kode'], list):
-                for code in data['cpv_kode']:
-                    doc.add_paragraph(f"• {code}", style='List Bullet')
-            else:
-                doc.add_paragraph(data['cpv_kode'])
-        
-        if data.get('kraj_izvedbe'):
-            doc.add_heading('Kraj izvedbe', level=2)
-            doc.add_paragraph(data['kraj_izvedbe'])
-        
-        doc.add_paragraph()
-    
-    def _add_criteria_section(self, doc, data: Dict[str, Any]):
-        """Add selection criteria section."""
-        doc.add_heading('Merila za izbor', level=1)
-        
-        # Get criteria from data
+
+    def render_docx(self, data: Dict[str, Any],
+                    include_summary: bool = False,
+                    summary_content: Optional[str] = None) -> bytes:
+        """Render a procurement to DOCX bytes with the compiled template."""
+        context = self._template_context(data, summary_content if include_summary else None)
+        return load_template(self.template_path).render(context)
+
+    def _template_context(self, data: Dict[str, Any], summary: Optional[str]) -> Dict[str, Any]:
+        """Template values derived from procurement data (criteria labels, CPV list or text, lots)."""
+        context = dict(data)
+        context['summary'] = summary
+        context['rok_za_vprasanja'] = data.get('rok_za_vprašanja')
+        context['generated_at'] = datetime.now().strftime('%d.%m.%Y %H:%M')
+
+        cpv = data.get('cpv_kode')
+        context['cpv_list'] = cpv if isinstance(cpv, list) else None
+        context['cpv_text'] = cpv if cpv and not isinstance(cpv, list) else None
+
         criteria = data.get('merila', [])
-        if criteria:
-            if isinstance(criteria, str):
-                doc.add_paragraph(criteria)
-            elif isinstance(criteria, list):
-                for i, criterion in enumerate(criteria, 1):
-                    if isinstance(criterion, dict):
-                        p = doc.add_paragraph()
-                        p.add_run(f"{i}. {criterion.get('naziv', 'Merilo')}")
-                        if criterion.get('utez'):
-                            p.add_run(f" (utež: {criterion['utez']}%)")
-                        if criterion.get('opis'):
-                            doc.add_paragraph(f"   {criterion['opis']}")
-                    else:
-                        doc.add_paragraph(f"{i}. {criterion}")
-        else:
-            doc.add_paragraph("Merila niso določena.")
-        
-        doc.add_paragraph()
-    
-    def _add_lots_section(self, doc, data: Dict[str, Any]):
-        """Add lots section if applicable."""
+        context['criteria_text'] = criteria if isinstance(criteria, str) and criteria else None
+        context['criteria'] = []
+        if isinstance(criteria, list):
+            for i, criterion in enumerate(criteria, 1):
+                if isinstance(criterion, dict):
+                    label = f"{i}. {criterion.get('naziv', 'Merilo')}"
+                    if criterion.get('utez'):
+                        label += f" (utež: {criterion['utez']}%)"
+                    context['criteria'].append({'label': label, 'opis': criterion.get('opis')})
+                else:
+                    context['criteria'].append({'label': f"{i}. {criterion}", 'opis': None})
+
         lots = data.get('sklopi', [])
-        if lots and isinstance(lots, list) and len(lots) > 0:
-            doc.add_heading('Sklopi', level=1)
-            
-            for i, lot in enumerate(lots, 1):
-                if isinstance(lot, dict):
-                    doc.add_heading(f"Sklop {i}: {lot.get('naziv', 'Brez naziva')}", level=2)
-                    
-                    if lot.get('opis'):
-                        doc.add_paragraph(f"Opis: {lot['opis']}")
-                    if lot.get('ocenjena_vrednost'):
-                        doc.add_paragraph(f"Ocenjena vrednost: {lot['ocenjena_vrednost']} EUR")
-                    if lot.get('cpv_kode'):
-                        doc.add_paragraph(f"CPV kode: {lot['cpv_kode']}")
-                    
-                    doc.add_paragraph()
-        
-        doc.add_paragraph()
-    
-    def _add_additional_info_section(self, doc, data: Dict[str, Any]):
-        """Add additional information section."""
-        doc.add_heading('Dodatne informacije', level=1)
-        
-        info = []
-        if data.get('dostop_do_dokumentacije'):
-            info.append(f"Dostop do dokumentacije: {data['dostop_do_dokumentacije']}")
-        if data.get('rok_za_vprašanja'):
-            info.append(f"Rok za vprašanja: {data['rok_za_vprašanja']}")
-        if data.get('datum_odpiranja'):
-            info.append(f"Datum odpiranja ponudb: {data['datum_odpiranja']}")
-        if data.get('veljavnost_ponudbe'):
-            info.append(f"Veljavnost ponudbe: {data['veljavnost_ponudbe']} dni")
-        
-        for item in info:
-            doc.add_paragraph(item)
-        
-        if data.get('dodatne_informacije'):
-            doc.add_heading('Opombe', level=2)
-            doc.add_paragraph(data['dodatne_informacije'])
-        
-        # Add footer with generation date
-        doc.add_paragraph()
-        doc.add_paragraph()
-        footer = doc.add_paragraph()
-        footer.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        footer.add_run(f"Dokument generiran: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
-        footer.runs[0].font.size = Pt(10)
-        footer.runs[0].font.color.rgb = RGBColor(128, 128, 128)
\ No newline at end of file
+        context['lots'] = [lot for lot in lots if isinstance(lot, dict)] if isinstance(lots, list) else []
+        return context
+
+    def generate_batch(self, procurement_ids: Iterable[int],
+                       processes: Optional[int] = None) -> Iterator[Tuple[int, Optional[bytes]]]:
+        """
+        Render many procurements, yielding (id, docx bytes) in input order.
+
+        With processes > 1 the work is spread over a process pool; each worker
+        compiles the template once and loads procurements from the database
+        itself, so only IDs and finished documents cross process boundaries.
+        Missing procurements yield (id, None).
+
+        Args:
+            procurement_ids: Procurement IDs to render
+            processes: Worker processes (default: CPU count, 1 renders in-process)
+        """
+        import database
+
+        ids = list(procurement_ids)
+        processes = min(processes or os.cpu_count() or 1, max(1, len(ids)))
+        if processes <= 1:
+            _init_batch_worker(database.DATABASE_FILE, self.template_path)
+            yield from ((pid, _render_procurement(pid)) for pid in ids)
+            return
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_batch_worker,
+                                 initargs=(database.DATABASE_FILE, self.template_path)) as executor:
+            chunksize = max(1, min(16, len(ids) // (processes * 4)))
+            yield from zip(ids, executor.map(_render_procurement, ids, chunksize=chunksize))
+
+    def iter_batch_zip(self, procurement_ids: Iterable[int],
+                       processes: Optional[int] = None) -> Iterator[bytes]:
+        """ZIP of the rendered procurements as a stream of chunks (for files or download responses)."""
+        def documents():
+            for procurement_id, content in self.generate_batch(procurement_ids, processes):
+                if content is None:
+                    logger.warning(f"Procurement {procurement_id} not found, skipped in batch export")
+                    continue
+                yield f"javno_narocilo_{procurement_id}.docx", content
+        return iter_zip(documents())
+
+    def generate_batch_zip(self, procurement_ids: List[int], path: Optional[str] = None,
+                           processes: Optional[int] = None) -> str:
+        """Write the batch ZIP to a file (default: temp directory) and return its path."""
+        if path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(self.temp_dir, f"javna_narocila_{timestamp}.zip")
+        with open(path, 'wb') as f:
+            for chunk in self.iter_batch_zip(procurement_ids, processes):
+                f.write(chunk)
+        logger.info(f"Generated batch ZIP with {len(procurement_ids)} procurements: {path}")
+        return path
+
+
+# Per-process state for batch rendering (set by the pool initializer)
+_batch_generator: Optional[DocumentGenerator] = None
+
+
+def _init_batch_worker(database_file: str, template_path: Optional[str]):
+    global _batch_generator
+    import database
+    database.DATABASE_FILE = database_file
+    _batch_generator = DocumentGenerator(template_path)
+    load_template(template_path)  # compile before the first task
+
+
+def _render_procurement(procurement_id: int) -> Optional[bytes]:
+    import database
+    procurement = database.get_procurement_by_id(procurement_id)
+    if not procurement:
+        return None
+    return _batch_generator.render_docx(procurement_to_document_data(procurement))
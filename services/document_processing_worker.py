@@ -0,0 +1,542 @@
+"""
+Document Processing Worker Service
+Durable worker pool around the form_document_processing_queue table.
+Jobs are claimed atomically with a lease that is kept alive by a heartbeat,
+processed by a pool of worker processes (Docling/OCR are CPU-bound) and
+retried with exponential backoff.
+
+Run beside the app:
+    python -m services.document_processing_worker --workers 2
+"""
+
+import os
+import sys
+import time
+import signal
+import random
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import (
+    Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+)
+
+# Add parent directory to path for local imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+QUEUE_TABLE = 'form_document_processing_queue'
+
+# Columns the lease-based worker needs on top of the 002/003 migration schemas
+LEASE_COLUMNS = {
+    'started_at': 'DATETIME',
+    'next_retry_at': 'DATETIME',
+    'locked_by': 'TEXT',
+    'lease_expires_at': 'DATETIME',
+    'heartbeat_at': 'DATETIME',
+}
+
+
+def ensure_queue_schema(db_path: str):
+    """Add the lease/heartbeat columns to the processing queue if missing.
+
+    Both 002_form_documents_tables.sql and 003_ai_documents_tables.sql create
+    the queue table with slightly different columns, so columns are checked
+    individually instead of relying on a single migration file.
+    """
+    with sqlite3.connect(db_path, timeout=30) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (QUEUE_TABLE,)
+        )
+        if not cursor.fetchone():
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {QUEUE_TABLE} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    form_document_id INTEGER NOT NULL,
+                    priority INTEGER DEFAULT 5,
+                    status TEXT DEFAULT 'pending',
+                    retry_count INTEGER DEFAULT 0,
+                    max_retries INTEGER DEFAULT 3,
+                    error_message TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    completed_at DATETIME
+                )
+            """)
+
+        cursor.execute(f"PRAGMA table_info({QUEUE_TABLE})")
+        columns = {col[1] for col in cursor.fetchall()}
+
+        for column, column_type in LEASE_COLUMNS.items():
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE {QUEUE_TABLE} ADD COLUMN {column} {column_type}")
+
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_processing_queue_claim
+            ON {QUEUE_TABLE}(status, priority DESC, id)
+        """)
+        conn.commit()
+
+
+@dataclass
+class QueueJob:
+    """A claimed queue entry"""
+    id: int
+    form_document_id: int
+    priority: int
+    retry_count: int
+    max_retries: int
+
+
+class DocumentJobQueue:
+    """SQLite-backed job queue with atomic claims, leases and backoff"""
+
+    def __init__(self, db_path: str = 'mainDB.db',
+                 lease_seconds: int = 120,
+                 backoff_base: float = 5.0,
+                 backoff_max: float = 600.0,
+                 max_retries: int = 3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retries = max_retries
+        ensure_queue_schema(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode so BEGIN IMMEDIATE controls the write lock explicitly
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        return conn
+
+    def enqueue(self, form_doc_id: int, priority: int = 5) -> int:
+        """Add a document to the queue, or raise priority of its open entry.
+
+        Returns:
+            Queue entry ID
+        """
+        priority = max(1, min(10, int(priority)))
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(f"""
+                SELECT id, priority FROM {QUEUE_TABLE}
+                WHERE form_document_id = ? AND status IN ('pending', 'processing')
+                ORDER BY id LIMIT 1
+            """, (form_doc_id,)).fetchone()
+
+            if row:
+                job_id = row[0]
+                if priority > (row[1] or 0):
+                    conn.execute(
+                        f"UPDATE {QUEUE_TABLE} SET priority = ? WHERE id = ?",
+                        (priority, job_id)
+                    )
+            else:
+                cursor = conn.execute(f"""
+                    INSERT INTO {QUEUE_TABLE}
+                    (form_document_id, priority, status, retry_count, max_retries)
+                    VALUES (?, ?, 'pending', 0, ?)
+                """, (form_doc_id, priority, self.max_retries))
+                job_id = cursor.lastrowid
+
+            conn.execute("COMMIT")
+            return job_id
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[QueueJob]:
+        """Atomically claim up to `limit` runnable jobs for a worker.
+
+        Runnable jobs are pending entries whose backoff has elapsed, plus
+        processing entries whose lease expired (their worker died).
+        Higher priority first, then FIFO.
+        """
+        if limit <= 0:
+            return []
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(f"""
+                SELECT id, form_document_id, priority, retry_count, max_retries
+                FROM {QUEUE_TABLE}
+                WHERE (status = 'pending'
+                       AND (next_retry_at IS NULL OR next_retry_at <= datetime('now')))
+                   OR (status = 'processing'
+                       AND lease_expires_at IS NOT NULL
+                       AND lease_expires_at < datetime('now'))
+                ORDER BY priority DESC, id ASC
+                LIMIT ?
+            """, (limit,)).fetchall()
+
+            jobs = []
+            for row in rows:
+                conn.execute(f"""
+                    UPDATE {QUEUE_TABLE}
+                    SET status = 'processing',
+                        locked_by = ?,
+                        lease_expires_at = datetime('now', ?),
+                        heartbeat_at = datetime('now'),
+                        started_at = COALESCE(started_at, datetime('now'))
+                    WHERE id = ?
+                """, (worker_id, f'+{self.lease_seconds} seconds', row[0]))
+                jobs.append(QueueJob(
+                    id=row[0],
+                    form_document_id=row[1],
+                    priority=row[2] or 5,
+                    retry_count=row[3] or 0,
+                    max_retries=row[4] if row[4] is not None else self.max_retries
+                ))
+
+            conn.execute("COMMIT")
+            return jobs
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_ids: List[int], worker_id: str) -> int:
+        """Extend the lease of jobs still held by this worker.
+
+        Returns:
+            Number of leases renewed
+        """
+        if not job_ids:
+            return 0
+
+        placeholders = ','.join('?' for _ in job_ids)
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            cursor = conn.execute(f"""
+                UPDATE {QUEUE_TABLE}
+                SET lease_expires_at = datetime('now', ?),
+                    heartbeat_at = datetime('now')
+                WHERE id IN ({placeholders})
+                AND locked_by = ? AND status = 'processing'
+            """, (f'+{self.lease_seconds} seconds', *job_ids, worker_id))
+            conn.commit()
+            return cursor.rowcount
+
+    def complete(self, job_id: int, worker_id: str, message: str = ''):
+        """Mark a claimed job as completed"""
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            conn.execute(f"""
+                UPDATE {QUEUE_TABLE}
+                SET status = 'completed',
+                    completed_at = CURRENT_TIMESTAMP,
+                    error_message = ?,
+                    locked_by = NULL,
+                    lease_expires_at = NULL
+                WHERE id = ? AND locked_by = ?
+            """, (message, job_id, worker_id))
+            conn.commit()
+
+    def backoff_delay(self, retry_count: int) -> float:
+        """Exponential backoff with jitter for the given retry attempt"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** retry_count))
+        return delay * random.uniform(0.8, 1.2)
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Record a failed attempt; reschedule with backoff or give up.
+
+        Returns:
+            True if the job will be retried
+        """
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            row = conn.execute(
+                f"SELECT retry_count, max_retries FROM {QUEUE_TABLE} WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+            if not row:
+                return False
+
+            retry_count = (row[0] or 0) + 1
+            max_retries = row[1] if row[1] is not None else self.max_retries
+
+            if retry_count < max_retries:
+                delay = int(round(self.backoff_delay(retry_count - 1)))
+                conn.execute(f"""
+                    UPDATE {QUEUE_TABLE}
+                    SET status = 'pending',
+                        retry_count = ?,
+                        next_retry_at = datetime('now', ?),
+                        error_message = ?,
+                        locked_by = NULL,
+                        lease_expires_at = NULL
+                    WHERE id = ? AND locked_by = ?
+                """, (retry_count, f'+{delay} seconds', error, job_id, worker_id))
+                retry = True
+            else:
+                conn.execute(f"""
+                    UPDATE {QUEUE_TABLE}
+                    SET status = 'failed',
+                        retry_count = ?,
+                        completed_at = CURRENT_TIMESTAMP,
+                        error_message = ?,
+                        locked_by = NULL,
+                        lease_expires_at = NULL
+                    WHERE id = ? AND locked_by = ?
+                """, (retry_count, error, job_id, worker_id))
+                retry = False
+
+            conn.commit()
+            return retry
+
+    def release(self, job_ids: List[int], worker_id: str) -> int:
+        """Return unfinished jobs to the queue without counting a retry"""
+        if not job_ids:
+            return 0
+
+        placeholders = ','.join('?' for _ in job_ids)
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            cursor = conn.execute(f"""
+                UPDATE {QUEUE_TABLE}
+                SET status = 'pending',
+                    locked_by = NULL,
+                    lease_expires_at = NULL
+                WHERE id IN ({placeholders}) AND locked_by = ?
+                AND status = 'processing'
+            """, (*job_ids, worker_id))
+            conn.commit()
+            return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, int]:
+        """Count queue entries by status"""
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            rows = conn.execute(
+                f"SELECT status, COUNT(*) FROM {QUEUE_TABLE} GROUP BY status"
+            ).fetchall()
+            return dict(rows)
+
+
+# Per-process processor instance; built once in each pool worker
+_worker_processor = None
+
+
+def process_form_document_job(db_path: str, form_doc_id: int) -> Tuple[bool, str]:
+    """Default job handler executed inside a pool worker process"""
+    global _worker_processor
+
+    if _worker_processor is None or _worker_processor.db_path != db_path:
+        from services.form_document_processor import FormDocumentProcessor
+        _worker_processor = FormDocumentProcessor(db_path)
+
+    return _worker_processor.process_form_document(form_doc_id)
+
+
+JobHandler = Callable[[str, int], Tuple[bool, str]]
+
+
+class DocumentProcessingWorker:
+    """Dispatcher that feeds claimed jobs to a pool of worker processes.
+
+    The dispatcher thread owns all queue bookkeeping (claim, heartbeat,
+    complete/fail); pool workers only run the handler.
+    """
+
+    def __init__(self,
+                 db_path: str = 'mainDB.db',
+                 num_workers: Optional[int] = None,
+                 handler: JobHandler = process_form_document_job,
+                 lease_seconds: Optional[int] = None,
+                 heartbeat_interval: Optional[float] = None,
+                 poll_interval: float = 2.0,
+                 use_processes: bool = True,
+                 worker_id: Optional[str] = None,
+                 job_queue: Optional[DocumentJobQueue] = None):
+        self.db_path = db_path
+        self.num_workers = num_workers or int(os.getenv('DOC_WORKER_COUNT', '2'))
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self.use_processes = use_processes
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+        lease_seconds = lease_seconds or int(os.getenv('DOC_WORKER_LEASE_SECONDS', '120'))
+        self.queue = job_queue or DocumentJobQueue(db_path, lease_seconds=lease_seconds)
+        self.heartbeat_interval = heartbeat_interval or max(1.0, self.queue.lease_seconds / 3)
+
+        self._stop_event = threading.Event()
+        self._in_flight: Dict[Future, QueueJob] = {}
+        self._lock = threading.Lock()
+        self.stats = {'completed': 0, 'failed': 0, 'retried': 0}
+
+    def _create_executor(self) -> Executor:
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.num_workers)
+        return ThreadPoolExecutor(max_workers=self.num_workers,
+                                  thread_name_prefix='doc-worker')
+
+    def request_stop(self, *_):
+        """Ask the worker to stop claiming jobs and drain (signal-safe)"""
+        logger.info("Shutdown requested - draining in-flight jobs")
+        self._stop_event.set()
+
+    def install_signal_handlers(self):
+        """Route SIGINT/SIGTERM to a graceful shutdown"""
+        signal.signal(signal.SIGINT, self.request_stop)
+        signal.signal(signal.SIGTERM, self.request_stop)
+
+    def _heartbeat_loop(self):
+        while not self._stop_event.wait(self.heartbeat_interval):
+            self._send_heartbeat()
+
+    def _send_heartbeat(self):
+        with self._lock:
+            job_ids = [job.id for job in self._in_flight.values()]
+        try:
+            self.queue.heartbeat(job_ids, self.worker_id)
+        except sqlite3.Error as e:
+            logger.warning(f"Heartbeat failed: {e}")
+
+    def _handle_result(self, future: Future, job: QueueJob):
+        try:
+            success, message = future.result()
+        except Exception as e:
+            success, message = False, f"{type(e).__name__}: {e}"
+
+        if success:
+            self.queue.complete(job.id, self.worker_id, message)
+            self.stats['completed'] += 1
+            logger.info(f"Document {job.form_document_id} processing completed: {message}")
+        elif self.queue.fail(job.id, self.worker_id, message):
+            self.stats['retried'] += 1
+            logger.warning(f"Document {job.form_document_id} failed, scheduled for retry: {message}")
+        else:
+            self.stats['failed'] += 1
+            logger.error(f"Document {job.form_document_id} processing failed: {message}")
+
+    def run(self, max_jobs: Optional[int] = None, drain_timeout: float = 300.0,
+            exit_when_idle: bool = False) -> Dict[str, int]:
+        """Run the dispatch loop until stopped.
+
+        Args:
+            max_jobs: Stop after this many jobs were claimed (None = unlimited)
+            drain_timeout: Seconds to wait for in-flight jobs on shutdown
+            exit_when_idle: Stop once the queue has no runnable jobs
+
+        Returns:
+            Counters of completed, failed and retried jobs
+        """
+        claimed_total = 0
+        heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat_thread.start()
+
+        executor = self._create_executor()
+        logger.info(f"Document worker {self.worker_id} started with {self.num_workers} "
+                    f"{'processes' if self.use_processes else 'threads'}")
+        try:
+            while not self._stop_event.is_set():
+                free_slots = self.num_workers - len(self._in_flight)
+                if max_jobs is not None:
+                    free_slots = min(free_slots, max_jobs - claimed_total)
+
+                jobs = self.queue.claim(self.worker_id, free_slots) if free_slots > 0 else []
+                for job in jobs:
+                    future = executor.submit(self.handler, self.db_path, job.form_document_id)
+                    with self._lock:
+                        self._in_flight[future] = job
+                claimed_total += len(jobs)
+
+                if not self._in_flight:
+                    if exit_when_idle or (max_jobs is not None and claimed_total >= max_jobs):
+                        break
+                    self._stop_event.wait(self.poll_interval)
+                    continue
+
+                done, _ = wait(list(self._in_flight), timeout=self.poll_interval,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    with self._lock:
+                        job = self._in_flight.pop(future)
+                    self._handle_result(future, job)
+
+            # Graceful shutdown: let in-flight jobs finish, release the rest
+            if self._in_flight:
+                done, not_done = wait(list(self._in_flight), timeout=drain_timeout)
+                for future in done:
+                    with self._lock:
+                        job = self._in_flight.pop(future)
+                    self._handle_result(future, job)
+                if not_done:
+                    with self._lock:
+                        pending_ids = [self._in_flight.pop(f).id for f in not_done]
+                    released = self.queue.release(pending_ids, self.worker_id)
+                    logger.warning(f"Released {released} unfinished jobs back to the queue")
+        finally:
+            self._stop_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            heartbeat_thread.join(timeout=1)
+
+        logger.info(f"Document worker {self.worker_id} stopped: {self.stats}")
+        return dict(self.stats)
+
+
+def run_pending_jobs(db_path: str = 'mainDB.db',
+                     handler: JobHandler = process_form_document_job,
+                     num_workers: int = 1) -> Dict[str, int]:
+    """Process everything currently runnable in-process, then return"""
+    worker = DocumentProcessingWorker(
+        db_path=db_path,
+        num_workers=num_workers,
+        handler=handler,
+        use_processes=False,
+        poll_interval=0.1,
+        worker_id=f"inline:{os.getpid()}:{threading.get_ident()}"
+    )
+    return worker.run(exit_when_idle=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Run the form document processing worker')
+    parser.add_argument('--db', default=os.getenv('DOC_WORKER_DB', 'mainDB.db'),
+                        help='Path to the SQLite database (default: mainDB.db)')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('DOC_WORKER_COUNT', '2')),
+                        help='Number of worker processes')
+    parser.add_argument('--lease-seconds', type=int,
+                        default=int(os.getenv('DOC_WORKER_LEASE_SECONDS', '120')),
+                        help='Job lease duration; renewed by heartbeat')
+    parser.add_argument('--poll-interval', type=float, default=2.0,
+                        help='Seconds between queue polls when idle')
+    parser.add_argument('--threads', action='store_true',
+                        help='Use threads instead of processes (debugging)')
+    parser.add_argument('--once', action='store_true',
+                        help='Exit when the queue has no runnable jobs')
+    parser.add_argument('--stats', action='store_true',
+                        help='Print queue statistics and exit')
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    if args.stats:
+        queue = DocumentJobQueue(args.db)
+        for status, count in sorted(queue.get_stats().items()):
+            print(f"{status}: {count}")
+        return 0
+
+    worker = DocumentProcessingWorker(
+        db_path=args.db,
+        num_workers=args.workers,
+        lease_seconds=args.lease_seconds,
+        poll_interval=args.poll_interval,
+        use_processes=not args.threads
+    )
+    worker.install_signal_handlers()
+    stats = worker.run(exit_when_idle=args.once)
+    return 0 if stats['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
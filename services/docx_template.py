@@ -0,0 +1,436 @@
+"""DOCX template engine: compile a template once, render it many times without python-docx.
+
+A template is an ordinary .docx whose text contains tags:
+
+    {{ naziv }}                    value (dotted paths, optional filters: {{ lot.value|money }})
+    {{ summary|markdown }}         alone in a paragraph: replaced by generated paragraphs
+    {% for lot in sklopi %}        each tag alone in its own paragraph; the paragraphs
+    ...                            between the tags repeat per item (loop.index is 1-based)
+    {% endfor %}
+    {% if x %} / {% elif y %} / {% else %} / {% endif %}
+
+Compilation merges the runs Word splits tags across, serializes every body
+element once and splits it into literal XML and expressions, and deflates
+the parts without tags (styles, theme, settings) once. Rendering is string
+concatenation plus compressing document.xml, so a compiled template is
+cheap to reuse across documents, threads and worker processes.
+"""
+
+import io
+import os
+import re
+import zlib
+import struct
+import zipfile
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from lxml import etree
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+XML_NS = 'http://www.w3.org/XML/1998/namespace'
+W = f'{{{W_NS}}}'
+
+DOCUMENT_PART = 'word/document.xml'
+INLINE_PARTS = re.compile(r'^word/(header|footer)\d*\.xml$')
+
+_VALUE_TAG = re.compile(r'\{\{\s*(.+?)\s*\}\}')
+_BLOCK_TAG = re.compile(r'^\{%\s*(.+?)\s*%\}$')
+_FOR = re.compile(r'^for\s+(\w+)\s+in\s+(.+)$')
+_FILTER = re.compile(r'^(\w+)(?:\((.*)\))?$')
+
+
+class TemplateError(ValueError):
+    """Raised for malformed tags or unbalanced blocks in a template"""
+
+
+# ============ EXPRESSIONS ============
+
+def _escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _text_xml(value: Any) -> str:
+    """Value as run text: escaped, newlines as line breaks"""
+    if value is None:
+        return ''
+    text = _escape(str(value))
+    if '\n' in text:
+        text = text.replace('\n', '</w:t><w:br/><w:t xml:space="preserve">')
+    return text
+
+
+def _money(value: Any) -> str:
+    """1234567.5 -> 1.234.567,50"""
+    try:
+        return f"{float(value):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    except (TypeError, ValueError):
+        return '' if value is None else str(value)
+
+
+def _markdown_paragraphs(content: Any) -> str:
+    """Paragraph XML for simple markdown: #/##/### headings, - and * bullets, numbered lines, **bold**"""
+    paragraphs = []
+    for line in str(content or '').split('\n'):
+        stripped = line.strip()
+        style, indent, text = None, False, line
+        if not stripped:
+            paragraphs.append('<w:p/>')
+            continue
+        heading = re.match(r'^(#{1,3}) (.*)$', line)
+        if heading:
+            style, text = f"Heading{len(heading.group(1))}", heading.group(2)
+        elif stripped.startswith(('- ', '* ')):
+            style, text = 'ListBullet', stripped[2:]
+        elif re.match(r'^\s*\d+\.\s+', line):
+            indent, text = True, line.strip()
+        runs = []
+        last = 0
+        for match in re.finditer(r'\*\*([^*]+)\*\*', text):
+            if match.start() > last:
+                runs.append(f'<w:r><w:t xml:space="preserve">{_escape(text[last:match.start()])}</w:t></w:r>')
+            runs.append(f'<w:r><w:rPr><w:b/></w:rPr><w:t xml:space="preserve">{_escape(match.group(1))}</w:t></w:r>')
+            last = match.end()
+        if last < len(text):
+            runs.append(f'<w:r><w:t xml:space="preserve">{_escape(text[last:])}</w:t></w:r>')
+        properties = ''
+        if style:
+            properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>'
+        elif indent:
+            properties = '<w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr>'
+        paragraphs.append(f'<w:p>{properties}{"".join(runs)}</w:p>')
+    return ''.join(paragraphs)
+
+
+FILTERS: Dict[str, Callable[..., Any]] = {
+    'default': lambda value, fallback='': fallback if value in (None, '', [], {}) else value,
+    'join': lambda value, separator=', ': separator.join(map(str, value)) if isinstance(value, (list, tuple)) else value,
+    'money': _money,
+    'upper': lambda value: '' if value is None else str(value).upper(),
+}
+
+
+def _parse_argument(text: str) -> Any:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '\'"':
+        return text[1:-1]
+    try:
+        return float(text) if '.' in text else int(text)
+    except ValueError:
+        raise TemplateError(f"filter arguments must be quoted strings or numbers: {text!r}")
+
+
+def compile_expression(source: str) -> Callable[[Dict[str, Any]], Any]:
+    """`path.to.value|filter('arg')|filter` -> function(context) -> value"""
+    path, *filter_sources = [part.strip() for part in source.split('|')]
+    negate = False
+    if path.startswith('not '):
+        negate, path = True, path[4:].strip()
+    if not re.match(r'^[A-Za-z_]\w*(\.\w+)*$', path):
+        raise TemplateError(f"invalid expression: {source!r}")
+    names = path.split('.')
+    filters = []
+    for filter_source in filter_sources:
+        match = _FILTER.match(filter_source)
+        if not match or match.group(1) not in FILTERS and match.group(1) != 'markdown':
+            raise TemplateError(f"unknown filter in {source!r}: {filter_source!r}")
+        args = [_parse_argument(a) for a in match.group(2).split(',')] if match.group(2) else []
+        filters.append((match.group(1), args))
+
+    def evaluate(context: Dict[str, Any]) -> Any:
+        value = context.get(names[0])
+        for name in names[1:]:
+            if isinstance(value, dict):
+                value = value.get(name)
+            elif isinstance(value, (list, tuple)) and name.isdigit():
+                value = value[int(name)] if int(name) < len(value) else None
+            else:
+                value = getattr(value, name, None)
+            if value is None:
+                break
+        for name, args in filters:
+            if name != 'markdown':
+                value = FILTERS[name](value, *args)
+        return not value if negate else value
+    return evaluate
+
+
+# ============ COMPILED NODES ============
+
+class _Text:
+    """Serialized XML split into literal strings and value expressions"""
+    __slots__ = ('parts',)
+
+    def __init__(self, xml: str):
+        parts: List[Union[str, Callable]] = []
+        last = 0
+        for match in _VALUE_TAG.finditer(xml):
+            parts.append(xml[last:match.start()])
+            parts.append(compile_expression(match.group(1)))
+            last = match.end()
+        parts.append(xml[last:])
+        self.parts = [p for p in parts if p != '']
+
+    def render(self, context: Dict[str, Any], out: List[str]):
+        for part in self.parts:
+            out.append(part if isinstance(part, str) else _text_xml(part(context)))
+
+
+class _Markdown:
+    __slots__ = ('expression',)
+
+    def __init__(self, source: str):
+        self.expression = compile_expression(source)
+
+    def render(self, context: Dict[str, Any], out: List[str]):
+        out.append(_markdown_paragraphs(self.expression(context)))
+
+
+class _For:
+    __slots__ = ('name', 'items', 'body')
+
+    def __init__(self, name: str, items: str):
+        self.name = name
+        self.items = compile_expression(items)
+        self.body: List[Any] = []
+
+    def render(self, context: Dict[str, Any], out: List[str]):
+        items = self.items(context) or []
+        for index, item in enumerate(items):
+            scope = {**context, self.name: item,
+                     'loop': {'index': index + 1, 'first': index == 0, 'last': index == len(items) - 1}}
+            for node in self.body:
+                node.render(scope, out)
+
+
+class _If:
+    __slots__ = ('branches', 'body')
+
+    def __init__(self, condition: str):
+        self.branches: List[Tuple[Optional[Callable], List[Any]]] = []
+        self.add_branch(condition)
+
+    def add_branch(self, condition: Optional[str]):
+        self.body = []
+        self.branches.append((compile_expression(condition) if condition else None, self.body))
+
+    def render(self, context: Dict[str, Any], out: List[str]):
+        for condition, body in self.branches:
+            if condition is None or condition(context):
+                for node in body:
+                    node.render(context, out)
+                return
+
+
+# ============ COMPILATION ============
+
+def _paragraph_text(paragraph) -> str:
+    return ''.join(t.text or '' for t in paragraph.iter(W + 't'))
+
+
+def _merge_tag_runs(element) -> None:
+    """Put the text of every paragraph containing a tag into its first run, so tags are contiguous"""
+    paragraphs = [element] if element.tag == W + 'p' else list(element.iter(W + 'p'))
+    for paragraph in paragraphs:
+        text = _paragraph_text(paragraph)
+        if '{{' not in text and '{%' not in text:
+            continue
+        runs = [r for r in paragraph.iter(W + 'r') if r.find(W + 't') is not None]
+        if not runs:
+            continue
+        first = runs[0]
+        for t in first.findall(W + 't')[1:]:
+            first.remove(t)
+        target = first.find(W + 't')
+        target.text = text
+        target.set(f'{{{XML_NS}}}space', 'preserve')
+        for run in runs[1:]:
+            run.getparent().remove(run)
+
+
+def _strip_namespaces(xml: str, declared: Dict[Optional[str], str]) -> str:
+    """Drop namespace declarations lxml repeats on serialized children when the root already has them"""
+    def drop(match):
+        prefix, uri = match.group(1), match.group(2)
+        return '' if declared.get(prefix) == uri else match.group(0)
+    head_end = xml.index('>')
+    return re.sub(r' xmlns:(\w+)="([^"]*)"', drop, xml[:head_end]) + xml[head_end:]
+
+
+def _compile_body(children, declared) -> List[Any]:
+    root: List[Any] = []
+    stack: List[Tuple[str, Any, List[Any]]] = []  # (kind, node, enclosing list)
+    current = root
+    for child in children:
+        _merge_tag_runs(child)
+        text = _paragraph_text(child).strip() if child.tag == W + 'p' else ''
+        block = _BLOCK_TAG.match(text)
+        if block:
+            tag = block.group(1)
+            loop = _FOR.match(tag)
+            if loop:
+                node = _For(loop.group(1), loop.group(2))
+                current.append(node)
+                stack.append(('for', node, current))
+                current = node.body
+            elif tag.startswith('if '):
+                node = _If(tag[3:])
+                current.append(node)
+                stack.append(('if', node, current))
+                current = node.body
+            elif tag.startswith('elif ') or tag == 'else':
+                if not stack or stack[-1][0] != 'if':
+                    raise TemplateError(f"{{% {tag} %}} outside an if block")
+                stack[-1][1].add_branch(tag[5:] if tag != 'else' else None)
+                current = stack[-1][1].body
+            elif tag in ('endfor', 'endif'):
+                if not stack or stack[-1][0] != tag[3:]:
+                    raise TemplateError(f"unexpected {{% {tag} %}}")
+                current = stack.pop()[2]
+            else:
+                raise TemplateError(f"unknown block tag {{% {tag} %}}")
+            continue
+        markdown = re.match(r'^\{\{\s*(.+\|\s*markdown)\s*\}\}$', text)
+        if markdown:
+            current.append(_Markdown(markdown.group(1)))
+            continue
+        current.append(_Text(_strip_namespaces(etree.tostring(child, encoding='unicode'), declared)))
+    if stack:
+        raise TemplateError(f"unclosed {{% {stack[-1][0]} %}} block")
+    return root
+
+
+# ============ ZIP OUTPUT ============
+
+# Fixed member timestamp (1980-01-01 00:00 in DOS format): identical input renders identical bytes
+_DOS_TIME, _DOS_DATE = 0, (1 << 5) | 1
+_UTF8_FLAG = 0x800
+
+
+def _deflate(data: bytes, level: int) -> Tuple[bytes, int, int]:
+    """Raw deflate stream plus the CRC and size a zip entry needs"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(), zlib.crc32(data), len(data)
+
+
+def _zip_bytes(members: List[Tuple[str, Tuple[bytes, int, int]]]) -> bytes:
+    """Assemble a zip from already-deflated members (zipfile can only compress on write)"""
+    out = io.BytesIO()
+    central = []
+    for name, (data, crc, size) in members:
+        encoded = name.encode('utf-8')
+        offset = out.tell()
+        out.write(struct.pack('<IHHHHHIIIHH', 0x04034b50, 20, _UTF8_FLAG, zipfile.ZIP_DEFLATED,
+                              _DOS_TIME, _DOS_DATE, crc, len(data), size, len(encoded), 0))
+        out.write(encoded)
+        out.write(data)
+        central.append(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, 20, 20, _UTF8_FLAG, zipfile.ZIP_DEFLATED,
+                                   _DOS_TIME, _DOS_DATE, crc, len(data), size, len(encoded), 0, 0, 0, 0, 0,
+                                   offset) + encoded)
+    start = out.tell()
+    for entry in central:
+        out.write(entry)
+    out.write(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, len(central), len(central),
+                          out.tell() - start, start, 0))
+    return out.getvalue()
+
+
+class DocxTemplate:
+    """A compiled .docx template; rendering never mutates it, so one instance serves every thread"""
+
+    def __init__(self, source: Union[str, bytes]):
+        data = source if isinstance(source, bytes) else open(source, 'rb').read()
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.names = [info.filename for info in archive.infolist()]
+            self.parts = {name: archive.read(name) for name in self.names}
+        self.nodes: Dict[str, List[Any]] = {}
+        self.frames: Dict[str, Tuple[str, str]] = {}
+        self._compile_document()
+        for name in self.names:
+            if INLINE_PARTS.match(name) and b'{{' in self.parts[name]:
+                self.nodes[name] = [_Text(self._merged_part(name))]
+        # Parts without tags are identical in every output: deflate them once here
+        self.static = {name: _deflate(self.parts[name], 6) for name in self.names if name not in self.nodes}
+
+    def _merged_part(self, name: str) -> str:
+        root = etree.fromstring(self.parts[name])
+        _merge_tag_runs(root)
+        return etree.tostring(root, encoding='unicode')
+
+    def _compile_document(self):
+        root = etree.fromstring(self.parts[DOCUMENT_PART])
+        body = root.find(W + 'body')
+        children = [c for c in body if c.tag != W + 'sectPr']
+        self.nodes[DOCUMENT_PART] = _compile_body(children, root.nsmap)
+        for child in children:
+            body.remove(child)
+        body.insert(0, etree.Comment('BODY'))
+        head, tail = etree.tostring(root, encoding='unicode').split('<!--BODY-->')
+        self.frames[DOCUMENT_PART] = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n' + head, tail)
+
+    def render_part(self, name: str, context: Dict[str, Any]) -> bytes:
+        head, tail = self.frames.get(name, ('', ''))
+        out = [head]
+        for node in self.nodes[name]:
+            node.render(context, out)
+        out.append(tail)
+        return ''.join(out).encode('utf-8')
+
+    def render(self, context: Dict[str, Any], compresslevel: int = 6) -> bytes:
+        """The filled-in document as .docx bytes"""
+        return _zip_bytes([
+            (name, _deflate(self.render_part(name, context), compresslevel) if name in self.nodes
+             else self.static[name])
+            for name in self.names
+        ])
+
+
+_cache: Dict[Tuple[str, int], DocxTemplate] = {}
+_cache_lock = threading.Lock()
+
+
+def get_template(path: str) -> DocxTemplate:
+    """Compiled template for a file, recompiled only when the file changes"""
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    with _cache_lock:
+        template = _cache.get(key)
+    if template is None:
+        template = DocxTemplate(path)
+        with _cache_lock:
+            for stale in [k for k in _cache if k[0] == key[0]]:
+                del _cache[stale]
+            _cache[key] = template
+        logger.info(f"Compiled DOCX template {path}")
+    return template
+
+
+def iter_zip(documents: Iterable[Tuple[str, bytes]], compresslevel: int = 1) -> Iterable[bytes]:
+    """
+    Stream (filename, content) pairs as a ZIP archive, yielding chunks as each member is written.
+
+    Nothing is buffered beyond the current member, so large batches can be
+    written to a file or HTTP response while documents are still rendering.
+    DOCX members are already deflated, hence the low default compresslevel.
+    """
+    class _Sink:
+        def __init__(self):
+            self.chunks: List[bytes] = []
+
+        def write(self, data: bytes) -> int:
+            self.chunks.append(bytes(data))
+            return len(data)
+
+        def flush(self):
+            pass
+
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as archive:
+        for filename, content in documents:
+            archive.writestr(filename, content)
+            yield b''.join(sink.chunks)
+            sink.chunks.clear()
+    yield b''.join(sink.chunks)
@@ -0,0 +1,254 @@
+"""
+Extraction Result Cache
+Content-addressed cache of extracted document text keyed by
+(file_hash, extractor, extractor_version). Reprocessing a deduplicated file
+(see FormDocumentService) costs only a lookup instead of a Docling/PyPDF2/OCR run.
+Text is stored compressed in SQLite and evicted least-recently-used by size.
+"""
+
+import os
+import sys
+import json
+import zlib
+import hashlib
+import sqlite3
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Add parent directory to path for local imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+CACHE_TABLE = 'extraction_cache'
+HASH_CHUNK_SIZE = 8192  # Same chunking as FormDocumentService
+
+
+def compute_file_hash(file_path: str) -> str:
+    """SHA-256 of file content, compatible with form_documents.file_hash"""
+    sha256_hash = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _package_version(package: str) -> str:
+    try:
+        from importlib.metadata import version
+        return version(package)
+    except Exception:
+        return 'none'
+
+
+def extractor_version(code_version: str, *packages: str) -> str:
+    """Build a version string from our extractor code version and library versions.
+
+    A library upgrade (e.g. a new Docling release) changes the key, so stale
+    extractions are never served.
+    """
+    parts = [code_version] + [f"{p}={_package_version(p)}" for p in packages]
+    return '|'.join(parts)
+
+
+class ExtractionCache:
+    """Compressed, size-bounded extraction cache stored in SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None, max_bytes: Optional[int] = None):
+        if db_path is None:
+            import database
+            db_path = database.DATABASE_FILE
+        self.db_path = db_path
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(os.getenv('EXTRACTION_CACHE_MAX_MB', '512')) * 1024 * 1024
+        self.codec = 'zstd' if HAS_ZSTD else 'zlib'
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._ensure_table()
+
+    def _ensure_table(self):
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {CACHE_TABLE} (
+                    file_hash TEXT NOT NULL,
+                    extractor TEXT NOT NULL,
+                    extractor_version TEXT NOT NULL,
+                    codec TEXT NOT NULL,
+                    text_blob BLOB NOT NULL,
+                    metadata_json TEXT,
+                    raw_size INTEGER NOT NULL,
+                    compressed_size INTEGER NOT NULL,
+                    hit_count INTEGER DEFAULT 0,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    last_accessed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (file_hash, extractor, extractor_version)
+                )
+            """)
+            conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_extraction_cache_lru
+                ON {CACHE_TABLE}(last_accessed_at)
+            """)
+            conn.commit()
+
+    def _compress(self, text: str) -> bytes:
+        data = text.encode('utf-8')
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=6).compress(data)
+        return zlib.compress(data, 6)
+
+    @staticmethod
+    def _decompress(codec: str, blob: bytes) -> Optional[str]:
+        if codec == 'zstd':
+            if not HAS_ZSTD:
+                return None
+            return zstandard.ZstdDecompressor().decompress(blob).decode('utf-8')
+        return zlib.decompress(blob).decode('utf-8')
+
+    def get(self, file_hash: str, extractor: str,
+            version: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Look up cached text and metadata; None on miss"""
+        if not file_hash:
+            return None
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30) as conn:
+                row = conn.execute(f"""
+                    SELECT codec, text_blob, metadata_json FROM {CACHE_TABLE}
+                    WHERE file_hash = ? AND extractor = ? AND extractor_version = ?
+                """, (file_hash, extractor, version)).fetchone()
+
+                if not row:
+                    self.stats['misses'] += 1
+                    return None
+
+                text = self._decompress(row[0], row[1])
+                if text is None:
+                    self.stats['misses'] += 1
+                    return None
+
+                conn.execute(f"""
+                    UPDATE {CACHE_TABLE}
+                    SET hit_count = hit_count + 1, last_accessed_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+                    WHERE file_hash = ? AND extractor = ? AND extractor_version = ?
+                """, (file_hash, extractor, version))
+                conn.commit()
+
+            self.stats['hits'] += 1
+            return text, json.loads(row[2]) if row[2] else {}
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            logger.warning(f"Extraction cache lookup failed: {e}")
+            return None
+
+    def put(self, file_hash: str, extractor: str, version: str,
+            text: str, metadata: Optional[Dict[str, Any]] = None):
+        """Store an extraction result and evict old entries if over budget"""
+        if not file_hash or not text:
+            return
+
+        blob = self._compress(text)
+        if len(blob) > self.max_bytes:
+            return
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30) as conn:
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO {CACHE_TABLE}
+                    (file_hash, extractor, extractor_version, codec, text_blob,
+                     metadata_json, raw_size, compressed_size, last_accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+                """, (file_hash, extractor, version, self.codec, blob,
+                      json.dumps(metadata or {}, default=str),
+                      len(text.encode('utf-8')), len(blob)))
+                self.stats['stores'] += 1
+                self._evict(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache store failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least-recently-used entries until under 90% of max_bytes"""
+        total = conn.execute(
+            f"SELECT COALESCE(SUM(compressed_size), 0) FROM {CACHE_TABLE}"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * 0.9)
+        rows = conn.execute(f"""
+            SELECT rowid, compressed_size FROM {CACHE_TABLE}
+            ORDER BY last_accessed_at ASC, rowid ASC
+        """).fetchall()
+
+        to_delete = []
+        for rowid, size in rows:
+            if total <= target:
+                break
+            to_delete.append((rowid,))
+            total -= size
+
+        conn.executemany(f"DELETE FROM {CACHE_TABLE} WHERE rowid = ?", to_delete)
+        self.stats['evictions'] += len(to_delete)
+        logger.info(f"Extraction cache evicted {len(to_delete)} entries")
+
+    def get_or_extract(self, file_hash: str, extractor: str, version: str,
+                       extract_fn: Callable[[], Tuple[str, Dict[str, Any]]]
+                       ) -> Tuple[str, Dict[str, Any], bool]:
+        """Return cached extraction or run extract_fn and cache its result.
+
+        Returns:
+            Tuple of (text, metadata, cache_hit)
+        """
+        cached = self.get(file_hash, extractor, version)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        text, metadata = extract_fn()
+        if isinstance(text, str) and text.strip():
+            self.put(file_hash, extractor, version, text, metadata)
+        return text, metadata, False
+
+    def invalidate(self, file_hash: str) -> int:
+        """Remove all cached extractions of a file"""
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            cursor = conn.execute(f"DELETE FROM {CACHE_TABLE} WHERE file_hash = ?", (file_hash,))
+            conn.commit()
+            return cursor.rowcount
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Entry count, stored sizes and hit counters"""
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            entries, raw, compressed, hits = conn.execute(f"""
+                SELECT COUNT(*), COALESCE(SUM(raw_size), 0),
+                       COALESCE(SUM(compressed_size), 0), COALESCE(SUM(hit_count), 0)
+                FROM {CACHE_TABLE}
+            """).fetchone()
+        return {
+            'entries': entries,
+            'raw_mb': raw / (1024 * 1024),
+            'stored_mb': compressed / (1024 * 1024),
+            'compression_ratio': (raw / compressed) if compressed else 0,
+            'total_hits': hits,
+            'max_mb': self.max_bytes / (1024 * 1024),
+            'codec': self.codec,
+            **self.stats
+        }
+
+
+_caches: Dict[str, ExtractionCache] = {}
+
+
+def get_extraction_cache(db_path: Optional[str] = None) -> ExtractionCache:
+    """Get the shared cache instance for a database"""
+    if db_path is None:
+        import database
+        db_path = database.DATABASE_FILE
+    if db_path not in _caches:
+        _caches[db_path] = ExtractionCache(db_path)
+    return _caches[db_path]
@@ -5,6 +5,7 @@ Handles text extraction, chunking, embeddings, and vector storage
 """
 
 import os
+import sys
 import json
 import sqlite3
 import asyncio
@@ -18,52 +19,44 @@ from io import BytesIO
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Text extraction libraries
-try:
-    import PyPDF2
-    HAS_PDF = True
-except ImportError:
+# Heavy extraction backends are only checked for here and imported on first
+# use through the backend registry, keeping this module cheap to import
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.backend_registry import backends, get_document_converter, get_easyocr_reader
+
+HAS_PDF = backends.is_available('pypdf2')
+if not HAS_PDF:
     logger.warning("PyPDF2 not installed. PDF extraction will be limited.")
-    HAS_PDF = False
 
-try:
-    from docx import Document
-    HAS_DOCX = True
-except ImportError:
+HAS_DOCX = backends.is_available('docx')
+if not HAS_DOCX:
     logger.warning("python-docx not installed. DOCX extraction will be limited.")
-    HAS_DOCX = False
 
-try:
-    from PIL import Image
-    import pytesseract
-    HAS_OCR = True
-except ImportError:
+HAS_TESSERACT = backends.is_available('tesseract')
+HAS_EASYOCR = backends.is_available('easyocr')
+HAS_OCR = HAS_TESSERACT or HAS_EASYOCR
+if not HAS_OCR:
     logger.warning("PIL/pytesseract not installed. OCR will not be available.")
-    HAS_OCR = False
 
-# Try importing Docling for enhanced extraction
-try:
-    from docling.document_converter import DocumentConverter
-    from docling.datamodel.base_models import ConversionStatus
-    HAS_DOCLING = True
+HAS_DOCLING = backends.is_available('docling')
+if HAS_DOCLING:
     logger.info("Docling available for enhanced document extraction")
-except ImportError:
+else:
     logger.warning("Docling not installed. Using basic extraction methods.")
-    HAS_DOCLING = False
 
-# Try importing LangChain for intelligent chunking
-try:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    HAS_LANGCHAIN = True
+HAS_LANGCHAIN = backends.is_available('langchain_splitter')
+if HAS_LANGCHAIN:
     logger.info("LangChain available for intelligent text chunking")
-except ImportError:
+else:
     logger.warning("LangChain not installed. Using basic chunking methods.")
-    HAS_LANGCHAIN = False
 
 
 class TextExtractor:
     """Enhanced text extraction for various file formats with Docling support"""
     
+    # Bump when extraction output changes so cached results are not reused
+    EXTRACTOR_VERSION = '1'
+    
     def __init__(self):
         """Initialize extractor with Docling if available"""
         self.use_docling = HAS_DOCLING and os.getenv('USE_DOCLING', 'true').lower() == 'true'
@@ -71,7 +64,7 @@ class TextExtractor:
         
         if self.use_docling:
             try:
-                self.converter = DocumentConverter()
+                self.converter = get_document_converter()
                 logger.info("Docling document converter initialized for enhanced extraction")
             except Exception as e:
                 logger.warning(f"Docling initialization failed, using fallback: {e}")
@@ -87,7 +80,7 @@ class TextExtractor:
             result = self.converter.convert(file_path)
             
             # Check conversion status
-            if result.status != ConversionStatus.SUCCESS:
+            if result.status != backends.load('docling').ConversionStatus.SUCCESS:
                 logger.warning(f"Docling conversion failed with status: {result.status}")
                 return None
             
@@ -138,7 +131,7 @@ class TextExtractor:
         try:
             text_parts = []
             with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
+                pdf_reader = backends.load('pypdf2').PdfReader(file)
                 num_pages = len(pdf_reader.pages)
                 
                 for page_num in range(num_pages):
@@ -159,7 +152,7 @@ class TextExtractor:
             return "[DOCX extraction not available - install python-docx]"
         
         try:
-            doc = Document(file_path)
+            doc = backends.load('docx').Document(file_path)
             text_parts = []
             
             for paragraph in doc.paragraphs:
@@ -185,13 +178,27 @@ class TextExtractor:
             return "[OCR not available - install PIL and pytesseract]"
         
         try:
-            image = Image.open(file_path)
-            text = pytesseract.image_to_string(image)
+            if HAS_TESSERACT:
+                tesseract = backends.load('tesseract')
+                image = tesseract.Image.open(file_path)
+                text = tesseract.pytesseract.image_to_string(image)
+            else:
+                # Warm EasyOCR reader shared across documents
+                text = "\n".join(get_easyocr_reader().readtext(file_path, detail=0))
             return text.strip()
         except Exception as e:
             logger.error(f"Error extracting text from image: {e}")
             return ""
     
+    def cache_key(self) -> Tuple[str, str]:
+        """(extractor, extractor_version) identifying this extraction pipeline"""
+        from services.extraction_cache import extractor_version
+        
+        extractor = 'form_docling' if self.use_docling else 'form_basic'
+        version = extractor_version(self.EXTRACTOR_VERSION, 'docling', 'PyPDF2',
+                                    'python-docx', 'pytesseract', 'easyocr')
+        return extractor, version
+    
     def extract_text(self, file_path: str, file_type: str) -> str:
         """Main method to extract text based on file type - now with Docling priority"""
         file_type = file_type.lower()
@@ -239,7 +246,7 @@ class DocumentChunker:
             self.chunk_overlap = int(os.getenv('CHUNK_OVERLAP', '200'))
             
             # Initialize RecursiveCharacterTextSplitter
-            self.splitter = RecursiveCharacterTextSplitter(
+            self.splitter = backends.load('langchain_splitter').RecursiveCharacterTextSplitter(
                 chunk_size=self.chunk_size,
                 chunk_overlap=self.chunk_overlap,
                 length_function=len,
@@ -349,6 +356,9 @@ class FormDocumentProcessor:
         self.text_extractor = TextExtractor()
         self.document_chunker = DocumentChunker()
         
+        from services.extraction_cache import get_extraction_cache
+        self.extraction_cache = get_extraction_cache(db_path)
+        
         # Import existing AI processor components
         try:
             from ui.ai_processor import DocumentProcessor, EmbeddingGenerator, VectorStoreManager
@@ -379,11 +389,8 @@ class FormDocumentProcessor:
             # 3. Update status to processing
             self._update_status(form_doc_id, 'processing')
             
-            # 4. Extract text from document
-            text = self.text_extractor.extract_text(
-                form_doc['file_path'],
-                form_doc['file_type']
-            )
+            # 4. Extract text from document (cached by file hash)
+            text = self._extract_text_cached(form_doc)
             
             if not text or len(text.strip()) < 100:
                 self._update_status(form_doc_id, 'skipped')
@@ -433,6 +440,21 @@ class FormDocumentProcessor:
             self._update_status(form_doc_id, 'failed', str(e))
             return False, str(e)
     
+    def _extract_text_cached(self, form_doc: Dict) -> str:
+        """Extract text, reusing a cached extraction of the same file content"""
+        extractor, version = self.text_extractor.cache_key()
+        
+        def extract():
+            text = self.text_extractor.extract_text(form_doc['file_path'], form_doc['file_type'])
+            return text, {'file_type': form_doc['file_type'], 'text_length': len(text or '')}
+        
+        text, _, cache_hit = self.extraction_cache.get_or_extract(
+            form_doc.get('file_hash'), extractor, version, extract
+        )
+        if cache_hit:
+            logger.info(f"Extraction cache hit for form document {form_doc.get('id')}")
+        return text
+    
     def _should_process_file(self, form_doc: Dict) -> bool:
         """Check if file type should be processed"""
         processable_types = ['.pdf', '.doc', '.docx', '.txt', '.md']
@@ -721,140 +743,46 @@ class FormDocumentProcessor:
 
 
 class ProcessingQueue:
-    """Async queue for document processing with retry logic"""
+    """Durable processing queue backed by form_document_processing_queue.
+
+    Entries are picked up by the worker service
+    (python -m services.document_processing_worker); this class only
+    enqueues and, for scripts and tests, can drain the queue in-process.
+    """
     
     def __init__(self, db_path: str = 'mainDB.db'):
+        from services.document_processing_worker import DocumentJobQueue
+        
         self.db_path = db_path
-        self.processor = FormDocumentProcessor(db_path)
         self.max_retries = 3
-        self.retry_delays = [5, 15, 30]  # seconds
+        self.job_queue = DocumentJobQueue(db_path, max_retries=self.max_retries)
     
     async def add_to_queue(self, form_doc_id: int, priority: int = 5):
         """Add document to processing queue"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR IGNORE INTO form_document_processing_queue
-                (form_document_id, priority, status, retry_count, max_retries)
-                VALUES (?, ?, 'pending', 0, ?)
-            """, (form_doc_id, priority, self.max_retries))
-            conn.commit()
-        
-        # Trigger async processing
-        asyncio.create_task(self._process_with_retry(form_doc_id))
+        return self.enqueue(form_doc_id, priority)
     
-    async def _process_with_retry(self, form_doc_id: int):
-        """Process document with retry logic"""
-        for attempt in range(self.max_retries):
-            try:
-                # Update queue status
-                self._update_queue_status(form_doc_id, 'processing', attempt)
-                
-                # Process document
-                success, message = self.processor.process_form_document(form_doc_id)
-                
-                if success:
-                    self._mark_complete(form_doc_id, message)
-                    return
-                else:
-                    # If not the last attempt, retry
-                    if attempt < self.max_retries - 1:
-                        await asyncio.sleep(self.retry_delays[attempt])
-                        continue
-                    else:
-                        self._mark_failed(form_doc_id, message)
-                        
-            except Exception as e:
-                logger.error(f"Processing error for document {form_doc_id}: {e}")
-                
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delays[attempt])
-                else:
-                    self._mark_failed(form_doc_id, str(e))
+    def enqueue(self, form_doc_id: int, priority: int = 5) -> int:
+        """Persist a processing job; returns the queue entry ID"""
+        job_id = self.job_queue.enqueue(form_doc_id, priority)
+        logger.info(f"Document {form_doc_id} queued for processing (job {job_id})")
+        return job_id
     
-    def _update_queue_status(self, form_doc_id: int, status: str, retry_count: int):
-        """Update queue entry status"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE form_document_processing_queue
-                SET status = ?, 
-                    retry_count = ?,
-                    started_at = CASE WHEN started_at IS NULL THEN CURRENT_TIMESTAMP ELSE started_at END
-                WHERE form_document_id = ?
-            """, (status, retry_count, form_doc_id))
-            conn.commit()
-    
-    def _mark_complete(self, form_doc_id: int, message: str):
-        """Mark queue entry as complete"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE form_document_processing_queue
-                SET status = 'completed',
-                    completed_at = CURRENT_TIMESTAMP,
-                    error_message = ?
-                WHERE form_document_id = ?
-            """, (message, form_doc_id))
-            conn.commit()
+    async def process_pending_queue(self, num_workers: int = 1) -> Dict[str, int]:
+        """Process all runnable items in queue with bounded concurrency"""
+        from services.document_processing_worker import run_pending_jobs
         
-        logger.info(f"Document {form_doc_id} processing completed: {message}")
-    
-    def _mark_failed(self, form_doc_id: int, error: str):
-        """Mark queue entry as failed"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE form_document_processing_queue
-                SET status = 'failed',
-                    completed_at = CURRENT_TIMESTAMP,
-                    error_message = ?
-                WHERE form_document_id = ?
-            """, (error, form_doc_id))
-            conn.commit()
-        
-        logger.error(f"Document {form_doc_id} processing failed: {error}")
-    
-    async def process_pending_queue(self):
-        """Process all pending items in queue"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT form_document_id 
-                FROM form_document_processing_queue
-                WHERE status = 'pending'
-                ORDER BY priority DESC, created_at ASC
-            """)
-            
-            pending = cursor.fetchall()
-        
-        # Process all pending documents
-        tasks = []
-        for (form_doc_id,) in pending:
-            tasks.append(self._process_with_retry(form_doc_id))
-        
-        if tasks:
-            await asyncio.gather(*tasks)
-            logger.info(f"Processed {len(tasks)} pending documents")
+        stats = await asyncio.to_thread(run_pending_jobs, self.db_path, num_workers=num_workers)
+        logger.info(f"Processed pending documents: {stats}")
+        return stats
 
 
 # Helper function for integration
-def trigger_document_processing(form_doc_id: int):
-    """Synchronous wrapper to trigger document processing"""
+def trigger_document_processing(form_doc_id: int, priority: int = 5):
+    """Queue a document for the processing worker service"""
     try:
-        # Create event loop if not exists
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        # Create queue and add document
         queue = ProcessingQueue()
-        loop.create_task(queue.add_to_queue(form_doc_id))
-        
-        logger.info(f"Document {form_doc_id} added to processing queue")
+        queue.enqueue(form_doc_id, priority)
         return True
     except Exception as e:
         logger.error(f"Failed to trigger processing for document {form_doc_id}: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,307 @@
+"""
+Hybrid Retrieval
+Lexical (SQLite FTS5 / BM25) search over ai_document_chunks, fused with the
+dense Qdrant results by reciprocal rank fusion.
+
+Dense vectors match paraphrases well but exact identifiers poorly: "75. člen",
+CPV "45233140-2" or "ZJN-3" embed close to any other article, code or act.
+The chunk text already lives in ai_document_chunks, so an external-content
+FTS5 table over it (kept in sync by triggers, built on first use) gives BM25
+ranking at no extra storage cost.
+
+hybrid_search() runs the lexical query first. When the query contains an
+identifier (a term with a digit) and the best lexical hit contains every
+identifier plus at least AI_LEXICAL_FAST_PATH_COVERAGE (default 0.5) of the
+query's terms, it answers from BM25 alone and never requests an embedding.
+Otherwise it embeds the query, runs the vector search and fuses both ranked
+lists: score(chunk) = sum over lists of 1 / (AI_RRF_K + rank), reported
+scaled to 0..1. Retrievals are counted in ai_retrieval_total{mode}.
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import logging
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Add parent directory to path for local imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CHUNKS_TABLE = 'ai_document_chunks'
+FTS_TABLE = 'ai_document_chunks_fts'
+
+# Slovenian function words that carry no retrieval signal
+STOPWORDS = frozenset("""
+    a ali ampak bi bil bila bilo biti bo bodo da do je ker kaj kako kakšen kakšna kateri katera
+    katere katero ki kje kdaj ko kot med mora morajo na nad naj ne ni o ob od pa po pod pri
+    s se so sta ter tudi v vse z za že
+""".split())
+
+_TERM = re.compile(r'\w+(?:[-/.]\w+)*')
+_WORD = re.compile(r'\w+')
+
+
+def fold(text: str) -> str:
+    """Lowercase without diacritics (č -> c), as the FTS5 tokenizer indexes it"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+@dataclass
+class QueryTerm:
+    """One search term: an identifier phrase (has digits) or a word matched by prefix"""
+    words: List[str]
+    identifier: bool
+
+    @property
+    def prefix(self) -> str:
+        """Stem matched by prefix so inflected forms match (člen -> členom, pogodba -> pogodbe)"""
+        word = self.words[0]
+        return word[:-2] if len(word) >= 6 else word
+
+    @property
+    def phrase(self) -> bool:
+        return self.identifier or len(self.words) > 1
+
+    def fts(self) -> str:
+        if self.phrase:
+            return '"' + ' '.join(self.words) + '"'
+        return f'"{self.prefix}" *' if len(self.words[0]) >= 4 else f'"{self.words[0]}"'
+
+    def found_in(self, tokens: Sequence[str], joined: str) -> bool:
+        if self.phrase:
+            return f" {' '.join(self.words)} " in joined
+        if len(self.words[0]) < 4:
+            return self.words[0] in tokens
+        return any(token.startswith(self.prefix) for token in tokens)
+
+
+def query_terms(query: str) -> List[QueryTerm]:
+    """Search terms of a free-text query; '75. člen ZJN-3' -> 75, clen, "zjn 3\""""
+    terms: List[QueryTerm] = []
+    seen = set()
+    for raw in _TERM.findall(query or ''):
+        words = _WORD.findall(fold(raw))
+        identifier = any(c.isdigit() for c in raw)
+        if not words or (len(words) == 1 and not identifier and
+                         (words[0] in STOPWORDS or len(words[0]) < 2)):
+            continue
+        key = ' '.join(words)
+        if key not in seen:
+            seen.add(key)
+            terms.append(QueryTerm(words, identifier))
+    return terms
+
+
+def coverage(terms: Sequence[QueryTerm], text: str) -> float:
+    """Share of query terms that occur in text"""
+    if not terms:
+        return 0.0
+    tokens = _WORD.findall(fold(text))
+    joined = f" {' '.join(tokens)} "
+    return sum(term.found_in(tokens, joined) for term in terms) / len(terms)
+
+
+@dataclass
+class RetrievedChunk:
+    """A retrieval hit shaped like a Qdrant ScoredPoint (id, score, payload)"""
+    id: Any
+    score: float
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class HybridResult:
+    hits: List[RetrievedChunk]
+    mode: str                                   # 'lexical', 'hybrid' or 'vector'
+    query_embedding: Optional[List[float]] = None
+    lexical_confidence: float = 0.0
+
+
+def chunk_key(payload: Dict[str, Any]) -> str:
+    """Identity of a chunk shared by Qdrant payloads and ai_document_chunks rows"""
+    return f"{payload.get('document_id')}:{payload.get('chunk_index')}"
+
+
+class ChunkLexicalIndex:
+    """BM25 search over ai_document_chunks through an FTS5 table"""
+
+    _ready: Dict[str, bool] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, db_path: Optional[str] = None):
+        if db_path is None:
+            import database
+            db_path = database.DATABASE_FILE
+        self.db_path = db_path
+
+    def ensure_index(self) -> bool:
+        """Create the FTS table and sync triggers once per database; False if unavailable"""
+        if self._ready.get(self.db_path):
+            return True
+        with self._lock:
+            if self._ready.get(self.db_path) is not None:
+                return self._ready[self.db_path]
+            try:
+                with sqlite3.connect(self.db_path, timeout=30) as conn:
+                    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                                        (CHUNKS_TABLE,)).fetchone():
+                        return False        # not created yet; try again next time
+                    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                                          (FTS_TABLE,)).fetchone()
+                    conn.executescript(f"""
+                        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                            chunk_text, content='{CHUNKS_TABLE}', content_rowid='id',
+                            tokenize='unicode61 remove_diacritics 2'
+                        );
+                        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {CHUNKS_TABLE} BEGIN
+                            INSERT INTO {FTS_TABLE}(rowid, chunk_text) VALUES (new.id, new.chunk_text);
+                        END;
+                        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {CHUNKS_TABLE} BEGIN
+                            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, chunk_text)
+                            VALUES ('delete', old.id, old.chunk_text);
+                        END;
+                        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF chunk_text
+                        ON {CHUNKS_TABLE} BEGIN
+                            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, chunk_text)
+                            VALUES ('delete', old.id, old.chunk_text);
+                            INSERT INTO {FTS_TABLE}(rowid, chunk_text) VALUES (new.id, new.chunk_text);
+                        END;
+                    """)
+                    if not exists:
+                        # Index the chunks stored before the table existed
+                        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+                        logger.info(f"Built lexical index over {CHUNKS_TABLE}")
+                    conn.commit()
+                self._ready[self.db_path] = True
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5
+                logger.warning(f"Lexical chunk index unavailable: {e}")
+                self._ready[self.db_path] = False
+        return self._ready[self.db_path]
+
+    def search(self, query: str, limit: int = 10,
+               document_types: Optional[Sequence[str]] = None) -> List[RetrievedChunk]:
+        """BM25-ranked chunks; score is the share of query terms each chunk contains"""
+        terms = query_terms(query)
+        if not terms or not self.ensure_index():
+            return []
+
+        sql = f"""
+            SELECT c.document_id, c.chunk_index, c.chunk_text, c.vector_id,
+                   d.filename, d.tip_dokumenta, bm25({FTS_TABLE}) AS rank
+            FROM {FTS_TABLE}
+            JOIN {CHUNKS_TABLE} c ON c.id = {FTS_TABLE}.rowid
+            LEFT JOIN ai_documents d ON d.id = c.document_id
+            WHERE {FTS_TABLE} MATCH ?
+        """
+        params: List[Any] = [' OR '.join(term.fts() for term in terms)]
+        if document_types:
+            sql += f" AND d.tip_dokumenta IN ({','.join('?' for _ in document_types)})"
+            params.extend(document_types)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        with metrics.time('ai_retrieval_seconds', stage='lexical'), \
+                sqlite3.connect(self.db_path, timeout=30) as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        hits = []
+        for document_id, chunk_index, text, vector_id, filename, doc_type, rank in rows:
+            payload = {'document_id': document_id, 'chunk_index': chunk_index, 'text': text,
+                       'filename': filename or '', 'tip_dokumenta': doc_type or 'unknown',
+                       'bm25': -rank}
+            hits.append(RetrievedChunk(vector_id or chunk_key(payload), coverage(terms, text), payload))
+        return hits
+
+
+def lexical_confidence(query: str, hits: Sequence[RetrievedChunk]) -> float:
+    """Coverage of the best lexical hit, or 0 unless the query names an identifier it contains"""
+    terms = query_terms(query)
+    identifiers = [term for term in terms if term.identifier]
+    if not hits or not identifiers:
+        return 0.0
+    top = hits[0].payload.get('text', '')
+    if coverage(identifiers, top) < 1.0:
+        return 0.0
+    return coverage(terms, top)
+
+
+def reciprocal_rank_fusion(ranked_lists: Sequence[Sequence[RetrievedChunk]],
+                           k: Optional[int] = None) -> List[RetrievedChunk]:
+    """Fuse ranked lists by sum of 1/(k + rank); scores are scaled so 1.0 means first everywhere"""
+    k = k if k is not None else int(os.getenv('AI_RRF_K', '60'))
+    fused: Dict[str, RetrievedChunk] = {}
+    totals: Dict[str, float] = {}
+    for hits in ranked_lists:
+        for rank, hit in enumerate(hits, 1):
+            key = chunk_key(hit.payload)
+            totals[key] = totals.get(key, 0.0) + 1.0 / (k + rank)
+            if key not in fused:
+                fused[key] = RetrievedChunk(hit.id, 0.0, dict(hit.payload))
+            else:
+                fused[key].payload = {**hit.payload, **fused[key].payload}
+    best = len(ranked_lists) / (k + 1)
+    for key, hit in fused.items():
+        hit.score = totals[key] / best
+    return sorted(fused.values(), key=lambda hit: hit.score, reverse=True)
+
+
+def hybrid_search(query: str, top_k: int,
+                  embed: Callable[[str], Optional[List[float]]],
+                  vector_search: Callable[[List[float], int], Sequence[Any]],
+                  document_types: Optional[Sequence[str]] = None,
+                  index: Optional[ChunkLexicalIndex] = None) -> HybridResult:
+    """Lexical fast path, or BM25 + vector results fused by RRF.
+
+    Args:
+        query: Free-text query
+        top_k: Number of hits to return
+        embed: Query embedding function (only called when the fast path does not apply)
+        vector_search: (embedding, limit) -> Qdrant hits with .id, .score and .payload
+        document_types: Optional tip_dokumenta filter applied to the lexical side
+            (apply the same filter inside vector_search)
+        index: Lexical index (defaults to the application database)
+    """
+    if os.getenv('AI_HYBRID_SEARCH', 'true').lower() == 'false':
+        embedding = embed(query)
+        hits = list(vector_search(embedding, top_k)) if embedding else []
+        metrics.inc('ai_retrieval_total', mode='vector')
+        return HybridResult(hits, 'vector', embedding)
+
+    index = index or ChunkLexicalIndex()
+    candidates = top_k * 2
+    try:
+        lexical = index.search(query, candidates, document_types)
+    except sqlite3.Error as e:
+        logger.warning(f"Lexical search failed, using vectors only: {e}")
+        lexical = []
+
+    confidence = lexical_confidence(query, lexical)
+    fast_path = os.getenv('AI_LEXICAL_FAST_PATH', 'true').lower() != 'false'
+    if fast_path and confidence >= float(os.getenv('AI_LEXICAL_FAST_PATH_COVERAGE', '0.5')):
+        metrics.inc('ai_retrieval_total', mode='lexical')
+        return HybridResult(lexical[:top_k], 'lexical', None, confidence)
+
+    embedding = embed(query)
+    dense = [RetrievedChunk(hit.id, hit.score, dict(hit.payload or {}))
+             for hit in (vector_search(embedding, candidates) if embedding else [])]
+    if not lexical:
+        metrics.inc('ai_retrieval_total', mode='vector')
+        return HybridResult(dense[:top_k], 'vector', embedding, confidence)
+    if not dense:
+        metrics.inc('ai_retrieval_total', mode='lexical')
+        return HybridResult(lexical[:top_k], 'lexical', embedding, confidence)
+
+    for hit in dense:
+        hit.payload['vector_score'] = hit.score
+    metrics.inc('ai_retrieval_total', mode='hybrid')
+    return HybridResult(reciprocal_rank_fusion([dense, lexical])[:top_k], 'hybrid', embedding, confidence)
@@ -0,0 +1,140 @@
+"""
+Streaming chat completions.
+
+ChatStream wraps `chat.completions.create(stream=True)` as a plain iterator of
+text deltas, so Streamlit pages can render answers as they arrive with
+st.write_stream() while non-streaming callers simply join the deltas.
+
+Accounting happens once the stream ends: time to first token
+(ai_ttft_seconds), total call time (ai_call_seconds) and prompt/completion
+tokens (ai_tokens_total, from the API's usage chunk or counted locally with
+services.context_packer.count_tokens when the server does not send one). Done callbacks
+(e.g. writing the query log) run at the same point with the full text.
+
+Each stream holds one of its model's concurrency slots (utils.single_flight)
+from the request until the last delta.
+"""
+
+import time
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils.metrics import metrics
+from utils.single_flight import model_limits
+from services.context_packer import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def completion_params(model: str, max_tokens: Optional[int] = None,
+                      temperature: Optional[float] = None) -> Dict[str, Any]:
+    """Sampling parameters for a model; o1 models accept neither"""
+    if model.startswith('o1'):
+        return {}
+    params = {}
+    if max_tokens is not None:
+        params['max_tokens'] = max_tokens
+    if temperature is not None:
+        params['temperature'] = temperature
+    return params
+
+
+class ChatStream:
+    """Iterator of text deltas from one streamed chat completion"""
+
+    def __init__(self, client, call: str, model: str, messages: List[Dict[str, str]],
+                 error_prefix: Optional[str] = None, **params):
+        self.client = client
+        self.call = call
+        self.model = model
+        self.messages = messages
+        self.params = params
+        self.error_prefix = error_prefix
+        self.ttft: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.usage: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.completed = False
+        self._parts: List[str] = []
+        self._consumed = False
+        self._callbacks: List[Callable[['ChatStream'], None]] = []
+
+    @classmethod
+    def from_text(cls, text: str) -> 'ChatStream':
+        """A finished stream holding a fixed message (not configured, nothing found, ...)"""
+        stream = cls(None, call='static', model='', messages=[])
+        stream._parts = [text]
+        stream._consumed = stream.completed = True
+        return stream
+
+    @property
+    def text(self) -> str:
+        return ''.join(self._parts)
+
+    def add_done_callback(self, fn: Callable[['ChatStream'], None]) -> 'ChatStream':
+        """Call fn(stream) when the stream ends (immediately if it already has)"""
+        if self._consumed:
+            fn(self)
+        else:
+            self._callbacks.append(fn)
+        return self
+
+    def __iter__(self) -> Iterator[str]:
+        if self._consumed:
+            yield from self._parts
+            return
+        self._consumed = True
+        start = time.perf_counter()
+        try:
+            with model_limits.limit(self.model):
+                response = self.client.chat.completions.create(
+                    model=self.model, messages=self.messages, stream=True,
+                    stream_options={'include_usage': True}, **self.params
+                )
+                for chunk in response:
+                    if getattr(chunk, 'usage', None):
+                        self.usage = {'prompt_tokens': chunk.usage.prompt_tokens,
+                                      'completion_tokens': chunk.usage.completion_tokens}
+                    for choice in chunk.choices or ():
+                        delta = choice.delta.content if choice.delta else None
+                        if not delta:
+                            continue
+                        if self.ttft is None:
+                            self.ttft = time.perf_counter() - start
+                        self._parts.append(delta)
+                        yield delta
+            self.completed = True
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"[AI_STREAM] {self.call} failed: {e}")
+            if self.error_prefix is None:
+                raise
+            message = f"{self.error_prefix}{e}"
+            self._parts.append(message)
+            yield message
+        finally:
+            self.duration = time.perf_counter() - start
+            self._finish()
+
+    def _finish(self):
+        labels = {'call': self.call, 'model': self.model}
+        if self.ttft is not None:
+            metrics.observe('ai_ttft_seconds', self.ttft, **labels)
+        metrics.observe('ai_call_seconds', self.duration, **labels)
+        if not self.usage:
+            self.usage = {'prompt_tokens': sum(count_tokens(m.get('content') or '') for m in self.messages),
+                          'completion_tokens': count_tokens(self.text), 'estimated': True}
+        metrics.inc('ai_tokens_total', self.usage['prompt_tokens'], kind='prompt', **labels)
+        metrics.inc('ai_tokens_total', self.usage['completion_tokens'], kind='completion', **labels)
+        for fn in self._callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                logger.error(f"[AI_STREAM] done callback failed: {e}")
+        self._callbacks = []
+
+
+def stream_chat(client, call: str, model: str, messages: List[Dict[str, str]],
+                error_prefix: Optional[str] = None, **params) -> ChatStream:
+    """Start a streamed completion; nothing is sent until the stream is iterated"""
+    return ChatStream(client, call, model, messages, error_prefix=error_prefix, **params)
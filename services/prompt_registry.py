@@ -0,0 +1,170 @@
+"""
+System Prompt Registry
+Process-wide, in-memory view of the ai_system_prompts table.
+
+Every AI call used to read its system prompt from SQLite. The registry loads
+the table once and serves lookups by prompt_key and by (form_section,
+field_name) from memory, shared by all Streamlit sessions of the process.
+
+save() and delete() write through and invalidate the registry, so the next
+lookup reloads. Edits made by another process (or directly in the database
+manager) bump the version column or change the row count; the registry
+compares that stamp at most every PROMPT_REGISTRY_RECHECK_SECONDS (default
+60) with a single aggregate query.
+
+Each active prompt carries a version tag ("<prompt_key>@v<version>") that
+response caches use in their keys, so editing a prompt never serves answers
+generated with the old text.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add parent directory to path for local imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_TABLE = 'ai_system_prompts'
+
+
+def version_tag(prompt: Dict[str, Any]) -> str:
+    """Version tag of a stored prompt; bumped on every save"""
+    return f"{prompt['prompt_key']}@v{prompt['version']}"
+
+
+class PromptRegistry:
+    """Cached, versioned view of the stored system prompts"""
+
+    def __init__(self, db_path: Optional[str] = None, recheck_seconds: Optional[float] = None):
+        if db_path is None:
+            import database
+            db_path = database.DATABASE_FILE
+        self.db_path = db_path
+        self.recheck_seconds = recheck_seconds if recheck_seconds is not None else \
+            float(os.getenv('PROMPT_REGISTRY_RECHECK_SECONDS', '60'))
+        self._prompts: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self._active: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._stale = True
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read_stamp(self, conn: sqlite3.Connection) -> Tuple[int, int]:
+        count, versions = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(version), 0) FROM {PROMPTS_TABLE}"
+        ).fetchone()
+        return count, versions
+
+    def _load(self):
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = [dict(row) for row in conn.execute(
+                f"SELECT * FROM {PROMPTS_TABLE} ORDER BY form_section, field_name"
+            ).fetchall()]
+            stamp = self._read_stamp(conn)
+
+        active: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for row in rows:
+            slot = (row['form_section'], row['field_name'])
+            if row['is_active'] and (slot not in active or row['version'] > active[slot]['version']):
+                active[slot] = row
+
+        self._prompts = rows
+        self._by_key = {row['prompt_key']: row for row in rows}
+        self._active = active
+        self._stamp = stamp
+        self._stale = False
+        self._checked_at = time.monotonic()
+        metrics.inc('ai_prompt_registry_loads_total')
+        logger.debug(f"Prompt registry loaded {len(rows)} prompts")
+
+    def _ensure_current(self):
+        with self._lock:
+            if self._stale:
+                self._load()
+            elif time.monotonic() - self._checked_at >= self.recheck_seconds:
+                with sqlite3.connect(self.db_path, timeout=30) as conn:
+                    stamp = self._read_stamp(conn)
+                self._checked_at = time.monotonic()
+                if stamp != self._stamp:
+                    self._load()
+
+    def invalidate(self):
+        """Drop the loaded prompts; the next lookup reloads them"""
+        with self._lock:
+            self._stale = True
+
+    def get(self, prompt_key: str) -> Optional[Dict[str, Any]]:
+        """Stored prompt by key (active or not)"""
+        self._ensure_current()
+        prompt = self._by_key.get(prompt_key)
+        return dict(prompt) if prompt else None
+
+    def active(self, form_section: str, field_name: str) -> Optional[Dict[str, Any]]:
+        """Highest-version active prompt for a form field"""
+        self._ensure_current()
+        prompt = self._active.get((form_section, field_name))
+        return dict(prompt) if prompt else None
+
+    def all(self) -> List[Dict[str, Any]]:
+        """All stored prompts ordered by form section and field"""
+        self._ensure_current()
+        return [dict(prompt) for prompt in self._prompts]
+
+    def save(self, prompt_key: str, form_section: str, field_name: str,
+             prompt_text: str, description: str, is_active: bool) -> Dict[str, Any]:
+        """Insert a prompt, or update it and bump its version; returns the stored row"""
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            conn.execute(f"""
+                INSERT INTO {PROMPTS_TABLE}
+                (prompt_key, form_section, field_name, prompt_text, description, is_active)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(prompt_key) DO UPDATE SET
+                    prompt_text = excluded.prompt_text,
+                    description = excluded.description,
+                    is_active = excluded.is_active,
+                    version = version + 1,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (prompt_key, form_section, field_name, prompt_text, description, is_active))
+            conn.commit()
+        self.invalidate()
+        return self.get(prompt_key)
+
+    def delete(self, prompt_id: int) -> bool:
+        """Delete a prompt by id; False when it did not exist"""
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            deleted = conn.execute(f"DELETE FROM {PROMPTS_TABLE} WHERE id = ?", (prompt_id,)).rowcount
+            conn.commit()
+        self.invalidate()
+        return deleted > 0
+
+    def note_usage(self, prompt_id: int):
+        """Reflect a usage_count increment written elsewhere without reloading"""
+        with self._lock:
+            for prompt in self._prompts:
+                if prompt['id'] == prompt_id:
+                    prompt['usage_count'] = (prompt.get('usage_count') or 0) + 1
+
+
+_registries: Dict[str, PromptRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_prompt_registry(db_path: Optional[str] = None) -> PromptRegistry:
+    """Get the shared registry for a database"""
+    if db_path is None:
+        import database
+        db_path = database.DATABASE_FILE
+    with _registries_lock:
+        if db_path not in _registries:
+            _registries[db_path] = PromptRegistry(db_path)
+        return _registries[db_path]
@@ -30,8 +30,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:
     from qdrant_client import QdrantClient
     from qdrant_client.models import (
-        Filter, FieldCondition, MatchValue, 
-        PointIdsList, PointStruct
+        Filter, FieldCondition, MatchValue, MatchAny,
+        FilterSelector, PointIdsList, PointStruct
     )
     # Try to import index params - these may not exist in all versions
     try:
@@ -56,9 +56,32 @@ except ImportError:
     HAS_OPENAI = False
 
 # Local imports
-from utils.qdrant_init import get_qdrant_client, COLLECTION_NAME
+from utils.qdrant_init import (
+    get_qdrant_client, COLLECTION_NAME, VECTOR_SIZE, get_vector_storage_config,
+    build_search_params, embedding_request_kwargs, fit_embedding
+)
+from utils.metrics import metrics
+from utils.single_flight import ai_calls, fingerprint, model_limits
 import database
 
+# Payload fields used in filters (search_documents, AISuggestionService._search_knowledge_base,
+# deletes). Every one of them needs a payload index, otherwise Qdrant scans all payloads.
+INDEXED_PAYLOAD_FIELDS = {
+    "document_id": "keyword",
+    "document_type": "keyword",
+    "organization": "keyword",
+    "file_format": "keyword",
+    "created_at": "keyword",
+    "procurement_type": "keyword",
+    "has_cofinancing": "bool"
+}
+
+# Bytes per vector dimension by Qdrant storage datatype
+DATATYPE_BYTES = {"float32": 4, "float16": 2, "uint8": 1}
+
+# SQLite's default limit on bound parameters is 999
+SQLITE_IN_BATCH = 500
+
 
 class QdrantCRUDService:
     """
@@ -77,42 +100,40 @@ class QdrantCRUDService:
                 self.openai_client = OpenAI(api_key=api_key)
         
         self.embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+        self.vector_storage = get_vector_storage_config()
         self.db_file = database.DATABASE_FILE
         
         # Ensure payload indexes exist for filtering
         self._ensure_indexes()
     
     def _ensure_indexes(self):
-        """Ensure Qdrant has necessary indexes for filtering."""
+        """Ensure Qdrant has payload indexes for every filtered field."""
         if not self.qdrant_client:
             return
         
-        # Skip index creation if params not available in this version
-        if not HAS_INDEX_PARAMS:
-            logger.info("Skipping index creation - not supported in this qdrant-client version")
-            return
-            
         try:
-            # Create indexes for common filter fields
-            index_fields = {
-                "document_id": "keyword",
-                "document_type": "keyword", 
-                "organization": "keyword",
-                "file_format": "keyword",
-                "created_at": "keyword"
-            }
+            # Skip fields that are already indexed
+            existing = {}
+            try:
+                schema = self.qdrant_client.get_collection(COLLECTION_NAME).payload_schema
+                if isinstance(schema, dict):
+                    existing = schema
+            except Exception as e:
+                logger.debug(f"Could not read payload schema: {e}")
             
-            for field, index_type in index_fields.items():
+            for field, index_type in INDEXED_PAYLOAD_FIELDS.items():
+                if field in existing:
+                    continue
                 try:
-                    if index_type == "keyword":
-                        self.qdrant_client.create_payload_index(
-                            collection_name=COLLECTION_NAME,
-                            field_name=field,
-                            field_schema=KeywordIndexParams(
-                                type="keyword",
-                                is_tenant=False
-                            )
-                        )
+                    if index_type == "keyword" and HAS_INDEX_PARAMS:
+                        field_schema = KeywordIndexParams(type="keyword", is_tenant=False)
+                    else:
+                        field_schema = index_type
+                    self.qdrant_client.create_payload_index(
+                        collection_name=COLLECTION_NAME,
+                        field_name=field,
+                        field_schema=field_schema
+                    )
                     logger.debug(f"Index created/verified for field: {field}")
                 except Exception as e:
                     # Index might already exist
@@ -121,18 +142,52 @@ class QdrantCRUDService:
         except Exception as e:
             logger.warning(f"Could not ensure indexes: {e}")
     
+    def _build_filter(self, filters: Optional[Dict[str, Any]]) -> Optional["Filter"]:
+        """
+        Build a Qdrant filter from a {field: value} mapping.
+        
+        Lists match any of their values; empty values and "All" are ignored.
+        """
+        if not filters:
+            return None
+        
+        conditions = []
+        for key, value in filters.items():
+            if value is None or value == "" or value == "All":
+                continue
+            if isinstance(value, (list, tuple, set)):
+                values = list(value)
+                if not values:
+                    continue
+                match = MatchAny(any=values) if len(values) > 1 else MatchValue(value=values[0])
+            else:
+                match = MatchValue(value=value)
+            conditions.append(FieldCondition(key=key, match=match))
+        
+        return Filter(must=conditions) if conditions else None
+    
     def _create_embedding(self, text: str) -> Optional[List[float]]:
-        """Generate embedding for text using OpenAI."""
+        """Generate embedding for text using OpenAI.
+        
+        Concurrent requests for the same text share one API call.
+        """
         if not self.openai_client:
             logger.warning("OpenAI client not available")
             return None
         
+        def create() -> List[float]:
+            with model_limits.limit(self.embedding_model), \
+                    metrics.time('ai_call_seconds', call='embedding', model=self.embedding_model):
+                response = self.openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=text,
+                    **embedding_request_kwargs(self.embedding_model, self.vector_storage)
+                )
+            return fit_embedding(response.data[0].embedding, self.vector_storage)
+        
         try:
-            response = self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=text
-            )
-            return response.data[0].embedding
+            key = fingerprint('embedding', self.embedding_model, self.vector_storage, text)
+            return ai_calls.do(key, create, call='embedding')
         except Exception as e:
             logger.error(f"Failed to create embedding: {e}")
             return None
@@ -167,20 +222,7 @@ class QdrantCRUDService:
                 return [], 0
             
             # Build filter conditions
-            qdrant_filter = None
-            if filters:
-                conditions = []
-                for key, value in filters.items():
-                    if value and value != "All":
-                        conditions.append(
-                            FieldCondition(
-                                key=key,
-                                match=MatchValue(value=value)
-                            )
-                        )
-                
-                if conditions:
-                    qdrant_filter = Filter(must=conditions)
+            qdrant_filter = self._build_filter(filters)
             
             # Search in Qdrant
             # Version 1.15.1 uses 'query_filter' parameter
@@ -196,6 +238,11 @@ class QdrantCRUDService:
             if qdrant_filter:
                 search_params["query_filter"] = qdrant_filter
             
+            # Rescore quantized candidates with the original vectors
+            quantization_params = build_search_params(self.vector_storage)
+            if quantization_params:
+                search_params["search_params"] = quantization_params
+            
             results = self.qdrant_client.search(**search_params)
             
             # Format results
@@ -207,11 +254,12 @@ class QdrantCRUDService:
                     **result.payload
                 })
             
-            # Get total count (approximate)
-            total_count = len(formatted_results)
+            # Every point matching the filter is a ranked result, so the
+            # total is a server-side count rather than a large search
+            total_count = offset + len(formatted_results)
             if len(formatted_results) == limit:
                 # There might be more results
-                total_count = self._estimate_total_results(query_vector, qdrant_filter)
+                total_count = self._count_points(qdrant_filter)
             
             return formatted_results, total_count
             
@@ -219,25 +267,59 @@ class QdrantCRUDService:
             logger.error(f"Search failed: {e}")
             return [], 0
     
-    def _estimate_total_results(
-        self, 
-        query_vector: List[float], 
-        filter_condition: Optional[Filter]
-    ) -> int:
-        """Estimate total number of search results."""
+    def _count_points(self, qdrant_filter: Optional["Filter"] = None, exact: bool = True) -> int:
+        """Count points matching a filter on the server."""
         try:
-            # Do a count-only search with high limit
-            results = self.qdrant_client.search(
+            result = self.qdrant_client.count(
                 collection_name=COLLECTION_NAME,
-                query_vector=query_vector,
-                query_filter=filter_condition,  # Use query_filter for v1.15.1
-                limit=1000,  # High limit for counting
-                with_payload=False  # Don't need payload for counting
+                count_filter=qdrant_filter,
+                exact=exact
             )
-            return len(results)
-        except:
+            return result.count
+        except Exception as e:
+            logger.warning(f"Count failed: {e}")
             return 0
     
+    def count_documents(self, filters: Optional[Dict[str, Any]] = None, exact: bool = True) -> int:
+        """
+        Count vectors matching metadata filters.
+        
+        Args:
+            filters: Optional metadata filters (same format as search_documents)
+            exact: Exact count; False lets Qdrant estimate from its indexes
+            
+        Returns:
+            Number of matching points
+        """
+        if not self.qdrant_client:
+            return 0
+        return self._count_points(self._build_filter(filters), exact=exact)
+    
+    def delete_by_filter(self, filters: Dict[str, Any]) -> int:
+        """
+        Delete all vectors matching metadata filters in a single request.
+        
+        Args:
+            filters: Metadata filters; must select at least one field
+            
+        Returns:
+            Number of points deleted
+        """
+        qdrant_filter = self._build_filter(filters)
+        if qdrant_filter is None:
+            raise ValueError("delete_by_filter requires at least one filter")
+        if not self.qdrant_client:
+            return 0
+        
+        matched = self._count_points(qdrant_filter)
+        self.qdrant_client.delete(
+            collection_name=COLLECTION_NAME,
+            points_selector=FilterSelector(filter=qdrant_filter),
+            wait=True
+        )
+        logger.info(f"Deleted {matched} vectors from Qdrant by filter")
+        return matched
+    
     def update_document_metadata(
         self, 
         document_id: str, 
@@ -278,17 +360,12 @@ class QdrantCRUDService:
             
             # Update Qdrant payloads if client available
             if self.qdrant_client:
-                # Get all points for this document
-                points = self._get_document_points(document_id)
-                
-                if points:
-                    # Update payload for each point
-                    point_ids = [p.id for p in points]
-                    self.qdrant_client.set_payload(
-                        collection_name=COLLECTION_NAME,
-                        payload=updates,
-                        points=point_ids
-                    )
+                # Select all chunks of the document by filter instead of scrolling IDs
+                self.qdrant_client.set_payload(
+                    collection_name=COLLECTION_NAME,
+                    payload=updates,
+                    points=self._build_filter({"document_id": document_id})
+                )
             
             conn.commit()
             logger.info(f"Updated metadata for document: {document_id}")
@@ -313,51 +390,7 @@ class QdrantCRUDService:
         Returns:
             True if successful
         """
-        conn = None
-        try:
-            # Delete from Qdrant first
-            if self.qdrant_client:
-                # Get all points for this document
-                points = self._get_document_points(document_id)
-                
-                if points:
-                    point_ids = [p.id for p in points]
-                    
-                    # Delete points by IDs
-                    self.qdrant_client.delete(
-                        collection_name=COLLECTION_NAME,
-                        points_selector=PointIdsList(points=point_ids)
-                    )
-                    logger.info(f"Deleted {len(point_ids)} vectors from Qdrant")
-            
-            # Delete from SQLite
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # Delete document record
-            cursor.execute("DELETE FROM ai_documents WHERE document_id = ?", (document_id,))
-            deleted_rows = cursor.rowcount
-            
-            # Delete chunk records if table exists
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='ai_document_chunks'
-            """)
-            if cursor.fetchone():
-                cursor.execute("DELETE FROM ai_document_chunks WHERE document_id = ?", (document_id,))
-            
-            conn.commit()
-            logger.info(f"Deleted document {document_id} from database")
-            return deleted_rows > 0
-            
-        except Exception as e:
-            logger.error(f"Delete failed for {document_id}: {e}")
-            if conn:
-                conn.rollback()
-            return False
-        finally:
-            if conn:
-                conn.close()
+        return self.batch_delete([document_id])[document_id]
     
     def _get_document_points(self, document_id: str) -> List:
         """Get all Qdrant points for a document."""
@@ -413,15 +446,73 @@ class QdrantCRUDService:
         """
         Delete multiple documents.
         
+        All their vectors are removed with one delete-by-filter request and the
+        SQLite rows in one transaction.
+        
         Args:
             document_ids: List of document IDs to delete
             
         Returns:
             Dictionary mapping document_id to success status
         """
-        results = {}
-        for doc_id in document_ids:
-            results[doc_id] = self.delete_document(doc_id)
+        document_ids = list(dict.fromkeys(document_ids))
+        results = {doc_id: False for doc_id in document_ids}
+        if not document_ids:
+            return results
+        
+        conn = None
+        try:
+            # Delete from Qdrant first
+            if self.qdrant_client:
+                deleted = self.delete_by_filter({"document_id": document_ids})
+                logger.info(f"Deleted {deleted} vectors for {len(document_ids)} documents")
+            
+            # Delete from SQLite
+            conn = sqlite3.connect(self.db_file)
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT name FROM sqlite_master 
+                WHERE type='table' AND name='ai_document_chunks'
+            """)
+            has_chunks_table = cursor.fetchone() is not None
+            
+            for i in range(0, len(document_ids), SQLITE_IN_BATCH):
+                batch = document_ids[i:i + SQLITE_IN_BATCH]
+                placeholders = ','.join('?' for _ in batch)
+                
+                if len(batch) == 1:
+                    # Single delete: rowcount tells whether it existed
+                    cursor.execute("DELETE FROM ai_documents WHERE document_id = ?", batch)
+                    results[batch[0]] = cursor.rowcount > 0
+                else:
+                    cursor.execute(
+                        f"SELECT document_id FROM ai_documents WHERE document_id IN ({placeholders})",
+                        batch
+                    )
+                    for (doc_id,) in cursor.fetchall():
+                        results[doc_id] = True
+                    cursor.execute(
+                        f"DELETE FROM ai_documents WHERE document_id IN ({placeholders})", batch
+                    )
+                
+                # Delete chunk records if table exists
+                if has_chunks_table:
+                    cursor.execute(
+                        f"DELETE FROM ai_document_chunks WHERE document_id IN ({placeholders})",
+                        batch
+                    )
+            
+            conn.commit()
+            
+        except Exception as e:
+            logger.error(f"Batch delete failed: {e}")
+            if conn:
+                conn.rollback()
+            return {doc_id: False for doc_id in document_ids}
+        finally:
+            if conn:
+                conn.close()
         
         successful = sum(1 for v in results.values() if v)
         logger.info(f"Batch delete: {successful}/{len(document_ids)} successful")
@@ -439,6 +530,14 @@ class QdrantCRUDService:
             "total_documents": 0,
             "total_chunks": 0,
             "total_vectors": 0,
+            "total_points": 0,
+            "indexed_vectors": 0,
+            "segments": 0,
+            "vector_size": VECTOR_SIZE,
+            "vector_datatype": "float32",
+            "on_disk": False,
+            "quantization": None,
+            "indexed_payload_fields": [],
             "storage_mb": 0,
             "organizations": [],
             "document_types": [],
@@ -450,13 +549,9 @@ class QdrantCRUDService:
         if self.qdrant_client:
             try:
                 collection_info = self.qdrant_client.get_collection(COLLECTION_NAME)
-                stats["total_vectors"] = collection_info.vectors_count or 0
+                stats.update(self._collection_storage_stats(collection_info))
                 stats["collection_exists"] = True
                 
-                # Estimate storage (rough calculation)
-                # Each vector is 1536 floats * 4 bytes = 6KB + metadata ~2KB = 8KB per vector
-                stats["storage_mb"] = (stats["total_vectors"] * 8) / 1024
-                
             except Exception as e:
                 logger.warning(f"Could not get Qdrant stats: {e}")
         
@@ -513,6 +608,57 @@ class QdrantCRUDService:
         
         return stats
     
+    @staticmethod
+    def _collection_storage_stats(collection_info) -> Dict[str, Any]:
+        """Derive counts and vector storage size from Qdrant collection info."""
+        def as_int(value, default=0):
+            return value if isinstance(value, int) else default
+        
+        points = as_int(getattr(collection_info, "points_count", None))
+        vectors = as_int(getattr(collection_info, "vectors_count", None)) or points
+        
+        vector_size = VECTOR_SIZE
+        datatype = "float32"
+        on_disk = False
+        try:
+            vector_params = collection_info.config.params.vectors
+            if isinstance(vector_params, dict):
+                # Named vectors: use the first one
+                vector_params = next(iter(vector_params.values()))
+            vector_size = as_int(getattr(vector_params, "size", None), VECTOR_SIZE)
+            raw_datatype = getattr(vector_params, "datatype", None)
+            datatype = str(getattr(raw_datatype, "value", raw_datatype or "float32"))
+            on_disk = getattr(vector_params, "on_disk", None) is True
+        except AttributeError:
+            pass
+        
+        quantization = None
+        try:
+            quantization_config = collection_info.config.quantization_config
+            if quantization_config is not None and hasattr(quantization_config, "model_dump"):
+                quantization = next(
+                    (k for k, v in quantization_config.model_dump().items() if v), None
+                )
+        except AttributeError:
+            pass
+        
+        payload_schema = getattr(collection_info, "payload_schema", None)
+        bytes_per_dim = DATATYPE_BYTES.get(datatype, 4)
+        
+        return {
+            "total_vectors": vectors,
+            "total_points": points,
+            "indexed_vectors": as_int(getattr(collection_info, "indexed_vectors_count", None)),
+            "segments": as_int(getattr(collection_info, "segments_count", None)),
+            "vector_size": vector_size,
+            "vector_datatype": datatype,
+            "on_disk": on_disk,
+            "quantization": quantization,
+            "indexed_payload_fields": sorted(payload_schema) if isinstance(payload_schema, dict) else [],
+            # Raw vector data only; HNSW links and payloads come on top
+            "storage_mb": vectors * vector_size * bytes_per_dim / (1024 * 1024)
+        }
+    
     def export_metadata(self, document_ids: Optional[List[str]] = None) -> List[Dict]:
         """
         Export document metadata for backup or analysis.
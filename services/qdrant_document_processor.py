@@ -19,13 +19,17 @@ import uuid
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Import OpenAI for embeddings
-try:
-    from openai import OpenAI
-    HAS_OPENAI = True
-except ImportError:
+# Add parent directory to path for local imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.backend_registry import (
+    backends, lazy_module_attributes, get_document_converter, get_preloaded_converter_process
+)
+
+# Heavy backends (OpenAI, Docling, LangChain, PyPDF2, python-docx) are only
+# checked for here; they are imported on first use through the backend registry.
+HAS_OPENAI = backends.is_available('openai')
+if not HAS_OPENAI:
     logger.warning("OpenAI not installed. Install with: pip install openai")
-    HAS_OPENAI = False
 
 # Import Qdrant client
 try:
@@ -36,41 +40,39 @@ except ImportError:
     logger.warning("qdrant-client not installed. Install with: pip install qdrant-client")
     HAS_QDRANT = False
 
-# Import Docling for document extraction
-try:
-    from docling.document_converter import DocumentConverter
-    from docling.datamodel.base_models import ConversionStatus
-    HAS_DOCLING = True
+HAS_DOCLING = backends.is_available('docling')
+if HAS_DOCLING:
     logger.info("Docling available for enhanced document extraction")
-except ImportError:
+else:
     logger.warning("Docling not installed. Install with: pip install docling")
-    HAS_DOCLING = False
 
-# Import LangChain for intelligent chunking
-try:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    HAS_LANGCHAIN = True
+HAS_LANGCHAIN = backends.is_available('langchain_splitter')
+if HAS_LANGCHAIN:
     logger.info("LangChain available for intelligent text chunking")
-except ImportError:
+else:
     logger.warning("LangChain not installed. Install with: pip install langchain")
-    HAS_LANGCHAIN = False
 
-# Fallback text extraction imports
-try:
-    import PyPDF2
-    HAS_PDF = True
-except ImportError:
-    HAS_PDF = False
+# Fallback text extraction
+HAS_PDF = backends.is_available('pypdf2')
+HAS_DOCX = backends.is_available('docx')
 
-try:
-    from docx import Document
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
+# Resolve OpenAI, DocumentConverter, ... lazily as module attributes
+__getattr__ = lazy_module_attributes({
+    'OpenAI': ('openai', 'OpenAI'),
+    'DocumentConverter': ('docling', 'DocumentConverter'),
+    'ConversionStatus': ('docling', 'ConversionStatus'),
+    'RecursiveCharacterTextSplitter': ('langchain_splitter', 'RecursiveCharacterTextSplitter'),
+    'PyPDF2': ('pypdf2', None),
+    'Document': ('docx', 'Document'),
+})
+_module = sys.modules[__name__]
 
-# Add parent directory to path for local imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.qdrant_init import get_qdrant_client, COLLECTION_NAME
+from utils.qdrant_init import (
+    get_qdrant_client, COLLECTION_NAME, get_vector_storage_config,
+    build_search_params, embedding_request_kwargs, fit_embedding
+)
+from utils.metrics import metrics
+from utils.single_flight import model_limits
 
 
 class QdrantDocumentProcessor:
@@ -79,13 +81,17 @@ class QdrantDocumentProcessor:
     Follows Story 27.2 requirements with Docling, LangChain, and OpenAI.
     """
     
+    # Bump when extraction output changes so cached results are not reused
+    EXTRACTOR_VERSION = '1'
+    
     def __init__(self):
         """Initialize the document processor with required components."""
-        # Initialize document converter
+        # Docling converter is shared process-wide, so only the first
+        # processor pays the model loading cost
         self.doc_converter = None
         if HAS_DOCLING:
             try:
-                self.doc_converter = DocumentConverter()
+                self.doc_converter = get_document_converter(_module.DocumentConverter)
                 logger.info("Docling converter initialized successfully")
             except Exception as e:
                 logger.warning(f"Failed to initialize Docling: {e}")
@@ -93,7 +99,7 @@ class QdrantDocumentProcessor:
         # Initialize text splitter
         self.text_splitter = None
         if HAS_LANGCHAIN:
-            self.text_splitter = RecursiveCharacterTextSplitter(
+            self.text_splitter = _module.RecursiveCharacterTextSplitter(
                 chunk_size=int(os.getenv("CHUNK_SIZE", "1000")),
                 chunk_overlap=int(os.getenv("CHUNK_OVERLAP", "200")),
                 separators=["\n\n", "\n", ". ", ", ", " ", ""],
@@ -106,7 +112,7 @@ class QdrantDocumentProcessor:
         if HAS_OPENAI:
             api_key = os.getenv("OPENAI_API_KEY")
             if api_key:
-                self.openai_client = OpenAI(api_key=api_key)
+                self.openai_client = _module.OpenAI(api_key=api_key)
                 logger.info("OpenAI client initialized")
             else:
                 logger.warning("OPENAI_API_KEY not found in environment")
@@ -114,10 +120,43 @@ class QdrantDocumentProcessor:
         # Initialize Qdrant client
         self.qdrant_client = get_qdrant_client() if HAS_QDRANT else None
         
-        # Embedding model configuration
+        # Embedding model and vector storage mode (dimensions, quantization)
         self.embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+        self.vector_storage = get_vector_storage_config()
     
     def extract_text(self, file_path: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Extract text from document, reusing a cached extraction of identical content.
+        
+        Args:
+            file_path: Path to the document file
+            
+        Returns:
+            Tuple of (text_content, metadata)
+        """
+        from services.extraction_cache import (
+            get_extraction_cache, compute_file_hash, extractor_version
+        )
+        
+        try:
+            file_hash = compute_file_hash(file_path)
+        except OSError as e:
+            logger.warning(f"Could not hash {file_path} for extraction cache: {e}")
+            return self._extract_text_uncached(file_path)
+        
+        extractor = 'qdrant_docling' if self.doc_converter else 'qdrant_basic'
+        version = extractor_version(self.EXTRACTOR_VERSION, 'docling', 'PyPDF2',
+                                    'python-docx', 'beautifulsoup4')
+        
+        text_content, metadata, cache_hit = get_extraction_cache().get_or_extract(
+            file_hash, extractor, version, lambda: self._extract_text_uncached(file_path)
+        )
+        metadata = {**metadata, "file_hash": file_hash, "cache_hit": cache_hit}
+        if cache_hit:
+            logger.info(f"Extraction cache hit: {file_path} ({len(text_content)} chars)")
+        return text_content, metadata
+    
+    def _extract_text_uncached(self, file_path: str) -> Tuple[str, Dict[str, Any]]:
         """
         Extract text from document using Docling or fallback methods.
         
@@ -135,13 +174,26 @@ class QdrantDocumentProcessor:
             "extraction_timestamp": datetime.now().isoformat()
         }
         
+        # Prefer the preloaded converter process when it is running
+        converter_process = get_preloaded_converter_process() if HAS_DOCLING else None
+        if converter_process is not None and converter_process.ready:
+            try:
+                logger.info(f"Extracting with preloaded Docling process: {file_path}")
+                converted = converter_process.convert_to_markdown(file_path)
+                if converted is not None:
+                    text_content, docling_metadata = converted
+                    metadata.update(docling_metadata)
+                    return text_content, metadata
+            except Exception as e:
+                logger.warning(f"Preloaded Docling process failed: {e}")
+        
         # Try Docling first for best extraction
         if self.doc_converter:
             try:
                 logger.info(f"Extracting with Docling: {file_path}")
                 result = self.doc_converter.convert(Path(file_path))
                 
-                if result.status == ConversionStatus.SUCCESS:
+                if result.status == _module.ConversionStatus.SUCCESS:
                     # Export to markdown for best text representation
                     text_content = result.document.export_to_markdown()
                     
@@ -168,7 +220,7 @@ class QdrantDocumentProcessor:
         if file_ext == '.pdf' and HAS_PDF:
             try:
                 with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
+                    pdf_reader = _module.PyPDF2.PdfReader(file)
                     metadata["page_count"] = len(pdf_reader.pages)
                     metadata["extraction_method"] = "pypdf2"
                     
@@ -182,7 +234,7 @@ class QdrantDocumentProcessor:
         
         elif file_ext in ['.docx', '.doc'] and HAS_DOCX:
             try:
-                doc = Document(file_path)
+                doc = _module.Document(file_path)
                 metadata["extraction_method"] = "python-docx"
                 metadata["page_count"] = len(doc.paragraphs) // 10  # Approximate
                 
@@ -286,12 +338,15 @@ class QdrantDocumentProcessor:
             return None
         
         try:
-            response = self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=text
-            )
+            with model_limits.limit(self.embedding_model), \
+                    metrics.time('ai_call_seconds', call='embedding', model=self.embedding_model):
+                response = self.openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=text,
+                    **embedding_request_kwargs(self.embedding_model, self.vector_storage)
+                )
             
-            embedding = response.data[0].embedding
+            embedding = fit_embedding(response.data[0].embedding, self.vector_storage)
             logger.debug(f"Created embedding with {len(embedding)} dimensions")
             return embedding
             
@@ -513,7 +568,8 @@ class QdrantDocumentProcessor:
                 collection_name=COLLECTION_NAME,
                 query_vector=query_embedding,
                 limit=limit,
-                query_filter=qdrant_filter
+                query_filter=qdrant_filter,
+                search_params=build_search_params(self.vector_storage)
             )
             
             # Format results
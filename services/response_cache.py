@@ -0,0 +1,312 @@
+"""
+AI Response Cache
+Shared cache of generated answers (form field suggestions, RAG answers) in
+front of the LLM, so an identical request from any session costs a lookup.
+
+Two tiers:
+    exact     key = hash of (org, namespace, model, system prompt version,
+              normalized user prompt, retrieved chunk IDs)
+    semantic  same org/namespace/model/prompt version and the same retrieved
+              context, and a query embedding within a cosine threshold of a
+              cached one (a rephrased question over the same documents)
+
+Entries live in SQLite next to the data, expire after a TTL and are evicted
+least-recently-used beyond max_entries. Every lookup is counted in
+ai_cache_lookups_total{namespace, result=exact|semantic|miss}.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Add parent directory to path for local imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_TABLE = 'ai_response_cache'
+DEFAULT_ORG = 'default'
+
+
+def normalize_prompt(text: str) -> str:
+    """Case- and whitespace-insensitive form of a prompt"""
+    return ' '.join((text or '').split()).casefold()
+
+
+def prompt_version(system_prompt: str) -> str:
+    """Version tag for a system prompt; editing the prompt changes every key"""
+    return hashlib.sha256((system_prompt or '').encode('utf-8')).hexdigest()[:12]
+
+
+def context_key(chunk_ids: Iterable[Any]) -> str:
+    """Order-independent digest of the retrieved chunk IDs"""
+    ids = sorted({str(chunk_id) for chunk_id in chunk_ids or ()})
+    return hashlib.sha256('\n'.join(ids).encode('utf-8')).hexdigest()
+
+
+def current_org() -> str:
+    """Organization of the logged-in Streamlit session (cache isolation boundary)"""
+    try:
+        import streamlit as st
+        return st.session_state.get('organization') or DEFAULT_ORG
+    except Exception:
+        return DEFAULT_ORG
+
+
+class ResponseCache:
+    """Exact + semantic cache of AI responses stored in SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None, similarity_threshold: Optional[float] = None):
+        if db_path is None:
+            import database
+            db_path = database.DATABASE_FILE
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else \
+            float(os.getenv('AI_CACHE_TTL_HOURS', '24')) * 3600
+        self.max_entries = max_entries if max_entries is not None else \
+            int(os.getenv('AI_CACHE_MAX_ENTRIES', '5000'))
+        self.similarity_threshold = similarity_threshold if similarity_threshold is not None else \
+            float(os.getenv('AI_CACHE_SIMILARITY', '0.95'))
+        self.enabled = os.getenv('AI_CACHE_ENABLED', 'true').lower() != 'false'
+        self.stats = {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0, 'stores': 0,
+                      'evictions': 0, 'expired': 0}
+        self._ensure_table()
+
+    def _ensure_table(self):
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {CACHE_TABLE} (
+                    cache_key TEXT PRIMARY KEY,
+                    org TEXT NOT NULL,
+                    namespace TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    context_key TEXT NOT NULL,
+                    prompt_text TEXT NOT NULL,
+                    embedding BLOB,
+                    response_json TEXT NOT NULL,
+                    tokens INTEGER DEFAULT 0,
+                    hit_count INTEGER DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_ai_response_cache_context
+                ON {CACHE_TABLE}(org, namespace, model, prompt_version, context_key)
+            """)
+            conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_ai_response_cache_lru
+                ON {CACHE_TABLE}(last_accessed_at)
+            """)
+            conn.commit()
+
+    @staticmethod
+    def make_key(org: str, namespace: str, model: str, version: str,
+                 prompt: str, chunk_ids: Iterable[Any] = ()) -> str:
+        parts = [org, namespace, model, version, normalize_prompt(prompt), context_key(chunk_ids)]
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _vector(embedding: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+        if embedding is None or len(embedding) == 0:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _count(self, namespace: str, result: str, tokens: int = 0):
+        self.stats['misses' if result == 'miss' else f'{result}_hits'] += 1
+        metrics.inc('ai_cache_lookups_total', namespace=namespace, result=result)
+        if tokens:
+            metrics.inc('ai_cache_tokens_saved_total', tokens, namespace=namespace)
+
+    def get(self, namespace: str, model: str, version: str, prompt: str,
+            chunk_ids: Iterable[Any] = (), embedding: Optional[Sequence[float]] = None,
+            org: Optional[str] = None) -> Optional[Tuple[Any, str]]:
+        """Look up a cached response.
+
+        Returns:
+            Tuple of (response, tier) where tier is 'exact' or 'semantic'; None on miss
+        """
+        if not self.enabled:
+            return None
+        org = org or current_org()
+        chunk_ids = list(chunk_ids or ())
+        key = self.make_key(org, namespace, model, version, prompt, chunk_ids)
+        now = time.time()
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30) as conn:
+                row = conn.execute(f"""
+                    SELECT cache_key, response_json, tokens FROM {CACHE_TABLE}
+                    WHERE cache_key = ? AND expires_at > ?
+                """, (key, now)).fetchone()
+                tier = 'exact'
+
+                if not row:
+                    row = self._semantic_match(conn, org, namespace, model, version,
+                                               context_key(chunk_ids), embedding, now)
+                    tier = 'semantic'
+
+                if not row:
+                    self._count(namespace, 'miss')
+                    return None
+
+                conn.execute(f"""
+                    UPDATE {CACHE_TABLE} SET hit_count = hit_count + 1, last_accessed_at = ?
+                    WHERE cache_key = ?
+                """, (now, row[0]))
+                conn.commit()
+
+            self._count(namespace, tier, row[2] or 0)
+            return json.loads(row[1]), tier
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"AI response cache lookup failed: {e}")
+            return None
+
+    def _semantic_match(self, conn: sqlite3.Connection, org: str, namespace: str, model: str,
+                        version: str, ctx_key: str, embedding: Optional[Sequence[float]],
+                        now: float) -> Optional[Tuple[str, str, int]]:
+        """Closest cached query over the same retrieved context, if similar enough"""
+        query = self._vector(embedding)
+        if query is None:
+            return None
+
+        rows = conn.execute(f"""
+            SELECT cache_key, response_json, tokens, embedding FROM {CACHE_TABLE}
+            WHERE org = ? AND namespace = ? AND model = ? AND prompt_version = ?
+              AND context_key = ? AND expires_at > ? AND embedding IS NOT NULL
+        """, (org, namespace, model, version, ctx_key, now)).fetchall()
+
+        best, best_score = None, self.similarity_threshold
+        for row in rows:
+            cached = np.frombuffer(row[3], dtype=np.float32)
+            if cached.shape != query.shape:
+                continue
+            score = float(np.dot(query, cached))
+            if score >= best_score:
+                best, best_score = row[:3], score
+
+        if best is not None:
+            logger.debug(f"AI response cache semantic hit ({best_score:.3f}) for {namespace}")
+        return best
+
+    def put(self, namespace: str, model: str, version: str, prompt: str, response: Any,
+            chunk_ids: Iterable[Any] = (), embedding: Optional[Sequence[float]] = None,
+            tokens: int = 0, org: Optional[str] = None):
+        """Store a response (any JSON-serializable value) and evict if over budget"""
+        if not self.enabled or response is None:
+            return
+        org = org or current_org()
+        chunk_ids = list(chunk_ids or ())
+        vector = self._vector(embedding)
+        now = time.time()
+
+        try:
+            with sqlite3.connect(self.db_path, timeout=30) as conn:
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO {CACHE_TABLE}
+                    (cache_key, org, namespace, model, prompt_version, context_key, prompt_text,
+                     embedding, response_json, tokens, created_at, expires_at, last_accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (self.make_key(org, namespace, model, version, prompt, chunk_ids),
+                      org, namespace, model, version, context_key(chunk_ids), normalize_prompt(prompt),
+                      vector.tobytes() if vector is not None else None,
+                      json.dumps(response, ensure_ascii=False, default=str),
+                      int(tokens or 0), now, now + self.ttl_seconds, now))
+                self.stats['stores'] += 1
+                self._evict(conn, now)
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"AI response cache store failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then least-recently-used ones beyond max_entries"""
+        expired = conn.execute(f"DELETE FROM {CACHE_TABLE} WHERE expires_at <= ?", (now,)).rowcount
+        self.stats['expired'] += expired
+
+        total = conn.execute(f"SELECT COUNT(*) FROM {CACHE_TABLE}").fetchone()[0]
+        if total <= self.max_entries:
+            return
+        evicted = conn.execute(f"""
+            DELETE FROM {CACHE_TABLE} WHERE cache_key IN (
+                SELECT cache_key FROM {CACHE_TABLE}
+                ORDER BY last_accessed_at ASC LIMIT ?
+            )
+        """, (total - self.max_entries,)).rowcount
+        self.stats['evictions'] += evicted
+        logger.info(f"AI response cache evicted {evicted} entries")
+
+    def invalidate(self, org: Optional[str] = None, namespace: Optional[str] = None) -> int:
+        """Remove cached responses, optionally only for one org and/or namespace"""
+        clauses, params = [], []
+        if org:
+            clauses.append("org = ?")
+            params.append(org)
+        if namespace:
+            clauses.append("namespace = ?")
+            params.append(namespace)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            cursor = conn.execute(f"DELETE FROM {CACHE_TABLE} {where}", params)
+            conn.commit()
+            return cursor.rowcount
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Entries and lifetime hits per namespace, plus this process's counters"""
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            rows = conn.execute(f"""
+                SELECT namespace, COUNT(*), COALESCE(SUM(hit_count), 0),
+                       COALESCE(SUM(hit_count * tokens), 0)
+                FROM {CACHE_TABLE} WHERE expires_at > ? GROUP BY namespace
+            """, (time.time(),)).fetchall()
+        return {
+            'namespaces': {ns: {'entries': entries, 'total_hits': hits, 'tokens_saved': saved}
+                           for ns, entries, hits, saved in rows},
+            'entries': sum(r[1] for r in rows),
+            'max_entries': self.max_entries,
+            'ttl_hours': self.ttl_seconds / 3600,
+            'similarity_threshold': self.similarity_threshold,
+            **self.stats
+        }
+
+
+def hit_rates() -> Dict[str, Dict[str, float]]:
+    """Per-namespace lookup counts and hit rates since process start"""
+    rates: Dict[str, Dict[str, float]] = {}
+    for series in metrics.snapshot('ai_cache_lookups_total'):
+        labels = series['labels']
+        entry = rates.setdefault(labels.get('namespace', ''),
+                                 {'exact': 0, 'semantic': 0, 'miss': 0})
+        entry[labels.get('result', 'miss')] = entry.get(labels.get('result', 'miss'), 0) + series['value']
+    for entry in rates.values():
+        lookups = entry['exact'] + entry['semantic'] + entry['miss']
+        entry['lookups'] = lookups
+        entry['hit_rate'] = (entry['exact'] + entry['semantic']) / lookups if lookups else 0.0
+        entry['semantic_rate'] = entry['semantic'] / lookups if lookups else 0.0
+    return rates
+
+
+_caches: Dict[str, ResponseCache] = {}
+
+
+def get_response_cache(db_path: Optional[str] = None) -> ResponseCache:
+    """Get the shared cache instance for a database"""
+    if db_path is None:
+        import database
+        db_path = database.DATABASE_FILE
+    if db_path not in _caches:
+        _caches[db_path] = ResponseCache(db_path)
+    return _caches[db_path]
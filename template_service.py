@@ -43,20 +43,17 @@ def clear_drafts():
         return False, f"Napaka pri brisanju osnutkov: {e}"
 
 def backup_drafts():
-    """Backs up the SQLite database file."""
+    """Backs up the SQLite database with the online backup API (safe while the app writes)."""
     import database
+    from services.backup_service import BackupManager
     if not os.path.exists(database.DATABASE_FILE):
         return False, "Ni baze podatkov za varnostno kopiranje."
     
-    backup_dir = 'backups'
-    if not os.path.exists(backup_dir):
-        os.makedirs(backup_dir)
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_file = os.path.join(backup_dir, f'drafts_backup_{timestamp}.db')
-    
     try:
-        shutil.copyfile(database.DATABASE_FILE, backup_file)
+        manager = BackupManager(database.DATABASE_FILE)
+        record = manager.full_backup()
+        manager.prune()
+        backup_file = os.path.join(manager.backup_dir, record.path)
         return True, f"Varnostna kopija uspešno ustvarjena: {backup_file}"
     except Exception as e:
         return False, f"Napaka pri ustvarjanju varnostne kopije: {e}"
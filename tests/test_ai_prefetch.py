@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for speculative background prefetch of AI field suggestions
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ui.renderers.ai_prefetch as ai_prefetch
+from services.ai_suggestion_service import AIFieldSuggestionService
+
+
+class FakeService(AIFieldSuggestionService):
+    """Suggestion service whose generation is counted and can be held back"""
+
+    def __init__(self):
+        self.qdrant_service = None
+        self.ai_response_service = None
+        self.context = {'project_title': 'Vrtec'}
+        self.generated = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def _collect_form_context(self, form_data):
+        return dict(self.context)
+
+    def _suggest(self, field_context, field_type, query, full_context, refresh=False, org=None):
+        self.started.set()
+        self.release.wait(5)
+        self.generated.append((field_context, full_context['project_title'], org))
+        return {'suggestions': [{'text': f"{field_context} za {full_context['project_title']}"}]}
+
+
+class FakeHelper:
+    def __init__(self, service):
+        self.ai_renderer = type('Renderer', (), {
+            'ai_service': service,
+            '_determine_field_type': staticmethod(lambda key, schema: schema['ai_field_type']),
+        })()
+
+    def should_use_ai_renderer(self, key, schema):
+        return schema.get('ai_enabled', False)
+
+    def get_ai_config(self, key):
+        return {'type': 'price_formation'}
+
+
+STEP = {
+    'priceInfo': {'type': 'object', 'properties': {
+        'priceFixation': {'type': 'string', 'ai_enabled': True, 'description': 'Cene'},
+        'priceClause': {'type': 'string'},
+        'hidden': {'type': 'string', 'ai_enabled': True, 'render_if': {'field': 'x'}},
+        'cofinancers': {'type': 'array', 'items': {'type': 'object'}, 'ai_enabled': True},
+    }},
+}
+
+
+def visible(schema, parent_key):
+    return 'render_if' not in schema
+
+
+def _setup(monkeypatch):
+    AIFieldSuggestionService._prefetched.clear()
+    service = FakeService()
+    session = {'ai_integration_helper': FakeHelper(service), 'organization': 'obcina'}
+    monkeypatch.setattr(ai_prefetch.st, 'session_state', session)
+    monkeypatch.setattr('services.response_cache.current_org', lambda: session['organization'])
+    monkeypatch.setattr(ai_prefetch, 'current_org', lambda: session['organization'])
+    monkeypatch.setenv('AI_PREFETCH_ENABLED', 'true')
+    return service, session
+
+
+def _wait(session):
+    for future in session[ai_prefetch.STATE_KEY]['jobs'].values():
+        future.result(5)
+
+
+def test_step_fields_follow_render_conditions():
+    helper = FakeHelper(FakeService())
+    fields = ai_prefetch.ai_fields_for_step(STEP, helper, should_render=visible)
+    assert [key for key, _ in fields] == ['priceInfo.priceFixation']
+
+
+def test_prefetched_suggestion_answers_the_click(monkeypatch):
+    service, session = _setup(monkeypatch)
+
+    assert ai_prefetch.prefetch_step_suggestions(3, STEP, visible) == 1
+    _wait(session)
+    assert service.generated == [('priceInfo.priceFixation', 'Vrtec', 'obcina')]
+
+    # Rerun with the same context queues nothing; the click is served from the prefetch
+    assert ai_prefetch.prefetch_step_suggestions(3, STEP, visible) == 0
+    result = service.get_field_suggestion('priceInfo.priceFixation', 'price_formation', 'Cene')
+    assert result['suggestions'][0]['text'] == 'priceInfo.priceFixation za Vrtec'
+    assert len(service.generated) == 1
+
+    # Another organization with the same form does not see it
+    session['organization'] = 'druga'
+    service.get_field_suggestion('priceInfo.priceFixation', 'price_formation', 'Cene')
+    assert service.generated[-1][2] == 'druga'
+
+    # refresh regenerates
+    session['organization'] = 'obcina'
+    service.get_field_suggestion('priceInfo.priceFixation', 'price_formation', 'Cene', refresh=True)
+    assert len(service.generated) == 3
+
+
+def test_context_change_discards_and_waits_to_settle(monkeypatch):
+    service, session = _setup(monkeypatch)
+    service.release.clear()
+
+    ai_prefetch.prefetch_step_suggestions(3, STEP, visible)
+    old_key = service.suggestion_key('priceInfo.priceFixation', 'price_formation', 'Cene',
+                                     service.context, 'obcina')
+    running = session[ai_prefetch.STATE_KEY]['jobs'][old_key]
+    assert service.started.wait(5)
+
+    # The title changes: the running job's result is discarded, nothing new yet
+    service.context['project_title'] = 'Šola'
+    assert ai_prefetch.prefetch_step_suggestions(3, STEP, visible) == 0
+    service.release.set()
+    running.result(5)
+    assert service._take_prefetched(old_key) is None
+
+    # Same context on the next rerun: it has settled, so the job is queued
+    assert ai_prefetch.prefetch_step_suggestions(3, STEP, visible) == 1
+    _wait(session)
+    assert service.generated[-1][1] == 'Šola'
+
+    monkeypatch.setenv('AI_PREFETCH_ENABLED', 'false')
+    assert ai_prefetch.prefetch_step_suggestions(4, STEP, visible) == 0
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the lazy backend registry and shared warm instances
+"""
+
+import os
+import sys
+import types
+from unittest.mock import Mock
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backend_registry import (
+    BackendRegistry, BackendUnavailable, backends, get_document_converter,
+    lazy_module_attributes
+)
+
+
+class TestBackendRegistry:
+    """Lazy loading, error reporting and shared instances"""
+
+    def test_availability_check_does_not_import(self):
+        registry = BackendRegistry()
+        loader = Mock(return_value='loaded')
+        registry.register('json_backend', ['json'], loader)
+
+        assert registry.is_available('json_backend') is True
+        assert loader.call_count == 0
+        assert registry.is_loaded('json_backend') is False
+
+    def test_load_runs_loader_once_and_times_it(self):
+        registry = BackendRegistry()
+        loader = Mock(return_value='loaded')
+        registry.register('json_backend', ['json'], loader)
+
+        assert registry.load('json_backend') == 'loaded'
+        assert registry.load('json_backend') == 'loaded'
+        assert loader.call_count == 1
+
+        status = {s['name']: s for s in registry.report()}['json_backend']
+        assert status['loaded'] is True
+        assert status['load_seconds'] >= 0
+
+    def test_missing_backend(self):
+        registry = BackendRegistry()
+        registry.register('missing', ['surely_not_installed_module'],
+                          lambda: __import__('surely_not_installed_module'))
+
+        assert registry.is_available('missing') is False
+        with pytest.raises(BackendUnavailable):
+            registry.load('missing')
+        assert registry.get('missing', 'fallback') == 'fallback'
+
+        status = {s['name']: s for s in registry.report()}['missing']
+        assert 'ModuleNotFoundError' in status['error']
+
+    def test_shared_instance_built_once(self):
+        registry = BackendRegistry()
+        factory = Mock(side_effect=lambda: object())
+
+        first = registry.shared_instance('reader', factory)
+        second = registry.shared_instance('reader', factory)
+
+        assert first is second
+        assert factory.call_count == 1
+
+    def test_preload_in_foreground(self):
+        registry = BackendRegistry()
+        registry.register('json_backend', ['json'], lambda: 'loaded')
+        registry.preload(['json_backend'], background=False)
+        assert registry.is_loaded('json_backend')
+
+
+def test_document_converter_is_shared_per_class():
+    class FakeConverter:
+        pass
+
+    assert get_document_converter(FakeConverter) is get_document_converter(FakeConverter)
+
+
+def test_lazy_module_attributes():
+    backends.register('test_json', ['json'], lambda: types.SimpleNamespace(dumps='dumps'))
+    backends.register('test_missing', ['surely_not_installed_module'],
+                      lambda: __import__('surely_not_installed_module'))
+    getter = lazy_module_attributes({
+        'dumps': ('test_json', 'dumps'),
+        'Missing': ('test_missing', 'Missing'),
+    })
+
+    assert getter('dumps') == 'dumps'
+    # Uninstalled backends behave like a failed module-level import
+    with pytest.raises(AttributeError):
+        getter('Missing')
+    with pytest.raises(AttributeError):
+        getter('unknown')
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for online backups, WAL archiving, retention and point-in-time restore
+"""
+
+import os
+import sys
+import time
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.backup_service import BackupManager, BackupError, RetentionPolicy
+
+
+def _open(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_autocheckpoint=0")  # keep frames in the WAL between archive runs
+    return conn
+
+
+@pytest.fixture
+def live_db(tmp_path):
+    path = str(tmp_path / 'live.db')
+    conn = _open(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE drafts (id INTEGER PRIMARY KEY, body TEXT)")
+    conn.executemany("INSERT INTO drafts (body) VALUES (?)", [(f"osnutek {i}" * 20,) for i in range(200)])
+    conn.commit()
+    yield path, conn
+    conn.close()
+
+
+def _count(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM drafts").fetchone()[0]
+
+
+def test_point_in_time_restore(live_db, tmp_path):
+    path, conn = live_db
+    manager = BackupManager(path, backup_dir=str(tmp_path / 'backups'))
+    base = manager.full_backup()
+    assert base.kind == 'full' and base.pages > 0
+
+    conn.executemany("INSERT INTO drafts (body) VALUES (?)", [('a',)] * 50)
+    conn.commit()
+    first = manager.archive_wal()
+    assert first.kind == 'wal' and first.first_frame == 1
+    assert manager.archive_wal() is None  # nothing new
+
+    time.sleep(0.01)
+    between = datetime.now()
+    time.sleep(0.01)
+    conn.execute("DELETE FROM drafts WHERE id <= 100")
+    conn.commit()
+    second = manager.archive_wal()
+    assert second.first_frame == first.last_frame + 1
+
+    latest = str(tmp_path / 'latest.db')
+    assert manager.restore(latest)['frames'] == second.last_frame
+    assert _count(latest) == 150
+
+    earlier = str(tmp_path / 'earlier.db')
+    manager.restore(earlier, until=between)
+    assert _count(earlier) == 250
+
+    with pytest.raises(BackupError):
+        manager.restore(latest)  # refuses to overwrite
+
+
+def test_wal_restart_starts_new_generation(live_db, tmp_path):
+    path, conn = live_db
+    manager = BackupManager(path, backup_dir=str(tmp_path / 'backups'))
+    manager.full_backup()
+    conn.execute("INSERT INTO drafts (body) VALUES ('x')")
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("INSERT INTO drafts (body) VALUES ('y')")
+    conn.commit()
+
+    record = manager.archive_wal()
+    assert record.kind == 'full'
+    assert len(manager.generations()) == 2
+    restored = str(tmp_path / 'restored.db')
+    manager.restore(restored)
+    assert _count(restored) == 202
+
+
+def test_rollback_mode_stepped_backup_and_prune(tmp_path):
+    path = str(tmp_path / 'plain.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE drafts (id INTEGER PRIMARY KEY, body TEXT)")
+        conn.executemany("INSERT INTO drafts (body) VALUES (?)", [('z' * 500,)] * 500)
+    steps = []
+    manager = BackupManager(path, backup_dir=str(tmp_path / 'backups'), pages_per_step=16, step_pause=0)
+    for _ in range(3):
+        manager.full_backup(progress=lambda done, total: steps.append((done, total)))
+    assert len(steps) > 3 and steps[-1][0] == steps[-1][1]
+    assert manager.archive_wal() is None  # no WAL in rollback-journal mode
+
+    removed = manager.prune(RetentionPolicy(keep_generations=1, max_age_days=None))
+    assert len(removed) == 2 and len(manager.generations()) == 1
+    restored = str(tmp_path / 'restored.db')
+    manager.restore(restored)
+    assert _count(restored) == 500
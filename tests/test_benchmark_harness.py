@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark harness (runner, skipping and baseline comparison)
+"""
+
+import os
+import sys
+
+# Add benchmarks directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from harness import Benchmark, expand_params, run_benchmark, compare, result_id
+
+
+def _result(rid, median):
+    return {'id': rid, 'status': 'ok', 'seconds': {'median': median}}
+
+
+def test_expand_params():
+    params = {'rows': [1, 10], 'lots': [1, 5]}
+    assert len(expand_params(params)) == 4
+    assert expand_params(params, quick=True) == [{'rows': 1, 'lots': 1}]
+    assert expand_params({}) == [{}]
+    assert result_id('db.get', {'rows': 10}) == 'db.get[rows=10]'
+
+
+def test_run_benchmark_times_and_cleans_up():
+    cleaned = []
+
+    def bench(ctx, n):
+        ctx.items = n
+        ctx.add_cleanup(lambda: cleaned.append(ctx.workdir))
+        return lambda: sum(range(n))
+
+    result = run_benchmark(Benchmark('sum', 'test', bench, rounds=3), {'n': 1000})
+    assert result['status'] == 'ok'
+    assert result['rounds'] == 3
+    assert result['seconds']['min'] <= result['seconds']['median'] <= result['seconds']['max']
+    assert result['items_per_second'] > 0
+    assert cleaned and not os.path.exists(cleaned[0])
+
+
+def test_missing_dependency_is_skipped_and_errors_reported():
+    def needs_missing(ctx):
+        import module_that_does_not_exist  # noqa: F401
+
+    def broken(ctx):
+        def run():
+            raise ValueError("boom")
+        return run
+
+    assert run_benchmark(Benchmark('a', 't', needs_missing), {})['status'] == 'skipped'
+    failed = run_benchmark(Benchmark('b', 't', broken), {})
+    assert failed['status'] == 'error'
+    assert 'boom' in failed['reason']
+
+
+def test_compare_flags_regressions_beyond_threshold_and_noise():
+    baseline = {'results': [_result('slow', 0.100), _result('fast', 0.100),
+                            _result('same', 0.100), _result('tiny', 0.0001)]}
+    report = {'results': [_result('slow', 0.150), _result('fast', 0.050),
+                          _result('same', 0.110), _result('tiny', 0.0002), _result('new', 1.0)]}
+
+    comparison = compare(report, baseline, threshold=0.2)
+    assert [r['id'] for r in comparison['regressions']] == ['slow']
+    assert [r['id'] for r in comparison['improvements']] == ['fast']
+    # 'tiny' doubled but is below the absolute noise floor
+    assert {r['id'] for r in comparison['unchanged']} == {'same', 'tiny'}
+    assert comparison['new'] == [{'id': 'new'}]
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for token-budgeted context packing of retrieved chunks
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.context_packer import TokenCounter, fit_lines, pack_context
+
+estimate = TokenCounter('estimate')
+
+DOCUMENT = (
+    "Naročnik bo pogodbo sklenil z izbranim ponudnikom za obdobje treh let. "
+    "Cene so fiksne prvih dvanajst mesecev, nato se valorizirajo z indeksom cen življenjskih potrebščin. "
+    "Ponudnik mora predložiti bančno garancijo za dobro izvedbo v višini deset odstotkov pogodbene vrednosti. "
+    "Rok plačila je trideset dni od prejema pravilno izstavljenega računa."
+)
+
+
+def _chunk(start, end, score, chunk_index):
+    return {'id': f'doc1:{chunk_index}', 'text': DOCUMENT[start:end], 'score': score,
+            'document_id': 'doc1', 'chunk_index': chunk_index}
+
+
+def test_overlapping_and_contained_chunks_are_not_repeated():
+    first = _chunk(0, 200, 0.91, 0)
+    second = _chunk(140, 340, 0.88, 1)        # repeats the last 60 characters of the first
+    contained = _chunk(150, 190, 0.80, 2)     # inside the first
+
+    packed = pack_context([first, second, contained], budget=1000, mmr_lambda=1.0, counter=estimate)
+
+    assert [c['id'] for c in packed.chunks] == ['doc1:0', 'doc1:1']
+    assert packed.duplicates == 1 and packed.trimmed_chars == 60
+    assert packed.text == DOCUMENT[0:200].strip() + "\n\n" + DOCUMENT[200:340].strip()
+    assert packed.tokens == estimate.count(packed.text)
+
+
+def test_budget_is_respected_and_mmr_prefers_new_information():
+    refund = {'id': 'a', 'text': "Rok plačila računa je trideset dni od prejema računa.", 'score': 0.95,
+              'document_id': 'd1'}
+    same = {'id': 'b', 'text': "Rok plačila vsakega računa je trideset dni po prejemu računa.", 'score': 0.94,
+            'document_id': 'd2'}
+    guarantee = {'id': 'c', 'text': "Garancija za dobro izvedbo znaša deset odstotkov vrednosti.", 'score': 0.90,
+                 'document_id': 'd3'}
+
+    diverse = pack_context([refund, same, guarantee], budget=40, mmr_lambda=0.5, counter=estimate)
+    assert [c['id'] for c in diverse.chunks] == ['a', 'c']
+    assert diverse.tokens <= 40 and diverse.over_budget == 1
+
+    by_score = pack_context([refund, same, guarantee], budget=40, mmr_lambda=1.0, counter=estimate)
+    assert [c['id'] for c in by_score.chunks] == ['a', 'b']
+
+    # A single chunk longer than the budget is cut to fit instead of dropped
+    header = lambda chunk, position: f"[Del {position}]"
+    tiny = pack_context([DOCUMENT], budget=20, header=header, counter=estimate)
+    assert tiny.text.startswith("[Del 1]\nNaročnik") and tiny.tokens <= 20
+
+
+def test_fit_lines_keeps_order_and_cuts_the_last_line():
+    lines = ["- Naslov projekta: Vrtec", "- Tip naročila: blago", "- Opis: " + "dolg opis " * 50]
+    kept = fit_lines(lines, 40, counter=estimate)
+    assert kept[:2] == lines[:2] and kept[2].endswith('…')
+    assert sum(estimate.count(line + "\n") for line in kept) <= 40
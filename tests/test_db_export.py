@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming database exporter (chunked reads, filters, formats)
+"""
+
+import os
+import sys
+import csv
+import io
+import json
+import sqlite3
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import db_export
+from utils.db_export import ExportSpec
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'export.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE javna_narocila (id INTEGER PRIMARY KEY, naziv TEXT, vrednost REAL, form_data_json TEXT)")
+        conn.execute("CREATE TABLE application_logs (id INTEGER PRIMARY KEY, level TEXT, message TEXT)")
+        conn.executemany("INSERT INTO javna_narocila VALUES (?, ?, ?, ?)", [
+            (i, f"Naročilo {i}", i * 1000.5, json.dumps({'projectInfo': {'projectName': f"P{i}"}}))
+            for i in range(1, 6)
+        ])
+        conn.executemany("INSERT INTO application_logs (level, message) VALUES (?, ?)", [
+            ('ERROR' if i % 10 == 0 else 'INFO', f"sporočilo {i}") for i in range(1, 1001)
+        ])
+    return path
+
+
+def test_zip_csv_chunked_with_filter_and_progress(db_path, tmp_path):
+    out = str(tmp_path / 'out.zip')
+    calls = []
+    counts = db_export.export_to_zip(
+        out,
+        [ExportSpec('javna_narocila'),
+         ExportSpec('application_logs', where='level = ?', params=('ERROR',)),
+         ExportSpec('missing_table')],
+        chunk_size=7,
+        progress=lambda name, done, total: calls.append((name, done, total)),
+        db_path=db_path,
+    )
+    assert counts == {'javna_narocila': 5, 'application_logs': 100}
+    # One callback per chunk plus the initial one, totals known up front
+    log_calls = [c for c in calls if c[0] == 'application_logs']
+    assert log_calls[0] == ('application_logs', 0, 100)
+    assert log_calls[-1] == ('application_logs', 100, 100)
+    assert len(log_calls) == 1 + 15
+
+    with zipfile.ZipFile(out) as archive:
+        assert set(archive.namelist()) == {'javna_narocila.csv', 'application_logs.csv', 'metadata.txt'}
+        rows = list(csv.reader(io.TextIOWrapper(archive.open('javna_narocila.csv'), encoding='utf-8')))
+        assert rows[0] == ['id', 'naziv', 'vrednost', 'form_data_json']
+        assert rows[1][:2] == ['1', 'Naročilo 1'] and len(rows) == 6
+        assert 'application_logs: 100 rows' in archive.read('metadata.txt').decode()
+
+
+def test_query_spec_to_csv(db_path, tmp_path):
+    out = str(tmp_path / 'logs.csv')
+    spec = ExportSpec('application_logs', query="SELECT id, message FROM application_logs WHERE id > ? ORDER BY id DESC",
+                      params=(990,))
+    assert db_export.export_to_csv(out, spec, chunk_size=3, db_path=db_path) == 10
+    with open(out, encoding='utf-8', newline='') as handle:
+        rows = list(csv.reader(handle))
+    assert rows[0] == ['id', 'message'] and rows[1] == ['1000', 'sporočilo 1000']
+
+
+def test_single_json_matches_procurement_shape(db_path, tmp_path):
+    out = str(tmp_path / 'one.json')
+    spec = ExportSpec('javna_narocila', where='id = ?', params=(3,), json_columns={'form_data_json': 'form_data'})
+    assert db_export.export_to_json(out, spec, single=True, db_path=db_path) == 1
+    with open(out, encoding='utf-8') as handle:
+        data = json.load(handle)
+    assert data['naziv'] == 'Naročilo 3'
+    assert data['form_data'] == {'projectInfo': {'projectName': 'P3'}}
+    assert isinstance(data['form_data_json'], str)
+
+    spec.params = (99,)
+    assert db_export.export_to_json(out, spec, single=True, db_path=db_path) == 0
+
+
+@pytest.mark.skipif(not db_export.PARQUET_AVAILABLE, reason="pyarrow not installed")
+def test_zip_parquet_row_groups(db_path, tmp_path):
+    import pyarrow.parquet as pq
+
+    out = str(tmp_path / 'out.zip')
+    db_export.export_to_zip(out, [ExportSpec('javna_narocila'), ExportSpec('application_logs')],
+                            fmt='parquet', chunk_size=300, db_path=db_path)
+    with zipfile.ZipFile(out) as archive:
+        logs = pq.ParquetFile(io.BytesIO(archive.read('application_logs.parquet')))
+        assert logs.metadata.num_rows == 1000 and logs.metadata.num_row_groups == 4
+        table = pq.read_table(io.BytesIO(archive.read('javna_narocila.parquet')))
+        assert str(table.schema.field('vrednost').type) == 'double'
+        assert table.column('id').to_pylist() == [1, 2, 3, 4, 5]
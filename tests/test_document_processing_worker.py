@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Tests for the durable document processing worker service
+Covers atomic claims, leases, backoff, priority ordering and shutdown
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import time
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.document_processing_worker import (
+    DocumentJobQueue, DocumentProcessingWorker, ensure_queue_schema, run_pending_jobs
+)
+
+
+def ok_handler(db_path, form_doc_id):
+    return True, f"processed {form_doc_id}"
+
+
+def failing_handler(db_path, form_doc_id):
+    return False, "extraction failed"
+
+
+def raising_handler(db_path, form_doc_id):
+    raise RuntimeError("boom")
+
+
+def slow_handler(db_path, form_doc_id):
+    time.sleep(0.3)
+    return True, "slow"
+
+
+class TestDocumentJobQueue:
+    """Queue bookkeeping against a real SQLite file"""
+
+    @pytest.fixture
+    def db_path(self):
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        # Mirror the 002 migration schema (queued_at, no started_at)
+        with sqlite3.connect(path) as conn:
+            conn.execute("""
+                CREATE TABLE form_document_processing_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    form_document_id INTEGER NOT NULL,
+                    priority INTEGER DEFAULT 5 CHECK(priority BETWEEN 1 AND 10),
+                    retry_count INTEGER DEFAULT 0,
+                    max_retries INTEGER DEFAULT 3,
+                    queued_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    processing_started_at DATETIME,
+                    completed_at DATETIME,
+                    next_retry_at DATETIME,
+                    status TEXT DEFAULT 'pending',
+                    error_message TEXT
+                )
+            """)
+        yield path
+        os.remove(path)
+
+    def _row(self, db_path, job_id):
+        with sqlite3.connect(db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            return dict(conn.execute(
+                "SELECT * FROM form_document_processing_queue WHERE id = ?", (job_id,)
+            ).fetchone())
+
+    def test_schema_adds_lease_columns(self, db_path):
+        ensure_queue_schema(db_path)
+        ensure_queue_schema(db_path)  # idempotent
+        with sqlite3.connect(db_path) as conn:
+            columns = {c[1] for c in conn.execute(
+                "PRAGMA table_info(form_document_processing_queue)")}
+        assert {'locked_by', 'lease_expires_at', 'heartbeat_at', 'started_at'} <= columns
+
+    def test_enqueue_deduplicates_open_entries(self, db_path):
+        queue = DocumentJobQueue(db_path)
+        first = queue.enqueue(1, priority=3)
+        second = queue.enqueue(1, priority=8)
+        assert first == second
+        assert self._row(db_path, first)['priority'] == 8
+
+    def test_claim_honors_priority_and_is_exclusive(self, db_path):
+        queue = DocumentJobQueue(db_path)
+        low = queue.enqueue(1, priority=2)
+        high = queue.enqueue(2, priority=9)
+        mid = queue.enqueue(3, priority=5)
+
+        jobs = queue.claim('worker-a', limit=2)
+        assert [j.id for j in jobs] == [high, mid]
+
+        other = queue.claim('worker-b', limit=5)
+        assert [j.id for j in other] == [low]
+        assert queue.claim('worker-c', limit=5) == []
+
+    def test_expired_lease_is_reclaimed(self, db_path):
+        queue = DocumentJobQueue(db_path, lease_seconds=60)
+        job_id = queue.enqueue(1)
+        queue.claim('dead-worker')
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""
+                UPDATE form_document_processing_queue
+                SET lease_expires_at = datetime('now', '-1 seconds') WHERE id = ?
+            """, (job_id,))
+
+        jobs = queue.claim('live-worker')
+        assert [j.id for j in jobs] == [job_id]
+        assert self._row(db_path, job_id)['locked_by'] == 'live-worker'
+
+    def test_heartbeat_only_renews_own_leases(self, db_path):
+        queue = DocumentJobQueue(db_path)
+        job_id = queue.enqueue(1)
+        queue.claim('worker-a')
+        assert queue.heartbeat([job_id], 'worker-b') == 0
+        assert queue.heartbeat([job_id], 'worker-a') == 1
+
+    def test_fail_applies_backoff_then_gives_up(self, db_path):
+        queue = DocumentJobQueue(db_path, backoff_base=30, max_retries=2)
+        job_id = queue.enqueue(1)
+
+        queue.claim('w')
+        assert queue.fail(job_id, 'w', 'first') is True
+        row = self._row(db_path, job_id)
+        assert row['status'] == 'pending'
+        assert row['retry_count'] == 1
+        # Backoff pushes the retry into the future, so it is not claimable yet
+        assert queue.claim('w') == []
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE form_document_processing_queue SET next_retry_at = NULL")
+        queue.claim('w')
+        assert queue.fail(job_id, 'w', 'second') is False
+        assert self._row(db_path, job_id)['status'] == 'failed'
+
+    def test_backoff_grows_exponentially(self, db_path):
+        queue = DocumentJobQueue(db_path, backoff_base=5, backoff_max=1000)
+        delays = [queue.backoff_delay(n) for n in range(4)]
+        assert delays[0] <= 6 and delays[3] >= 32
+
+    def test_release_returns_job_without_retry(self, db_path):
+        queue = DocumentJobQueue(db_path)
+        job_id = queue.enqueue(1)
+        queue.claim('w')
+        assert queue.release([job_id], 'w') == 1
+        row = self._row(db_path, job_id)
+        assert row['status'] == 'pending' and row['retry_count'] == 0
+
+
+class TestDocumentProcessingWorker:
+    """Dispatch loop with thread and process pools"""
+
+    @pytest.fixture
+    def db_path(self):
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        yield path
+        os.remove(path)
+
+    def test_run_pending_jobs_completes_all(self, db_path):
+        queue = DocumentJobQueue(db_path)
+        for doc_id in range(5):
+            queue.enqueue(doc_id)
+
+        stats = run_pending_jobs(db_path, handler=ok_handler, num_workers=2)
+        assert stats['completed'] == 5
+        assert queue.get_stats() == {'completed': 5}
+
+    def test_handler_exception_is_retried(self, db_path):
+        queue = DocumentJobQueue(db_path, max_retries=3)
+        queue.enqueue(1)
+        stats = run_pending_jobs(db_path, handler=raising_handler)
+        assert stats['retried'] == 1
+        assert queue.get_stats() == {'pending': 1}
+
+    def test_process_pool_workers(self, db_path):
+        queue = DocumentJobQueue(db_path)
+        for doc_id in range(4):
+            queue.enqueue(doc_id)
+
+        worker = DocumentProcessingWorker(db_path, num_workers=2, handler=ok_handler,
+                                          poll_interval=0.1)
+        stats = worker.run(exit_when_idle=True)
+        assert stats['completed'] == 4
+
+    def test_graceful_shutdown_drains_in_flight(self, db_path):
+        queue = DocumentJobQueue(db_path)
+        for doc_id in range(6):
+            queue.enqueue(doc_id)
+
+        worker = DocumentProcessingWorker(db_path, num_workers=2, handler=slow_handler,
+                                          use_processes=False, poll_interval=0.05)
+        threading.Timer(0.1, worker.request_stop).start()
+        stats = worker.run()
+
+        counts = queue.get_stats()
+        assert stats['completed'] == 2
+        assert counts.get('processing', 0) == 0
+        assert counts['pending'] == 4
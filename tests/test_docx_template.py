@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled DOCX template engine and batch document generation
+"""
+
+import io
+import os
+import sys
+import zipfile
+
+import pytest
+from docx import Document
+
+from services.docx_template import DocxTemplate, TemplateError, iter_zip
+from services.document_generator import DocumentGenerator
+
+# Add benchmarks directory to path (seeded procurement fixtures)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+
+def _template(*paragraphs):
+    doc = Document()
+    for text in paragraphs:
+        if isinstance(text, tuple):
+            # Split a tag over several runs, the way Word stores edited text
+            paragraph = doc.add_paragraph()
+            for part in text:
+                paragraph.add_run(part)
+        else:
+            doc.add_paragraph(text)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return DocxTemplate(buffer.getvalue())
+
+
+def _texts(content):
+    return [p.text for p in Document(io.BytesIO(content)).paragraphs]
+
+
+def test_values_loops_and_conditions():
+    template = _template(
+        ('Naziv: {{ na', 'ziv }}', ''),
+        '{% for lot in lots %}',
+        'Sklop {{ loop.index }}: {{ lot.name }} ({{ lot.value|money }} EUR)',
+        '{% endfor %}',
+        '{% if cpv %}',
+        'CPV: {{ cpv|join(" / ") }}',
+        '{% elif note %}',
+        '{{ note }}',
+        '{% else %}',
+        'Brez CPV',
+        '{% endif %}',
+    )
+    content = template.render({'naziv': 'A & <B>', 'cpv': ['1', '2'],
+                               'lots': [{'name': 'X', 'value': 1234.5}, {'name': 'Y', 'value': 10}]})
+    assert _texts(content) == ['Naziv: A & <B>', 'Sklop 1: X (1.234,50 EUR)', 'Sklop 2: Y (10,00 EUR)', 'CPV: 1 / 2']
+    assert _texts(template.render({'note': 'opomba'})) == ['Naziv: ', 'opomba']
+    assert _texts(template.render({})) == ['Naziv: ', 'Brez CPV']
+    # Rendering does not change the compiled template and is deterministic
+    assert template.render({'naziv': 'x'}) == template.render({'naziv': 'x'})
+
+
+def test_malformed_templates_are_rejected():
+    with pytest.raises(TemplateError):
+        _template('{% for x in items %}', 'text')
+    with pytest.raises(TemplateError):
+        _template('{% endif %}')
+    with pytest.raises(TemplateError):
+        _template('{{ value|nosuchfilter }}')
+
+
+def test_generator_renders_sections_and_summary():
+    data = {'id': 7, 'naziv': 'Gradnja vrtca', 'cpv_kode': ['45000000-7'], 'merila': [{'naziv': 'Cena', 'utez': 100}],
+            'sklopi': [{'naziv': 'Sklop A', 'ocenjena_vrednost': 1000}]}
+    texts = _texts(DocumentGenerator().render_docx(data, include_summary=True, summary_content="# Povzetek\n- **a** b"))
+    for expected in ('Številka: 7', 'Naziv: Gradnja vrtca', 'Povzetek', 'a b', '• 45000000-7',
+                     '1. Cena (utež: 100%)', 'Sklop 1: Sklop A', 'Ocenjena vrednost: 1000 EUR'):
+        assert expected in texts
+
+
+def test_iter_zip_streams_members():
+    chunks = list(iter_zip([('a.docx', b'one'), ('b.docx', b'two')]))
+    assert len(chunks) == 3
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+    assert archive.read('b.docx') == b'two'
+
+
+def test_batch_zip_from_database(tmp_path, monkeypatch):
+    import database
+    from fixtures import seed_procurements
+
+    path = str(tmp_path / 'batch.db')
+    monkeypatch.setattr(database, 'DATABASE_FILE', path)
+    database.init_db()
+    seed_procurements(path, 3, lots=2)
+
+    generator = DocumentGenerator()
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(generator.iter_batch_zip([1, 2, 3, 99], processes=1))))
+    assert archive.namelist() == [f'javno_narocilo_{i}.docx' for i in (1, 2, 3)]
+    assert 'Številka: 2' in _texts(archive.read('javno_narocilo_2.docx'))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed extraction result cache
+"""
+
+import os
+import sys
+import tempfile
+from unittest.mock import Mock
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.extraction_cache import (
+    ExtractionCache, compute_file_hash, extractor_version
+)
+
+
+class TestExtractionCache:
+    """Cache behaviour against a temporary SQLite database"""
+
+    @pytest.fixture
+    def cache(self):
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        yield ExtractionCache(path, max_bytes=10 * 1024 * 1024)
+        os.remove(path)
+
+    def test_round_trip_is_compressed(self, cache):
+        text = "Predmet naročila: dobava računalniške opreme. " * 500
+        cache.put('abc', 'form_docling', 'v1', text, {'page_count': 3})
+
+        cached_text, metadata = cache.get('abc', 'form_docling', 'v1')
+        assert cached_text == text
+        assert metadata == {'page_count': 3}
+
+        stats = cache.get_cache_stats()
+        assert stats['entries'] == 1
+        assert stats['compression_ratio'] > 5
+
+    def test_key_includes_extractor_and_version(self, cache):
+        cache.put('abc', 'form_docling', 'v1', 'text')
+        assert cache.get('abc', 'form_docling', 'v2') is None
+        assert cache.get('abc', 'qdrant_docling', 'v1') is None
+
+    def test_get_or_extract_runs_extractor_once(self, cache):
+        extract = Mock(return_value=("extracted text", {'extraction_method': 'pypdf2'}))
+
+        first = cache.get_or_extract('h1', 'form_basic', 'v1', extract)
+        second = cache.get_or_extract('h1', 'form_basic', 'v1', extract)
+
+        assert first == ("extracted text", {'extraction_method': 'pypdf2'}, False)
+        assert second == ("extracted text", {'extraction_method': 'pypdf2'}, True)
+        assert extract.call_count == 1
+
+    def test_empty_results_are_not_cached(self, cache):
+        extract = Mock(return_value=("", {}))
+        cache.get_or_extract('h1', 'form_basic', 'v1', extract)
+        cache.get_or_extract('h1', 'form_basic', 'v1', extract)
+        assert extract.call_count == 2
+
+    def test_size_based_lru_eviction(self):
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            cache = ExtractionCache(path)
+            # Random-ish text that does not compress well
+            blobs = {f"h{i}": os.urandom(600).hex() for i in range(4)}
+            for file_hash, text in list(blobs.items())[:3]:
+                cache.put(file_hash, 'x', 'v1', text)
+            # Budget fits exactly the three stored entries
+            cache.max_bytes = int(cache.get_cache_stats()['stored_mb'] * 1024 * 1024) + 10
+
+            # Touch h0 so h1 becomes least recently used
+            assert cache.get('h0', 'x', 'v1') is not None
+            cache.put('h3', 'x', 'v1', blobs['h3'])
+
+            assert cache.get('h1', 'x', 'v1') is None
+            assert cache.get('h0', 'x', 'v1') is not None
+            assert cache.get('h3', 'x', 'v1') is not None
+            assert cache.stats['evictions'] >= 1
+        finally:
+            os.remove(path)
+
+    def test_invalidate(self, cache):
+        cache.put('abc', 'a', 'v1', 'one')
+        cache.put('abc', 'b', 'v1', 'two')
+        assert cache.invalidate('abc') == 2
+        assert cache.get('abc', 'a', 'v1') is None
+
+
+def test_compute_file_hash_matches_content_hash():
+    import hashlib
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(b"x" * 20000)
+    try:
+        assert compute_file_hash(f.name) == hashlib.sha256(b"x" * 20000).hexdigest()
+    finally:
+        os.remove(f.name)
+
+
+def test_extractor_version_tracks_libraries():
+    version = extractor_version('1', 'pytest', 'surely-not-installed-package')
+    assert version.startswith('1|pytest=')
+    assert version.endswith('surely-not-installed-package=none')
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for BM25 + vector hybrid retrieval over ai_document_chunks
+"""
+
+import os
+import sys
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.hybrid_search import (
+    ChunkLexicalIndex, hybrid_search, query_terms, reciprocal_rank_fusion, RetrievedChunk
+)
+
+CHUNKS = [
+    (1, 0, "Naročnik lahko izključi ponudnika iz postopka, kot določa 75. člen ZJN-3."),
+    (1, 1, "Rok za oddajo ponudb je trideset dni od objave obvestila o naročilu."),
+    (2, 0, "Predmet naročila so gradbena dela po CPV 45233140-2 in 45233141-9."),
+    (2, 1, "Pogodbena kazen znaša pol odstotka pogodbene vrednosti za vsak dan zamude."),
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'chunks.db')
+    with sqlite3.connect(path) as conn:
+        conn.executescript("""
+            CREATE TABLE ai_documents (id INTEGER PRIMARY KEY, filename TEXT, tip_dokumenta TEXT);
+            CREATE TABLE ai_document_chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, document_id INTEGER NOT NULL,
+                chunk_index INTEGER NOT NULL, chunk_text TEXT NOT NULL, chunk_size INTEGER, vector_id TEXT
+            );
+            INSERT INTO ai_documents VALUES (1, 'zakon.pdf', 'pravilniki'), (2, 'razpis.pdf', 'razpisi');
+        """)
+        # The first chunk exists before the index: it is picked up by the initial rebuild
+        conn.execute("INSERT INTO ai_document_chunks (document_id, chunk_index, chunk_text) VALUES (?, ?, ?)",
+                     CHUNKS[0])
+    return path
+
+
+class FakeVectors:
+    def __init__(self, ranking):
+        self.ranking = ranking
+        self.embedded = []
+
+    def embed(self, text):
+        self.embedded.append(text)
+        return [0.1, 0.2]
+
+    def search(self, vector, limit):
+        return [SimpleNamespace(id=f'v{doc}:{idx}', score=score,
+                                payload={'document_id': doc, 'chunk_index': idx, 'text': 'x'})
+                for doc, idx, score in self.ranking[:limit]]
+
+
+def _add_chunks(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO ai_document_chunks (document_id, chunk_index, chunk_text) VALUES (?, ?, ?)",
+                         CHUNKS[1:])
+
+
+def test_query_terms_keep_identifiers_and_drop_stopwords():
+    terms = query_terms("Kaj določa 75. člen ZJN-3 za CPV 45233140-2?")
+    assert [(t.words, t.identifier) for t in terms] == [
+        (['doloca'], False), (['75'], True), (['clen'], False), (['zjn', '3'], True),
+        (['cpv'], False), (['45233140', '2'], True)]
+
+
+def test_index_stays_in_sync_with_chunk_table(db_path):
+    index = ChunkLexicalIndex(db_path)
+    assert index.ensure_index()
+    _add_chunks(db_path)
+
+    hits = index.search("CPV 45233140-2")
+    assert [(h.payload['document_id'], h.payload['chunk_index']) for h in hits] == [(2, 0)]
+    assert hits[0].payload['filename'] == 'razpis.pdf' and hits[0].score == 1.0
+
+    # Diacritics and inflection: "clena" finds "člen", "pogodbeni" finds "pogodbena"/"pogodbene"
+    assert index.search("75. clena")[0].payload['chunk_index'] == 0
+    assert index.search("pogodbeni")[0].payload['document_id'] == 2
+    assert index.search("ponudb", document_types=['razpisi']) == []
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM ai_document_chunks WHERE document_id = 2")
+    assert index.search("CPV 45233140-2") == []
+
+
+def test_identifier_query_skips_the_embedding_call(db_path):
+    _add_chunks(db_path)
+    vectors = FakeVectors([(1, 1, 0.8)])
+
+    result = hybrid_search("Kaj določa 75. člen ZJN-3?", 3, vectors.embed, vectors.search,
+                           index=ChunkLexicalIndex(db_path))
+    assert result.mode == 'lexical' and vectors.embedded == []
+    assert result.hits[0].payload['text'].endswith("75. člen ZJN-3.")
+
+    # A natural-language question is fused with the vector results
+    result = hybrid_search("do kdaj moram oddati ponudbo", 3, vectors.embed, vectors.search,
+                           index=ChunkLexicalIndex(db_path))
+    assert result.mode == 'hybrid' and result.query_embedding == [0.1, 0.2]
+    assert (result.hits[0].payload['document_id'], result.hits[0].payload['chunk_index']) == (1, 1)
+
+
+def test_rrf_rewards_agreement_between_lists():
+    def hits(*keys):
+        return [RetrievedChunk(key, 0.0, {'document_id': key, 'chunk_index': 0}) for key in keys]
+
+    fused = reciprocal_rank_fusion([hits('a', 'b', 'c'), hits('b', 'c', 'd')], k=60)
+    assert [h.id for h in fused] == ['b', 'c', 'a', 'd']
+    assert 0 < fused[-1].score < fused[0].score < 1
+    assert reciprocal_rank_fusion([hits('a')], k=60)[0].score == 1.0
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for streamed chat completions against a local OpenAI-compatible SSE server
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import OpenAI
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.llm_stream import ChatStream, stream_chat
+from services.context_packer import count_tokens
+from utils.metrics import metrics
+
+
+class FakeChatServer:
+    """Minimal /v1/chat/completions endpoint that streams `tokens` as SSE chunks"""
+
+    def __init__(self, tokens, delay=0.0, usage=True, status=200):
+        self.tokens = tokens
+        self.delay = delay
+        self.usage = usage
+        self.status = status
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                server.requests.append(body)
+                if server.status != 200:
+                    payload = json.dumps({'error': {'message': 'boom', 'type': 'server_error'}}).encode()
+                    self.send_response(server.status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+
+                def send(data):
+                    self.wfile.write(f"data: {data}\n\n".encode())
+                    self.wfile.flush()
+
+                base = {'id': 'chatcmpl-1', 'object': 'chat.completion.chunk', 'created': 0, 'model': body['model']}
+                for token in server.tokens:
+                    time.sleep(server.delay)
+                    send(json.dumps({**base, 'choices': [
+                        {'index': 0, 'delta': {'content': token}, 'finish_reason': None}]}))
+                send(json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}))
+                if server.usage and body.get('stream_options', {}).get('include_usage'):
+                    send(json.dumps({**base, 'choices': [], 'usage': {
+                        'prompt_tokens': 11, 'completion_tokens': len(server.tokens), 'total_tokens': 11 + len(server.tokens)}}))
+                send('[DONE]')
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def client(self):
+        return OpenAI(api_key='test', base_url=f"http://127.0.0.1:{self.httpd.server_port}/v1", max_retries=0)
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fake_server():
+    servers = []
+
+    def start(*args, **kwargs):
+        servers.append(FakeChatServer(*args, **kwargs))
+        return servers[-1]
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def _series(name, **labels):
+    return [s for s in metrics.snapshot(name) if all(s['labels'].get(k) == v for k, v in labels.items())]
+
+
+def test_deltas_arrive_incrementally_and_are_accounted(fake_server):
+    server = fake_server(['Dober ', 'dan', ', ', 'svet'], delay=0.05)
+    done = []
+    stream = stream_chat(server.client(), 'test_stream', 'gpt-test', [{'role': 'user', 'content': 'Zdravo'}],
+                         max_tokens=20).add_done_callback(done.append)
+
+    arrivals = []
+    start = time.perf_counter()
+    for delta in stream:
+        arrivals.append((delta, time.perf_counter() - start))
+        assert not done  # accounting only happens at the end
+
+    assert [d for d, _ in arrivals] == ['Dober ', 'dan', ', ', 'svet']
+    assert arrivals[-1][1] - arrivals[0][1] >= 0.1  # not buffered until the end
+    assert done == [stream] and stream.completed and stream.text == 'Dober dan, svet'
+    assert stream.usage == {'prompt_tokens': 11, 'completion_tokens': 4}
+    assert 0 < stream.ttft < stream.duration
+    assert server.requests[0]['stream'] is True and server.requests[0]['max_tokens'] == 20
+    assert _series('ai_ttft_seconds', call='test_stream', model='gpt-test')
+    tokens = {s['labels']['kind']: s['value'] for s in _series('ai_tokens_total', call='test_stream')}
+    assert tokens['prompt'] >= 11 and tokens['completion'] >= 4
+
+    # A finished stream replays its text
+    assert ''.join(stream) == 'Dober dan, svet'
+
+
+def test_errors_become_text_and_usage_is_estimated(fake_server):
+    failing = fake_server(['x'], status=500)
+    stream = stream_chat(failing.client(), 'test_error', 'gpt-test', [{'role': 'user', 'content': 'a' * 40}],
+                         error_prefix="Napaka: ")
+    text = ''.join(stream)
+    assert text.startswith("Napaka: ") and stream.error and not stream.completed
+
+    no_usage = fake_server(['ena', 'dva'], usage=False)
+    stream = stream_chat(no_usage.client(), 'test_estimate', 'gpt-test', [{'role': 'user', 'content': 'a' * 40}])
+    assert ''.join(stream) == 'enadva'
+    assert stream.usage == {'prompt_tokens': count_tokens('a' * 40), 'completion_tokens': count_tokens('enadva'),
+                            'estimated': True}
+
+    static = ChatStream.from_text("Ni podatkov")
+    calls = []
+    static.add_done_callback(calls.append)
+    assert list(static) == ["Ni podatkov"] and calls == [static]
+
+
+def test_ai_response_service_streams_and_joins(fake_server, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    monkeypatch.setenv('OPENAI_MODEL', 'gpt-test')
+    from services.ai_response_service import AIResponseService
+
+    server = fake_server(['Rok ', 'je ', '15. 3.'])
+    service = AIResponseService()
+    service.client = server.client()
+    chunks = [{'chunk_text': 'Rok za oddajo ponudb je 15. 3.', 'original_filename': 'razpis.pdf'}]
+
+    assert list(service.stream_response("Kateri je rok?", chunks)) == ['Rok ', 'je ', '15. 3.']
+    assert service.generate_response("Kateri je rok?", chunks) == 'Rok je 15. 3.'
+    assert service.get_ai_response("Predlagaj pogoje", field_type="price_formation") == 'Rok je 15. 3.'
+    assert service.generate_response("Kateri je rok?", []).startswith("🔍")
+    assert len(server.requests) == 3
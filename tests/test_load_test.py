@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the headless load test (session isolation and a short run)
+"""
+
+import os
+import sys
+import threading
+
+# Add benchmarks directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from load_test import (
+    SimulatedSessionState, ThreadLocalSessionState, load_journeys, run_load, DEFAULT_JOURNEYS
+)
+
+
+def test_proxy_routes_to_thread_session():
+    proxy = ThreadLocalSessionState()
+    states = [SimulatedSessionState(), SimulatedSessionState()]
+
+    def work(state, value):
+        proxy.bind(state)
+        proxy.current_step = value
+        proxy['lots'] = [value]
+        assert 'lots' in proxy and proxy.get('current_step') == value
+
+    threads = [threading.Thread(target=work, args=(state, i)) for i, state in enumerate(states)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [state['current_step'] for state in states] == [0, 1]
+    assert states[1].lots == [1]
+
+
+def test_short_run_reports_latencies(tmp_path, monkeypatch):
+    import database
+    from utils import cpv_manager
+    from fixtures import seed_procurements, seed_cpv_codes
+
+    path = str(tmp_path / 'load.db')
+    monkeypatch.setattr(database, 'DATABASE_FILE', path)
+    monkeypatch.setattr(cpv_manager, 'DATABASE_FILE', path)
+    database.init_db()
+    seed_procurements(path, 20, lots=2)
+    seed_cpv_codes(path, 100)
+
+    result = run_load(3, load_journeys(DEFAULT_JOURNEYS), iterations=1, think_scale=0)
+    assert result['journeys_completed'] == 3
+    assert result['errors'] == {}
+    assert result['latency_seconds']['rerun']['count'] > 0
+    assert result['sqlite']['write_statement_seconds']['count'] > 0
+    assert result['memory']['session_state_bytes']['max'] > 0
@@ -0,0 +1,125 @@
+"""
+Tests for LotStore - copy-on-write lot data behind the flat lots.N.field keys.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.form_helpers import FormContext
+from utils.form_helpers.lot_store import LotData, LotStore, split_lot_key
+
+
+class CountingState(dict):
+    """Session state that records writes and deletes"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = []
+
+    def __setitem__(self, key, value):
+        self.writes.append(key)
+        super().__setitem__(key, value)
+
+    def pop(self, key, *default):
+        self.writes.append(key)
+        return super().pop(key, *default)
+
+
+def _three_lots():
+    return {
+        'lots': [{'name': f'Sklop {i + 1}', 'index': i} for i in range(3)],
+        'current_lot_index': 0,
+    }
+
+
+class TestLotData:
+
+    def test_copy_shares_until_written(self):
+        original = LotData({'a': 1, 'b': 2})
+        clone = original.copy()
+        assert clone.shares_with(original)
+
+        clone.set('a', 10)
+        assert not clone.shares_with(original)
+        assert original['a'] == 1 and clone['a'] == 10 and clone['b'] == 2
+
+    def test_split_lot_key(self):
+        assert split_lot_key('lots.12.orderType.type') == (12, 'orderType.type')
+        assert split_lot_key('lots.x.field') is None
+        assert split_lot_key('lot_1.field') is None
+
+
+class TestApply:
+
+    def test_only_changed_values_are_written(self):
+        shared = ['shared']
+        state = CountingState(_three_lots())
+        for i in range(3):
+            state[f'lots.{i}.common'] = shared
+            state[f'lots.{i}.own'] = f'value {i}'
+        state.writes.clear()
+
+        store = LotStore.from_session(state)
+        before = list(store.lots)
+        store.remove(0)
+        store.apply(state, before)
+
+        # 'common' is the same object in every lot, so it never moves
+        assert sorted(state.writes) == ['lots.0.own', 'lots.1.own', 'lots.2.common', 'lots.2.own']
+        assert state['lots.0.own'] == 'value 1' and state['lots.1.own'] == 'value 2'
+        assert 'lots.2.own' not in state
+
+    def test_unread_lots_are_left_alone(self):
+        state = CountingState(_three_lots())
+        for i in range(3):
+            state[f'lots.{i}.field'] = i
+        state.writes.clear()
+
+        store = LotStore.from_session(state, only=(0, 2))
+        before = list(store.lots)
+        store.copy(0, 2)
+        store.apply(state, before)
+
+        assert state.writes == ['lots.2.field']
+        assert [state[f'lots.{i}.field'] for i in range(3)] == [0, 1, 0]
+
+
+class TestFormContextLotEdits:
+
+    def test_remove_lot_independent_of_key_order(self):
+        # Lot 2's key is older than lot 1's, as after a reload or a copy
+        state = _three_lots()
+        state['lots.2.name'] = 'third'
+        state['lots.0.name'] = 'first'
+        state['lots.1.name'] = 'second'
+        context = FormContext(state)
+
+        assert context.remove_lot(0)
+        assert state['lots.0.name'] == 'second'
+        assert state['lots.1.name'] == 'third'
+        assert 'lots.2.name' not in state
+
+    def test_move_lot_keeps_current_lot(self):
+        state = _three_lots()
+        for i in range(3):
+            state[f'lots.{i}.name'] = f'lot {i}'
+        state['current_lot_index'] = 1
+        context = FormContext(state)
+
+        assert context.move_lot(0, 2)
+        assert [state[f'lots.{i}.name'] for i in range(3)] == ['lot 1', 'lot 2', 'lot 0']
+        assert [lot['name'] for lot in state['lots']] == ['Sklop 2', 'Sklop 3', 'Sklop 1']
+        assert [lot['index'] for lot in state['lots']] == [0, 1, 2]
+        assert context.lot_index == 0 and state['lots.0.name'] == 'lot 1'
+
+    def test_duplicate_lot(self):
+        state = _three_lots()
+        state['lots.1.items'] = ['a', 'b']
+        context = FormContext(state)
+
+        new_index = context.duplicate_lot(1)
+        assert new_index == 3
+        assert state['lots'][3]['name'] == 'Sklop 2 (kopija)'
+        assert state['lots.3.items'] == ['a', 'b']
+        assert context.duplicate_lot(7) == -1
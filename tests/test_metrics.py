@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the process-wide metrics registry
+"""
+
+import os
+import sys
+import random
+import urllib.request
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import (
+    LogHistogram, MetricsRegistry, render_prometheus, start_prometheus_server
+)
+
+
+class TestLogHistogram:
+    """Quantile accuracy and fixed memory"""
+
+    def test_quantiles_within_relative_error(self):
+        rng = random.Random(1)
+        values = sorted(rng.lognormvariate(-3, 1) for _ in range(20000))
+        hist = LogHistogram()
+        for v in values:
+            hist.record(v)
+
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            assert hist.quantile(q) == pytest.approx(exact, rel=0.03)
+        assert hist.count == 20000
+
+    def test_memory_does_not_grow(self):
+        hist = LogHistogram()
+        buckets = len(hist.buckets)
+        for i in range(100000):
+            hist.record(i * 1e-5)
+        assert len(hist.buckets) == buckets
+
+    def test_empty_and_out_of_range(self):
+        hist = LogHistogram()
+        assert hist.quantile(0.5) == 0.0
+        hist.record(0.0)
+        hist.record(1e9)
+        assert hist.quantile(0.0) == 0.0
+        assert hist.quantile(1.0) == 1e9
+
+
+class TestMetricsRegistry:
+    """Labelled series, timers and export"""
+
+    def test_labels_create_separate_series(self):
+        registry = MetricsRegistry()
+        registry.observe('page_load_seconds', 0.1, page='dashboard')
+        registry.observe('page_load_seconds', 0.3, page='form')
+        registry.observe('page_load_seconds', 0.2, page='form')
+
+        by_page = {s['labels']['page']: s for s in registry.snapshot('page_load_seconds')}
+        assert by_page['dashboard']['count'] == 1
+        assert by_page['form']['count'] == 2
+        assert by_page['form']['sum'] == pytest.approx(0.5)
+
+    def test_cardinality_is_bounded(self):
+        registry = MetricsRegistry(max_series_per_metric=3)
+        for i in range(10):
+            registry.inc('requests_total', site=f"site_{i}")
+
+        series = registry.snapshot('requests_total')
+        assert len(series) == 4
+        overflow = [s for s in series if s['labels'] == {'overflow': 'true'}]
+        assert overflow[0]['value'] == 7
+
+    def test_timer_counts_errors(self):
+        registry = MetricsRegistry()
+        with pytest.raises(RuntimeError):
+            with registry.time('ai_call_seconds', call='suggestion'):
+                raise RuntimeError("api down")
+
+        assert registry.snapshot('ai_call_seconds')[0]['count'] == 1
+        assert registry.snapshot('ai_call_seconds_errors_total')[0]['value'] == 1
+
+    def test_kind_mismatch(self):
+        registry = MetricsRegistry()
+        registry.inc('x')
+        with pytest.raises(ValueError):
+            registry.observe('x', 1.0)
+
+    def test_gauge_callback(self):
+        registry = MetricsRegistry()
+        registry.gauge('queue_depth').callback = lambda: 42
+        assert registry.snapshot('queue_depth')[0]['value'] == 42
+
+    def test_prometheus_text(self):
+        registry = MetricsRegistry()
+        registry.observe('db_call_seconds', 0.01, site='load_draft')
+        registry.inc('cache_hits_total', 3, cache='extraction')
+
+        text = render_prometheus(registry)
+        assert '# TYPE db_call_seconds summary' in text
+        assert 'db_call_seconds{site="load_draft",quantile="0.99"}' in text
+        assert 'db_call_seconds_count{site="load_draft"} 1' in text
+        assert 'cache_hits_total{cache="extraction"} 3' in text
+
+
+def test_prometheus_endpoint_serves_metrics():
+    from utils.metrics import metrics
+    metrics.inc('endpoint_test_total')
+    server = start_prometheus_server(port=0)
+    port = server.server_port
+    body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+    assert 'endpoint_test_total 1' in body
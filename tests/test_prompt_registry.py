@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached, versioned system-prompt registry
+"""
+
+import os
+import sys
+import sqlite3
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.prompt_registry import PromptRegistry, version_tag
+from utils.metrics import metrics
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'prompts.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute("""
+            CREATE TABLE ai_system_prompts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                prompt_key TEXT UNIQUE NOT NULL,
+                form_section TEXT NOT NULL,
+                field_name TEXT NOT NULL,
+                prompt_text TEXT NOT NULL,
+                description TEXT,
+                is_active BOOLEAN DEFAULT 1,
+                version INTEGER DEFAULT 1,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                usage_count INTEGER DEFAULT 0
+            )
+        """)
+    return path
+
+
+def _loads():
+    return sum(series['value'] for series in metrics.snapshot('ai_prompt_registry_loads_total'))
+
+
+def test_lookups_are_served_from_memory_until_a_save(db_path):
+    registry = PromptRegistry(db_path, recheck_seconds=3600)
+    registry.save('pogajanja_posebne_zelje', 'pogajanja', 'posebne_zelje', 'Prvi poziv', 'opis', True)
+
+    loads = _loads()
+    for _ in range(5):
+        prompt = registry.active('pogajanja', 'posebne_zelje')
+    assert prompt['prompt_text'] == 'Prvi poziv' and version_tag(prompt) == 'pogajanja_posebne_zelje@v1'
+    assert _loads() == loads
+
+    registry.save('pogajanja_posebne_zelje', 'pogajanja', 'posebne_zelje', 'Drugi poziv', 'opis', True)
+    prompt = registry.active('pogajanja', 'posebne_zelje')
+    assert prompt['prompt_text'] == 'Drugi poziv' and prompt['version'] == 2
+    assert _loads() == loads + 1
+
+    registry.save('pogajanja_posebne_zelje', 'pogajanja', 'posebne_zelje', 'Drugi poziv', 'opis', False)
+    assert registry.active('pogajanja', 'posebne_zelje') is None
+    assert registry.get('pogajanja_posebne_zelje')['version'] == 3
+
+    assert registry.delete(prompt['id']) is True
+    assert registry.all() == [] and registry.delete(prompt['id']) is False
+
+
+def test_edits_from_another_process_are_picked_up_on_recheck(db_path):
+    registry = PromptRegistry(db_path, recheck_seconds=0)
+    other = PromptRegistry(db_path, recheck_seconds=3600)
+    registry.save('merila_opis', 'variante_merila', 'opis', 'Star poziv', '', True)
+    assert other.active('variante_merila', 'opis')['prompt_text'] == 'Star poziv'
+
+    # Direct edit in the database (e.g. the database manager) bumps the version
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE ai_system_prompts SET prompt_text = 'Nov poziv', version = version + 1")
+    assert registry.active('variante_merila', 'opis')['prompt_text'] == 'Nov poziv'
+
+    # The other registry does not recheck yet, and the cached copies are not shared
+    stale = other.active('variante_merila', 'opis')
+    stale['prompt_text'] = 'spremenjeno'
+    assert other.active('variante_merila', 'opis')['prompt_text'] == 'Star poziv'
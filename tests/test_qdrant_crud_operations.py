@@ -179,20 +179,70 @@ class TestQdrantCRUDOperations:
     
     def test_batch_delete(self, crud_service):
         """Test batch document deletion."""
-        # Mock individual delete
-        crud_service.delete_document = Mock(side_effect=[True, True, False])
+        fd, db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("CREATE TABLE ai_documents (document_id TEXT PRIMARY KEY)")
+                conn.executemany("INSERT INTO ai_documents VALUES (?)", [("doc_001",), ("doc_002",)])
+            crud_service.db_file = db_path
+            crud_service.qdrant_client = Mock()
+            crud_service.qdrant_client.count.return_value = Mock(count=12)
+            
+            # Batch delete
+            doc_ids = ["doc_001", "doc_002", "doc_003"]
+            results = crud_service.batch_delete(doc_ids)
+            
+            # Verify results
+            assert results["doc_001"] is True
+            assert results["doc_002"] is True
+            assert results["doc_003"] is False
+            
+            # All vectors go in a single delete-by-filter request
+            crud_service.qdrant_client.delete.assert_called_once()
+            selector = crud_service.qdrant_client.delete.call_args[1]["points_selector"]
+            assert selector.filter.must[0].match.any == doc_ids
+            
+            with sqlite3.connect(db_path) as conn:
+                assert conn.execute("SELECT COUNT(*) FROM ai_documents").fetchone()[0] == 0
+        finally:
+            os.remove(db_path)
+    
+    def test_count_documents(self, crud_service):
+        """Test server-side counting with filters."""
+        crud_service.qdrant_client = Mock()
+        crud_service.qdrant_client.count.return_value = Mock(count=42)
         
-        # Batch delete
-        doc_ids = ["doc_001", "doc_002", "doc_003"]
-        results = crud_service.batch_delete(doc_ids)
+        total = crud_service.count_documents({"organization": "demo_org", "document_type": "All"})
         
-        # Verify results
-        assert results["doc_001"] is True
-        assert results["doc_002"] is True
-        assert results["doc_003"] is False
+        assert total == 42
+        call_args = crud_service.qdrant_client.count.call_args[1]
+        assert [c.key for c in call_args["count_filter"].must] == ["organization"]
+        assert call_args["exact"] is True
+    
+    def test_search_total_uses_count(self, crud_service):
+        """Test that a full result page gets its total from count, not a large search."""
+        crud_service.openai_client = Mock()
+        crud_service.openai_client.embeddings.create.return_value = Mock(
+            data=[Mock(embedding=[0.1] * 1536)]
+        )
+        crud_service.qdrant_client = Mock()
+        crud_service.qdrant_client.search.return_value = [
+            Mock(score=0.9, id=i, payload={}) for i in range(2)
+        ]
+        crud_service.qdrant_client.count.return_value = Mock(count=250)
         
-        # Verify each document was attempted
-        assert crud_service.delete_document.call_count == 3
+        results, total = crud_service.search_documents("query", limit=2)
+        
+        assert total == 250
+        crud_service.qdrant_client.search.assert_called_once()
+    
+    def test_delete_by_filter_requires_filter(self, crud_service):
+        """Test that an empty filter never deletes the whole collection."""
+        crud_service.qdrant_client = Mock()
+        with pytest.raises(ValueError):
+            crud_service.delete_by_filter({"document_type": "All"})
+        crud_service.qdrant_client.delete.assert_not_called()
     
     def test_get_collection_stats(self, crud_service):
         """Test collection statistics retrieval."""
@@ -232,6 +282,27 @@ class TestQdrantCRUDOperations:
             assert len(stats["document_types"]) == 2
             assert stats["collection_exists"] is True
     
+    def test_collection_storage_stats(self, crud_service):
+        """Test storage size derived from collection info."""
+        vector_params = Mock(size=1536, datatype="float16", on_disk=True)
+        info = Mock(
+            points_count=1000,
+            vectors_count=1000,
+            indexed_vectors_count=900,
+            segments_count=4,
+            payload_schema={"document_id": Mock(), "organization": Mock()}
+        )
+        info.config.params.vectors = vector_params
+        info.config.quantization_config = None
+        
+        stats = crud_service._collection_storage_stats(info)
+        
+        assert stats["total_points"] == 1000
+        assert stats["indexed_vectors"] == 900
+        assert stats["on_disk"] is True
+        assert stats["indexed_payload_fields"] == ["document_id", "organization"]
+        assert stats["storage_mb"] == pytest.approx(1000 * 1536 * 2 / (1024 * 1024))
+    
     def test_export_metadata(self, crud_service):
         """Test metadata export functionality."""
         with patch('services.qdrant_crud_service.sqlite3.connect') as mock_connect:
@@ -282,6 +353,10 @@ class TestQdrantCRUDOperations:
         # Verify indexes were created for key fields
         calls = crud_service.qdrant_client.create_payload_index.call_count
         assert calls >= 5  # At least 5 fields should have indexes
+        
+        # Fields filtered by the AI suggestion service are indexed too
+        fields = {c[1]["field_name"] for c in crud_service.qdrant_client.create_payload_index.call_args_list}
+        assert {"procurement_type", "has_cofinancing"} <= fields
 
 
 class TestIntegrationWorkflow:
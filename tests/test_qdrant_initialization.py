@@ -21,7 +21,11 @@ from utils.qdrant_init import (
     METADATA_SCHEMA,
     COLLECTION_NAME,
     VECTOR_SIZE,
-    DISTANCE_METRIC
+    DISTANCE_METRIC,
+    VectorStorageConfig,
+    get_vector_storage_config,
+    embedding_request_kwargs,
+    fit_embedding
 )
 
 
@@ -263,6 +267,42 @@ class TestQdrantInitialization:
             assert isinstance(result, bool)
 
 
+class TestVectorStorageMode:
+    """Quantized / reduced-dimension storage configuration."""
+    
+    def test_default_is_full_precision(self):
+        with patch.dict(os.environ, {}, clear=True):
+            config = get_vector_storage_config()
+        assert config.dimensions == VECTOR_SIZE
+        assert config.quantization == 'none'
+        assert config.bytes_per_vector == VECTOR_SIZE * 4
+    
+    def test_env_configuration(self):
+        with patch.dict(os.environ, {'VECTOR_QUANTIZATION': 'binary', 'VECTOR_DIMENSIONS': '512'}):
+            config = get_vector_storage_config()
+        assert config.quantization == 'binary'
+        assert config.dimensions == 512
+        assert config.oversampling == 3.0
+        assert config.bytes_per_vector == 64
+    
+    def test_invalid_values_fall_back(self):
+        with patch.dict(os.environ, {'VECTOR_QUANTIZATION': 'pq', 'VECTOR_DIMENSIONS': '4096'}):
+            config = get_vector_storage_config()
+        assert config.quantization == 'none'
+        assert config.dimensions == VECTOR_SIZE
+    
+    def test_matryoshka_dimensions_only_for_supported_models(self):
+        config = VectorStorageConfig(dimensions=256)
+        assert embedding_request_kwargs('text-embedding-3-small', config) == {'dimensions': 256}
+        assert embedding_request_kwargs('text-embedding-ada-002', config) == {}
+        assert embedding_request_kwargs('text-embedding-3-small', VectorStorageConfig()) == {}
+    
+    def test_fit_embedding_truncates_and_normalizes(self):
+        config = VectorStorageConfig(dimensions=2)
+        assert fit_embedding([3.0, 4.0, 12.0], config) == pytest.approx([0.6, 0.8])
+        assert fit_embedding([0.1, 0.2], config) == [0.1, 0.2]
+
+
 class TestIntegrationRequirements:
     """Test integration requirements from Story 27.1."""
     
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the GCRA rate limiter and its shared storages
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.rate_limiter import MemoryStorage, MmapStorage, RateLimiter, SQLiteStorage
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'mmap'])
+def storages(request, tmp_path):
+    """Two handles on one storage, as two worker processes would open it"""
+    if request.param == 'memory':
+        storage = MemoryStorage()
+        yield storage, storage
+    elif request.param == 'sqlite':
+        path = str(tmp_path / 'limits.db')
+        yield SQLiteStorage(path), SQLiteStorage(path)
+    else:
+        path = str(tmp_path / 'limits.bin')
+        first, second = MmapStorage(path, slots=64), MmapStorage(path, slots=64)
+        yield first, second
+        first.close()
+        second.close()
+
+
+def test_limit_is_shared_and_refills_gradually(storages, monkeypatch):
+    clock = [1_000.0]
+    monkeypatch.setattr('utils.rate_limiter.time.time', lambda: clock[0])
+    worker_a = RateLimiter(max_requests=3, window_seconds=60, name='ai', storage=storages[0])
+    worker_b = RateLimiter(max_requests=3, window_seconds=60, name='ai', storage=storages[1])
+
+    assert worker_a.is_allowed('s1')[0] and worker_b.is_allowed('s1')[0] and worker_a.is_allowed('s1')[0]
+    allowed, error = worker_b.is_allowed('s1')
+    assert not allowed and error == "Preveč poizvedb. Počakajte 20 sekund."
+    assert worker_a.get_remaining_requests('s1') == 0
+
+    # One request comes back every window / max_requests seconds
+    clock[0] += 20
+    assert worker_b.get_remaining_requests('s1') == 1
+    assert worker_a.is_allowed('s1')[0] and not worker_b.is_allowed('s1')[0]
+
+    # Other sessions and other limiters are independent
+    assert worker_a.get_remaining_requests('s2') == 3
+    assert RateLimiter(3, 60, name='upload', storage=storages[1]).is_allowed('s1')[0]
+
+    worker_b.reset_session('s1')
+    assert worker_a.get_remaining_requests('s1') == 3
+
+
+def test_idle_keys_are_evicted(storages):
+    storage = storages[0]
+    limiter = RateLimiter(max_requests=2, window_seconds=10, name='swift', storage=storage)
+    for session in ('a', 'b', 'c'):
+        limiter.is_allowed(session)
+    limiter.is_allowed('c')
+
+    # After 5 s a and b are full again (nothing to remember); c still has a pending request
+    now = storage.peek('swift:a') + 0.1
+    assert storage.evict(now) == 2
+    assert storage.peek('swift:a') is None and storage.peek('swift:c') is not None
+    assert limiter.get_remaining_requests('a') == 2
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-rerun profiler
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import sql_profiler
+from utils.metrics import metrics
+from utils.rerun_profiler import (
+    RerunTrace, span, traced, profile_rerun, profiling_requested,
+    to_chrome_trace, to_speedscope, current_trace
+)
+
+
+@traced('field', 'field', label=lambda name: name)
+def render_field(name):
+    time.sleep(0.001)
+    return name
+
+
+def test_span_is_noop_without_profile():
+    assert current_trace() is None
+    with span('anything'):
+        pass
+    assert render_field('x') == 'x'
+
+
+def test_profile_collects_nested_spans_timers_and_sql(tmp_path):
+    db = str(tmp_path / "t.db")
+    with profile_rerun('form', directory=str(tmp_path)) as trace:
+        with span('render_form', 'form'):
+            render_field('clientInfo.name')
+            with metrics.time('ai_call_seconds', call='suggestion'):
+                pass
+            conn = sqlite3.connect(db)
+            conn.execute("SELECT 1").fetchall()
+            conn.close()
+
+    names = [s.name for s in trace.spans]
+    assert 'render_form' in names
+    assert 'field [clientInfo.name]' in names
+    assert 'ai_call_seconds [call=suggestion]' in names
+    assert 'SELECT ?' in names
+    # Listeners and SQL tracing are removed after the rerun
+    assert not sql_profiler.is_tracing_installed()
+    assert metrics.timer_listeners == []
+
+    written = sorted(os.listdir(tmp_path))
+    assert any(f.endswith('.trace.json') for f in written)
+    assert any(f.endswith('.speedscope.json') for f in written)
+
+
+def test_chrome_and_speedscope_formats():
+    trace = RerunTrace('dashboard')
+    base = trace.start
+    trace.add('outer', 'render', base, 0.010)
+    trace.add('inner', 'field', base + 0.002, 0.003)
+    # Overlaps the end of outer: clamped so the stack stays valid
+    trace.add('late', 'sql', base + 0.009, 0.002)
+    trace.duration = 0.012
+
+    chrome = to_chrome_trace(trace)
+    events = {e['name']: e for e in chrome['traceEvents']}
+    assert events['inner']['ph'] == 'X'
+    assert events['inner']['ts'] == 2000
+    assert events['late']['dur'] == 1000
+    json.dumps(chrome)
+
+    speedscope = to_speedscope(trace)
+    stack = []
+    frames = speedscope['shared']['frames']
+    for event in speedscope['profiles'][0]['events']:
+        if event['type'] == 'O':
+            stack.append(event['frame'])
+        else:
+            assert stack.pop() == event['frame']
+    assert stack == []
+    assert [f['name'] for f in frames] == ['outer', 'inner', 'late']
+
+
+def test_profiling_requested(monkeypatch):
+    monkeypatch.delenv('RERUN_PROFILER', raising=False)
+    assert not profiling_requested({}, {})
+    assert profiling_requested({}, {'profile': '1'})
+    assert profiling_requested({'rerun_profiler_enabled': True}, {})
+    monkeypatch.setenv('RERUN_PROFILER', 'true')
+    assert profiling_requested()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared exact + semantic AI response cache
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.response_cache import ResponseCache, hit_rates, prompt_version
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / 'cache.db'), ttl_seconds=60, max_entries=3,
+                         similarity_threshold=0.95)
+
+
+def test_exact_tier_normalizes_prompt_and_isolates_orgs(cache):
+    key = {'namespace': 'rag_answer', 'model': 'gpt-test', 'version': prompt_version('system'),
+           'chunk_ids': ['b', 'a']}
+    cache.put(prompt="Kateri je  rok za oddajo?", response="15. 3.", tokens=120, org='obcina', **key)
+
+    assert cache.get(prompt="kateri je rok za ODDAJO?", org='obcina', **{**key, 'chunk_ids': ['a', 'b']}) \
+        == ("15. 3.", 'exact')
+    assert cache.get(prompt="Kateri je rok za oddajo?", org='druga', **key) is None
+    assert cache.get(prompt="Kateri je rok za oddajo?", org='obcina', **{**key, 'chunk_ids': ['a', 'c']}) is None
+    assert cache.get(prompt="Kateri je rok za oddajo?", org='obcina',
+                     **{**key, 'version': prompt_version('edited system')}) is None
+
+    stats = cache.get_cache_stats()
+    assert stats['namespaces']['rag_answer'] == {'entries': 1, 'total_hits': 1, 'tokens_saved': 120}
+    assert stats['exact_hits'] == 1 and stats['misses'] == 3
+
+
+def test_semantic_tier_requires_same_context(cache):
+    key = {'namespace': 'rag_answer_semantic', 'model': 'gpt-test', 'version': 'v1', 'org': 'obcina'}
+    cache.put(prompt="Kateri je rok?", response="15. 3.", chunk_ids=[1, 2], embedding=[1.0, 0.0, 0.0], **key)
+
+    close, far = [0.98, 0.1, 0.0], [0.6, 0.8, 0.0]
+    assert cache.get(prompt="Do kdaj je rok?", chunk_ids=[2, 1], embedding=close, **key) == ("15. 3.", 'semantic')
+    assert cache.get(prompt="Kdo je naročnik?", chunk_ids=[1, 2], embedding=far, **key) is None
+    assert cache.get(prompt="Do kdaj je rok?", chunk_ids=[1, 3], embedding=close, **key) is None
+    assert cache.get(prompt="Do kdaj je rok?", chunk_ids=[1, 2], **key) is None
+
+    rates = hit_rates()['rag_answer_semantic']
+    assert rates['semantic'] >= 1 and 0 < rates['hit_rate'] < 1
+
+
+def test_ttl_expiry_and_lru_eviction(cache):
+    key = {'namespace': 'field_suggestion', 'model': 'gpt-test', 'version': 'v1', 'org': 'obcina'}
+    for name in ('a', 'b', 'c'):
+        cache.put(prompt=name, response={'suggestions': [name]}, **key)
+    assert cache.get(prompt='a', **key)[0] == {'suggestions': ['a']}   # 'b' is now least recently used
+
+    cache.put(prompt='d', response={'suggestions': ['d']}, **key)
+    assert cache.get(prompt='b', **key) is None
+    assert all(cache.get(prompt=name, **key) for name in ('a', 'c', 'd'))
+    assert cache.stats['evictions'] == 1
+
+    short = ResponseCache(cache.db_path, ttl_seconds=0.05, max_entries=10)
+    short.put(prompt='e', response='x', **key)
+    assert short.get(prompt='e', **key) == ('x', 'exact')
+    time.sleep(0.1)
+    assert short.get(prompt='e', **key) is None
+    short.put(prompt='f', response='y', **key)     # stores purge expired entries
+    assert short.stats['expired'] == 1
+    assert short.invalidate(org='obcina') == 4
+
+
+def test_field_suggestions_are_served_from_cache(tmp_path, monkeypatch):
+    import services.ai_suggestion_service as suggestion_module
+    from services.ai_suggestion_service import AIFieldSuggestionService
+
+    class FakeResponses:
+        calls = 0
+
+        def _get_current_model(self):
+            return 'gpt-test'
+
+        def field_system_message(self, field_type=None):
+            return f"system {field_type}"
+
+        def get_ai_response(self, query, field_type=None):
+            FakeResponses.calls += 1
+            return f"Predlog {FakeResponses.calls}"
+
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    monkeypatch.setattr(suggestion_module, 'get_response_cache', lambda: cache)
+    service = AIFieldSuggestionService.__new__(AIFieldSuggestionService)
+    service.qdrant_service = None
+    service.ai_response_service = FakeResponses()
+
+    def suggest(**kwargs):
+        return service._generate_ai_suggestions_with_context(
+            'priceInfo.priceFixation', 'price_formation', {'project_title': 'Vrtec'}, 'Cene', **kwargs)
+
+    first = suggest()
+    assert [s['text'] for s in first['suggestions']] == ['Predlog 1', 'Predlog 2'] and 'cache' not in first
+    again = suggest()
+    assert again['cache'] == 'exact' and again['suggestions'] == first['suggestions']
+    assert FakeResponses.calls == 2
+
+    fresh = suggest(refresh=True)
+    assert [s['text'] for s in fresh['suggestions']] == ['Predlog 3', 'Predlog 4']
+    assert suggest()['suggestions'] == fresh['suggestions']
+    assert FakeResponses.calls == 4
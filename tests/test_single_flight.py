@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for request coalescing and per-model concurrency limits
+"""
+
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.single_flight import SingleFlight, ModelConcurrency, fingerprint
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow_call():
+        calls.append(1)
+        release.wait(5)
+        return {'embedding': [0.1, 0.2]}
+
+    key = fingerprint('embedding', 'text-embedding-3-small', {'b': 2, 'a': 1})
+    assert key == fingerprint('embedding', 'text-embedding-3-small', {'a': 1, 'b': 2})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, key, slow_call) for _ in range(8)]
+        while flight.in_flight() == 0 or len(calls) == 0:
+            time.sleep(0.01)
+        time.sleep(0.1)            # let the other callers join
+        release.set()
+        results = [f.result(5) for f in futures]
+
+    assert len(calls) == 1 and all(r is results[0] for r in results)
+    assert flight.in_flight() == 0
+
+    # Once finished nothing is cached: the next call runs again
+    release.set()
+    flight.do(key, slow_call)
+    assert len(calls) == 2
+
+
+def test_errors_reach_every_waiting_caller():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.2)
+        raise TimeoutError("upstream timeout")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        leader = pool.submit(flight.do, 'k', failing)
+        started.wait(5)
+        followers = [pool.submit(flight.do, 'k', lambda: 'never') for _ in range(2)]
+        for future in [leader] + followers:
+            with pytest.raises(TimeoutError):
+                future.result(5)
+
+
+def test_model_limit_bounds_concurrency_per_model():
+    limits = ModelConcurrency(default_limit=2, limits={'gpt-big': 1})
+    active = {'gpt-test': 0, 'gpt-big': 0}
+    peak = {'gpt-test': 0, 'gpt-big': 0}
+    lock = threading.Lock()
+
+    def call(model):
+        with limits.limit(model):
+            with lock:
+                active[model] += 1
+                peak[model] = max(peak[model], active[model])
+            time.sleep(0.05)
+            with lock:
+                active[model] -= 1
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        list(pool.map(call, ['gpt-test'] * 6 + ['gpt-big'] * 6))
+
+    assert peak == {'gpt-test': 2, 'gpt-big': 1}
+    assert ModelConcurrency(default_limit=3).limit_for('gpt-4o-mini') == 3
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for SQL tracing and the slow-query profiler
+"""
+
+import os
+import sys
+import sqlite3
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import sql_profiler
+from utils.sql_profiler import (
+    fingerprint, profiler, install_sql_tracing, uninstall_sql_tracing,
+    is_tracing_installed, explain_query_plan
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE drafts (id INTEGER PRIMARY KEY, name TEXT, status TEXT)")
+    conn.execute("CREATE INDEX idx_drafts_status ON drafts(status)")
+    conn.executemany("INSERT INTO drafts (name, status) VALUES (?, ?)",
+                     [(f"draft {i}", 'open' if i % 2 else 'closed') for i in range(20)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def tracing():
+    profiler.reset()
+    install_sql_tracing()
+    yield profiler
+    uninstall_sql_tracing()
+    profiler.reset()
+
+
+def test_fingerprint_normalizes_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM drafts WHERE id = 42 AND name = 'it''s'") == \
+        "SELECT * FROM drafts WHERE id = ? AND name = ?"
+    assert fingerprint("DELETE FROM t WHERE id IN (?, ?, ?)") == \
+        fingerprint("DELETE FROM t WHERE id IN (?,?)")
+    assert fingerprint("SELECT  col1\n FROM t2;") == "SELECT col1 FROM t2"
+
+
+def test_install_is_idempotent_and_reversible():
+    original = sqlite3.connect
+    install_sql_tracing()
+    install_sql_tracing()
+    assert is_tracing_installed()
+    uninstall_sql_tracing()
+    assert sqlite3.connect is original
+
+
+def test_traces_execute_shortcut_and_cursor(db_path, tracing):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    assert isinstance(conn, sql_profiler.TracingConnection)
+
+    rows = conn.execute("SELECT * FROM drafts WHERE status = 'open'").fetchall()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM drafts WHERE status = ?", ('closed',))
+    assert cursor.fetchone()['status'] == 'closed'
+    conn.close()
+
+    assert len(rows) == 10
+    by_fp = {s['fingerprint']: s for s in tracing.top_statements()}
+    stats = by_fp["SELECT * FROM drafts WHERE status = ?"]
+    assert stats['calls'] == 2
+    assert stats['rows'] == 11
+    # Call site is this test, not the profiler or sqlite3
+    assert any('test_traces_execute_shortcut_and_cursor' in site for site in stats['sites'])
+
+
+def test_explicit_factory_is_respected(db_path, tracing):
+    class Plain(sqlite3.Connection):
+        pass
+
+    conn = sqlite3.connect(db_path, factory=Plain)
+    conn.execute("SELECT 1")
+    conn.close()
+    assert not isinstance(conn, sql_profiler.TracingConnection)
+    assert tracing.top_statements() == []
+
+
+def test_ring_buffer_is_bounded():
+    small = sql_profiler.SQLProfiler(buffer_size=5, max_fingerprints=2)
+    for i in range(10):
+        small.record(f"SELECT * FROM t{i}", 0.001, 'site:1', ':memory:')
+    assert len(small.recent) == 5
+    assert {s['fingerprint'] for s in small.top_statements()} == \
+        {'SELECT * FROM t0', 'SELECT * FROM t1', '<other>'}
+
+
+def test_save_aggregates(db_path, tracing):
+    conn = sqlite3.connect(db_path)
+    conn.execute("SELECT name FROM drafts").fetchall()
+    conn.close()
+
+    assert tracing.save_aggregates(db_path) >= 1
+    conn = sqlite3.connect(db_path)
+    saved = conn.execute("SELECT calls FROM sql_query_stats WHERE fingerprint = ?",
+                         ("SELECT name FROM drafts",)).fetchone()
+    conn.close()
+    assert saved[0] == 1
+
+
+def test_explain_flags_full_scans(db_path):
+    scan = explain_query_plan(db_path, "SELECT * FROM drafts WHERE name = ?")
+    assert scan['error'] is None
+    assert scan['full_scans'] == ['drafts']
+
+    indexed = explain_query_plan(db_path, "SELECT * FROM drafts WHERE status = :status")
+    assert indexed['full_scans'] == []
+    assert any('idx_drafts_status' in step['detail'] for step in indexed['plan'])
+
+    assert explain_query_plan(db_path, "PRAGMA table_info(drafts)")['error']
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for process-level startup tasks and lazy page imports
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.startup import StartupManager, lazy_callable
+
+
+def test_tasks_run_once_with_readiness_flags():
+    manager = StartupManager()
+    calls = []
+    release = threading.Event()
+
+    manager.register('logging', lambda: calls.append('logging'))
+
+    @manager.task('seed', background=True)
+    def seed():
+        release.wait(5)
+        calls.append('seed')
+        return 42
+
+    manager.register('broken', lambda: 1 / 0, background=True)
+
+    assert manager.start() is True
+    assert calls == ['logging'] and manager.ready('logging')
+    assert not manager.ready('seed')          # still running in the background
+    release.set()
+    assert manager.wait('seed', timeout=5) and manager.ready('seed') and manager.result('seed') == 42
+    assert manager.wait('broken', timeout=5) and not manager.ready('broken')
+
+    # A rerun re-registers the same tasks and calls start() again: nothing reruns
+    manager.register('logging', lambda: calls.append('again'))
+    assert manager.start() is False
+    assert calls == ['logging', 'seed'] and manager.ready('logging')
+    states = {task['name']: task['state'] for task in manager.report()}
+    assert states == {'logging': 'ready', 'seed': 'ready', 'broken': 'failed'}
+
+
+def test_lazy_callable_imports_on_first_call():
+    sys.modules.pop('colorsys', None)
+    to_hsv = lazy_callable('colorsys', 'rgb_to_hsv')
+    assert 'colorsys' not in sys.modules
+    assert to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert 'colorsys' in sys.modules
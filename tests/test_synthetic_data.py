@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic data generator (row counts, schema shape, determinism)
+"""
+
+import os
+import sys
+import json
+import sqlite3
+from datetime import date
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from generate_synthetic_data import SyntheticDataGenerator
+
+TABLES = ['organizacija', 'cpv_criteria', 'javna_narocila', 'form_documents', 'form_document_versions',
+          'form_document_associations', 'ai_documents', 'ai_document_chunks', 'application_logs']
+
+
+def _generate(path, seed=7):
+    generator = SyntheticDataGenerator(str(path), seed=seed, end_date=date(2026, 1, 31), batch_size=100)
+    generator.init_schema()
+    with generator.deferred_indexes(TABLES):
+        organizations = generator.organizations(5)
+        generator.cpv_criteria(20)
+        generator.procurements(30, organizations, lot_weights={1: 1, 3: 1})
+        generator.form_documents(10)
+        generator.ai_documents(3, chunks_per_document=(2, 4))
+        generator.application_logs(250, days=2, organizations=organizations)
+    generator.close()
+
+
+def _dump(path):
+    with sqlite3.connect(path) as conn:
+        return {table: conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+                for table in TABLES}
+
+
+def test_row_counts_and_form_shape(tmp_path):
+    path = tmp_path / 'synthetic.db'
+    _generate(path)
+    with sqlite3.connect(path) as conn:
+        count = lambda table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        assert count('organizacija') == 5
+        assert count('cpv_criteria') == 20
+        assert count('javna_narocila') == 30
+        assert count('form_documents') == 10
+        assert count('ai_documents') == 3
+        assert count('application_logs') == 250
+        assert count('form_document_versions') >= 10
+
+        forms = [json.loads(row[0]) for row in conn.execute("SELECT form_data_json FROM javna_narocila")]
+        multi = [form for form in forms if form['lot_mode'] == 'multiple']
+        assert multi and all(form['num_lots'] == 3 and 'lot_2.orderType.estimatedValue' in form for form in multi)
+
+        newest = conn.execute("SELECT MAX(timestamp) FROM application_logs").fetchone()[0]
+        assert newest <= '2026-01-31 23:59:59'
+        # Deferred indexes are restored
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert 'idx_logs_timestamp' in indexes
+
+
+def test_same_seed_same_rows(tmp_path):
+    _generate(tmp_path / 'a.db')
+    _generate(tmp_path / 'b.db')
+    _generate(tmp_path / 'c.db', seed=8)
+    assert _dump(tmp_path / 'a.db') == _dump(tmp_path / 'b.db')
+    assert _dump(tmp_path / 'a.db')['application_logs'] != _dump(tmp_path / 'c.db')['application_logs']
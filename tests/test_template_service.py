@@ -114,9 +114,11 @@ def test_backup_drafts_success(mock_sqlite_connect_for_template_service, setup_b
     # Create a dummy db file
     with open(DATABASE_FILE, 'w') as f: f.write("db content")
 
-    with patch('shutil.copyfile') as mock_copyfile:
+    with patch('services.backup_service.BackupManager.full_backup') as mock_full_backup, \
+            patch('services.backup_service.BackupManager.prune'):
+        mock_full_backup.return_value.path = 'gen/base.db.zst'
         success, message = backup_drafts()
-        mock_copyfile.assert_called_once()
+        mock_full_backup.assert_called_once()
         assert success is True
         assert "Varnostna kopija uspešno ustvarjena" in message
     os.remove(DATABASE_FILE) # Clean up dummy db
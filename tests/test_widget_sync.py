@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for event-driven widget -> lot key synchronization
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+
+from utils.metrics import metrics
+from utils.widget_sync import WidgetSync, widget_callback, widget_changed
+
+
+def _count(name):
+    return sum(series['value'] for series in metrics.snapshot(name))
+
+
+@pytest.fixture
+def session(monkeypatch):
+    state = {'lots': [{'name': 'Splošni sklop', 'index': 0}], 'current_lot_index': 0}
+    for i in range(500):
+        state[f'widget_lots.0.field_{i}'] = state[f'lots.0.field_{i}'] = f'value {i}'
+    monkeypatch.setattr(st, 'session_state', state)
+    return state
+
+
+def test_callback_updates_lot_key_without_full_scan(session):
+    kwargs = widget_callback('widget_lots.0.field_1', 'lots.0.field_1')
+    assert kwargs == {'on_change': widget_changed, 'args': ('widget_lots.0.field_1', 'lots.0.field_1')}
+
+    # The user edits the field; Streamlit calls on_change before the rerun
+    session['widget_lots.0.field_1'] = 'edited'
+    kwargs['on_change'](*kwargs['args'])
+    assert session['lots.0.field_1'] == 'edited'
+
+    # A renderer overwrote the lot key; validation prep re-syncs only dirty widgets
+    session['lots.0.field_1'] = 'stale'
+    full_scans, dirty = _count('widget_sync_full_scans_total'), _count('widget_sync_dirty_widgets_total')
+    assert WidgetSync.ensure_validation_ready() == 1
+    assert session['lots.0.field_1'] == 'edited'
+    assert _count('widget_sync_full_scans_total') == full_scans
+    assert _count('widget_sync_dirty_widgets_total') == dirty + 1
+
+    # The dirty set is drained
+    assert WidgetSync.ensure_validation_ready() == 0
+    assert _count('widget_sync_dirty_widgets_total') == dirty + 1
+
+
+def test_sessions_without_callbacks_fall_back_to_full_scan(session):
+    session['widget_lots.0.field_7'] = 'typed'
+    full_scans = _count('widget_sync_full_scans_total')
+
+    assert WidgetSync.ensure_validation_ready() == 1
+    assert session['lots.0.field_7'] == 'typed'
+    assert _count('widget_sync_full_scans_total') == full_scans + 1
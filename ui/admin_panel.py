@@ -1651,24 +1651,34 @@ def fetch_logs_with_filters(filters):
 
 
 def export_logs_to_csv():
-    """Export filtered logs to CSV file."""
-    logs_df = fetch_logs_with_filters(st.session_state.log_filters)
-    
-    if not logs_df.empty:
-        # Convert to CSV
-        csv_buffer = StringIO()
-        logs_df.to_csv(csv_buffer, index=False)
-        csv_data = csv_buffer.getvalue()
-        
-        # Download button
-        st.download_button(
-            label=" Prenesi CSV",
-            data=csv_data,
-            file_name=f"logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
-        )
+    """Export all logs matching the current filters, streamed to a CSV on disk."""
+    from utils.log_query_builder import LogQueryBuilder
+    from utils import db_export
+
+    filters = st.session_state.log_filters
+    query_builder = LogQueryBuilder()
+    if filters.get('use_quick_filter') == 'last100':
+        query, params = query_builder.recent_logs_query(100)
     else:
-        st.warning("Ni podatkov za izvoz.")
+        query, params = query_builder.filtered_query(filters.copy())
+
+    path = db_export.temp_export_path('logs_', '.csv')
+    try:
+        rows = db_export.export_to_csv(
+            path, db_export.ExportSpec('application_logs', query=query, params=params)
+        )
+        if rows:
+            with open(path, 'rb') as handle:
+                st.download_button(
+                    label=f" Prenesi CSV ({rows:,} vrstic)",
+                    data=handle,
+                    file_name=f"logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv"
+                )
+        else:
+            st.warning("Ni podatkov za izvoz.")
+    finally:
+        os.remove(path)
 
 
 def render_compact_bank_management():
@@ -1978,6 +1988,142 @@ def render_registries_menu():
         render_compact_bank_management()
 
 
+def render_performance_tab():
+    """Render process-wide latency percentiles, counters and memory usage."""
+    from ui.components.performance_monitor import PerformanceMonitor
+    from utils.metrics import metrics, render_prometheus
+    
+    st.subheader("Zmogljivost aplikacije")
+    st.caption("Metrike so skupne vsem sejam v tem procesu (od zadnjega zagona).")
+    
+    percentiles = PerformanceMonitor.get_latency_percentiles()
+    if percentiles:
+        df = pd.DataFrame(percentiles).sort_values(['metric', 'p95_ms'], ascending=[True, False])
+        st.dataframe(df.round(1), use_container_width=True, hide_index=True)
+    else:
+        st.info("Ni še zabeleženih meritev")
+    
+    counters = [m for m in metrics.snapshot() if m['kind'] != 'histogram']
+    if counters:
+        st.markdown("**Števci in merila**")
+        st.dataframe(pd.DataFrame([
+            {
+                'metric': m['name'],
+                'labels': ', '.join(f"{k}={v}" for k, v in m['labels'].items()),
+                'value': m['value']
+            } for m in counters
+        ]), use_container_width=True, hide_index=True)
+    
+    memory = PerformanceMonitor.get_memory_usage()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("RSS", f"{memory['rss_mb']:.0f} MB")
+    col2.metric("VMS", f"{memory['vms_mb']:.0f} MB")
+    col3.metric("Pomnilnik", f"{memory['percent']:.1f}%")
+    
+    st.download_button(
+        "Prenesi metrike (Prometheus)",
+        data=render_prometheus(),
+        file_name="metrics.prom",
+        mime="text/plain"
+    )
+    
+    render_rerun_profiles()
+
+def render_rerun_profiles():
+    """Toggle per-rerun profiling for this session and download written profiles."""
+    from utils.rerun_profiler import SESSION_FLAG, list_profiles
+    
+    st.markdown("**Profil osveževanja strani**")
+    st.caption("Časovnica vsakega osveževanja (upodabljanje, validacija, SQL, AI) v formatu "
+               "Chrome trace / speedscope. Za posamezno sejo tudi z ?profile=1 v URL.")
+    st.checkbox("Profiliraj osveževanja v tej seji", key=SESSION_FLAG)
+    
+    profiles = list_profiles()
+    if not profiles:
+        st.info("Ni še zapisanih profilov")
+        return
+    
+    selected = st.selectbox("Profil", [p['name'] for p in profiles[:50]], key="rerun_profile_select")
+    profile = next(p for p in profiles if p['name'] == selected)
+    col1, col2 = st.columns(2)
+    with open(profile['chrome'], 'rb') as f:
+        col1.download_button("Chrome trace", data=f.read(),
+                             file_name=os.path.basename(profile['chrome']), mime="application/json")
+    if os.path.exists(profile['speedscope']):
+        with open(profile['speedscope'], 'rb') as f:
+            col2.download_button("Speedscope", data=f.read(),
+                                 file_name=os.path.basename(profile['speedscope']), mime="application/json")
+
+def render_sql_profiler_tab():
+    """Render the SQL profiler: top statements, recent queries and query plans."""
+    from utils.sql_profiler import (
+        profiler, install_sql_tracing, uninstall_sql_tracing,
+        is_tracing_installed, explain_query_plan
+    )
+    
+    st.subheader("SQL profiler")
+    st.caption("Merjenje vseh SQLite poizvedb v tem procesu. Vklop velja do ponovnega zagona "
+               "(trajno z SQL_PROFILER=true).")
+    
+    enabled = st.checkbox("Sledenje SQL poizvedbam", value=is_tracing_installed(), key="sql_profiler_enabled")
+    if enabled and not is_tracing_installed():
+        install_sql_tracing()
+    elif not enabled and is_tracing_installed():
+        uninstall_sql_tracing()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Ponastavi meritve", key="sql_profiler_reset"):
+            profiler.reset()
+            st.rerun()
+    with col2:
+        if st.button("Shrani v bazo (sql_query_stats)", key="sql_profiler_save"):
+            saved = profiler.save_aggregates(database.DATABASE_FILE)
+            st.success(f"Shranjenih {saved} poizvedb")
+    
+    top = profiler.top_statements(limit=50)
+    if not top:
+        st.info("Ni še zabeleženih poizvedb")
+        return
+    
+    st.markdown("**Najdražje poizvedbe (skupni čas)**")
+    st.dataframe(pd.DataFrame([
+        {
+            'poizvedba': row['fingerprint'][:200],
+            'klici': row['calls'],
+            'skupaj_ms': row['total_seconds'] * 1000,
+            'povprečje_ms': row['mean_seconds'] * 1000,
+            'max_ms': row['max_seconds'] * 1000,
+            'vrstice': row['rows'],
+            'klicna_mesta': ', '.join(list(row['sites'])[:3])
+        } for row in top
+    ]).round(2), use_container_width=True, hide_index=True)
+    
+    st.markdown("**Načrt izvajanja (EXPLAIN QUERY PLAN)**")
+    options = {row['fingerprint'][:150]: row for row in top if row['example_sql']}
+    selected = st.selectbox("Poizvedba", list(options), key="sql_profiler_explain_select")
+    if selected and st.button("Prikaži načrt", key="sql_profiler_explain"):
+        plan = explain_query_plan(database.DATABASE_FILE, options[selected]['example_sql'])
+        if plan['error']:
+            st.warning(plan['error'])
+        else:
+            for step in plan['plan']:
+                st.text(step['detail'])
+            for table in plan['full_scans']:
+                st.error(f"Celotno pregledovanje tabele {table} - razmislite o indeksu")
+    
+    with st.expander("Zadnje poizvedbe"):
+        recent = profiler.recent_statements(limit=200)
+        st.dataframe(pd.DataFrame([
+            {
+                'čas': datetime.fromtimestamp(r['timestamp']).strftime('%H:%M:%S.%f')[:-3],
+                'poizvedba': r['fingerprint'][:200],
+                'ms': round(r['duration_ms'], 2),
+                'vrstice': r['rows'],
+                'klicno_mesto': r['site']
+            } for r in recent
+        ]), use_container_width=True, hide_index=True)
+
 def render_admin_panel():
     """Render the complete admin panel with modern interface."""
     if "logged_in" not in st.session_state:
@@ -1996,6 +2142,8 @@ def render_admin_panel():
             "CPV kode & Merila",
             "Dnevnik",
             "AI upravljanje",
+            "Zmogljivost",
+            "SQL profiler",
             "Šifranti"  # NEW - at last position
         ])
         
@@ -2018,5 +2166,11 @@ def render_admin_panel():
             from ui.ai_manager import render_ai_manager
             render_ai_manager()
         
-        with tabs[6]:  # Šifranti tab
+        with tabs[6]:
+            render_performance_tab()
+        
+        with tabs[7]:
+            render_sql_profiler_tab()
+        
+        with tabs[8]:  # Šifranti tab
             render_registries_menu()
\ No newline at end of file
@@ -8,6 +8,7 @@ import streamlit as st
 import os
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
+from utils.rate_limiter import ai_suggestion_rate_limiter, current_session_id
 
 # Load environment variables
 load_dotenv()
@@ -142,25 +143,30 @@ def render_ai_field(
                 button_help = "Generiraj predlog z AI"
             
             if st.button(button_label, key=button_key, help=button_help):
-                with st.spinner("Generiram predlog..."):
-                    try:
-                        # Initialize AI assistant
-                        assistant = FormAIAssistant()
-                        
-                        # Get AI suggestion
-                        suggestion = assistant.get_ai_suggestion(
+                allowed, rate_error = ai_suggestion_rate_limiter.is_allowed(current_session_id())
+                if not allowed:
+                    st.warning(rate_error)
+                    return value
+                try:
+                    # Initialize AI assistant
+                    assistant = FormAIAssistant()
+                    
+                    # Retrieve context, then show the suggestion as it is generated
+                    with st.spinner("Generiram predlog..."):
+                        stream = assistant.stream_ai_suggestion(
                             form_section=form_section,
                             field_name=field_name,
                             context=context or {}
                         )
-                        
-                        # Update session state with suggestion
-                        st.session_state[field_key] = suggestion
-                        st.success(" AI predlog generiran!")
-                        st.rerun()
-                        
-                    except Exception as e:
-                        st.error(f" Napaka pri generiranju: {str(e)}")
+                    suggestion = st.write_stream(stream)
+                    
+                    # Update session state with suggestion
+                    st.session_state[field_key] = suggestion
+                    st.success(" AI predlog generiran!")
+                    st.rerun()
+                    
+                except Exception as e:
+                    st.error(f" Napaka pri generiranju: {str(e)}")
     
     return value
 
@@ -233,25 +239,30 @@ def render_ai_text_input(
                 button_help = "Generiraj predlog z AI"
             
             if st.button(button_label, key=button_key, help=button_help):
-                with st.spinner("Generiram predlog..."):
-                    try:
-                        # Initialize AI assistant
-                        assistant = FormAIAssistant()
-                        
-                        # Get AI suggestion
-                        suggestion = assistant.get_ai_suggestion(
+                allowed, rate_error = ai_suggestion_rate_limiter.is_allowed(current_session_id())
+                if not allowed:
+                    st.warning(rate_error)
+                    return value
+                try:
+                    # Initialize AI assistant
+                    assistant = FormAIAssistant()
+                    
+                    # Retrieve context, then show the suggestion as it is generated
+                    with st.spinner("Generiram predlog..."):
+                        stream = assistant.stream_ai_suggestion(
                             form_section=form_section,
                             field_name=field_name,
                             context=context or {}
                         )
-                        
-                        # Update session state with suggestion
-                        st.session_state[field_key] = suggestion
-                        st.success(" AI predlog generiran!")
-                        st.rerun()
-                        
-                    except Exception as e:
-                        st.error(f" Napaka pri generiranju: {str(e)}")
+                    suggestion = st.write_stream(stream)
+                    
+                    # Update session state with suggestion
+                    st.session_state[field_key] = suggestion
+                    st.success(" AI predlog generiran!")
+                    st.rerun()
+                    
+                except Exception as e:
+                    st.error(f" Napaka pri generiranju: {str(e)}")
     
     return value
 
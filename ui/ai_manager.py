@@ -5,12 +5,19 @@ import json
 import uuid
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union
 from dotenv import load_dotenv
 import pandas as pd
 import numpy as np
 import database
 from utils.validations import ValidationManager
+from utils.metrics import metrics
+from utils.rate_limiter import document_upload_rate_limiter, current_session_id
+from services.llm_stream import ChatStream, stream_chat
+from services.response_cache import get_response_cache, prompt_version, hit_rates, current_org
+from services.prompt_registry import get_prompt_registry
+from services.context_packer import PackedContext, count_tokens, pack_context
+from services.hybrid_search import hybrid_search
 
 # Import AI processing capabilities
 try:
@@ -490,18 +497,22 @@ def render_document_management():
                 """)
                 
                 if st.button(" Naloži dokument", type="primary", use_container_width=True):
-                    with st.spinner("Nalagam dokument..."):
-                        doc_id = save_document(
-                            file=uploaded_file,
-                            tip_dokumenta=tip_dokumenta,
-                            description=description,
-                            tags=tags
-                        )
-                        if doc_id:
-                            st.success(f" Dokument uspešno naložen (ID: {doc_id})")
-                            st.rerun()
-                        else:
-                            st.error(" Napaka pri nalaganju dokumenta")
+                    allowed, rate_error = document_upload_rate_limiter.is_allowed(current_session_id())
+                    if not allowed:
+                        st.warning(rate_error)
+                    else:
+                        with st.spinner("Nalagam dokument..."):
+                            doc_id = save_document(
+                                file=uploaded_file,
+                                tip_dokumenta=tip_dokumenta,
+                                description=description,
+                                tags=tags
+                            )
+                            if doc_id:
+                                st.success(f" Dokument uspešno naložen (ID: {doc_id})")
+                                st.rerun()
+                            else:
+                                st.error(" Napaka pri nalaganju dokumenta")
     
     st.divider()
     
@@ -867,10 +878,8 @@ def perform_ai_search(query: str, doc_type_filter: str, limit: int):
             
             if results:
                 # Always generate AI response (except for raw search)
-                st.info(" Generiram odgovor...")
-                
-                # Generate AI response
-                ai_response = ai_service.generate_response(
+                # Generate AI response (rendered token by token below)
+                ai_stream = ai_service.stream_response(
                     query=query,
                     chunks=results[:10],  # Use top 10 chunks for context
                     context_mode="document",
@@ -881,13 +890,8 @@ def perform_ai_search(query: str, doc_type_filter: str, limit: int):
                 if is_summary_request:
                     # For summaries - full width, no chunks shown by default
                     st.markdown("###  Povzetek dokumenta")
-                    st.markdown(f"""
-                    <div style="background: var(--bg-secondary, #FAFAFA); 
-                                padding: 20px; border-radius: var(--radius-md, 6px); 
-                                border: 1px solid var(--border, #E5E5E5); margin: 20px 0;">
-                        <div style="color: var(--text-primary, #000000);">{ai_response}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    with st.container(border=True):
+                        st.write_stream(ai_stream)
                     
                     # Source chunks in expander for summaries
                     with st.expander(" Viri (kosi dokumenta)", expanded=False):
@@ -899,13 +903,8 @@ def perform_ai_search(query: str, doc_type_filter: str, limit: int):
                 else:
                     # For Q&A - show answer AND relevant chunks
                     st.markdown("###  Odgovor AI")
-                    st.markdown(f"""
-                    <div style="background: rgba(16, 185, 129, 0.05); 
-                                padding: 20px; border-radius: var(--radius-md, 6px); 
-                                border: 1px solid rgba(16, 185, 129, 0.2); margin: 20px 0;">
-                        <div style="color: var(--text-primary, #000000);">{ai_response}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    with st.container(border=True):
+                        st.write_stream(ai_stream)
                     
                     st.success(f" Odgovor ustvarjen iz {min(10, len(results))} najdenih delov")
                     
@@ -1008,22 +1007,28 @@ def render_query_interface():
         if not AI_PROCESSING_AVAILABLE:
             st.error("AI procesiranje ni na voljo. Preverite konfiguracijo.")
         else:
-            with st.spinner("Iščem odgovor..."):
-                try:
-                    engine = QueryEngine()
-                    result = engine.process_query(query)
-                    
-                    # Store in session
-                    st.session_state.query_history.append(result)
-                    
-                    if query not in st.session_state.recent_queries:
-                        st.session_state.recent_queries.append(query)
-                        # Keep only last 10 recent queries
-                        if len(st.session_state.recent_queries) > 10:
-                            st.session_state.recent_queries.pop(0)
-                            
-                except Exception as e:
-                    st.error(f"Napaka pri procesiranju poizvedbe: {str(e)}")
+            try:
+                engine = QueryEngine()
+                with st.spinner("Iščem odgovor..."):
+                    stream = engine.stream_query(query)
+                
+                # Stream the answer as it arrives; the result is complete once the stream ends
+                st.markdown("###  Odgovor")
+                st.write_stream(stream)
+                result = stream.result
+                st.session_state.streamed_query = result
+                
+                # Store in session
+                st.session_state.query_history.append(result)
+                
+                if query not in st.session_state.recent_queries:
+                    st.session_state.recent_queries.append(query)
+                    # Keep only last 10 recent queries
+                    if len(st.session_state.recent_queries) > 10:
+                        st.session_state.recent_queries.pop(0)
+                        
+            except Exception as e:
+                st.error(f"Napaka pri procesiranju poizvedbe: {str(e)}")
     
     # Display results
     if st.session_state.query_history:
@@ -1041,8 +1046,10 @@ def render_query_interface():
         ">
         """, unsafe_allow_html=True)
         
-        st.markdown(f"###  Odgovor")
-        st.write(latest_result['response'])
+        # Already streamed above on the run that answered it
+        if st.session_state.pop('streamed_query', None) is not latest_result:
+            st.markdown(f"###  Odgovor")
+            st.write(latest_result['response'])
         
         # Metrics
         col1, col2, col3 = st.columns(3)
@@ -1052,6 +1059,9 @@ def render_query_interface():
             st.metric("Zanesljivost", f"{latest_result['confidence']:.0%}")
         with col3:
             st.metric("Viri", len(latest_result['sources']))
+        if latest_result.get('cache'):
+            st.caption("Odgovor iz predpomnilnika" +
+                       (" (podobno vprašanje)" if latest_result['cache'] == 'semantic' else ""))
         
         # Sources
         if latest_result['sources']:
@@ -1578,6 +1588,8 @@ def render_analytics_dashboard():
             f"~${analytics['estimated_cost']:.2f}"
         )
     
+    render_response_cache_metrics()
+    
     # TODO(human): Add export analytics report button here
     # Use st.download_button with generate_analytics_report function
     
@@ -1698,6 +1710,45 @@ def render_analytics_dashboard():
             st.plotly_chart(fig, use_container_width=True)
 
 
+def render_response_cache_metrics():
+    """Hit rates of the shared AI response cache (since server start) and stored entries"""
+    st.markdown("###  Predpomnilnik odgovorov")
+    
+    try:
+        cache_stats = get_response_cache().get_cache_stats()
+    except Exception as e:
+        st.warning(f"Statistika predpomnilnika ni na voljo: {str(e)}")
+        return
+    rates = hit_rates()
+    
+    namespaces = {'field_suggestion': 'Predlogi za polja', 'rag_answer': 'Odgovori iz baze znanja'}
+    columns = st.columns(len(namespaces) + 1)
+    for col, (namespace, label) in zip(columns, namespaces.items()):
+        rate = rates.get(namespace, {})
+        stored = cache_stats['namespaces'].get(namespace, {})
+        with col:
+            st.metric(
+                f"Zadetki: {label}",
+                f"{rate.get('hit_rate', 0):.0%}",
+                f"{int(rate.get('lookups', 0))} iskanj, {rate.get('semantic_rate', 0):.0%} semantičnih",
+                delta_color="off"
+            )
+            st.caption(f"{stored.get('entries', 0)} shranjenih odgovorov, "
+                       f"{stored.get('total_hits', 0)} zadetkov, "
+                       f"~{stored.get('tokens_saved', 0):,} prihranjenih tokenov")
+    
+    with columns[-1]:
+        st.metric(
+            "Shranjenih odgovorov",
+            f"{cache_stats['entries']:,}",
+            f"največ {cache_stats['max_entries']:,}, TTL {cache_stats['ttl_hours']:.0f} h",
+            delta_color="off"
+        )
+        if st.button("Počisti predpomnilnik", key="clear_response_cache"):
+            removed = get_response_cache().invalidate(org=current_org())
+            st.success(f"Odstranjenih {removed} odgovorov")
+
+
 def load_analytics_data(start_date, end_date):
     """Load analytics data from database"""
     
@@ -2191,67 +2242,27 @@ def delete_document(doc_id: int) -> bool:
 
 def get_prompt(prompt_key: str) -> Optional[Dict]:
     """Get a prompt by key"""
-    with sqlite3.connect(database.DATABASE_FILE) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM ai_system_prompts 
-            WHERE prompt_key = ?
-        """, (prompt_key,))
-        result = cursor.fetchone()
-        return dict(result) if result else None
+    return get_prompt_registry().get(prompt_key)
 
 def save_prompt(prompt_key: str, form_section: str, field_name: str, 
                 prompt_text: str, description: str, is_active: bool) -> bool:
-    """Save or update a prompt"""
+    """Save or update a prompt (updates bump its version)"""
     try:
-        with sqlite3.connect(database.DATABASE_FILE) as conn:
-            cursor = conn.cursor()
-            
-            # Check if exists
-            existing = get_prompt(prompt_key)
-            
-            if existing:
-                # Update existing
-                cursor.execute("""
-                    UPDATE ai_system_prompts 
-                    SET prompt_text = ?, description = ?, is_active = ?, 
-                        version = version + 1, updated_at = CURRENT_TIMESTAMP
-                    WHERE prompt_key = ?
-                """, (prompt_text, description, is_active, prompt_key))
-            else:
-                # Insert new
-                cursor.execute("""
-                    INSERT INTO ai_system_prompts 
-                    (prompt_key, form_section, field_name, prompt_text, description, is_active)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (prompt_key, form_section, field_name, prompt_text, description, is_active))
-            
-            conn.commit()
-            return True
+        get_prompt_registry().save(prompt_key, form_section, field_name,
+                                   prompt_text, description, is_active)
+        return True
     except Exception as e:
         st.error(f"Napaka pri shranjevanju poziva: {str(e)}")
         return False
 
 def load_all_prompts() -> List[Dict]:
     """Load all prompts"""
-    with sqlite3.connect(database.DATABASE_FILE) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM ai_system_prompts 
-            ORDER BY form_section, field_name
-        """)
-        return [dict(row) for row in cursor.fetchall()]
+    return get_prompt_registry().all()
 
 def delete_prompt(prompt_id: int) -> bool:
     """Delete a prompt"""
     try:
-        with sqlite3.connect(database.DATABASE_FILE) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM ai_system_prompts WHERE id = ?", (prompt_id,))
-            conn.commit()
-            return True
+        return get_prompt_registry().delete(prompt_id)
     except Exception as e:
         st.error(f"Napaka pri brisanju: {str(e)}")
         return False
@@ -2447,6 +2458,14 @@ Odgovori samo s konkretnimi merili in načinom točkovanja.
     return default_prompts.get(prompt_key, "Generiraj ustrezen predlog za to polje na podlagi konteksta.")
 
 
+QUERY_SYSTEM_PROMPT = """
+Si AI asistent za javna naročila. Odgovori na vprašanje na podlagi podanega konteksta.
+Če informacije ni v kontekstu, to jasno povej.
+Odgovori v slovenščini.
+Bodi konkreten in jedrnat.
+"""
+
+
 # Query Engine Implementation
 class QueryEngine:
     """RAG implementation for knowledge base queries"""
@@ -2470,23 +2489,50 @@ class QueryEngine:
     
     def process_query(self, query: str, top_k: int = 5) -> Dict:
         """Process user query through RAG pipeline"""
-        
+        stream = self.stream_query(query, top_k)
+        for _ in stream:
+            pass
+        return stream.result
+    
+    def stream_query(self, query: str, top_k: int = 5) -> ChatStream:
+        """Run retrieval now and stream the answer.
+        
+        Iterate the returned stream (or pass it to st.write_stream); once it
+        ends, stream.result holds the same dict process_query returns and the
+        query has been logged. Answers over the same retrieved chunks are
+        served from the shared response cache (stream.cache is 'exact' or
+        'semantic' then) and new answers are stored in it.
+        """
         start_time = datetime.now()
         
+        def error_result(error: Exception) -> ChatStream:
+            stream = ChatStream.from_text(f"Napaka pri iskanju: {str(error)}")
+            stream.result = {
+                'query': query,
+                'response': stream.text,
+                'sources': {},
+                'response_time': (datetime.now() - start_time).total_seconds(),
+                'timestamp': datetime.now(),
+                'confidence': 0,
+                'query_id': None,
+                'cache': None
+            }
+            return stream
+        
         try:
-            # 1. Generate query embedding
+            # 1-2. Lexical (BM25) search, fused with vector search unless it is conclusive
             if not self.embedding_gen:
                 raise ValueError("Embedding generator not available")
-                
-            query_embedding = self.embedding_gen.generate_single_embedding(query)
-            if not query_embedding:
-                raise ValueError("Failed to generate query embedding")
             
-            # 2. Search similar chunks in Qdrant
-            search_results = self.vector_store.search(
-                query_vector=query_embedding,
-                top_k=top_k
+            retrieval = hybrid_search(
+                query, top_k,
+                embed=self.embedding_gen.generate_single_embedding,
+                vector_search=lambda vector, limit: self.vector_store.search(query_vector=vector, top_k=limit)
             )
+            query_embedding = retrieval.query_embedding
+            if retrieval.mode != 'lexical' and not query_embedding:
+                raise ValueError("Failed to generate query embedding")
+            search_results = retrieval.hits
             
             # 3. Assemble context
             context_chunks = []
@@ -2497,7 +2543,12 @@ class QueryEngine:
                 doc_id = hit.payload.get('document_id', 0)
                 confidence = hit.score
                 
-                context_chunks.append(chunk_text)
+                context_chunks.append({
+                    'id': getattr(hit, 'id', None) or f"{doc_id}:{hit.payload.get('chunk_index', 0)}",
+                    'text': chunk_text,
+                    'score': confidence,
+                    'document_id': doc_id
+                })
                 
                 # Get document name
                 if doc_id not in sources:
@@ -2509,62 +2560,88 @@ class QueryEngine:
                     }
                 sources[doc_id]['chunks'].append(hit.payload.get('chunk_index', 0))
             
-            # 4. Generate response
-            response = self.generate_response(query, context_chunks)
-            
+            # Deduplicate and fit the chunks into the context token budget
+            packed = pack_context(context_chunks, call='query_engine')
+            chunk_ids = [chunk['id'] for chunk in packed.chunks]
+            
+            # 4. Reuse a cached answer or generate one (streamed)
+            cache_key = {
+                'namespace': 'rag_answer',
+                'model': self.response_model(),
+                'version': prompt_version(QUERY_SYSTEM_PROMPT),
+                'prompt': query,
+                'chunk_ids': chunk_ids
+            }
+            cached = get_response_cache().get(embedding=query_embedding, **cache_key) \
+                if packed.chunks and self.openai_client else None
+            if cached:
+                stream = ChatStream.from_text(cached[0])
+                stream.cache = cached[1]
+            else:
+                stream = self.stream_response(query, packed)
+                stream.cache = None
+                
+                def store(stream: ChatStream):
+                    if stream.completed and stream.client is not None:
+                        get_response_cache().put(
+                            response=stream.text, embedding=query_embedding,
+                            tokens=stream.usage.get('prompt_tokens', 0) + stream.usage.get('completion_tokens', 0),
+                            **cache_key
+                        )
+                stream.add_done_callback(store)
+        except Exception as e:
+            # Return error response
+            return error_result(e)
+        
+        def finish(stream: ChatStream):
             # 5. Calculate metrics
-            end_time = datetime.now()
-            response_time = (end_time - start_time).total_seconds()
+            response_time = (datetime.now() - start_time).total_seconds()
             
             # Calculate confidence score
             avg_confidence = sum(s['confidence'] for s in sources.values()) / len(sources) if sources else 0
             
             # 6. Log query
-            query_id = self.log_query(query, response, sources, response_time, avg_confidence)
+            query_id = self.log_query(query, stream.text, sources, response_time, avg_confidence,
+                                      tokens_used=sum(stream.usage.get(k, 0) for k in ('prompt_tokens', 'completion_tokens')))
             
-            return {
+            stream.result = {
                 'query': query,
-                'response': response,
+                'response': stream.text,
                 'sources': sources,
                 'response_time': response_time,
                 'timestamp': datetime.now(),
                 'confidence': avg_confidence,
-                'query_id': query_id
-            }
-            
-        except Exception as e:
-            # Return error response
-            end_time = datetime.now()
-            response_time = (end_time - start_time).total_seconds()
-            
-            return {
-                'query': query,
-                'response': f"Napaka pri iskanju: {str(e)}",
-                'sources': {},
-                'response_time': response_time,
-                'timestamp': datetime.now(),
-                'confidence': 0,
-                'query_id': None
+                'query_id': query_id,
+                'cache': stream.cache,
+                'context': packed.stats(),
+                'retrieval': retrieval.mode
             }
+        
+        return stream.add_done_callback(finish)
     
     def generate_response(self, query: str, context_chunks: List[str]) -> str:
         """Generate response using OpenAI"""
+        return ''.join(self.stream_response(query, context_chunks))
+    
+    def stream_response(self, query: str, context_chunks: Union[List[str], PackedContext]) -> ChatStream:
+        """Streaming variant of generate_response: an iterator of text deltas.
+        
+        Chunks are packed into the context token budget unless already packed.
+        """
         
         if not self.openai_client:
-            return "OpenAI API ni na voljo. Preverite konfiguracijo."
+            return ChatStream.from_text("OpenAI API ni na voljo. Preverite konfiguracijo.")
         
-        if not context_chunks:
-            return "Ni najdenih relevantnih dokumentov za vaše vprašanje."
+        if not isinstance(context_chunks, PackedContext):
+            context_chunks = pack_context(context_chunks, call='query_engine')
         
-        context = "\n\n".join(context_chunks)
+        if not context_chunks.chunks:
+            return ChatStream.from_text("Ni najdenih relevantnih dokumentov za vaše vprašanje.")
+        
+        context = context_chunks.text
         
         messages = [
-            {"role": "system", "content": """
-Si AI asistent za javna naročila. Odgovori na vprašanje na podlagi podanega konteksta.
-Če informacije ni v kontekstu, to jasno povej.
-Odgovori v slovenščini.
-Bodi konkreten in jedrnat.
-"""},
+            {"role": "system", "content": QUERY_SYSTEM_PROMPT},
             {"role": "user", "content": f"""
 Kontekst:
 {context}
@@ -2573,27 +2650,27 @@ Vprašanje: {query}
 """}
         ]
         
-        try:
-            response = self.openai_client.chat.completions.create(
-                model=os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview'),
-                messages=messages,
-                temperature=0.3,  # Lower temperature for factual responses
-                max_tokens=int(os.getenv('AI_MAX_TOKENS', 1000))
-            )
-            
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Napaka pri generiranju odgovora: {str(e)}"
+        return stream_chat(
+            self.openai_client, 'query_engine', self.response_model(), messages,
+            error_prefix="Napaka pri generiranju odgovora: ",
+            temperature=0.3,  # Lower temperature for factual responses
+            max_tokens=int(os.getenv('AI_MAX_TOKENS', 1000))
+        )
+    
+    def response_model(self) -> str:
+        return os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview')
     
     def log_query(self, query: str, response: str, sources: Dict, 
-                  response_time: float, confidence: float) -> Optional[int]:
+                  response_time: float, confidence: float,
+                  tokens_used: Optional[int] = None) -> Optional[int]:
         """Log query to database for analytics"""
         try:
             with sqlite3.connect(database.DATABASE_FILE) as conn:
                 cursor = conn.cursor()
                 
-                # Estimate tokens (rough approximation)
-                tokens_used = (len(query) + len(response)) // 4
+                # Count tokens unless the API reported usage
+                if tokens_used is None:
+                    tokens_used = count_tokens(query) + count_tokens(response)
                 
                 # Insert query log
                 cursor.execute("""
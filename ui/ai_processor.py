@@ -16,6 +16,16 @@ import logging
 import streamlit as st
 from dotenv import load_dotenv
 import database
+from utils.qdrant_init import (
+    get_vector_storage_config, build_vectors_config, build_quantization_config,
+    build_search_params, embedding_request_kwargs, fit_embedding
+)
+from utils.metrics import metrics
+from utils.single_flight import ai_calls, fingerprint, model_limits
+from services.llm_stream import ChatStream, stream_chat
+from services.prompt_registry import get_prompt_registry, version_tag
+from services.response_cache import prompt_version
+from services.hybrid_search import hybrid_search
 
 try:
     import openai
@@ -89,14 +99,37 @@ class DocumentProcessor:
         
         return chunks
     
+    # Bump when extraction output changes so cached results are not reused
+    EXTRACTOR_VERSION = '1'
+    
     def extract_text_from_file(self, file_path: str, file_type: str) -> str:
         """Extract text from various file formats"""
         text = ""
         
+        # Same bytes may already have been extracted via form documents or Qdrant
+        cache = None
+        file_hash = None
+        try:
+            from services.extraction_cache import (
+                get_extraction_cache, compute_file_hash, extractor_version
+            )
+            cache = get_extraction_cache()
+            file_hash = compute_file_hash(file_path)
+            version = extractor_version(self.EXTRACTOR_VERSION)
+            cached = cache.get(file_hash, 'ai_processor', version)
+            if cached is not None:
+                return cached[0]
+        except Exception as e:
+            logger.debug(f"Extraction cache unavailable for {file_path}: {e}")
+            cache = None
+        
         try:
             if file_type in ['.txt', '.md']:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     text = f.read()
+                if cache is not None:
+                    cache.put(file_hash, 'ai_processor', version, text,
+                              {'file_type': file_type, 'extraction_method': 'direct'})
             
             elif file_type == '.pdf':
                 # For PDF extraction, we'd need PyPDF2 or similar
@@ -232,6 +265,7 @@ class EmbeddingGenerator:
         
         self.client = OpenAI(api_key=api_key)
         self.model = os.getenv('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
+        self.vector_storage = get_vector_storage_config()
     
     def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Batch generate embeddings"""
@@ -243,12 +277,16 @@ class EmbeddingGenerator:
             for i in range(0, len(texts), max_batch_size):
                 batch = texts[i:i + max_batch_size]
                 
-                response = self.client.embeddings.create(
-                    model=self.model,
-                    input=batch
-                )
+                with model_limits.limit(self.model), \
+                        metrics.time('ai_call_seconds', call='embedding', model=self.model):
+                    response = self.client.embeddings.create(
+                        model=self.model,
+                        input=batch,
+                        **embedding_request_kwargs(self.model, self.vector_storage)
+                    )
                 
-                batch_embeddings = [item.embedding for item in response.data]
+                batch_embeddings = [fit_embedding(item.embedding, self.vector_storage)
+                                    for item in response.data]
                 all_embeddings.extend(batch_embeddings)
             
             return all_embeddings
@@ -259,8 +297,9 @@ class EmbeddingGenerator:
             return []
     
     def generate_single_embedding(self, text: str) -> Optional[List[float]]:
-        """Generate embedding for a single text"""
-        embeddings = self.generate_embeddings([text])
+        """Generate embedding for a single text (concurrent identical requests share one call)"""
+        key = fingerprint('embedding', self.model, self.vector_storage, text)
+        embeddings = ai_calls.do(key, lambda: self.generate_embeddings([text]), call='embedding')
         return embeddings[0] if embeddings else None
 
 
@@ -278,6 +317,7 @@ class VectorStoreManager:
                 api_key=os.getenv('QDRANT_API_KEY') if os.getenv('QDRANT_API_KEY') != 'test-qdrant-api-key' else None
             )
             self.collection_name = os.getenv('QDRANT_COLLECTION_NAME', 'javna_narocila')
+            self.vector_storage = get_vector_storage_config()
             self.ensure_collection()
         except Exception as e:
             logger.warning(f"Qdrant connection failed: {e}. Running in offline mode.")
@@ -293,10 +333,8 @@ class VectorStoreManager:
             if not any(c.name == self.collection_name for c in collections):
                 self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=1536,  # OpenAI embedding size
-                        distance=Distance.COSINE
-                    )
+                    vectors_config=build_vectors_config(self.vector_storage),
+                    quantization_config=build_quantization_config(self.vector_storage)
                 )
                 logger.info(f"Created Qdrant collection: {self.collection_name}")
         except Exception as e:
@@ -367,7 +405,8 @@ class VectorStoreManager:
                 query_filter=search_filter,
                 limit=top_k,
                 with_payload=True,
-                with_vectors=False
+                with_vectors=False,
+                search_params=build_search_params(self.vector_storage)
             )
             
             return results
@@ -393,9 +432,14 @@ class FormAIAssistant:
     def get_ai_suggestion(self, form_section: str, field_name: str, 
                          context: dict) -> str:
         """Generate AI suggestion for specific field"""
+        return ''.join(self.stream_ai_suggestion(form_section, field_name, context))
+    
+    def stream_ai_suggestion(self, form_section: str, field_name: str,
+                             context: dict) -> ChatStream:
+        """Streaming variant of get_ai_suggestion; usage is logged when the stream ends"""
         try:
             # Get system prompt
-            prompt = self.get_system_prompt(form_section, field_name)
+            prompt, version, prompt_id = self.resolve_system_prompt(form_section, field_name)
             
             # Build context query
             query = self.build_context_query(form_section, field_name, context)
@@ -407,34 +451,30 @@ class FormAIAssistant:
                 document_types=self.get_relevant_doc_types(form_section)
             )
             
-            # Generate suggestion
-            suggestion = self.generate_suggestion(prompt, relevant_docs, context)
-            
-            # Log usage
-            self.log_usage(form_section, field_name, suggestion)
-            
-            return suggestion
+            # Generate suggestion, then log usage
+            stream = self.stream_suggestion(prompt, relevant_docs, context).add_done_callback(
+                lambda stream: self.log_usage(form_section, field_name, stream.text, prompt_id)
+            )
+            stream.prompt_version = version
+            return stream
             
         except Exception as e:
             logger.error(f"Error generating AI suggestion: {e}")
-            return f"Napaka pri generiranju predloga: {str(e)}"
+            return ChatStream.from_text(f"Napaka pri generiranju predloga: {str(e)}")
     
     def get_system_prompt(self, form_section: str, field_name: str) -> str:
         """Get system prompt from database or use default"""
-        with sqlite3.connect(database.DATABASE_FILE) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT prompt_text FROM ai_system_prompts 
-                WHERE form_section = ? AND field_name = ? AND is_active = 1
-                ORDER BY version DESC LIMIT 1
-            """, (form_section, field_name))
-            result = cursor.fetchone()
-            
-            if result:
-                return result[0]
-            else:
-                # Use default prompt
-                return self.get_default_prompt(form_section, field_name)
+        return self.resolve_system_prompt(form_section, field_name)[0]
+    
+    def resolve_system_prompt(self, form_section: str, field_name: str) -> Tuple[str, str, int]:
+        """System prompt for a field with its version tag and stored prompt id (0 for defaults)"""
+        stored = get_prompt_registry().active(form_section, field_name)
+        if stored:
+            return stored['prompt_text'], version_tag(stored), stored['id']
+        
+        # Use default prompt
+        prompt = self.get_default_prompt(form_section, field_name)
+        return prompt, f"default@{prompt_version(prompt)}", 0
     
     def get_default_prompt(self, section: str, field: str) -> str:
         """Get default prompt for a field"""
@@ -543,15 +583,14 @@ Odgovori samo s konkretnimi merili in načinom točkovanja.
                             document_types: List[str] = None) -> List[Dict]:
         """Search for relevant document chunks with optional type filtering"""
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_gen.generate_single_embedding(query)
-            
-            if not query_embedding:
-                return []
-            
-            # Search with optional filtering
+            # Lexical (BM25) search, fused with vector search unless it is conclusive
             filter_dict = {'document_types': document_types} if document_types else None
-            results = self.vector_store.search(query_embedding, top_k, filter_dict)
+            results = hybrid_search(
+                query, top_k,
+                embed=self.embedding_gen.generate_single_embedding,
+                vector_search=lambda vector, limit: self.vector_store.search(vector, limit, filter_dict),
+                document_types=document_types
+            ).hits
             
             # Extract and format results
             formatted_results = []
@@ -572,19 +611,23 @@ Odgovori samo s konkretnimi merili in načinom točkovanja.
     def generate_suggestion(self, prompt: str, context_docs: List[Dict], 
                           form_context: dict) -> str:
         """Generate suggestion using OpenAI"""
+        return ''.join(self.stream_suggestion(prompt, context_docs, form_context))
+    
+    def stream_suggestion(self, prompt: str, context_docs: List[Dict],
+                          form_context: dict) -> ChatStream:
+        """Streaming variant of generate_suggestion: an iterator of text deltas"""
         if not self.openai_client:
-            return "OpenAI API ni na voljo. Preverite konfiguracijo."
+            return ChatStream.from_text("OpenAI API ni na voljo. Preverite konfiguracijo.")
         
-        try:
-            # Prepare context from documents
-            context_text = "\n\n".join([
-                f"[{doc['tip_dokumenta']}] {doc['text']}" 
-                for doc in context_docs
-            ])
-            
-            messages = [
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": f"""
+        # Prepare context from documents
+        context_text = "\n\n".join([
+            f"[{doc['tip_dokumenta']}] {doc['text']}" 
+            for doc in context_docs
+        ])
+        
+        messages = [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": f"""
 Kontekst dokumentov:
 {context_text}
 
@@ -593,36 +636,26 @@ Podatki obrazca:
 
 Generiraj ustrezen predlog za to polje.
 """}
-            ]
-            
-            response = self.openai_client.chat.completions.create(
-                model=os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview'),
-                messages=messages,
-                temperature=float(os.getenv('AI_TEMPERATURE', 0.7)),
-                max_tokens=int(os.getenv('AI_MAX_TOKENS', 500))
-            )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            logger.error(f"Error generating suggestion: {e}")
-            return f"Napaka pri generiranju: {str(e)}"
+        ]
+        
+        model = os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview')
+        return stream_chat(
+            self.openai_client, 'form_suggestion', model, messages,
+            error_prefix="Napaka pri generiranju: ",
+            temperature=float(os.getenv('AI_TEMPERATURE', 0.7)),
+            max_tokens=int(os.getenv('AI_MAX_TOKENS', 500))
+        )
     
-    def log_usage(self, form_section: str, field_name: str, suggestion: str):
+    def log_usage(self, form_section: str, field_name: str, suggestion: str,
+                  prompt_id: Optional[int] = None):
         """Log AI usage for analytics"""
         try:
+            if prompt_id is None:
+                prompt_id = self.resolve_system_prompt(form_section, field_name)[2]
+            
             with sqlite3.connect(database.DATABASE_FILE) as conn:
                 cursor = conn.cursor()
                 
-                # Get prompt ID
-                cursor.execute("""
-                    SELECT id FROM ai_system_prompts 
-                    WHERE form_section = ? AND field_name = ? AND is_active = 1
-                    ORDER BY version DESC LIMIT 1
-                """, (form_section, field_name))
-                result = cursor.fetchone()
-                prompt_id = result[0] if result else 0
-                
                 # Log usage
                 cursor.execute("""
                     INSERT INTO ai_prompt_usage_log 
@@ -645,6 +678,9 @@ Generiraj ustrezen predlog za to polje.
                     """, (prompt_id,))
                 
                 conn.commit()
+            
+            if prompt_id:
+                get_prompt_registry().note_usage(prompt_id)
                 
         except Exception as e:
             logger.error(f"Error logging usage: {e}")
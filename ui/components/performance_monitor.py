@@ -9,20 +9,23 @@ from typing import Dict, List, Optional, Any
 from functools import wraps
 import psutil
 import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.metrics import metrics
 
 
 class PerformanceMonitor:
-    """Monitor and track performance metrics"""
+    """Monitor and track performance metrics
+    
+    Timings are recorded in the process-wide metrics registry
+    (utils.metrics) as bounded histograms, shared across sessions.
+    """
     
     def __init__(self):
         """Initialize performance monitor"""
-        if 'performance_metrics' not in st.session_state:
-            st.session_state.performance_metrics = {
-                'page_loads': [],
-                'component_renders': {},
-                'api_calls': [],
-                'memory_usage': []
-            }
+        # Drop per-session lists left over from older versions
+        st.session_state.pop('performance_metrics', None)
     
     @staticmethod
     def track_page_load(page_name: str):
@@ -35,23 +38,16 @@ class PerformanceMonitor:
         def decorator(func):
             @wraps(func)
             def wrapper(*args, **kwargs):
-                start_time = time.time()
-                result = func(*args, **kwargs)
-                load_time = time.time() - start_time
-                
-                # Store metric
-                if 'performance_metrics' in st.session_state:
-                    st.session_state.performance_metrics['page_loads'].append({
-                        'page': page_name,
-                        'load_time': load_time,
-                        'timestamp': time.time()
-                    })
-                
-                # Show warning if slow
-                if load_time > 2.0:
-                    st.warning(f"Slow page load detected: {load_time:.2f}s")
-                
-                return result
+                start_time = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    load_time = time.perf_counter() - start_time
+                    metrics.observe('page_load_seconds', load_time, page=page_name)
+                    
+                    # Show warning if slow
+                    if load_time > 2.0:
+                        st.warning(f"Slow page load detected: {load_time:.2f}s")
             return wrapper
         return decorator
     
@@ -66,21 +62,12 @@ class PerformanceMonitor:
         def decorator(func):
             @wraps(func)
             def wrapper(*args, **kwargs):
-                start_time = time.time()
-                result = func(*args, **kwargs)
-                render_time = time.time() - start_time
-                
-                # Store metric
-                if 'performance_metrics' in st.session_state:
-                    if component_name not in st.session_state.performance_metrics['component_renders']:
-                        st.session_state.performance_metrics['component_renders'][component_name] = []
-                    
-                    st.session_state.performance_metrics['component_renders'][component_name].append({
-                        'render_time': render_time,
-                        'timestamp': time.time()
-                    })
-                
-                return result
+                start_time = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    metrics.observe('component_render_seconds', time.perf_counter() - start_time,
+                                    component=component_name)
             return wrapper
         return decorator
     
@@ -109,28 +96,49 @@ class PerformanceMonitor:
         Returns:
             Performance metrics summary
         """
-        if 'performance_metrics' not in st.session_state:
+        page_loads = metrics.snapshot('page_load_seconds')
+        if not page_loads and not metrics.snapshot('component_render_seconds'):
             return {}
         
-        metrics = st.session_state.performance_metrics
-        
-        # Calculate averages
-        avg_page_load = 0
-        if metrics['page_loads']:
-            avg_page_load = sum(p['load_time'] for p in metrics['page_loads']) / len(metrics['page_loads'])
+        total_page_loads = sum(p['count'] for p in page_loads)
+        avg_page_load = sum(p['sum'] for p in page_loads) / total_page_loads if total_page_loads else 0
         
-        component_avgs = {}
-        for component, renders in metrics['component_renders'].items():
-            if renders:
-                component_avgs[component] = sum(r['render_time'] for r in renders) / len(renders)
+        component_avgs = {
+            c['labels'].get('component', 'other'): c['mean']
+            for c in metrics.snapshot('component_render_seconds')
+        }
         
         return {
             'avg_page_load': avg_page_load,
-            'total_page_loads': len(metrics['page_loads']),
+            'total_page_loads': total_page_loads,
             'component_averages': component_avgs,
+            'latency_percentiles': PerformanceMonitor.get_latency_percentiles(),
             'memory_usage': PerformanceMonitor.get_memory_usage()
         }
     
+    @staticmethod
+    def get_latency_percentiles() -> List[Dict[str, Any]]:
+        """
+        p50/p95/p99 for every latency histogram (pages, components, SQL, AI calls)
+        
+        Returns:
+            One row per metric and label set
+        """
+        rows = []
+        for series in metrics.snapshot():
+            if series['kind'] != 'histogram' or not series['count']:
+                continue
+            rows.append({
+                'metric': series['name'],
+                'labels': ', '.join(f"{k}={v}" for k, v in series['labels'].items()),
+                'count': series['count'],
+                'p50_ms': series['p50'] * 1000,
+                'p95_ms': series['p95'] * 1000,
+                'p99_ms': series['p99'] * 1000,
+                'max_ms': series['max'] * 1000
+            })
+        return rows
+    
     @staticmethod
     def display_metrics():
         """Display performance metrics in UI"""
@@ -173,6 +181,13 @@ class PerformanceMonitor:
                 """,
                 key="memory_card"
             )
+        
+        # Latency percentiles across all sessions in this process
+        percentiles = summary.get('latency_percentiles', [])
+        if percentiles:
+            import pandas as pd
+            st.markdown("**Latence (p50 / p95 / p99)**")
+            st.dataframe(pd.DataFrame(percentiles).round(1), use_container_width=True, hide_index=True)
 
 
 class PerformanceOptimizations:
@@ -12,6 +12,7 @@ from ui.renderers.lot_manager import LotManager
 from ui.renderers.validation_renderer import ValidationRenderer
 from utils.validations import ValidationManager
 from utils.validation_adapter import ValidationAdapter
+from utils.rerun_profiler import traced
 
 
 class FormController:
@@ -76,6 +77,7 @@ class FormController:
         # This is just a local schema for this form controller instance
         # st.session_state['schema'] = schema  # REMOVED - was overwriting global schema
     
+    @traced('FormController.render_form', 'form')
     def render_form(self, 
                    schema: Optional[Dict[str, Any]] = None,
                    show_lot_navigation: bool = True,
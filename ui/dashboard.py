@@ -5,6 +5,7 @@ Provides table view with CRUD operations
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+import os
 import json
 import time
 import database
@@ -791,16 +792,24 @@ def display_procurements_table(procurements):
                 operation = st.radio("Izberite operacijo:", ["Izvoz", "Uvoz"])
                 
                 if operation == "Izvoz":
-                    procurement = database.get_procurement_by_id(st.session_state.export_selected_id)
-                    if procurement:
-                        import json
-                        export_data = json.dumps(procurement, indent=2, ensure_ascii=False)
-                        st.download_button(
-                            label="Prenesi JSON",
-                            data=export_data,
-                            file_name=f"narocilo_{st.session_state.export_selected_id}.json",
-                            mime="application/json"
-                        )
+                    from utils import db_export
+                    export_id = st.session_state.export_selected_id
+                    spec = db_export.ExportSpec(
+                        'javna_narocila', where='id = ?', params=(export_id,),
+                        json_columns={'form_data_json': 'form_data'}
+                    )
+                    path = db_export.temp_export_path(f'narocilo_{export_id}_', '.json')
+                    try:
+                        if db_export.export_to_json(path, spec, single=True):
+                            with open(path, 'rb') as handle:
+                                st.download_button(
+                                    label="Prenesi JSON",
+                                    data=handle,
+                                    file_name=f"narocilo_{export_id}.json",
+                                    mime="application/json"
+                                )
+                    finally:
+                        os.remove(path)
                 
                 elif operation == "Uvoz":
                     uploaded_file = st.file_uploader("Izberite JSON datoteko", type=['json'])
@@ -3,6 +3,7 @@ Database management module for admin panel.
 Provides schema visualization and CRUD operations for all tables.
 """
 
+import os
 import streamlit as st
 import sqlite3
 import pandas as pd
@@ -1056,7 +1057,10 @@ def render_database_tools():
     
     with col5:
         if st.button(" Izvozi celotno bazo", key="export_full", use_container_width=True):
-            export_full_database()
+            st.session_state.show_full_export = True
+
+    if st.session_state.get('show_full_export'):
+        export_full_database()
 
 
 def check_database_integrity():
@@ -1308,48 +1312,79 @@ def optimize_database():
 
 
 def export_full_database():
-    """Export the entire database to CSV files."""
+    """Export the database to an on-disk ZIP, streaming each table in chunks."""
+    from utils import db_export
+    import datetime
+
     st.markdown("###  Izvoz celotne baze podatkov")
-    
-    try:
-        import zipfile
-        import io
-        import datetime
-        
-        # Create a ZIP file in memory
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            
-            with sqlite3.connect(database.DATABASE_FILE) as conn:
-                for table in TABLES:
-                    # Read table data
-                    df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
-                    
-                    # Convert to CSV
-                    csv_data = df.to_csv(index=False)
-                    
-                    # Add to ZIP
-                    zip_file.writestr(f"{table}.csv", csv_data)
-                
-                # Add metadata file
-                metadata = f"""Database Export
-Generated: {datetime.datetime.now().isoformat()}
-Tables: {', '.join(TABLES)}
-Total tables: {len(TABLES)}
-"""
-                zip_file.writestr("metadata.txt", metadata)
-        
-        # Offer download
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        st.download_button(
-            label=" Prenesi izvoz baze (ZIP)",
-            data=zip_buffer.getvalue(),
-            file_name=f"database_export_{timestamp}.zip",
-            mime="application/zip"
+
+    with sqlite3.connect(database.DATABASE_FILE) as conn:
+        available = [table for table in db_export.existing_tables(conn) if table in TABLES]
+
+    col1, col2 = st.columns(2)
+    with col1:
+        formats = {'CSV': 'csv', 'JSON Lines': 'jsonl'}
+        if db_export.PARQUET_AVAILABLE:
+            formats['Parquet'] = 'parquet'
+        fmt = formats[st.selectbox("Format", list(formats), key="full_export_format")]
+    with col2:
+        log_days = st.number_input(
+            "Dnevniki zadnjih N dni (0 = vsi)", min_value=0, value=0, step=1, key="full_export_log_days"
         )
-        
-        st.success(" Izvoz pripravljen! Kliknite gumb za prenos.")
-        
-    except Exception as e:
-        st.error(f"Napaka pri izvozu: {str(e)}")
\ No newline at end of file
+    selected = st.multiselect(
+        "Tabele", available, default=available, format_func=lambda t: TABLE_NAMES.get(t, t),
+        key="full_export_tables"
+    )
+
+    col_run, col_close = st.columns(2)
+    with col_close:
+        if st.button("Zapri", key="full_export_close", use_container_width=True):
+            st.session_state.show_full_export = False
+            st.session_state.pop('full_export_path', None)
+            st.rerun()
+    with col_run:
+        run = st.button("Pripravi izvoz", key="full_export_run", type="primary",
+                        use_container_width=True, disabled=not selected)
+
+    if run:
+        specs = []
+        for table in selected:
+            spec = db_export.ExportSpec(table)
+            if table == 'application_logs' and log_days:
+                spec.where = "timestamp >= datetime('now', ?)"
+                spec.params = (f"-{int(log_days)} days",)
+            specs.append(spec)
+
+        bar = st.progress(0.0)
+        status = st.empty()
+
+        def on_progress(table, done, total):
+            position = selected.index(table)
+            fraction = done / total if total else 1.0
+            bar.progress(min((position + fraction) / len(selected), 1.0))
+            status.caption(f"{TABLE_NAMES.get(table, table)}: {done:,}" + (f" / {total:,}" if total else ""))
+
+        try:
+            path = db_export.temp_export_path('database_export_', '.zip')
+            counts = db_export.export_to_zip(path, specs, fmt=fmt, progress=on_progress)
+            previous = st.session_state.get('full_export_path')
+            if previous and previous != path and os.path.exists(previous):
+                os.remove(previous)
+            st.session_state.full_export_path = path
+            bar.progress(1.0)
+            status.caption(f"Izvoženih vrstic: {sum(counts.values()):,}")
+        except Exception as e:
+            st.error(f"Napaka pri izvozu: {str(e)}")
+
+    path = st.session_state.get('full_export_path')
+    if path and os.path.exists(path):
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        with open(path, 'rb') as handle:
+            st.download_button(
+                label=" Prenesi izvoz baze (ZIP)",
+                data=handle,
+                file_name=f"database_export_{timestamp}.zip",
+                mime="application/zip",
+                key="full_export_download"
+            )
+        st.success(f" Izvoz pripravljen ({os.path.getsize(path) / (1024 * 1024):.1f} MB)! Kliknite gumb za prenos.")
\ No newline at end of file
@@ -648,7 +648,8 @@ class AIFieldRenderer:
         Display AI suggestions with transfer buttons.
         Shows context being used and allows selection or rejection.
         """
-        # Check if we already have suggestions for this field
+        # Suggestions shown in this session; identical requests from any session
+        # are answered by the service's shared response cache
         cache_key = f"{full_key}_suggestions_cache"
         if cache_key not in st.session_state:
             # Collect form context
@@ -664,7 +665,8 @@ class AIFieldRenderer:
                         field_context=full_key,
                         field_type=field_type,
                         query=schema.get('description', ''),
-                        form_data=context
+                        form_data=context,
+                        refresh=st.session_state.pop(f"{full_key}_suggestions_refresh", False)
                     )
                 except Exception as e:
                     st.error(f"Napaka pri pridobivanju AI predlogov: {str(e)}")
@@ -747,6 +749,7 @@ class AIFieldRenderer:
                         # Mark as rejected and potentially get new suggestions
                         if f"{full_key}_suggestions_cache" in st.session_state:
                             del st.session_state[f"{full_key}_suggestions_cache"]
+                        st.session_state[f"{full_key}_suggestions_refresh"] = True
                         st.info("Generiram nove predloge...")
                         st.rerun()
         
@@ -755,6 +758,7 @@ class AIFieldRenderer:
             # Clear cache and regenerate
             if f"{full_key}_suggestions_cache" in st.session_state:
                 del st.session_state[f"{full_key}_suggestions_cache"]
+            st.session_state[f"{full_key}_suggestions_refresh"] = True
             st.rerun()
     
     def _collect_form_context(self) -> Dict[str, Any]:
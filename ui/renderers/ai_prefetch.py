@@ -0,0 +1,152 @@
+"""
+AI Suggestion Prefetch
+Generates a step's AI suggestions in the background before the user asks.
+
+Opt-in with AI_PREFETCH_ENABLED=true. When a step is entered, or when its
+form context has stopped changing (the same context on two consecutive
+reruns), suggestion jobs for the step's AI fields are queued on a small
+process-wide thread pool. Results are kept by AIFieldSuggestionService under
+the same request fingerprint a click uses, so "AI predlog" returns at once;
+a click while a job is still running joins it. When the form context changes,
+queued jobs are cancelled and finished ones are discarded.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+from services.response_cache import current_org
+from utils.metrics import metrics
+from utils.single_flight import fingerprint
+
+logger = logging.getLogger(__name__)
+
+STATE_KEY = '_ai_prefetch'
+
+
+def prefetch_enabled() -> bool:
+    return os.getenv('AI_PREFETCH_ENABLED', 'false').lower() == 'true'
+
+
+class SuggestionPrefetcher:
+    """Bounded background pool for speculative suggestion jobs"""
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv('AI_PREFETCH_WORKERS', '2'))
+        self.max_pending = max_pending or int(os.getenv('AI_PREFETCH_MAX_PENDING', '8'))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[], Any]) -> Optional[Future]:
+        """Queue a job; None when max_pending jobs are already queued or running"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                metrics.inc('ai_prefetch_total', result='dropped')
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='ai-prefetch')
+            self._pending += 1
+        future = self._executor.submit(fn)
+        future.add_done_callback(self._done)
+        metrics.inc('ai_prefetch_total', result='submitted')
+        return future
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"[AI_PREFETCH] Job failed: {future.exception()}")
+
+
+prefetcher = SuggestionPrefetcher()
+
+
+def ai_fields_for_step(step_properties: Dict[str, Any], helper,
+                       should_render: Optional[Callable[[dict, str], bool]] = None
+                       ) -> List[Tuple[str, dict]]:
+    """(full_key, schema) of every AI-assisted field the step would render.
+
+    Keys are built like SectionRenderer builds them (parent.child). Arrays are
+    skipped: their item keys only exist once rows have been added.
+    """
+    fields = []
+
+    def walk(name: str, schema: dict, parent_key: str):
+        if not isinstance(schema, dict):
+            return
+        full_key = f"{parent_key}.{name}" if parent_key else name
+        if should_render and not should_render(schema, parent_key):
+            return
+        if schema.get('type') == 'object':
+            for child, child_schema in schema.get('properties', {}).items():
+                walk(child, child_schema, full_key)
+        elif schema.get('type') != 'array' and helper.should_use_ai_renderer(full_key, schema):
+            fields.append((full_key, schema))
+
+    for name, schema in step_properties.items():
+        walk(name, schema, '')
+    return fields
+
+
+def _cancel(state: Dict[str, Any], service):
+    for key, future in state['jobs'].items():
+        if future.cancel():
+            metrics.inc('ai_prefetch_total', result='cancelled')
+        else:
+            # Already running: let it finish, then drop its result
+            future.add_done_callback(lambda _, key=key: service.forget_prefetched(key))
+    state['jobs'] = {}
+
+
+def prefetch_step_suggestions(step_index: int, step_properties: Dict[str, Any],
+                              should_render: Optional[Callable[[dict, str], bool]] = None) -> int:
+    """Queue suggestion jobs for the current step when appropriate.
+
+    Call on every rerun of the form page; returns the number of jobs queued.
+    """
+    if not prefetch_enabled():
+        return 0
+
+    helper = st.session_state.get('ai_integration_helper')  # set by apply_ai_integration()
+    if helper is None:
+        return 0
+    renderer = helper.ai_renderer
+    service = renderer.ai_service
+
+    state = st.session_state.setdefault(STATE_KEY, {'step': None, 'seen': None, 'submitted': None, 'jobs': {}})
+    full_context = service._collect_form_context({})
+    context_hash = fingerprint(full_context)
+
+    entered = state['step'] != step_index
+    settled = context_hash == state['seen']
+    state['step'], state['seen'] = step_index, context_hash
+
+    if not entered and context_hash == state['submitted']:
+        return 0
+    _cancel(state, service)
+    state['submitted'] = None
+    if not (entered or settled):
+        # Context is still changing; wait for it to settle
+        return 0
+
+    org = current_org()
+    for full_key, schema in ai_fields_for_step(step_properties, helper, should_render):
+        enhanced = {**schema, 'ai_field_type': helper.get_ai_config(full_key)['type']}
+        field_type = renderer._determine_field_type(full_key, enhanced)
+        query = schema.get('description', '')
+        key = service.suggestion_key(full_key, field_type, query, full_context, org)
+        future = prefetcher.submit(
+            lambda full_key=full_key, field_type=field_type, query=query: service.get_suggestion_for_context(
+                full_key, field_type, query, full_context, org=org, prefetch=True)
+        )
+        if future is not None:
+            state['jobs'][key] = future
+
+    state['submitted'] = context_hash
+    logger.info(f"[AI_PREFETCH] Step {step_index}: queued {len(state['jobs'])} suggestion jobs")
+    return len(state['jobs'])
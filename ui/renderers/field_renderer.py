@@ -10,6 +10,8 @@ from datetime import date, datetime
 import logging
 
 from utils.form_helpers import FormContext
+from utils.rerun_profiler import traced
+from utils.widget_sync import widget_callback
 
 
 class FieldRenderer:
@@ -38,6 +40,7 @@ class FieldRenderer:
         self.context = context
         self.validation_renderer = validation_renderer
         
+    @traced('field', 'field', label=lambda self, field_name, *args, **kwargs: field_name)
     def render_field(self, 
                     field_name: str, 
                     field_schema: dict,
@@ -206,7 +209,8 @@ class FieldRenderer:
                 label=self._format_label(label, required, full_key),
                 value=current_value,
                 key=widget_key,
-                help=help_text
+                help=help_text,
+                **widget_callback(widget_key, session_key)
             )
             
             # Update session state
@@ -334,7 +338,8 @@ class FieldRenderer:
             max_value=maximum,
             step=step,
             key=widget_key,
-            help=help_text
+            help=help_text,
+            **widget_callback(widget_key, session_key)
         )
         
         self.context.set_field_value(full_key, value)
@@ -364,7 +369,8 @@ class FieldRenderer:
             label=label,  # Checkboxes don't show required asterisk
             value=bool(current_value),
             key=widget_key,
-            help=help_text
+            help=help_text,
+            **widget_callback(widget_key, session_key)
         )
         
         self.context.set_field_value(full_key, value)
@@ -458,7 +464,8 @@ class FieldRenderer:
             help=help_text,
             format="DD.MM.YYYY",  # Use dd.mm.yyyy format
             min_value=min_date,
-            max_value=max_date
+            max_value=max_date,
+            **widget_callback(widget_key, session_key)
         )
         
         self.context.set_field_value(full_key, value)
@@ -550,7 +557,8 @@ class FieldRenderer:
                 options=options,
                 index=index,
                 key=widget_key,
-                help=None  # Don't show as help text
+                help=None,  # Don't show as help text
+                **widget_callback(widget_key, session_key)
             )
             # Show long description as info below
             st.info(help_text)
@@ -561,7 +569,8 @@ class FieldRenderer:
                 options=options,
                 index=index,
                 key=widget_key,
-                help=help_text
+                help=help_text,
+                **widget_callback(widget_key, session_key)
             )
         
         self.context.set_field_value(full_key, value)
@@ -594,7 +603,8 @@ class FieldRenderer:
             label=self._format_label(label, required, full_key),
             value=current_value,
             key=widget_key,
-            help=help_text
+            help=help_text,
+            **widget_callback(widget_key, session_key)
         )
         
         self.context.set_field_value(full_key, value)
@@ -682,7 +692,8 @@ class FieldRenderer:
             options=options,
             default=current_value,
             key=widget_key,
-            help=help_text
+            help=help_text,
+            **widget_callback(widget_key, session_key)
         )
         
         self.context.set_field_value(full_key, value)
@@ -1044,7 +1055,7 @@ class FieldRenderer:
                            current_value: str) -> str:
         """Render SWIFT/BIC field with validation, rate limiting and bank registry."""
         from utils.validations import validate_swift_bic, validate_swift_bank_consistency
-        from utils.rate_limiter import swift_rate_limiter
+        from utils.rate_limiter import swift_rate_limiter, current_session_id
         import streamlit as st
         import database
         
@@ -1052,7 +1063,7 @@ class FieldRenderer:
         widget_key = f"widget_{session_key}"
         
         # Get session ID for rate limiting
-        session_id = st.session_state.get('session_id', 'unknown')
+        session_id = current_session_id()
         
         # Get banks from registry for autocomplete
         all_banks = database.get_all_banks()
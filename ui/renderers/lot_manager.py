@@ -318,11 +318,8 @@ class LotManager:
         current_lot = self.context.get_current_lot()
         new_name = f"{current_lot['name']} (Copy)"
         
-        # Add new lot
-        new_index = self.context.add_lot(new_name)
-        
-        # Copy data
-        self.context.copy_lot_data(self.context.lot_index, new_index)
+        # Add new lot sharing the current lot's data
+        new_index = self.context.duplicate_lot(self.context.lot_index, new_name)
         
         # Switch to new lot
         self.context.switch_to_lot(new_index)
@@ -8,6 +8,7 @@ import logging
 import streamlit as st
 from typing import Any, Dict, List, Optional
 from utils.form_helpers import FormContext
+from utils.rerun_profiler import traced
 from .field_renderer import FieldRenderer
 
 # Configure logger
@@ -74,6 +75,7 @@ class SectionRenderer:
         """
         st.markdown(warning_html, unsafe_allow_html=True)
         
+    @traced('section', 'section', label=lambda self, section_name, *args, **kwargs: section_name)
     def render_section(self, 
                       section_name: str, 
                       section_schema: dict, 
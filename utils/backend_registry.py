@@ -0,0 +1,385 @@
+"""
+Lazy registry for heavy optional backends.
+
+Docling, LangChain, OpenAI, EasyOCR (torch) and PyPDF2 are imported on first
+use instead of at module import time, so importing the services from app.py
+stays cheap. Expensive objects (Docling DocumentConverter, EasyOCR reader) are
+built once per process and shared. An optional preloaded worker process keeps
+a warm converter ready for extraction. Every load is timed so startup can
+report which backends were loaded and how long each took.
+"""
+
+import os
+import time
+import logging
+import threading
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BackendUnavailable(ImportError):
+    """Raised when a registered backend cannot be imported"""
+
+
+@dataclass
+class BackendStatus:
+    """Load state of a backend or shared instance"""
+    name: str
+    available: Optional[bool] = None
+    loaded: bool = False
+    load_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class BackendRegistry:
+    """Thread-safe registry of lazily imported backends and shared instances"""
+
+    def __init__(self):
+        self._loaders: Dict[str, Tuple[Tuple[str, ...], Callable[[], Any]]] = {}
+        self._values: Dict[str, Any] = {}
+        self._instances: Dict[Hashable, Any] = {}
+        self._status: Dict[str, BackendStatus] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, modules: Sequence[str], loader: Callable[[], Any]):
+        """Register a backend.
+
+        Args:
+            name: Backend name used by callers
+            modules: Top-level modules whose presence means the backend is installed
+            loader: Performs the actual import and returns the backend object
+        """
+        self._loaders[name] = (tuple(modules), loader)
+        self._status.setdefault(name, BackendStatus(name=name))
+
+    def is_available(self, name: str) -> bool:
+        """Check whether a backend is installed without importing it"""
+        status = self._status[name]
+        if status.available is None:
+            modules, _ = self._loaders[name]
+            try:
+                status.available = all(importlib.util.find_spec(m) is not None for m in modules)
+            except (ImportError, ValueError):
+                status.available = False
+        return status.available
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._values
+
+    def load(self, name: str) -> Any:
+        """Import a backend on first use and return it.
+
+        Raises:
+            BackendUnavailable: If the backend is not installed or fails to import
+        """
+        if name in self._values:
+            return self._values[name]
+
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+
+            status = self._status[name]
+            if status.error is not None:
+                raise BackendUnavailable(f"{name} unavailable: {status.error}")
+
+            _, loader = self._loaders[name]
+            start = time.perf_counter()
+            try:
+                value = loader()
+            except Exception as e:
+                status.available = False
+                status.error = f"{type(e).__name__}: {e}"
+                status.load_seconds = time.perf_counter() - start
+                logger.warning(f"Backend {name} failed to load: {status.error}")
+                raise BackendUnavailable(f"{name} unavailable: {status.error}") from e
+
+            status.available = True
+            status.loaded = True
+            status.load_seconds = time.perf_counter() - start
+            self._values[name] = value
+            logger.info(f"Backend {name} loaded in {status.load_seconds:.2f}s")
+            return value
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Like load(), but returns default instead of raising"""
+        try:
+            return self.load(name)
+        except BackendUnavailable:
+            return default
+
+    def shared_instance(self, key: Hashable, factory: Callable[[], Any],
+                        label: Optional[str] = None) -> Any:
+        """Build an object once per process and return the same instance after.
+
+        Args:
+            key: Cache key (include the factory class so test doubles get their own slot)
+            factory: Builds the instance
+            label: Name used in the load report
+        """
+        if key in self._instances:
+            return self._instances[key]
+
+        with self._lock:
+            if key in self._instances:
+                return self._instances[key]
+
+            label = label or str(key)
+            status = self._status.setdefault(label, BackendStatus(name=label))
+            start = time.perf_counter()
+            instance = factory()
+            status.available = True
+            status.loaded = True
+            status.load_seconds = time.perf_counter() - start
+            self._instances[key] = instance
+            logger.info(f"Shared instance {label} initialized in {status.load_seconds:.2f}s")
+            return instance
+
+    def preload(self, names: Sequence[str], background: bool = True) -> Optional[threading.Thread]:
+        """Warm up backends, optionally in a daemon thread"""
+        def _run():
+            for name in names:
+                if name in self._loaders:
+                    if self.is_available(name):
+                        self.get(name)
+                elif name in WARM_INSTANCES:
+                    try:
+                        WARM_INSTANCES[name]()
+                    except Exception as e:
+                        logger.warning(f"Could not warm {name}: {e}")
+            log_backend_report()
+
+        if not background:
+            _run()
+            return None
+
+        thread = threading.Thread(target=_run, name='backend-preload', daemon=True)
+        thread.start()
+        return thread
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Load state of every backend and shared instance"""
+        for name in self._loaders:
+            self.is_available(name)
+        return [asdict(status) for status in self._status.values()]
+
+
+# ============ BUILT-IN BACKENDS ============
+
+def _load_docling():
+    from docling.document_converter import DocumentConverter
+    from docling.datamodel.base_models import ConversionStatus
+    return SimpleNamespace(DocumentConverter=DocumentConverter, ConversionStatus=ConversionStatus)
+
+
+def _load_langchain_splitter():
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    return SimpleNamespace(RecursiveCharacterTextSplitter=RecursiveCharacterTextSplitter)
+
+
+def _load_openai():
+    from openai import OpenAI
+    return SimpleNamespace(OpenAI=OpenAI)
+
+
+def _load_pypdf2():
+    import PyPDF2
+    return PyPDF2
+
+
+def _load_docx():
+    from docx import Document
+    return SimpleNamespace(Document=Document)
+
+
+def _load_tesseract():
+    from PIL import Image
+    import pytesseract
+    return SimpleNamespace(Image=Image, pytesseract=pytesseract)
+
+
+def _load_easyocr():
+    import easyocr
+    return easyocr
+
+
+def _load_tokenizers():
+    import tokenizers
+    return tokenizers
+
+
+backends = BackendRegistry()
+backends.register('docling', ['docling'], _load_docling)
+backends.register('langchain_splitter', ['langchain'], _load_langchain_splitter)
+backends.register('openai', ['openai'], _load_openai)
+backends.register('pypdf2', ['PyPDF2'], _load_pypdf2)
+backends.register('docx', ['docx'], _load_docx)
+backends.register('tesseract', ['PIL', 'pytesseract'], _load_tesseract)
+backends.register('easyocr', ['easyocr'], _load_easyocr)
+backends.register('tokenizers', ['tokenizers'], _load_tokenizers)
+
+
+def lazy_module_attributes(mapping: Dict[str, Tuple[str, Optional[str]]]) -> Callable[[str], Any]:
+    """Build a PEP 562 module __getattr__ resolving names through the registry.
+
+    Names of uninstalled backends raise AttributeError, exactly as if the
+    module-level import had failed.
+
+    Args:
+        mapping: attribute name -> (backend name, attribute on backend or None for the backend itself)
+    """
+    def __getattr__(name: str) -> Any:
+        if name in mapping:
+            backend, attr = mapping[name]
+            try:
+                value = backends.load(backend)
+            except BackendUnavailable as e:
+                raise AttributeError(name) from e
+            return value if attr is None else getattr(value, attr)
+        raise AttributeError(name)
+    return __getattr__
+
+
+# ============ WARM SHARED INSTANCES ============
+
+def get_document_converter(converter_cls: Optional[type] = None) -> Any:
+    """Process-wide Docling DocumentConverter"""
+    if converter_cls is None:
+        converter_cls = backends.load('docling').DocumentConverter
+    return backends.shared_instance(('docling_converter', converter_cls), converter_cls,
+                                    label='docling_converter')
+
+
+def get_easyocr_reader(languages: Optional[Sequence[str]] = None) -> Any:
+    """Process-wide EasyOCR reader (loads torch models once)"""
+    languages = tuple(languages or os.getenv('EASYOCR_LANGUAGES', 'sl,en').split(','))
+    easyocr = backends.load('easyocr')
+    gpu = os.getenv('EASYOCR_GPU', 'false').lower() == 'true'
+    return backends.shared_instance(('easyocr_reader', languages, gpu),
+                                    lambda: easyocr.Reader(list(languages), gpu=gpu),
+                                    label='easyocr_reader')
+
+
+WARM_INSTANCES: Dict[str, Callable[[], Any]] = {
+    'docling_converter': get_document_converter,
+    'easyocr_reader': get_easyocr_reader,
+}
+
+
+# ============ PRELOADED CONVERTER PROCESS ============
+
+def _warm_converter_worker():
+    """Pool initializer: build the converter before the first job arrives"""
+    try:
+        get_document_converter()
+    except Exception as e:
+        logger.warning(f"Preloaded converter process could not warm Docling: {e}")
+
+
+def _converter_ready() -> bool:
+    return backends.is_loaded('docling')
+
+
+def _convert_to_markdown(file_path: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Run a Docling conversion inside the preloaded process"""
+    docling = backends.load('docling')
+    result = get_document_converter().convert(Path(file_path))
+    if result.status != docling.ConversionStatus.SUCCESS:
+        return None
+
+    document = result.document
+    metadata = {
+        'extraction_method': 'docling',
+        'page_count': len(document.pages) if hasattr(document, 'pages') else 0,
+        'tables_count': len(document.tables) if hasattr(document, 'tables') else 0,
+        'figures_count': len(document.figures) if hasattr(document, 'figures') else 0,
+    }
+    return document.export_to_markdown(), metadata
+
+
+class PreloadedConverterProcess:
+    """Single worker process holding a warm Docling converter.
+
+    Keeps Docling's model loading and CPU-heavy conversion out of the
+    Streamlit server process.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.ready = False
+
+    def start(self, wait: bool = False, timeout: float = 300.0) -> bool:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=1,
+                                                     initializer=_warm_converter_worker)
+        future = self._executor.submit(_converter_ready)
+        if wait:
+            self.ready = bool(future.result(timeout=timeout))
+        else:
+            future.add_done_callback(lambda f: setattr(self, 'ready', bool(f.result())))
+        return self.ready
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def convert_to_markdown(self, file_path: str,
+                            timeout: Optional[float] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Convert a document in the warm process; None if conversion failed"""
+        if self._executor is None:
+            raise RuntimeError("Preloaded converter process not started")
+        return self._executor.submit(_convert_to_markdown, str(file_path)).result(timeout=timeout)
+
+    def stop(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self.ready = False
+
+
+_converter_process: Optional[PreloadedConverterProcess] = None
+
+
+def get_preloaded_converter_process(start: bool = False) -> Optional[PreloadedConverterProcess]:
+    """Shared preloaded converter process.
+
+    Started on request, or automatically when DOCLING_PRELOAD_PROCESS=true.
+    Returns None when it is neither running nor enabled.
+    """
+    global _converter_process
+
+    enabled = start or os.getenv('DOCLING_PRELOAD_PROCESS', 'false').lower() == 'true'
+    if _converter_process is None:
+        if not enabled or not backends.is_available('docling'):
+            return None
+        _converter_process = PreloadedConverterProcess()
+        _converter_process.start()
+    return _converter_process
+
+
+# ============ STARTUP REPORTING ============
+
+def get_backend_report() -> List[Dict[str, Any]]:
+    """Which backends are installed, loaded, and how long each load took"""
+    return backends.report()
+
+
+def log_backend_report():
+    """Log a one-line-per-backend summary"""
+    for status in get_backend_report():
+        if status['loaded']:
+            logger.info(f"[backends] {status['name']}: loaded in {status['load_seconds']:.2f}s")
+        elif status['error']:
+            logger.info(f"[backends] {status['name']}: failed ({status['error']})")
+        else:
+            state = 'available (not loaded)' if status['available'] else 'not installed'
+            logger.info(f"[backends] {status['name']}: {state}")
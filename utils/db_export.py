@@ -0,0 +1,363 @@
+"""
+Streaming database export.
+
+Tables (or arbitrary SELECTs) are read with cursor.fetchmany() in fixed-size
+chunks and each chunk is written straight into the output member, so peak
+memory is one chunk regardless of table size. Exports go to a file on disk:
+a ZIP with one member per table (CSV, Parquet or JSON Lines) or a single
+CSV/JSON file.
+
+Used by the admin full-database export, the log CSV export and the dashboard
+JSON export of a single procurement.
+
+Parquet needs pyarrow; without it only the text formats are offered.
+"""
+
+import io
+import os
+import csv
+import json
+import sqlite3
+import logging
+import zipfile
+import tempfile
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import database
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+DEFAULT_CHUNK_SIZE = 5000
+FORMATS = ('csv', 'parquet', 'jsonl')
+
+# progress(name, rows_done, rows_total); rows_total is None when unknown
+ProgressCallback = Callable[[str, int, Optional[int]], None]
+
+
+@dataclass
+class ExportSpec:
+    """One exported member: a table with an optional filter, or a raw query.
+
+    `where` is an SQL condition with ? placeholders bound from `params`.
+    `query` replaces the generated SELECT entirely (e.g. LogQueryBuilder
+    output). `json_columns` maps text columns holding JSON to the key their
+    decoded value is written under in JSON output (the same name replaces
+    the text, another name adds a key next to it).
+    """
+    table: str
+    where: Optional[str] = None
+    params: Sequence[Any] = ()
+    columns: Optional[List[str]] = None
+    order_by: Optional[str] = None
+    query: Optional[str] = None
+    name: Optional[str] = None
+    json_columns: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def member_name(self) -> str:
+        return self.name or self.table
+
+    def select_sql(self) -> str:
+        if self.query:
+            return self.query
+        columns = ', '.join(_quote(c) for c in self.columns) if self.columns else '*'
+        sql = f"SELECT {columns} FROM {_quote(self.table)}"
+        if self.where:
+            sql += f" WHERE {self.where}"
+        if self.order_by:
+            sql += f" ORDER BY {self.order_by}"
+        return sql
+
+    def count_sql(self) -> Optional[str]:
+        if self.query:
+            return None
+        sql = f"SELECT COUNT(*) FROM {_quote(self.table)}"
+        if self.where:
+            sql += f" WHERE {self.where}"
+        return sql
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def existing_tables(conn: sqlite3.Connection) -> List[str]:
+    """Names of the tables present in the database."""
+    return [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+
+
+def iter_chunks(conn: sqlite3.Connection, spec: ExportSpec,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[List[str], Iterator[List[tuple]]]:
+    """Run the spec's SELECT and return (column names, iterator of row chunks)."""
+    cursor = conn.execute(spec.select_sql(), tuple(spec.params))
+    columns = [desc[0] for desc in cursor.description]
+
+    def chunks():
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+    return columns, chunks()
+
+
+def count_rows(conn: sqlite3.Connection, spec: ExportSpec) -> Optional[int]:
+    sql = spec.count_sql()
+    if sql is None:
+        return None
+    return conn.execute(sql, tuple(spec.params)).fetchone()[0]
+
+
+def _json_row(columns: List[str], row: tuple, json_columns: Dict[str, str]) -> Dict[str, Any]:
+    record = dict(zip(columns, row))
+    for source, target in json_columns.items():
+        value = record.get(source)
+        if isinstance(value, str) and value:
+            try:
+                record[target] = json.loads(value)
+            except ValueError:
+                pass
+    return record
+
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+class _Progress:
+    """Counts rows for one member and forwards to the callback."""
+
+    def __init__(self, name: str, total: Optional[int], callback: Optional[ProgressCallback]):
+        self.name = name
+        self.total = total
+        self.callback = callback
+        self.done = 0
+        if callback:
+            callback(name, 0, total)
+
+    def add(self, rows: int):
+        self.done += rows
+        if self.callback:
+            self.callback(self.name, self.done, self.total)
+
+
+def write_csv(text_stream, columns: List[str], chunks: Iterator[List[tuple]],
+              progress: Optional[_Progress] = None) -> int:
+    writer = csv.writer(text_stream)
+    writer.writerow(columns)
+    written = 0
+    for rows in chunks:
+        writer.writerows(rows)
+        written += len(rows)
+        if progress:
+            progress.add(len(rows))
+    return written
+
+
+def write_jsonl(text_stream, columns: List[str], chunks: Iterator[List[tuple]],
+                json_columns: Optional[Dict[str, str]] = None, progress: Optional[_Progress] = None) -> int:
+    written = 0
+    for rows in chunks:
+        text_stream.write(''.join(
+            json.dumps(_json_row(columns, row, json_columns or {}), ensure_ascii=False,
+                       default=_json_default) + '\n'
+            for row in rows))
+        written += len(rows)
+        if progress:
+            progress.add(len(rows))
+    return written
+
+
+def _arrow_type(declared: str):
+    declared = (declared or '').upper()
+    if 'INT' in declared:
+        return pa.int64()
+    if any(kind in declared for kind in ('REAL', 'FLOA', 'DOUB')):
+        return pa.float64()
+    if 'BLOB' in declared:
+        return pa.binary()
+    if 'BOOL' in declared:
+        return pa.bool_()
+    return pa.string()
+
+
+def _arrow_schema(conn: sqlite3.Connection, spec: ExportSpec, columns: List[str]):
+    declared = {}
+    if not spec.query:
+        declared = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({_quote(spec.table)})")}
+    return pa.schema([(name, _arrow_type(declared.get(name, ''))) for name in columns])
+
+
+def _coerce(value, arrow_type):
+    """Fit a dynamically typed SQLite value into the declared column type.
+
+    Values that cannot be represented (text in an INTEGER column, which SQLite
+    allows) become null rather than aborting the export.
+    """
+    if value is None:
+        return None
+    try:
+        if arrow_type == pa.string():
+            return value if isinstance(value, str) else str(value)
+        if arrow_type == pa.int64():
+            return int(value)
+        if arrow_type == pa.float64():
+            return float(value)
+        if arrow_type == pa.bool_():
+            return bool(value)
+        if arrow_type == pa.binary():
+            return value if isinstance(value, bytes) else str(value).encode('utf-8')
+    except (TypeError, ValueError):
+        return None
+    return value
+
+
+def write_parquet(path: str, conn: sqlite3.Connection, spec: ExportSpec, columns: List[str],
+                  chunks: Iterator[List[tuple]], progress: Optional[_Progress] = None) -> int:
+    """Write one row group per chunk to a Parquet file."""
+    if not PARQUET_AVAILABLE:
+        raise ImportError("Izvoz v Parquet zahteva paket pyarrow")
+    schema = _arrow_schema(conn, spec, columns)
+    written = 0
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        for rows in chunks:
+            arrays = [pa.array([_coerce(row[i], column.type) for row in rows], type=column.type)
+                      for i, column in enumerate(schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            written += len(rows)
+            if progress:
+                progress.add(len(rows))
+        if not written:
+            writer.write_table(schema.empty_table())
+    return written
+
+
+def _connect(db_path: Optional[str]) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path or database.DATABASE_FILE)
+    # Consistent snapshot across all tables without blocking writers in WAL mode
+    conn.execute("BEGIN")
+    return conn
+
+
+def temp_export_path(prefix: str, suffix: str) -> str:
+    """A fresh file in the temp directory for an export the caller serves."""
+    handle, path = tempfile.mkstemp(prefix=prefix, suffix=suffix)
+    os.close(handle)
+    return path
+
+
+def export_to_zip(path: str, specs: Sequence[ExportSpec], fmt: str = 'csv',
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, progress: Optional[ProgressCallback] = None,
+                  db_path: Optional[str] = None, metadata: bool = True) -> Dict[str, int]:
+    """Export each spec into its own member of a ZIP file at `path`.
+
+    Specs for tables that do not exist are skipped. Returns rows written per
+    member.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Neznan format izvoza: {fmt}")
+    if fmt == 'parquet' and not PARQUET_AVAILABLE:
+        raise ImportError("Izvoz v Parquet zahteva paket pyarrow")
+
+    counts: Dict[str, int] = {}
+    conn = _connect(db_path)
+    try:
+        tables = set(existing_tables(conn))
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            for spec in specs:
+                if not spec.query and spec.table not in tables:
+                    logger.info("Skipping export of missing table %s", spec.table)
+                    continue
+                tracker = _Progress(spec.member_name, count_rows(conn, spec), progress)
+                columns, chunks = iter_chunks(conn, spec, chunk_size)
+                member = f"{spec.member_name}.{fmt}"
+
+                if fmt == 'parquet':
+                    # Parquet writers need a seekable file; stage it on disk
+                    staged = temp_export_path('export_', '.parquet')
+                    try:
+                        counts[spec.member_name] = write_parquet(staged, conn, spec, columns, chunks, tracker)
+                        archive.write(staged, member)
+                    finally:
+                        os.remove(staged)
+                    continue
+
+                with archive.open(member, 'w', force_zip64=True) as raw:
+                    text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+                    if fmt == 'csv':
+                        counts[spec.member_name] = write_csv(text, columns, chunks, tracker)
+                    else:
+                        counts[spec.member_name] = write_jsonl(text, columns, chunks, spec.json_columns, tracker)
+                    text.flush()
+                    text.detach()
+
+            if metadata:
+                lines = [
+                    "Database Export",
+                    f"Generated: {datetime.now().isoformat()}",
+                    f"Format: {fmt}",
+                    f"Total tables: {len(counts)}",
+                ] + [f"{name}: {rows} rows" for name, rows in counts.items()]
+                archive.writestr("metadata.txt", '\n'.join(lines) + '\n')
+    finally:
+        conn.close()
+    return counts
+
+
+def export_to_csv(path: str, spec: ExportSpec, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  progress: Optional[ProgressCallback] = None, db_path: Optional[str] = None) -> int:
+    """Export a single spec to a CSV file at `path`."""
+    conn = _connect(db_path)
+    try:
+        tracker = _Progress(spec.member_name, count_rows(conn, spec), progress)
+        columns, chunks = iter_chunks(conn, spec, chunk_size)
+        with open(path, 'w', encoding='utf-8', newline='') as handle:
+            return write_csv(handle, columns, chunks, tracker)
+    finally:
+        conn.close()
+
+
+def export_to_json(path: str, spec: ExportSpec, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   single: bool = False, db_path: Optional[str] = None) -> int:
+    """Export a spec to a JSON array (or, with `single`, the first row as an object).
+
+    Rows are written one at a time, so arrays of any length stay bounded.
+    """
+    conn = _connect(db_path)
+    chunks = (rows for rows in ())
+    written = 0
+    try:
+        columns, chunks = iter_chunks(conn, spec, chunk_size)
+        with open(path, 'w', encoding='utf-8') as handle:
+            if not single:
+                handle.write('[')
+            for rows in chunks:
+                for row in rows:
+                    record = _json_row(columns, row, spec.json_columns)
+                    if single:
+                        json.dump(record, handle, indent=2, ensure_ascii=False, default=_json_default)
+                        return 1
+                    handle.write(',\n' if written else '\n')
+                    handle.write(json.dumps(record, ensure_ascii=False, default=_json_default))
+                    written += 1
+            handle.write('null' if single else '\n]\n')
+    finally:
+        chunks.close()
+        conn.close()
+    return written
@@ -6,6 +6,8 @@ ALL forms have lot structure - no exceptions, no backward compatibility.
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field
 
+from .lot_store import LotStore
+
 # Fields that should never be lot-scoped
 GLOBAL_FIELDS = [
     'schema', 
@@ -265,8 +267,9 @@ class FormContext:
         if len(lots) <= 1 or lot_index < 0 or lot_index >= len(lots):
             return False
         
-        # Clear all data for this lot
-        self.clear_lot_data(lot_index)
+        # Shift the data of the following lots down one position
+        self._edit_lot_data(lambda store: store.remove(lot_index),
+                            only=range(lot_index, len(lots)))
         
         # Remove the lot
         lots.pop(lot_index)
@@ -281,10 +284,40 @@ class FormContext:
         if self.session_state['current_lot_index'] >= len(lots):
             self.session_state['current_lot_index'] = len(lots) - 1
             self.lot_index = self.session_state['current_lot_index']
+        
+        return True
+    
+    def move_lot(self, source_index: int, target_index: int) -> bool:
+        """
+        Move a lot to another position, keeping its data.
+        The current lot stays selected at its new position.
+        
+        Args:
+            source_index: Index of lot to move
+            target_index: Index the lot should end up at
             
-        # Migrate data keys for lots after the removed one
-        self._migrate_lot_keys_after_removal(lot_index)
+        Returns:
+            True if moved, False if an index is invalid
+        """
+        lots = self.session_state.get('lots', [])
+        if not (0 <= source_index < len(lots) and 0 <= target_index < len(lots)):
+            return False
+        if source_index == target_index:
+            return True
         
+        order = list(range(len(lots)))
+        order.insert(target_index, order.pop(source_index))
+        self._edit_lot_data(lambda store: store.move(source_index, target_index),
+                            only=range(min(source_index, target_index), max(source_index, target_index) + 1))
+        
+        lots.insert(target_index, lots.pop(source_index))
+        for i, lot in enumerate(lots):
+            lot['index'] = i
+        self.session_state['lots'] = lots
+        
+        current = order.index(self.session_state.get('current_lot_index', 0))
+        self.session_state['current_lot_index'] = current
+        self.lot_index = current
         return True
     
     def rename_lot(self, lot_index: int, new_name: str) -> bool:
@@ -334,43 +367,47 @@ class FormContext:
             0 <= target_index < len(lots) and
             source_index != target_index):
             
-            source_prefix = f"lots.{source_index}."
-            target_prefix = f"lots.{target_index}."
-            
-            # Find all source keys and copy to target
-            for key in list(self.session_state.keys()):
-                if key.startswith(source_prefix):
-                    field_name = key[len(source_prefix):]
-                    target_key = f"{target_prefix}{field_name}"
-                    self.session_state[target_key] = self.session_state[key]
-            
+            self._edit_lot_data(lambda store: store.copy(source_index, target_index),
+                                only=(source_index, target_index))
             return True
         return False
     
-    def _migrate_lot_keys_after_removal(self, removed_index: int) -> None:
+    def duplicate_lot(self, lot_index: int, name: Optional[str] = None) -> int:
         """
-        Migrate keys after removing a lot to maintain continuity.
+        Add a new lot with a copy of another lot's data.
         
         Args:
-            removed_index: Index of the removed lot
-        """
-        # Collect all keys that need migration
-        keys_to_migrate = {}
-        
-        for key in list(self.session_state.keys()):
-            if key.startswith("lots."):
-                parts = key.split(".", 2)
-                if len(parts) >= 3:
-                    lot_idx = int(parts[1])
-                    if lot_idx > removed_index:
-                        # This key needs to be migrated to idx-1
-                        new_key = f"lots.{lot_idx - 1}.{parts[2]}"
-                        keys_to_migrate[key] = new_key
-        
-        # Perform migration
-        for old_key, new_key in keys_to_migrate.items():
-            self.session_state[new_key] = self.session_state[old_key]
-            del self.session_state[old_key]
+            lot_index: Index of lot to duplicate
+            name: Name of the copy (defaults to "<name> (kopija)")
+            
+        Returns:
+            Index of the new lot, -1 if lot_index is invalid
+        """
+        lots = self.session_state.get('lots', [])
+        if not 0 <= lot_index < len(lots):
+            return -1
+        if name is None:
+            name = f"{lots[lot_index].get('name', f'Sklop {lot_index + 1}')} (kopija)"
+        new_index = self.add_lot(name)
+        self.copy_lot_data(lot_index, new_index)
+        return new_index
+    
+    def _edit_lot_data(self, edit, only=None) -> int:
+        """
+        Apply a structural edit to the lots' data.
+        
+        The flat keys of the lots in `only` (all lots if None) are grouped
+        per lot in one pass,
+        the edit works on that list, and only keys whose value changed
+        position are rewritten.
+        
+        Returns:
+            Number of session keys written or deleted
+        """
+        store = LotStore.from_session(self.session_state, only=only)
+        before = list(store.lots)
+        edit(store)
+        return store.apply(self.session_state, before)
     
     # Validation Methods
     
@@ -0,0 +1,212 @@
+"""
+Lot storage for the unified lot architecture.
+
+Lot-scoped values live in session state under flat positional keys
+("lots.{index}.{field}"): widgets, validators, renderers and the loaders
+read and write them directly, and some of them are widget keys owned by
+Streamlit. LotStore is the structural view of those keys: one LotData
+mapping per lot, referenced from an ordered list.
+
+Structural edits (duplicate, remove, move) are list operations on the
+store. LotStore.apply() then writes the flat keys back, touching only
+positions whose lot changed and, within them, only keys whose value
+differs from the previous occupant. Lots that share values (pre-lot
+screens are copied to every lot, duplicates are identical) therefore
+cost nothing to shift, and a duplicate shares its source's mapping until
+one of them is written (copy-on-write).
+
+    store = LotStore.from_session(session_state)
+    before = list(store.lots)
+    store.remove(0)
+    store.apply(session_state, before)
+"""
+
+from typing import Any, Collection, Dict, Iterator, List, Mapping, MutableMapping, Optional, Tuple
+
+LOT_PREFIX = 'lots.'
+
+_MISSING = object()
+
+
+def lot_key(lot_index: int, field_name: str) -> str:
+    """Flat session key of a lot-scoped field"""
+    return f"{LOT_PREFIX}{lot_index}.{field_name}"
+
+
+def split_lot_key(key: str) -> Optional[Tuple[int, str]]:
+    """(lot_index, field_name) of a flat lot key, None for any other key"""
+    if not key.startswith(LOT_PREFIX):
+        return None
+    index, dot, field_name = key[len(LOT_PREFIX):].partition('.')
+    if not dot or not field_name or not index.isdigit():
+        return None
+    return int(index), field_name
+
+
+class LotData(Mapping):
+    """Field values of one lot; copies share the dict until one of them is written"""
+
+    __slots__ = ('_fields', '_owned')
+
+    def __init__(self, fields: Optional[Dict[str, Any]] = None):
+        self._fields: Dict[str, Any] = fields if fields is not None else {}
+        self._owned = True
+
+    def __getitem__(self, field_name: str) -> Any:
+        return self._fields[field_name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def shares_with(self, other: 'LotData') -> bool:
+        return self._fields is other._fields
+
+    def copy(self) -> 'LotData':
+        """O(1) copy; the dict is copied on the first write to either lot"""
+        self._owned = False
+        clone = LotData(self._fields)
+        clone._owned = False
+        return clone
+
+    def _own(self):
+        if not self._owned:
+            self._fields = dict(self._fields)
+            self._owned = True
+
+    def set(self, field_name: str, value: Any):
+        self._own()
+        self._fields[field_name] = value
+
+    def delete(self, field_name: str):
+        if field_name in self._fields:
+            self._own()
+            del self._fields[field_name]
+
+    def update(self, values: Mapping):
+        self._own()
+        self._fields.update(values)
+
+
+class LotStore:
+    """Ordered list of per-lot mappings.
+
+    Edits replace the LotData at a position rather than writing into it;
+    apply() compares positions by identity.
+    """
+
+    def __init__(self, lots: Optional[List[LotData]] = None):
+        self.lots: List[LotData] = lots if lots is not None else []
+
+    @classmethod
+    def from_session(cls, session_state: Mapping, lot_count: Optional[int] = None,
+                     only: Optional[Collection[int]] = None) -> 'LotStore':
+        """Group the flat lot keys of session state by lot in one pass.
+
+        With `only`, just those lots are read; the others get empty
+        placeholders that apply() leaves alone, so an edit that touches two
+        lots does not read every value in the session.
+        """
+        if lot_count is None:
+            lot_count = len(session_state.get('lots', []) or [])
+        fields: List[Dict[str, Any]] = [{} for _ in range(lot_count)]
+        prefixes = LOT_PREFIX if only is None else tuple(f"{LOT_PREFIX}{i}." for i in only)
+        if not prefixes:
+            return cls([LotData(f) for f in fields])
+        for key in session_state.keys():
+            if not isinstance(key, str) or not key.startswith(prefixes):
+                continue
+            parts = split_lot_key(key)
+            if parts is None:
+                continue
+            while parts[0] >= len(fields):
+                fields.append({})
+            fields[parts[0]][parts[1]] = session_state[key]
+        return cls([LotData(f) for f in fields])
+
+    def __len__(self) -> int:
+        return len(self.lots)
+
+    def lot(self, lot_index: int) -> LotData:
+        while lot_index >= len(self.lots):
+            self.lots.append(LotData())
+        return self.lots[lot_index]
+
+    def get(self, lot_index: int, field_name: str, default: Any = None) -> Any:
+        if lot_index >= len(self.lots):
+            return default
+        return self.lots[lot_index].get(field_name, default)
+
+    def copy(self, source_index: int, target_index: int):
+        """Copy a lot's values onto another lot (O(1) when the target is empty)"""
+        source, target = self.lot(source_index), self.lot(target_index)
+        if len(target) == 0:
+            self.lots[target_index] = source.copy()
+        else:
+            # A new mapping, so apply() sees the position as changed
+            self.lots[target_index] = LotData({**target, **source})
+
+    def duplicate(self, lot_index: int) -> int:
+        """Append a copy of a lot; returns its index"""
+        self.lots.append(self.lot(lot_index).copy())
+        return len(self.lots) - 1
+
+    def remove(self, lot_index: int) -> LotData:
+        return self.lots.pop(lot_index)
+
+    def move(self, source_index: int, target_index: int):
+        self.lots.insert(target_index, self.lots.pop(source_index))
+
+    def clear(self, lot_index: int):
+        if lot_index < len(self.lots):
+            self.lots[lot_index] = LotData()
+
+    def view(self) -> 'LotKeyView':
+        return LotKeyView(self)
+
+    def apply(self, session_state: MutableMapping, before: List[LotData]) -> int:
+        """Write the flat keys of every position whose lot differs from `before`.
+
+        Returns:
+            Number of session keys written or deleted
+        """
+        changed = 0
+        for index in range(max(len(before), len(self.lots))):
+            old = before[index] if index < len(before) else None
+            new = self.lots[index] if index < len(self.lots) else None
+            if old is new or (old is not None and new is not None and old.shares_with(new)):
+                continue
+            if old is not None:
+                for field_name in old:
+                    if new is None or field_name not in new:
+                        session_state.pop(lot_key(index, field_name), None)
+                        changed += 1
+            if new is not None:
+                for field_name, value in new.items():
+                    if old is None or old.get(field_name, _MISSING) is not value:
+                        session_state[lot_key(index, field_name)] = value
+                        changed += 1
+        return changed
+
+
+class LotKeyView(Mapping):
+    """Read-only flat view of a LotStore: view['lots.1.orderType.type']"""
+
+    def __init__(self, store: LotStore):
+        self._store = store
+
+    def __getitem__(self, key: str) -> Any:
+        parts = split_lot_key(key)
+        if parts is None or parts[0] >= len(self._store.lots):
+            raise KeyError(key)
+        return self._store.lots[parts[0]][parts[1]]
+
+    def __iter__(self) -> Iterator[str]:
+        for index, lot in enumerate(self._store.lots):
+            for field_name in lot:
+                yield lot_key(index, field_name)
+
+    def __len__(self) -> int:
+        return sum(len(lot) for lot in self._store.lots)
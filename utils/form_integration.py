@@ -249,35 +249,11 @@ class FormIntegration:
             logging.warning(f"Invalid lot index: {lot_index}")
             return False
         
-        # Remove lot from list
-        removed_lot = lots.pop(lot_index)
+        removed_lot = lots[lot_index]
         
-        # Re-index remaining lots
-        for i, lot in enumerate(lots):
-            lot['index'] = i
-        
-        st.session_state['lots'] = lots
-        
-        # Remove lot data from session state
-        lot_prefix = f'lots.{lot_index}.'
-        keys_to_remove = [k for k in st.session_state.keys() if k.startswith(lot_prefix)]
-        for key in keys_to_remove:
-            del st.session_state[key]
-        
-        # Re-index data for lots after the removed one
-        for i in range(lot_index + 1, len(lots) + 1):
-            old_prefix = f'lots.{i}.'
-            new_prefix = f'lots.{i-1}.'
-            
-            keys_to_move = [k for k in st.session_state.keys() if k.startswith(old_prefix)]
-            for key in keys_to_move:
-                new_key = new_prefix + key[len(old_prefix):]
-                st.session_state[new_key] = st.session_state[key]
-                del st.session_state[key]
-        
-        # Adjust current lot index if needed
-        if st.session_state.get('current_lot_index', 0) >= len(lots):
-            st.session_state['current_lot_index'] = len(lots) - 1
+        # Remove the lot and shift the following lots' data
+        if not self.controller.context.remove_lot(lot_index):
+            return False
         
         logging.info(f"Removed lot: {removed_lot['name']}")
         return True
\ No newline at end of file
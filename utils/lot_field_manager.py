@@ -88,7 +88,8 @@ class LotFieldManager:
         source_prefix = f"lot_{source_lot_index}."
         dest_prefix = f"{self.prefix}."
         
-        for key, value in st.session_state.items():
+        # Snapshot: copying adds keys to the mapping being iterated
+        for key, value in list(st.session_state.items()):
             if key.startswith(source_prefix):
                 field_name = key[len(source_prefix):]
                 
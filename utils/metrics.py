@@ -0,0 +1,421 @@
+"""
+Process-wide metrics registry.
+
+Latencies go into fixed-memory log-bucketed histograms (about 2% relative
+error on quantiles), alongside counters and gauges. Every series is labelled
+(page, component, site, call, ...) and shared by all Streamlit sessions in
+the process, so memory does not grow with traffic. Cardinality is bounded per
+metric: series beyond the limit are folded into one overflow series.
+
+Exports:
+    render_prometheus()            Prometheus text exposition format
+    start_prometheus_server(port)  background HTTP endpoint serving /metrics
+    start_opentelemetry_export()   periodic OpenTelemetry export to console or file
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+OVERFLOW_LABELS: LabelKey = (('overflow', 'true'),)
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class LogHistogram:
+    """Fixed-size histogram with logarithmically spaced buckets.
+
+    Bucket i covers [min_value * growth**i, min_value * growth**(i+1)). With
+    the defaults (1 µs .. ~3 h, growth 1.04) that is about 590 integer counters
+    per series regardless of how many values are recorded.
+    """
+
+    def __init__(self, min_value: float = 1e-6, max_value: float = 1e4, growth: float = 1.04):
+        self.min_value = min_value
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self.num_buckets = int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 1
+        self.buckets = [0] * self.num_buckets
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return min(int(math.log(value / self.min_value) / self._log_growth), self.num_buckets - 1)
+
+    def record(self, value: float):
+        index = self._index(value)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile (geometric bucket midpoint, clamped to min/max)"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * (self.count - 1)
+            if rank <= 0:
+                return self.min
+            if rank >= self.count - 1:
+                return self.max
+            seen = 0
+            for index, bucket_count in enumerate(self.buckets):
+                seen += bucket_count
+                if seen > rank:
+                    low = self.min_value * self.growth ** index
+                    value = low * math.sqrt(self.growth)
+                    return min(max(value, self.min), self.max)
+            return self.max
+
+    def snapshot(self, quantiles=DEFAULT_QUANTILES) -> Dict[str, float]:
+        result = {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max
+        }
+        for q in quantiles:
+            result[f'p{int(q * 100)}'] = self.quantile(q)
+        return result
+
+
+class Counter:
+    """Monotonic counter"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Current value, set directly or read from a callback at export time"""
+
+    def __init__(self):
+        self._value = 0.0
+        self.callback: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        if self.callback is not None:
+            try:
+                return float(self.callback())
+            except Exception as e:
+                logger.debug(f"Gauge callback failed: {e}")
+                return 0.0
+        return self._value
+
+
+class MetricsRegistry:
+    """Labelled histograms, counters and gauges with bounded cardinality"""
+
+    def __init__(self, max_series_per_metric: int = 200):
+        self.max_series_per_metric = max_series_per_metric
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Called as listener(name, labels, start, duration) after every time() block
+        self.timer_listeners: List[Callable[[str, Dict[str, Any], float, float], None]] = []
+
+    def _series(self, kind: str, name: str, labels: Dict[str, Any], factory, description: str = ''):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(
+                    name, {'kind': kind, 'description': description, 'series': {}}
+                )
+        if metric['kind'] != kind:
+            raise ValueError(f"Metric {name} is a {metric['kind']}, not a {kind}")
+
+        key = _label_key(labels)
+        series = metric['series']
+        instrument = series.get(key)
+        if instrument is None:
+            with self._lock:
+                instrument = series.get(key)
+                if instrument is None:
+                    if len(series) >= self.max_series_per_metric:
+                        key = OVERFLOW_LABELS
+                    instrument = series.setdefault(key, factory())
+        return instrument
+
+    def histogram(self, name: str, description: str = '', **labels) -> LogHistogram:
+        return self._series('histogram', name, labels, LogHistogram, description)
+
+    def counter(self, name: str, description: str = '', **labels) -> Counter:
+        return self._series('counter', name, labels, Counter, description)
+
+    def gauge(self, name: str, description: str = '', **labels) -> Gauge:
+        return self._series('gauge', name, labels, Gauge, description)
+
+    def observe(self, name: str, value: float, **labels):
+        self.histogram(name, **labels).record(value)
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        self.counter(name, **labels).inc(amount)
+
+    @contextmanager
+    def time(self, name: str, **labels) -> Iterator[None]:
+        """Record the block's duration in seconds; failures also count <name>_errors_total"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(f"{name}_errors_total", **labels)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.observe(name, duration, **labels)
+            for listener in self.timer_listeners:
+                listener(name, labels, start, duration)
+
+    def timed(self, name: str, **labels):
+        """Decorator form of time()"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def collect(self) -> List[Tuple[str, str, str, LabelKey, Any]]:
+        """(name, kind, description, labels, instrument) for every series"""
+        with self._lock:
+            metrics = [(name, dict(m), dict(m['series'])) for name, m in self._metrics.items()]
+        return [
+            (name, m['kind'], m['description'], key, instrument)
+            for name, m, series in metrics
+            for key, instrument in series.items()
+        ]
+
+    def snapshot(self, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Plain-dict view of all (or one metric's) series, for UIs and tests"""
+        rows = []
+        for metric_name, kind, _, key, instrument in self.collect():
+            if name is not None and metric_name != name:
+                continue
+            row = {'name': metric_name, 'kind': kind, 'labels': dict(key)}
+            if kind == 'histogram':
+                row.update(instrument.snapshot())
+            else:
+                row['value'] = instrument.value
+            rows.append(row)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+metrics = MetricsRegistry(int(os.getenv('METRICS_MAX_SERIES', '200')))
+
+
+def get_registry() -> MetricsRegistry:
+    return metrics
+
+
+# ============ PROMETHEUS TEXT FORMAT ============
+
+def _prom_name(name: str) -> str:
+    return ''.join(c if c.isalnum() or c == '_' else '_' for c in name)
+
+
+def _prom_escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _prom_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{_prom_name(k)}="{_prom_escape(v)}"' for k, v in pairs) + '}'
+
+
+def render_prometheus(registry: Optional[MetricsRegistry] = None) -> str:
+    """Render all metrics in the Prometheus text exposition format.
+
+    Histograms are exported as summaries (p50/p95/p99 plus _sum and _count).
+    """
+    registry = registry or metrics
+    lines = []
+    seen = set()
+    for name, kind, description, key, instrument in sorted(registry.collect(), key=lambda r: (r[0], r[3])):
+        prom = _prom_name(name)
+        if prom not in seen:
+            seen.add(prom)
+            if description:
+                lines.append(f"# HELP {prom} {description}")
+            lines.append(f"# TYPE {prom} {'summary' if kind == 'histogram' else kind}")
+
+        if kind == 'histogram':
+            for q in DEFAULT_QUANTILES:
+                lines.append(f"{prom}{_prom_labels(key, (('quantile', str(q)),))} {instrument.quantile(q):.6g}")
+            lines.append(f"{prom}_sum{_prom_labels(key)} {instrument.sum:.6g}")
+            lines.append(f"{prom}_count{_prom_labels(key)} {instrument.count}")
+        else:
+            lines.append(f"{prom}{_prom_labels(key)} {instrument.value:.6g}")
+    return '\n'.join(lines) + '\n'
+
+
+_prometheus_server = None
+
+
+def start_prometheus_server(port: Optional[int] = None, addr: str = '127.0.0.1'):
+    """Serve /metrics on a daemon thread (Streamlit cannot add routes itself).
+
+    Idempotent per process. Port defaults to METRICS_PORT.
+    """
+    global _prometheus_server
+    if _prometheus_server is not None:
+        return _prometheus_server
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    port = port if port is not None else int(os.getenv('METRICS_PORT', '9464'))
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    _prometheus_server = server
+    logger.info(f"Prometheus metrics endpoint on http://{addr}:{server.server_port}/metrics")
+    return server
+
+
+# ============ OPENTELEMETRY EXPORT ============
+
+_otel_provider = None
+
+
+def start_opentelemetry_export(exporter: Optional[str] = None, path: Optional[str] = None,
+                               interval_seconds: Optional[float] = None):
+    """Periodically export the registry through the OpenTelemetry SDK.
+
+    Counters become observable counters; gauges and histogram quantiles
+    (with a `quantile` attribute) become observable gauges. The registry stays
+    the single source of truth, so nothing is double-counted.
+
+    Args:
+        exporter: 'console' (stdout) or 'file' (defaults to OTEL_METRICS_EXPORTER)
+        path: Output file for the 'file' exporter (OTEL_METRICS_FILE)
+        interval_seconds: Export interval (OTEL_METRIC_EXPORT_INTERVAL in ms, default 60 s)
+    """
+    global _otel_provider
+    if _otel_provider is not None:
+        return _otel_provider
+
+    try:
+        from opentelemetry import metrics as otel_metrics
+        from opentelemetry.metrics import CallbackOptions, Observation
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import (
+            ConsoleMetricExporter, PeriodicExportingMetricReader
+        )
+    except ImportError:
+        logger.warning("opentelemetry-sdk not installed; metrics export disabled")
+        return None
+
+    exporter = exporter or os.getenv('OTEL_METRICS_EXPORTER', 'console')
+    if exporter == 'file':
+        path = path or os.getenv('OTEL_METRICS_FILE', 'logs/metrics.jsonl')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        out = open(path, 'a', encoding='utf-8')
+        metric_exporter = ConsoleMetricExporter(
+            out=out, formatter=lambda data: data.to_json(indent=None) + '\n'
+        )
+    else:
+        metric_exporter = ConsoleMetricExporter()
+
+    if interval_seconds is None:
+        interval_seconds = int(os.getenv('OTEL_METRIC_EXPORT_INTERVAL', '60000')) / 1000
+    reader = PeriodicExportingMetricReader(metric_exporter,
+                                           export_interval_millis=interval_seconds * 1000)
+    provider = MeterProvider(metric_readers=[reader])
+    meter = provider.get_meter('javna_narocila')
+
+    def observe(kinds):
+        def callback(options: CallbackOptions):
+            observations = []
+            for name, kind, _, key, instrument in metrics.collect():
+                if kind not in kinds:
+                    continue
+                attributes = dict(key, metric=name)
+                if kind == 'histogram':
+                    for q in DEFAULT_QUANTILES:
+                        observations.append(Observation(instrument.quantile(q),
+                                                        dict(attributes, quantile=str(q))))
+                else:
+                    observations.append(Observation(instrument.value, attributes))
+            return observations
+        return callback
+
+    meter.create_observable_counter('app.counters', callbacks=[observe({'counter'})])
+    meter.create_observable_gauge('app.gauges', callbacks=[observe({'gauge'})])
+    meter.create_observable_gauge('app.latency_quantiles', unit='s',
+                                  callbacks=[observe({'histogram'})])
+
+    otel_metrics.set_meter_provider(provider)
+    _otel_provider = provider
+    logger.info(f"OpenTelemetry metrics export started ({exporter}, every {interval_seconds:.0f}s)")
+    return provider
+
+
+def start_exporters_from_env():
+    """Start exporters requested via METRICS_PORT / OTEL_METRICS_EXPORTER"""
+    if os.getenv('METRICS_PORT'):
+        try:
+            start_prometheus_server()
+        except OSError as e:
+            logger.warning(f"Could not start metrics endpoint: {e}")
+    if os.getenv('OTEL_METRICS_EXPORTER') in ('console', 'file'):
+        start_opentelemetry_export()
@@ -4,8 +4,10 @@ Qdrant collection initialization module for vector database.
 Follows the pattern established in init_database.py for non-blocking initialization.
 """
 import os
+import math
 import logging
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 # Load environment variables from .env file
@@ -39,6 +41,124 @@ COLLECTION_NAME = "javna_narocila"
 VECTOR_SIZE = 1536  # For text-embedding-3-small
 DISTANCE_METRIC = "Cosine"
 
+# Vector storage modes (VECTOR_QUANTIZATION)
+QUANTIZATION_MODES = ('none', 'int8', 'binary')
+
+# Default candidate oversampling before rescoring with the original vectors
+DEFAULT_OVERSAMPLING = {'none': 1.0, 'int8': 2.0, 'binary': 3.0}
+
+# Embedding models trained Matryoshka-style: a prefix of the vector is itself a
+# usable embedding, and the API can return it directly via `dimensions`
+MATRYOSHKA_MODEL_PREFIX = 'text-embedding-3-'
+
+
+@dataclass(frozen=True)
+class VectorStorageConfig:
+    """How knowledge base vectors are stored and searched"""
+    dimensions: int = VECTOR_SIZE
+    quantization: str = 'none'
+    rescore: bool = True
+    oversampling: float = 1.0
+    on_disk: bool = False
+
+    @property
+    def bytes_per_vector(self) -> float:
+        """Memory used per vector by the representation searched in RAM"""
+        if self.quantization == 'int8':
+            return self.dimensions
+        if self.quantization == 'binary':
+            return self.dimensions / 8
+        return self.dimensions * 4
+
+
+def get_vector_storage_config() -> VectorStorageConfig:
+    """
+    Read the vector storage mode from the environment.
+
+    VECTOR_DIMENSIONS      Truncated (Matryoshka) embedding size, default 1536
+    VECTOR_QUANTIZATION    none | int8 | binary, default none
+    VECTOR_RESCORE         Rescore quantized candidates with original vectors, default true
+    VECTOR_OVERSAMPLING    Candidate multiplier for rescoring, default per mode
+    VECTOR_ON_DISK         Keep original vectors on disk (quantized ones stay in RAM)
+    """
+    quantization = os.getenv('VECTOR_QUANTIZATION', 'none').lower()
+    if quantization not in QUANTIZATION_MODES:
+        logger.warning(f"Unknown VECTOR_QUANTIZATION '{quantization}', using 'none'")
+        quantization = 'none'
+
+    dimensions = int(os.getenv('VECTOR_DIMENSIONS', str(VECTOR_SIZE)))
+    if not 0 < dimensions <= VECTOR_SIZE:
+        logger.warning(f"VECTOR_DIMENSIONS must be between 1 and {VECTOR_SIZE}, using {VECTOR_SIZE}")
+        dimensions = VECTOR_SIZE
+
+    return VectorStorageConfig(
+        dimensions=dimensions,
+        quantization=quantization,
+        rescore=os.getenv('VECTOR_RESCORE', 'true').lower() == 'true',
+        oversampling=float(os.getenv('VECTOR_OVERSAMPLING', DEFAULT_OVERSAMPLING[quantization])),
+        on_disk=os.getenv('VECTOR_ON_DISK', 'false').lower() == 'true'
+    )
+
+
+def build_vectors_config(config: Optional[VectorStorageConfig] = None):
+    """VectorParams for collection creation"""
+    from qdrant_client.models import Distance, VectorParams
+
+    config = config or get_vector_storage_config()
+    return VectorParams(size=config.dimensions, distance=Distance.COSINE, on_disk=config.on_disk)
+
+
+def build_quantization_config(config: Optional[VectorStorageConfig] = None):
+    """Qdrant quantization config for the storage mode, or None for full precision"""
+    from qdrant_client.models import (
+        ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+        BinaryQuantization, BinaryQuantizationConfig
+    )
+
+    config = config or get_vector_storage_config()
+    if config.quantization == 'int8':
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if config.quantization == 'binary':
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def build_search_params(config: Optional[VectorStorageConfig] = None):
+    """SearchParams enabling rescoring for quantized collections, or None"""
+    config = config or get_vector_storage_config()
+    if config.quantization == 'none':
+        return None
+
+    from qdrant_client.models import SearchParams, QuantizationSearchParams
+    return SearchParams(quantization=QuantizationSearchParams(
+        ignore=False, rescore=config.rescore, oversampling=config.oversampling
+    ))
+
+
+def embedding_request_kwargs(model: str, config: Optional[VectorStorageConfig] = None) -> Dict[str, Any]:
+    """Extra arguments for embeddings.create so the API returns truncated vectors"""
+    config = config or get_vector_storage_config()
+    if config.dimensions < VECTOR_SIZE and model.startswith(MATRYOSHKA_MODEL_PREFIX):
+        return {'dimensions': config.dimensions}
+    return {}
+
+
+def fit_embedding(vector: List[float], config: Optional[VectorStorageConfig] = None) -> List[float]:
+    """
+    Truncate an embedding to the configured size and re-normalize it.
+
+    Vectors already at the configured size are returned unchanged.
+    """
+    config = config or get_vector_storage_config()
+    if vector is None or len(vector) <= config.dimensions:
+        return vector
+
+    truncated = list(vector[:config.dimensions])
+    norm = math.sqrt(sum(v * v for v in truncated))
+    return [v / norm for v in truncated] if norm else truncated
+
 
 def get_qdrant_client() -> Optional[Any]:
     """
@@ -97,6 +217,10 @@ def init_qdrant_collection(force: bool = False) -> Dict[str, Any]:
         'distance': DISTANCE_METRIC
     }
     
+    storage = get_vector_storage_config()
+    result['vector_size'] = storage.dimensions
+    result['quantization'] = storage.quantization
+    
     try:
         # Try to import Qdrant dependencies
         try:
@@ -122,6 +246,7 @@ def init_qdrant_collection(force: bool = False) -> Dict[str, Any]:
                 result['exists'] = True
                 
                 if not force:
+                    _apply_storage_mode(client, storage)
                     result['success'] = True
                     result['message'] = f"Collection '{COLLECTION_NAME}' already exists"
                     logger.debug(result['message'])  # Use debug to reduce log noise
@@ -134,22 +259,19 @@ def init_qdrant_collection(force: bool = False) -> Dict[str, Any]:
             # If we can't check collections, try to create anyway
             logger.warning(f"Could not check existing collections: {e}")
         
-        # Create collection with proper configuration
-        distance_enum = Distance.COSINE  # Use the enum directly
-        
+        # Create collection with the configured storage mode
         client.create_collection(
             collection_name=COLLECTION_NAME,
-            vectors_config=VectorParams(
-                size=VECTOR_SIZE,
-                distance=distance_enum
-            )
+            vectors_config=build_vectors_config(storage),
+            quantization_config=build_quantization_config(storage)
         )
         
         result['success'] = True
         result['created'] = True
         result['message'] = f"Created '{COLLECTION_NAME}' collection in Qdrant"
         logger.info(result['message'])
-        logger.info(f"Collection configured: vectors={VECTOR_SIZE}d, distance={DISTANCE_METRIC}")
+        logger.info(f"Collection configured: vectors={storage.dimensions}d, distance={DISTANCE_METRIC}, "
+                    f"quantization={storage.quantization}")
         
     except Exception as e:
         # Handle any errors gracefully - app continues
@@ -160,6 +282,29 @@ def init_qdrant_collection(force: bool = False) -> Dict[str, Any]:
     return result
 
 
+def _apply_storage_mode(client, storage: VectorStorageConfig):
+    """
+    Bring an existing collection in line with the configured storage mode.
+    
+    Quantization can be changed in place; the vector size cannot, so a
+    mismatch is only reported (recreate with force=True and re-ingest).
+    """
+    try:
+        info = client.get_collection(collection_name=COLLECTION_NAME)
+        size = info.config.params.vectors.size
+        if isinstance(size, int) and size != storage.dimensions:
+            logger.warning(f"Collection '{COLLECTION_NAME}' stores {size}d vectors but "
+                           f"VECTOR_DIMENSIONS={storage.dimensions}; recreate it to change size")
+        
+        current = info.config.quantization_config
+        wanted = build_quantization_config(storage)
+        if wanted is not None and current is None:
+            client.update_collection(collection_name=COLLECTION_NAME, quantization_config=wanted)
+            logger.info(f"Enabled {storage.quantization} quantization on '{COLLECTION_NAME}'")
+    except Exception as e:
+        logger.debug(f"Could not apply vector storage mode: {e}")
+
+
 def check_qdrant_status() -> Dict[str, Any]:
     """
     Check the status of Qdrant collection.
@@ -198,7 +343,8 @@ def check_qdrant_status() -> Dict[str, Any]:
                 status['vector_count'] = collection_info.vectors_count or 0
                 status['config'] = {
                     'vector_size': collection_info.config.params.vectors.size,
-                    'distance': str(collection_info.config.params.vectors.distance)
+                    'distance': str(collection_info.config.params.vectors.distance),
+                    'quantization': str(collection_info.config.quantization_config or 'none')
                 }
             except Exception as e:
                 logger.debug(f"Could not get collection details: {e}")
@@ -250,7 +396,7 @@ def ensure_qdrant_initialized():
 def init_qdrant_on_startup():
     """
     Initialize Qdrant collection on app startup.
-    Called from app.py init_app_data() function.
+    Called from the app.py "qdrant" background startup task.
     Non-blocking: logs status but doesn't stop app.
     
     Returns:
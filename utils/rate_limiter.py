@@ -1,78 +1,385 @@
 """
-Rate limiter for SWIFT/BIC lookups to prevent data harvesting.
+Rate limiter for SWIFT/BIC lookups, AI suggestions and document uploads.
 Story 3.2: SWIFT/BIC Validation and Registry Lookup
+
+Limits follow the generic cell rate algorithm (GCRA), the token bucket
+expressed as one number per key: the theoretical arrival time (TAT) of the
+next request. A limit of N requests per window W admits a request when
+max(TAT, now) + W/N - now <= W, and then advances TAT by W/N. That allows
+bursts of up to N and refills one request every W/N seconds; each decision
+is O(1) with no per-request history.
+
+A key whose TAT is in the past has a full bucket, so it can be dropped
+without changing any decision; the storages evict such idle keys.
+
+Storage (RATE_LIMIT_STORAGE):
+    memory  dict per limiter, in this process only (default)
+    sqlite  table rate_limits in the application database, one atomic
+            UPSERT per decision; shared by all processes on the host
+    mmap    fixed-size shared-memory table in RATE_LIMIT_MMAP_FILE with a
+            file lock; shared by all processes, no database writes
+
+Limits for AI suggestions and uploads are "count/seconds" strings in
+AI_SUGGESTION_RATE_LIMIT (default 20/60) and DOCUMENT_UPLOAD_RATE_LIMIT
+(default 10/300).
 """
 
+import os
+import math
+import mmap
 import time
-from typing import Dict, Tuple
-from collections import defaultdict
+import uuid
+import struct
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:         # Windows
+    fcntl = None
+    import msvcrt
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Tolerance for float rounding of W/N steps (3 x 1/3 s must fit a 1 s window)
+EPSILON = 1e-9
+SWEEP_SECONDS = 60
+
+
+def _gcra(tat: Optional[float], now: float, interval: float, window: float) -> Optional[float]:
+    """New TAT if the request is admitted, None if it is not"""
+    new_tat = max(tat or now, now) + interval
+    return new_tat if new_tat - now <= window + EPSILON else None
+
+
+class MemoryStorage:
+    """TATs in a per-process dict"""
+
+    def __init__(self, sweep_seconds: float = SWEEP_SECONDS):
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._sweep_seconds = sweep_seconds
+        self._next_sweep = time.time() + sweep_seconds
+
+    def acquire(self, key: str, now: float, interval: float, window: float) -> Optional[float]:
+        """Admit one request for key; None if admitted, otherwise the current TAT"""
+        with self._lock:
+            if now >= self._next_sweep:
+                self._evict(now)
+            tat = self._tats.get(key)
+            new_tat = _gcra(tat, now, interval, window)
+            if new_tat is None:
+                return tat
+            self._tats[key] = new_tat
+            return None
+
+    def peek(self, key: str) -> Optional[float]:
+        return self._tats.get(key)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._tats.pop(key, None)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drop keys whose bucket is full again"""
+        with self._lock:
+            return self._evict(now or time.time())
+
+    def _evict(self, now: float) -> int:
+        idle = [key for key, tat in self._tats.items() if tat <= now]
+        for key in idle:
+            del self._tats[key]
+        self._next_sweep = now + self._sweep_seconds
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class SQLiteStorage:
+    """TATs in the rate_limits table, decided by a single conditional UPSERT"""
+
+    def __init__(self, db_path: Optional[str] = None, sweep_seconds: float = SWEEP_SECONDS):
+        if db_path is None:
+            import database
+            db_path = database.DATABASE_FILE
+        self.db_path = db_path
+        self._local = threading.local()
+        self._sweep_seconds = sweep_seconds
+        self._next_sweep = 0.0
+        self._conn().execute("""
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT PRIMARY KEY,
+                tat REAL NOT NULL
+            )
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One autocommit connection per thread; every statement is its own transaction
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            # Losing the last decisions on power failure is harmless; an fsync per request is not
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, key: str, now: float, interval: float, window: float) -> Optional[float]:
+        """Admit one request for key; None if admitted, otherwise the current TAT"""
+        conn = self._conn()
+        if now >= self._next_sweep:
+            self.evict(now)
+        cursor = conn.execute("""
+            INSERT INTO rate_limits (key, tat) VALUES (:key, :now + :interval)
+            ON CONFLICT(key) DO UPDATE SET tat = max(tat, :now) + :interval
+            WHERE max(tat, :now) + :interval - :now <= :window + :epsilon
+        """, {'key': key, 'now': now, 'interval': interval, 'window': window, 'epsilon': EPSILON})
+        if cursor.rowcount:
+            return None
+        return self.peek(key) or now
+
+    def peek(self, key: str) -> Optional[float]:
+        row = self._conn().execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def delete(self, key: str):
+        self._conn().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drop keys whose bucket is full again"""
+        now = now or time.time()
+        self._next_sweep = now + self._sweep_seconds
+        return self._conn().execute("DELETE FROM rate_limits WHERE tat <= ?", (now,)).rowcount
+
+
+class MmapStorage:
+    """
+    TATs in a shared-memory hash table backed by a file.
+
+    Each slot holds a 64-bit key hash and a TAT. A key is looked up in
+    PROBE consecutive slots; idle slots (TAT in the past) are reused. When
+    all of them are busy the slot with the earliest TAT is taken over, which
+    gives its key a fresh bucket, so size `slots` well above the number of
+    concurrently active keys.
+    """
+
+    SLOT = struct.Struct('<Qd')
+    PROBE = 16
+
+    def __init__(self, path: Optional[str] = None, slots: int = 65536):
+        self.path = path or os.getenv('RATE_LIMIT_MMAP_FILE') or \
+            os.path.join(tempfile.gettempdir(), 'procurement_rate_limits.bin')
+        self.slots = slots
+        size = slots * self.SLOT.size
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        # The thread lock orders threads of this process, the file lock other processes
+        with self._lock:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+    def _find(self, key_hash: int, now: float) -> Tuple[int, Optional[float]]:
+        """Slot of key_hash and its TAT, or a slot to claim and None"""
+        free, oldest, oldest_tat = None, None, math.inf
+        start = key_hash % self.slots
+        for i in range(self.PROBE):
+            slot = (start + i) % self.slots
+            stored_hash, tat = self.SLOT.unpack_from(self._map, slot * self.SLOT.size)
+            if stored_hash == key_hash:
+                return slot, tat
+            if free is None and (stored_hash == 0 or tat <= now):
+                free = slot
+            if tat < oldest_tat:
+                oldest, oldest_tat = slot, tat
+        return (free if free is not None else oldest), None
+
+    def acquire(self, key: str, now: float, interval: float, window: float) -> Optional[float]:
+        """Admit one request for key; None if admitted, otherwise the current TAT"""
+        key_hash = self._hash(key)
+        with self._locked():
+            slot, tat = self._find(key_hash, now)
+            new_tat = _gcra(tat, now, interval, window)
+            if new_tat is None:
+                return tat
+            self.SLOT.pack_into(self._map, slot * self.SLOT.size, key_hash, new_tat)
+            return None
+
+    def peek(self, key: str) -> Optional[float]:
+        with self._locked():
+            return self._find(self._hash(key), time.time())[1]
+
+    def delete(self, key: str):
+        with self._locked():
+            slot, tat = self._find(self._hash(key), time.time())
+            if tat is not None:
+                self.SLOT.pack_into(self._map, slot * self.SLOT.size, 0, 0.0)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Clear slots whose bucket is full again"""
+        now = now or time.time()
+        evicted = 0
+        with self._locked():
+            for slot in range(self.slots):
+                stored_hash, tat = self.SLOT.unpack_from(self._map, slot * self.SLOT.size)
+                if stored_hash and tat <= now:
+                    self.SLOT.pack_into(self._map, slot * self.SLOT.size, 0, 0.0)
+                    evicted += 1
+        return evicted
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+_shared_storage = None
+_storage_lock = threading.Lock()
+
+
+def shared_storage():
+    """Cross-process storage selected by RATE_LIMIT_STORAGE, or None for per-limiter memory"""
+    global _shared_storage
+    kind = os.getenv('RATE_LIMIT_STORAGE', 'memory').lower()
+    if kind not in ('sqlite', 'mmap'):
+        return None
+    if _shared_storage is None:
+        with _storage_lock:
+            if _shared_storage is None:
+                try:
+                    _shared_storage = SQLiteStorage() if kind == 'sqlite' else MmapStorage()
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(f"Rate limit storage '{kind}' unavailable, using memory: {e}")
+                    _shared_storage = MemoryStorage()
+    return _shared_storage
 
 
 class RateLimiter:
-    """Session-based rate limiter for SWIFT lookups."""
-    
-    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
+    """Session-based GCRA rate limiter."""
+
+    def __init__(self, max_requests: int = 10, window_seconds: int = 60,
+                 name: str = 'swift', storage=None):
         """Initialize rate limiter.
-        
+
         Args:
-            max_requests: Maximum requests allowed per window
+            max_requests: Maximum requests allowed per window (burst size)
             window_seconds: Time window in seconds
+            name: Limiter name; keys of different limiters never collide
+            storage: MemoryStorage, SQLiteStorage or MmapStorage (default:
+                the shared one selected by RATE_LIMIT_STORAGE, else a private
+                MemoryStorage)
         """
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests: Dict[str, list] = defaultdict(list)
-    
+        self.name = name
+        self.interval = window_seconds / max_requests
+        self._storage = storage
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            self._storage = shared_storage() or MemoryStorage()
+        return self._storage
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.name}:{session_id}"
+
     def is_allowed(self, session_id: str) -> Tuple[bool, str]:
-        """Check if request is allowed for session.
-        
+        """Check if request is allowed for session and count it if so.
+
         Args:
             session_id: Unique session identifier
-        
+
         Returns:
             Tuple of (is_allowed, error_message)
         """
-        current_time = time.time()
-        
-        # Clean old requests
-        self.requests[session_id] = [
-            req_time for req_time in self.requests[session_id]
-            if current_time - req_time < self.window_seconds
-        ]
-        
-        # Check rate limit
-        if len(self.requests[session_id]) >= self.max_requests:
-            wait_time = self.window_seconds - (current_time - self.requests[session_id][0])
-            return False, f"Preveč poizvedb. Počakajte {int(wait_time)} sekund."
-        
-        # Record request
-        self.requests[session_id].append(current_time)
-        return True, ""
-    
+        now = time.time()
+        tat = self.storage.acquire(self._key(session_id), now, self.interval, self.window_seconds)
+        if tat is None:
+            return True, ""
+
+        metrics.inc('rate_limit_denied_total', limiter=self.name)
+        wait_time = tat + self.interval - self.window_seconds - now
+        return False, f"Preveč poizvedb. Počakajte {max(1, math.ceil(wait_time))} sekund."
+
     def get_remaining_requests(self, session_id: str) -> int:
         """Get remaining requests for session.
-        
+
         Args:
             session_id: Unique session identifier
-        
+
         Returns:
-            Number of remaining requests
+            Number of requests that would be allowed right now
         """
-        current_time = time.time()
-        self.requests[session_id] = [
-            req_time for req_time in self.requests[session_id]
-            if current_time - req_time < self.window_seconds
-        ]
-        return max(0, self.max_requests - len(self.requests[session_id]))
-    
+        tat = self.storage.peek(self._key(session_id))
+        if tat is None:
+            return self.max_requests
+        now = time.time()
+        remaining = int((now + self.window_seconds - max(tat, now)) / self.interval + EPSILON)
+        return min(self.max_requests, max(0, remaining))
+
     def reset_session(self, session_id: str):
         """Reset rate limit for a specific session.
-        
+
         Args:
             session_id: Session to reset
         """
-        if session_id in self.requests:
-            del self.requests[session_id]
+        self.storage.delete(self._key(session_id))
+
+
+def _limit_from_env(name: str, default: str) -> Tuple[int, int]:
+    """(max_requests, window_seconds) from a "count/seconds" setting"""
+    value = os.getenv(name, default)
+    try:
+        count, seconds = value.split('/')
+        return max(1, int(count)), max(1, int(seconds))
+    except ValueError:
+        logger.warning(f"Invalid {name}={value!r}, using {default}")
+        count, seconds = default.split('/')
+        return int(count), int(seconds)
+
+
+def current_session_id() -> str:
+    """Rate-limit key of the current Streamlit session (assigned on first use)"""
+    try:
+        import streamlit as st
+        if 'session_id' not in st.session_state:
+            st.session_state['session_id'] = uuid.uuid4().hex
+        return st.session_state['session_id']
+    except Exception:
+        return 'unknown'
 
 
-# Global rate limiter instance for SWIFT lookups
-swift_rate_limiter = RateLimiter(max_requests=10, window_seconds=60)
\ No newline at end of file
+# Global rate limiter instances
+swift_rate_limiter = RateLimiter(max_requests=10, window_seconds=60, name='swift')
+ai_suggestion_rate_limiter = RateLimiter(*_limit_from_env('AI_SUGGESTION_RATE_LIMIT', '20/60'),
+                                         name='ai_suggestion')
+document_upload_rate_limiter = RateLimiter(*_limit_from_env('DOCUMENT_UPLOAD_RATE_LIMIT', '10/300'),
+                                           name='document_upload')
@@ -0,0 +1,345 @@
+"""
+Per-rerun profiler for the Streamlit script.
+
+While a rerun is being profiled, nested spans record the wall time of each
+stage - page routing, step computation, form/section/field rendering,
+validation - and existing timers are folded in as they fire: every
+metrics.time() block (AI calls, decorated database functions) and every SQL
+statement seen by utils.sql_profiler. At the end of the rerun the spans are
+written as a Chrome trace (chrome://tracing, Perfetto) and a speedscope
+profile (https://www.speedscope.app).
+
+Profiling is opt-in per session: add ?profile=1 to the URL, tick the option
+in the admin panel, or set RERUN_PROFILER=true for all sessions. When no
+rerun is being profiled span() is a thread-local lookup and nothing else.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv('RERUN_PROFILE_DIR', 'logs/rerun_profiles')
+MAX_PROFILE_FILES = int(os.getenv('RERUN_PROFILE_KEEP', '200'))
+SESSION_FLAG = 'rerun_profiler_enabled'
+
+# Metric timers that become spans, and their trace category
+TIMER_CATEGORIES = {
+    'ai_call_seconds': 'ai',
+    'db_call_seconds': 'db',
+    'page_load_seconds': 'page',
+    'component_render_seconds': 'render'
+}
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start: float
+    duration: float
+    args: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+@dataclass
+class RerunTrace:
+    """Spans collected during one script run"""
+    label: str
+    start: float = field(default_factory=time.perf_counter)
+    started_at: datetime = field(default_factory=datetime.now)
+    spans: List[Span] = field(default_factory=list)
+    duration: float = 0.0
+
+    def add(self, name: str, category: str, start: float, duration: float, **args):
+        self.spans.append(Span(name, category, start - self.start, duration, args))
+
+    def nested_spans(self) -> List[Span]:
+        """
+        Spans ordered for a call stack, outer before inner.
+
+        Timers recorded after the fact can overlap by a few microseconds
+        instead of nesting; such a span is clamped to its parent's end.
+        """
+        ordered = sorted(self.spans, key=lambda s: (s.start, -s.duration))
+        stack: List[Span] = []
+        result = []
+        for span in ordered:
+            while stack and stack[-1].end <= span.start:
+                stack.pop()
+            if stack and span.end > stack[-1].end:
+                span = Span(span.name, span.category, span.start,
+                            stack[-1].end - span.start, span.args)
+            result.append(span)
+            stack.append(span)
+        return result
+
+
+_state = threading.local()
+
+
+def current_trace() -> Optional[RerunTrace]:
+    return getattr(_state, 'trace', None)
+
+
+@contextmanager
+def span(name: str, category: str = 'render', **args) -> Iterator[None]:
+    """Time a block as a span of the rerun being profiled (no-op otherwise)"""
+    trace = getattr(_state, 'trace', None)
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, category, start, time.perf_counter() - start, **args)
+
+
+def traced(name: Optional[str] = None, category: str = 'render',
+           label: Optional[Callable[..., str]] = None):
+    """
+    Decorator form of span().
+
+    Args:
+        name: Span name (defaults to the function's qualified name)
+        category: Trace category
+        label: Optional callable receiving the call's arguments and returning
+            a suffix, e.g. the field name, so spans of one function are told apart
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = getattr(_state, 'trace', None)
+            if trace is None:
+                return func(*args, **kwargs)
+            full_name = span_name
+            if label is not None:
+                try:
+                    full_name = f"{span_name} [{label(*args, **kwargs)}]"
+                except Exception:
+                    pass
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                trace.add(full_name, category, start, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# ============ LISTENERS ============
+
+def _on_timer(name: str, labels: Dict[str, Any], start: float, duration: float):
+    trace = getattr(_state, 'trace', None)
+    if trace is None or name not in TIMER_CATEGORIES:
+        return
+    detail = ', '.join(f"{k}={v}" for k, v in labels.items())
+    trace.add(f"{name} [{detail}]" if detail else name, TIMER_CATEGORIES[name],
+              start, duration, **labels)
+
+
+def _on_sql(entry: Dict[str, Any], start: float, duration: float):
+    trace = getattr(_state, 'trace', None)
+    if trace is None:
+        return
+    trace.add(entry['fingerprint'][:120], 'sql', start, duration,
+              site=entry['site'], sql=entry['fingerprint'])
+
+
+_listener_lock = threading.Lock()
+_active_profiles = 0
+_installed_sql_tracing = False
+
+
+def _attach_listeners():
+    """Register timer and SQL listeners while at least one rerun is profiled"""
+    global _active_profiles, _installed_sql_tracing
+    from utils.metrics import metrics
+    from utils import sql_profiler
+
+    with _listener_lock:
+        _active_profiles += 1
+        if _active_profiles > 1:
+            return
+        metrics.timer_listeners.append(_on_timer)
+        sql_profiler.profiler.listeners.append(_on_sql)
+        if not sql_profiler.is_tracing_installed():
+            sql_profiler.install_sql_tracing()
+            _installed_sql_tracing = True
+
+
+def _detach_listeners():
+    global _active_profiles, _installed_sql_tracing
+    from utils.metrics import metrics
+    from utils import sql_profiler
+
+    with _listener_lock:
+        _active_profiles -= 1
+        if _active_profiles > 0:
+            return
+        if _on_timer in metrics.timer_listeners:
+            metrics.timer_listeners.remove(_on_timer)
+        if _on_sql in sql_profiler.profiler.listeners:
+            sql_profiler.profiler.listeners.remove(_on_sql)
+        if _installed_sql_tracing:
+            sql_profiler.uninstall_sql_tracing()
+            _installed_sql_tracing = False
+
+
+# ============ EXPORT ============
+
+def to_chrome_trace(trace: RerunTrace) -> Dict[str, Any]:
+    """Chrome Trace Event Format with complete ("X") events in microseconds"""
+    events = [{
+        'name': trace.label, 'cat': 'rerun', 'ph': 'X', 'pid': 1, 'tid': 1,
+        'ts': 0, 'dur': round(trace.duration * 1e6, 3), 'args': {}
+    }]
+    for s in trace.nested_spans():
+        events.append({
+            'name': s.name, 'cat': s.category, 'ph': 'X', 'pid': 1, 'tid': 1,
+            'ts': round(s.start * 1e6, 3), 'dur': round(s.duration * 1e6, 3),
+            'args': {k: str(v) for k, v in s.args.items()}
+        })
+    return {
+        'traceEvents': events,
+        'displayTimeUnit': 'ms',
+        'otherData': {'label': trace.label, 'started_at': trace.started_at.isoformat()}
+    }
+
+
+def to_speedscope(trace: RerunTrace) -> Dict[str, Any]:
+    """Speedscope evented profile in milliseconds"""
+    frames: List[Dict[str, str]] = []
+    frame_index: Dict[str, int] = {}
+    events = []
+    stack: List[Span] = []
+
+    def frame_for(s: Span) -> int:
+        key = f"{s.category}:{s.name}"
+        if key not in frame_index:
+            frame_index[key] = len(frames)
+            frames.append({'name': s.name, 'file': s.category})
+        return frame_index[key]
+
+    def close_until(t: float):
+        while stack and stack[-1].end <= t:
+            done = stack.pop()
+            events.append({'type': 'C', 'frame': frame_for(done), 'at': done.end * 1000})
+
+    for s in trace.nested_spans():
+        close_until(s.start)
+        events.append({'type': 'O', 'frame': frame_for(s), 'at': s.start * 1000})
+        stack.append(s)
+    close_until(float('inf'))
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': trace.label,
+        'exporter': 'utils.rerun_profiler',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'evented',
+            'name': trace.label,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': max(trace.duration * 1000, events[-1]['at'] if events else 0),
+            'events': events
+        }]
+    }
+
+
+def write_trace(trace: RerunTrace, directory: str = None) -> Dict[str, str]:
+    """Write both formats; returns {'chrome': path, 'speedscope': path}"""
+    directory = directory or PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    safe_label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in trace.label)
+    base = os.path.join(directory, f"{trace.started_at:%Y%m%d_%H%M%S_%f}_{safe_label}")
+    paths = {'chrome': f"{base}.trace.json", 'speedscope': f"{base}.speedscope.json"}
+    with open(paths['chrome'], 'w', encoding='utf-8') as f:
+        json.dump(to_chrome_trace(trace), f)
+    with open(paths['speedscope'], 'w', encoding='utf-8') as f:
+        json.dump(to_speedscope(trace), f)
+    _prune(directory)
+    return paths
+
+
+def _prune(directory: str):
+    """Keep only the newest MAX_PROFILE_FILES profiles of each format"""
+    for suffix in ('.trace.json', '.speedscope.json'):
+        files = sorted(f for f in os.listdir(directory) if f.endswith(suffix))
+        for old in files[:-MAX_PROFILE_FILES]:
+            try:
+                os.remove(os.path.join(directory, old))
+            except OSError:
+                pass
+
+
+def list_profiles(directory: str = None) -> List[Dict[str, Any]]:
+    """Written profiles, newest first"""
+    directory = directory or PROFILE_DIR
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if name.endswith('.trace.json'):
+            base = name[:-len('.trace.json')]
+            profiles.append({
+                'name': base,
+                'chrome': os.path.join(directory, name),
+                'speedscope': os.path.join(directory, f"{base}.speedscope.json")
+            })
+    return profiles
+
+
+# ============ ENTRY POINT ============
+
+def profiling_requested(session_state=None, query_params=None) -> bool:
+    """?profile=1, the admin setting in session state, or RERUN_PROFILER=true"""
+    if os.getenv('RERUN_PROFILER', 'false').lower() == 'true':
+        return True
+    if query_params is not None and str(query_params.get('profile', '')).lower() in ('1', 'true', 'yes'):
+        return True
+    return bool(session_state is not None and session_state.get(SESSION_FLAG))
+
+
+@contextmanager
+def profile_rerun(label: str, enabled: bool = True,
+                  directory: str = None) -> Iterator[Optional[RerunTrace]]:
+    """
+    Profile one script run and write its trace files on exit.
+
+    Yields the RerunTrace (None when disabled or already inside a profiled run).
+    """
+    if not enabled or current_trace() is not None:
+        yield None
+        return
+
+    trace = RerunTrace(label)
+    _state.trace = trace
+    _attach_listeners()
+    try:
+        yield trace
+    finally:
+        trace.duration = time.perf_counter() - trace.start
+        _state.trace = None
+        _detach_listeners()
+        try:
+            paths = write_trace(trace, directory)
+            logger.info(f"Rerun profile written: {paths['chrome']} ({trace.duration * 1000:.0f} ms, "
+                        f"{len(trace.spans)} spans)")
+        except OSError as e:
+            logger.warning(f"Could not write rerun profile: {e}")
@@ -0,0 +1,128 @@
+"""
+Request coalescing and per-model concurrency limits for upstream AI calls.
+
+Streamlit runs every session in its own thread of one server process, so
+several users opening the same step (or one user double-clicking, which
+starts a new rerun while the old one is still waiting) issue identical
+OpenAI requests at the same time. SingleFlight lets the first caller for a
+fingerprint perform the call while concurrent callers with the same
+fingerprint wait for its result (or its exception) instead of sending their
+own request. Nothing is cached once the call finishes; see
+services.response_cache for that.
+
+ModelConcurrency bounds in-flight requests per upstream model with a
+semaphore so a burst of sessions queues locally instead of tripping the
+provider's rate limits.
+
+    value = ai_calls.do(fingerprint('embedding', model, text), lambda: create(text))
+    with model_limits.limit(model):
+        response = client.chat.completions.create(...)
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of request parameters (dicts are compared by content)"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """Process-wide coalescing of concurrent calls with the same key"""
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any], call: str = 'ai',
+           timeout: Optional[float] = None) -> Any:
+        """Run fn() unless a call with this key is in flight; then wait for that one's result.
+
+        Exceptions raised by the leading call are raised in every waiting caller.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            metrics.inc('ai_singleflight_total', call=call, role='shared')
+            return future.result(timeout)
+
+        metrics.inc('ai_singleflight_total', call=call, role='leader')
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class ModelConcurrency:
+    """Bounded number of concurrent requests per upstream model"""
+
+    def __init__(self, default_limit: Optional[int] = None, limits: Optional[Dict[str, int]] = None):
+        self.default_limit = default_limit if default_limit is not None else \
+            int(os.getenv('AI_MAX_CONCURRENT_REQUESTS', '4'))
+        self.limits = dict(limits or {})
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, model: str) -> int:
+        """Per-model override from limits or AI_MAX_CONCURRENT_<MODEL> (e.g. AI_MAX_CONCURRENT_GPT_4O_MINI)"""
+        if model in self.limits:
+            return self.limits[model]
+        env_name = 'AI_MAX_CONCURRENT_' + ''.join(c if c.isalnum() else '_' for c in model).upper()
+        return int(os.getenv(env_name, self.default_limit))
+
+    def _semaphore(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if model not in self._semaphores:
+                self._semaphores[model] = threading.BoundedSemaphore(max(1, self.limit_for(model)))
+            return self._semaphores[model]
+
+    @contextmanager
+    def limit(self, model: str) -> Iterator[None]:
+        """Hold one of the model's slots for the duration of the block"""
+        semaphore = self._semaphore(model or 'unknown')
+        start = time.perf_counter()
+        semaphore.acquire()
+        waited = time.perf_counter() - start
+        metrics.observe('ai_concurrency_wait_seconds', waited, model=model)
+        if waited > 1:
+            logger.info(f"[AI_LIMIT] Waited {waited:.1f}s for a {model} slot")
+        gauge = metrics.gauge('ai_requests_in_flight', model=model)
+        gauge.inc()
+        try:
+            yield
+        finally:
+            gauge.dec()
+            semaphore.release()
+
+
+ai_calls = SingleFlight()
+model_limits = ModelConcurrency()
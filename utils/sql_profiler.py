@@ -0,0 +1,341 @@
+"""
+SQL tracing and slow-query profiling for sqlite3.
+
+A tracing connection factory times every execute/executemany/executescript and
+records the statement fingerprint (literals and IN-lists normalized), the
+calling module/function, rows returned and duration. Recent statements go into
+a ring buffer; per-fingerprint totals into an aggregate table, and durations
+also feed the metrics registry as sql_query_seconds{site}.
+
+install_sql_tracing() makes sqlite3.connect use the tracing factory for every
+call site in the process (database.py, ui/*, services/*, utils/*), so call
+sites need no changes. It is off by default: enable with SQL_PROFILER=true or
+from the admin "SQL profiler" tab.
+"""
+
+import re
+import sys
+import time
+import sqlite3
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RING_BUFFER_SIZE = 2000
+MAX_FINGERPRINTS = 1000
+MAX_SITES_PER_STATEMENT = 10
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST = re.compile(r"(VALUES\s*\(\?\+?\))(?:\s*,\s*\(\?\+?\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+# Frames from these files are skipped when finding the call site
+_INTERNAL_FILES = (__file__.rstrip('c'), sqlite3.__file__.rsplit('/', 1)[0])
+
+
+def fingerprint(sql: str) -> str:
+    """Normalize a statement so calls differing only in literals aggregate together"""
+    normalized = _STRING_LITERAL.sub('?', sql)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _WHITESPACE.sub(' ', normalized).strip().rstrip(';')
+    normalized = _IN_LIST.sub('(?+)', normalized)
+    normalized = _VALUES_LIST.sub(r'\1', normalized)
+    return normalized
+
+
+def _call_site() -> str:
+    """module.function:line of the first frame outside this module and sqlite3"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_INTERNAL_FILES) and 'contextlib' not in filename:
+            module = frame.f_globals.get('__name__', '?')
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return '?'
+
+
+@dataclass
+class StatementStats:
+    """Aggregate for one statement fingerprint"""
+    fingerprint: str
+    example_sql: str
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    rows: int = 0
+    sites: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class SQLProfiler:
+    """Ring buffer of recent statements plus per-fingerprint aggregates"""
+
+    def __init__(self, buffer_size: int = RING_BUFFER_SIZE, max_fingerprints: int = MAX_FINGERPRINTS):
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self.stats: Dict[str, StatementStats] = {}
+        self.max_fingerprints = max_fingerprints
+        # Called as listener(entry, start, duration) for every recorded statement
+        self.listeners: List[Callable[[Dict[str, Any], float, float], None]] = []
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, duration: float, site: str, database: str,
+               rowcount: int = -1, start: Optional[float] = None) -> Dict[str, Any]:
+        """Record one execution; returns the ring buffer entry (rows are added as they are fetched)"""
+        fp = fingerprint(sql)
+        entry = {
+            'timestamp': time.time(),
+            'fingerprint': fp,
+            'site': site,
+            'database': database,
+            'duration_ms': duration * 1000,
+            'rows': max(rowcount, 0)
+        }
+        with self._lock:
+            stats = self.stats.get(fp)
+            if stats is None:
+                if len(self.stats) >= self.max_fingerprints:
+                    fp = '<other>'
+                    stats = self.stats.setdefault(fp, StatementStats(fp, ''))
+                else:
+                    stats = self.stats[fp] = StatementStats(fp, sql.strip())
+            stats.calls += 1
+            stats.total_seconds += duration
+            stats.max_seconds = max(stats.max_seconds, duration)
+            stats.rows += max(rowcount, 0)
+            if site in stats.sites or len(stats.sites) < MAX_SITES_PER_STATEMENT:
+                stats.sites[site] = stats.sites.get(site, 0) + 1
+            self.recent.append(entry)
+
+        try:
+            from utils.metrics import metrics
+            metrics.observe('sql_query_seconds', duration, site=site.rsplit(':', 1)[0])
+        except ImportError:
+            pass
+        for listener in self.listeners:
+            listener(entry, time.perf_counter() - duration if start is None else start, duration)
+        return entry
+
+    def add_rows(self, entry: Dict[str, Any], rows: int):
+        """Count rows fetched after execution"""
+        if rows <= 0:
+            return
+        entry['rows'] += rows
+        with self._lock:
+            stats = self.stats.get(entry['fingerprint'])
+            if stats is not None:
+                stats.rows += rows
+
+    def top_statements(self, limit: int = 20, order_by: str = 'total_seconds') -> List[Dict[str, Any]]:
+        """Statements sorted by total time (or calls / max_seconds / rows)"""
+        with self._lock:
+            stats = list(self.stats.values())
+        stats.sort(key=lambda s: getattr(s, order_by), reverse=True)
+        rows = []
+        for s in stats[:limit]:
+            row = asdict(s)
+            row['mean_seconds'] = s.mean_seconds
+            row['sites'] = dict(sorted(s.sites.items(), key=lambda kv: -kv[1]))
+            rows.append(row)
+        return rows
+
+    def recent_statements(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.recent)[-limit:][::-1]
+
+    def reset(self):
+        with self._lock:
+            self.recent.clear()
+            self.stats.clear()
+
+    def save_aggregates(self, db_path: str) -> int:
+        """Persist aggregates to the sql_query_stats table (untraced connection)"""
+        rows = self.top_statements(limit=self.max_fingerprints)
+        conn = _original_connect(db_path, timeout=30)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sql_query_stats (
+                    fingerprint TEXT PRIMARY KEY,
+                    example_sql TEXT,
+                    calls INTEGER,
+                    total_ms REAL,
+                    max_ms REAL,
+                    rows INTEGER,
+                    top_site TEXT,
+                    captured_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.executemany("""
+                INSERT OR REPLACE INTO sql_query_stats
+                (fingerprint, example_sql, calls, total_ms, max_ms, rows, top_site)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (r['fingerprint'], r['example_sql'], r['calls'], r['total_seconds'] * 1000,
+                 r['max_seconds'] * 1000, r['rows'], next(iter(r['sites']), None))
+                for r in rows
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+
+profiler = SQLProfiler()
+
+
+class TracingCursor(sqlite3.Cursor):
+    """Cursor that times statements and counts fetched rows"""
+
+    _trace_entry: Optional[Dict[str, Any]] = None
+
+    def _timed(self, method, sql, *args):
+        start = time.perf_counter()
+        try:
+            return method(self, sql, *args)
+        finally:
+            duration = time.perf_counter() - start
+            self._trace_entry = profiler.record(
+                sql, duration, _call_site(), self.connection.trace_database,
+                rowcount=self.rowcount if self.rowcount is not None else -1, start=start
+            )
+
+    def execute(self, sql, parameters=()):
+        return self._timed(sqlite3.Cursor.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(sqlite3.Cursor.executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._timed(sqlite3.Cursor.executescript, sql_script)
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None and self._trace_entry is not None:
+            profiler.add_rows(self._trace_entry, 1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if self._trace_entry is not None:
+            profiler.add_rows(self._trace_entry, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        if self._trace_entry is not None:
+            profiler.add_rows(self._trace_entry, len(rows))
+        return rows
+
+    def __next__(self):
+        row = super().__next__()
+        if self._trace_entry is not None:
+            profiler.add_rows(self._trace_entry, 1)
+        return row
+
+
+class TracingConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are traced"""
+
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        self.trace_database = str(database)
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or TracingCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def connect(database, *args, **kwargs) -> sqlite3.Connection:
+    """sqlite3.connect returning a tracing connection"""
+    kwargs.setdefault('factory', TracingConnection)
+    return _original_connect(database, *args, **kwargs)
+
+
+_original_connect = sqlite3.connect
+_install_lock = threading.Lock()
+
+
+def _patched_connect(database, *args, **kwargs):
+    # factory is the 6th positional parameter of sqlite3.connect
+    if 'factory' not in kwargs and len(args) < 5:
+        kwargs['factory'] = TracingConnection
+    return _original_connect(database, *args, **kwargs)
+
+
+def is_tracing_installed() -> bool:
+    return sqlite3.connect is _patched_connect
+
+
+def install_sql_tracing():
+    """Route every sqlite3.connect call in the process through the tracing factory"""
+    with _install_lock:
+        if not is_tracing_installed():
+            sqlite3.connect = _patched_connect
+            logger.info("SQL tracing enabled")
+
+
+def uninstall_sql_tracing():
+    with _install_lock:
+        if is_tracing_installed():
+            sqlite3.connect = _original_connect
+            logger.info("SQL tracing disabled")
+
+
+# ============ EXPLAIN QUERY PLAN ============
+
+_NAMED_PARAM = re.compile(r"[:@$]([A-Za-z_]\w*)")
+_EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')
+
+
+def explain_query_plan(db_path: str, sql: str) -> Dict[str, Any]:
+    """
+    Run EXPLAIN QUERY PLAN for a recorded statement.
+
+    Parameters are bound to NULL, which does not change the chosen plan.
+
+    Returns:
+        Dict with plan rows, full-scan tables and an error message if the
+        statement cannot be explained
+    """
+    result = {'plan': [], 'full_scans': [], 'error': None}
+    statement = sql.strip().rstrip(';')
+    if not statement.upper().startswith(_EXPLAINABLE):
+        result['error'] = "Only SELECT/INSERT/UPDATE/DELETE statements can be explained"
+        return result
+
+    named = _NAMED_PARAM.findall(_STRING_LITERAL.sub("''", statement))
+    params: Any = {name: None for name in named} if named else \
+        [None] * _STRING_LITERAL.sub("''", statement).count('?')
+
+    conn = _original_connect(db_path, timeout=30)
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {statement}", params).fetchall()
+    except sqlite3.Error as e:
+        result['error'] = str(e)
+        return result
+    finally:
+        conn.close()
+
+    for node_id, parent, _, detail in rows:
+        result['plan'].append({'id': node_id, 'parent': parent, 'detail': detail})
+        # "SCAN table" without an index is a full table scan
+        if detail.startswith('SCAN ') and 'USING' not in detail:
+            result['full_scans'].append(detail[5:].split(' ')[0])
+    return result
@@ -0,0 +1,141 @@
+"""
+Process-level startup: one-time initialization, background tasks and lazy pages.
+
+Streamlit re-executes app.py on every rerun of every session, but imported
+modules live for the whole server process. Initialization registered here
+runs once per process (not once per session), and tasks marked background
+run in daemon threads so the first render does not wait for CPV seeding,
+Qdrant collection setup or heavy imports. Each task has a readiness flag
+that pages can check or wait on.
+
+lazy_callable() defers importing a page module (admin panel, AI manager,
+dashboard) until the page is first rendered.
+"""
+
+import time
+import logging
+import importlib
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TaskStatus:
+    """State of a startup task"""
+    name: str
+    background: bool
+    state: str = 'pending'          # pending, running, ready, failed
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class StartupManager:
+    """Runs registered initialization tasks once per process"""
+
+    def __init__(self):
+        self._tasks: Dict[str, Callable[[], Any]] = {}
+        self._status: Dict[str, TaskStatus] = {}
+        self._events: Dict[str, threading.Event] = {}
+        self._results: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._started = False
+
+    def register(self, name: str, fn: Callable[[], Any], background: bool = False):
+        """Register a task; foreground tasks run in order before start() returns.
+
+        Registering an existing name again (app.py is re-executed on every
+        rerun) keeps its status and readiness flag.
+        """
+        self._tasks[name] = fn
+        if name in self._status:
+            return
+        self._status[name] = TaskStatus(name=name, background=background)
+        self._events[name] = threading.Event()
+
+    def task(self, name: str, background: bool = False):
+        """Decorator form of register()"""
+        def decorator(fn):
+            self.register(name, fn, background)
+            return fn
+        return decorator
+
+    def _run(self, name: str):
+        status = self._status[name]
+        status.state = 'running'
+        start = time.perf_counter()
+        try:
+            self._results[name] = self._tasks[name]()
+            status.state = 'ready'
+        except Exception as e:
+            status.state = 'failed'
+            status.error = str(e)
+            logger.warning(f"[STARTUP] {name} failed: {e}")
+        finally:
+            status.seconds = time.perf_counter() - start
+            self._events[name].set()
+            logger.info(f"[STARTUP] {name} {status.state} in {status.seconds * 1000:.0f}ms")
+
+    def start(self) -> bool:
+        """Run foreground tasks and launch background ones; only the first call does anything.
+
+        Returns True for the call that performed the initialization.
+        """
+        with self._lock:
+            if self._started:
+                return False
+            self._started = True
+        for name, status in self._status.items():
+            if status.background:
+                threading.Thread(target=self._run, args=(name,), name=f'startup-{name}', daemon=True).start()
+            else:
+                self._run(name)
+        return True
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def ready(self, name: str) -> bool:
+        """True once the task finished successfully"""
+        status = self._status.get(name)
+        return status is not None and status.state == 'ready'
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Block until the task finished (successfully or not); False on timeout"""
+        event = self._events.get(name)
+        return event.wait(timeout) if event else False
+
+    def result(self, name: str) -> Any:
+        return self._results.get(name)
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [asdict(status) for status in self._status.values()]
+
+
+startup = StartupManager()
+
+
+def lazy_callable(module: str, attribute: str) -> Callable[..., Any]:
+    """A function that imports `module` on first call and forwards to `attribute`"""
+    target: List[Callable[..., Any]] = []
+
+    def call(*args, **kwargs):
+        if not target:
+            target.append(getattr(importlib.import_module(module), attribute))
+        return target[0](*args, **kwargs)
+
+    call.__name__ = attribute
+    call.__qualname__ = f"lazy({module}.{attribute})"
+    return call
+
+
+def warm_imports(*modules: str):
+    """Import modules (for a background task) so a later page switch finds them loaded"""
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.debug(f"[STARTUP] could not warm {module}: {e}")
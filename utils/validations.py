@@ -10,6 +10,7 @@ import sqlite3
 from utils.cpv_manager import get_cpv_by_code
 from utils import criteria_manager
 import database
+from utils.rerun_profiler import span
 
 
 class ValidationManager:
@@ -273,7 +274,8 @@ class ValidationManager:
         
         # Call the validator if found
         if validator_func:
-            is_valid, screen_errors = validator_func()
+            with span(getattr(validator_func, '__name__', 'validator'), 'validation'):
+                is_valid, screen_errors = validator_func()
             self.errors.extend(screen_errors)
         
         # Expand section keys to field keys
@@ -285,15 +287,19 @@ class ValidationManager:
         
         # Run generic validations (skip _validate_required_fields for step 0 to avoid duplicates)
         if step_number != 0:
-            self._validate_required_fields(expanded_keys, step_number)
-        self._validate_dropdowns(expanded_keys)
+            with span('_validate_required_fields', 'validation'):
+                self._validate_required_fields(expanded_keys, step_number)
+        with span('_validate_dropdowns', 'validation'):
+            self._validate_dropdowns(expanded_keys)
         
         # Only run multiple entries validation when we're on a screen that has that data
         # Check if we're on the client info screen (has clientInfo fields)
         if any('clientInfo' in key for key in expanded_keys):
-            self._validate_multiple_entries()
+            with span('_validate_multiple_entries', 'validation'):
+                self._validate_multiple_entries()
         
-        self._validate_conditional_requirements()
+        with span('_validate_conditional_requirements', 'validation'):
+            self._validate_conditional_requirements()
         
         is_valid = len(self.errors) == 0
         import logging
@@ -2,14 +2,51 @@
 """
 Widget synchronization utilities for Streamlit.
 Ensures widget values are properly synced to lot keys before validation.
+
+FieldRenderer registers widget_changed() as the on_change callback of its
+widgets. Streamlit runs the callback at the start of the rerun that follows
+an edit, so the lot key is updated at once and the widget is recorded in a
+dirty set. Validation then only looks at the widgets in that set instead of
+scanning the whole session (see sync_changed_widgets). The full scan remains
+for sessions whose widgets were not rendered with callbacks.
 """
 
 import streamlit as st
 from typing import Dict, Any, List
 import logging
 
+from utils.metrics import metrics
+
 logger = logging.getLogger(__name__)
 
+# Widget key -> lot key of widgets changed since the last validation (the dirty set)
+DIRTY_WIDGETS_KEY = '_widget_sync_dirty'
+# Set once FieldRenderer has rendered a widget with the on_change callback
+CALLBACKS_ACTIVE_KEY = '_widget_sync_callbacks'
+
+
+def widget_callback(widget_key: str, session_key: str) -> Dict[str, Any]:
+    """
+    on_change/args keyword arguments that keep a widget's lot key in sync.
+    
+    Usage:
+        st.text_input(label, key=widget_key, **widget_callback(widget_key, session_key))
+    """
+    if not st.session_state.get(CALLBACKS_ACTIVE_KEY):
+        st.session_state[CALLBACKS_ACTIVE_KEY] = True
+    return {'on_change': widget_changed, 'args': (widget_key, session_key)}
+
+
+def widget_changed(widget_key: str, session_key: str):
+    """on_change callback: copy the new widget value to its lot key and mark it dirty"""
+    if widget_key not in st.session_state:
+        return
+    st.session_state[session_key] = st.session_state[widget_key]
+    dirty = st.session_state.get(DIRTY_WIDGETS_KEY)
+    if dirty is None:
+        dirty = st.session_state[DIRTY_WIDGETS_KEY] = {}
+    dirty[widget_key] = session_key
+
 
 class WidgetSync:
     """
@@ -32,6 +69,7 @@ class WidgetSync:
             Number of values synced
         """
         synced_count = 0
+        metrics.inc('widget_sync_full_scans_total')
         
         # Find all widget keys that need syncing
         widget_keys = [k for k in st.session_state.keys() if k.startswith('widget_')]
@@ -55,6 +93,36 @@ class WidgetSync:
         
         return synced_count
     
+    @staticmethod
+    def sync_changed_widgets():
+        """
+        Sync the widgets changed since the last call (the dirty set).
+        
+        The on_change callback has already copied the values; this re-checks
+        only those widgets, in case a renderer wrote the lot key afterwards,
+        and empties the set.
+        
+        Returns:
+            Number of values synced
+        """
+        dirty = st.session_state.get(DIRTY_WIDGETS_KEY)
+        if not dirty:
+            return 0
+        
+        synced_count = 0
+        for widget_key, lot_key in dirty.items():
+            if widget_key not in st.session_state:
+                continue
+            widget_value = st.session_state[widget_key]
+            if st.session_state.get(lot_key) != widget_value:
+                st.session_state[lot_key] = widget_value
+                synced_count += 1
+                logger.debug(f"Synced {widget_key} -> {lot_key}")
+        
+        metrics.inc('widget_sync_dirty_widgets_total', len(dirty))
+        st.session_state[DIRTY_WIDGETS_KEY] = {}
+        return synced_count
+    
     @staticmethod
     def sync_widget_for_field(field_name: str, lot_index: int = 0):
         """
@@ -86,8 +154,12 @@ class WidgetSync:
             st.session_state['lots'] = [{'name': 'Splošni sklop', 'index': 0}]
             st.session_state['current_lot_index'] = 0
         
-        # Sync all widget values
-        synced = WidgetSync.sync_all_widget_values()
+        # Widgets rendered with callbacks report their own changes;
+        # only sessions without them need the full scan
+        if st.session_state.get(CALLBACKS_ACTIVE_KEY):
+            synced = WidgetSync.sync_changed_widgets()
+        else:
+            synced = WidgetSync.sync_all_widget_values()
         
         if synced > 0:
             logger.info(f"Synced {synced} widget values before validation")